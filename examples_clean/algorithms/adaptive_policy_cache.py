@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Adaptive Policy Cache - выбор политики вытеснения на лету по теневым кэшам
+
+CacheBenchmark.print_summary называет лучшую политику только после
+прогона. Здесь выбор делается во время работы: рядом с обслуживающим
+кэшем живут маленькие теневые экземпляры LRU, LFU, ARC, S3-FIFO и SIEVE.
+
+- Пространственная выборка (как в SHARDS, см. miss_ratio_curve.py):
+  тени видят только ключи, чей перемешанный хэш попадает в долю
+  sample_rate, и имеют ёмкость capacity * sample_rate. На такой выборке
+  hit rate тени приближает hit rate полноразмерного кэша той же политики.
+- Тени хранят только ключи (значение - общий True), их суммарная ёмкость -
+  len(policies) * sample_rate от основной, по умолчанию 5%. Запрос вне
+  выборки стоит одного умножения хэша и сравнения, запрос выборки -
+  обращения к len(policies) теням.
+- Каждые window запросов выборки попадания теней складываются в оценки
+  с экспоненциальным затуханием (decay). Если лучшая тень опережает
+  текущую политику больше чем на min_gain по hit rate, обслуживающий кэш
+  заменяется новым экземпляром лучшей политики.
+- Переключение не теряет содержимое: старый кэш становится сливаемым,
+  промах нового кэша ищет ключ в старом и переносит найденное. Каждая
+  вставка в новый кэш сверх общей ёмкости вытесняет элемент из старого
+  его собственной политикой, поэтому вместе они не больше capacity.
+  Слив заканчивается, когда новый кэш заполнен или старый опустел.
+
+AdaptiveCacheStrategy из misc/hybrid_approaches.py адаптирует другое:
+паттерн доступа (cache-aside, read-through, write-through) для каждого
+ключа по соотношению чтений и записей. Здесь адаптируется политика
+вытеснения всего кэша по hit rate теней. Подходы не пересекаются:
+AdaptivePolicyCache можно передать в AdaptiveCacheStrategy как cache.
+
+hash() строк зависит от PYTHONHASHSEED, поэтому выборка ключей-строк
+различается между запусками; для воспроизводимости нужны целые ключи
+или фиксированный PYTHONHASHSEED.
+"""
+
+import random
+import time
+
+from arc_adaptive_algorithm import ARCCache
+from cache_base import CacheBase, NullStatsRecorder
+from lfu_least_frequently_used import LFUCache
+from lru_doubly_linked_list import LRUCache
+from s3_fifo import S3FIFOCache
+from sieve_eviction import SIEVECache
+
+
+# Политики-кандидаты по умолчанию: имя -> класс (capacity, stats=...)
+DEFAULT_POLICIES = {
+    'LRU': LRUCache,
+    'LFU': LFUCache,
+    'ARC': ARCCache,
+    'S3-FIFO': S3FIFOCache,
+    'SIEVE': SIEVECache
+}
+
+# Хэш выборки - фибоначчиево хеширование младших 32 бит hash(key) (у целых
+# ключей hash(key) == key). В выборку входят верхние значения хэша: ключ 0,
+# обычно самый горячий, даёт хэш 0 и не попадает в неё всегда
+SAMPLE_MULTIPLIER = 0x9E3779B1
+SAMPLE_MASK = 0xFFFFFFFF
+
+
+def sample_hash(key):
+    """Перемешанный хэш ключа в диапазоне [0, 2**32)"""
+    return (hash(key) * SAMPLE_MULTIPLIER) & SAMPLE_MASK
+
+
+def evict_one(cache):
+    """
+    Вытеснить из cache один элемент по его собственной политике
+
+    Returns:
+        False, если политика неизвестна и вытеснять нечем
+    """
+    if isinstance(cache, LRUCache):
+        cache.delete(next(iter(cache.cache)))
+    elif isinstance(cache, ARCCache):
+        cache._replace(None)
+    elif hasattr(cache, '_evict'):
+        # LFUCache, S3FIFOCache, SIEVECache
+        cache._evict()
+    else:
+        return False
+    return True
+
+
+class AdaptivePolicyCache(CacheBase):
+    """Кэш, переключающий политику по hit rate теневых кэшей на выборке ключей"""
+
+    def __init__(self, capacity, policies=None, initial=None, sample_rate=0.01,
+                 window=500, decay=0.5, min_gain=0.02, stats=None):
+        """
+        Инициализация адаптивного кэша
+
+        Args:
+            capacity: Максимальный размер кэша
+            policies: dict имя -> класс политики (None - DEFAULT_POLICIES)
+            initial: Имя начальной политики (None - первая в policies)
+            sample_rate: Доля ключей, которую видят тени (0, 1]
+            window: Запросов выборки между решениями
+            decay: Вес прошлых окон в оценках [0, 1)
+            min_gain: Минимальный выигрыш в hit rate для переключения
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if not 0 < sample_rate <= 1:
+            raise ValueError("Sample rate must be in (0, 1]")
+        if window <= 0:
+            raise ValueError("Window must be positive")
+        if not 0 <= decay < 1:
+            raise ValueError("Decay must be in [0, 1)")
+
+        self.capacity = capacity
+        self.policies = dict(policies if policies is not None else DEFAULT_POLICIES)
+        if not self.policies:
+            raise ValueError("At least one policy is required")
+        self.names = list(self.policies)
+        if initial is None:
+            initial = self.names[0]
+        if initial not in self.policies:
+            raise ValueError(f"Unknown policy: {initial}")
+
+        self.sample_rate = sample_rate
+        self.cutoff = SAMPLE_MASK + 1 - max(1, round(sample_rate * (SAMPLE_MASK + 1)))
+        self.shadow_capacity = max(1, round(capacity * sample_rate))
+        self.window = window
+        self.decay = decay
+        self.min_gain = min_gain
+
+        # Статистика: обслуживающий кэш пишет прямо в общий recorder
+        self._init_stats(stats)
+        self.current = self.names.index(initial)
+        self.serving = self.policies[initial](capacity, stats=self.stats)
+        self.draining = None  # Прежний обслуживающий кэш, пока идёт перенос
+
+        self._reset_shadows()
+        self.switches = 0
+        self.migrated = 0
+        self.history = []  # (номер окна, имя политики) при каждом переключении
+
+    def _reset_shadows(self):
+        """Новые пустые тени и обнулённые оценки"""
+        self.shadows = [policy(self.shadow_capacity, stats=NullStatsRecorder())
+                        for policy in self.policies.values()]
+        self.window_hits = [0] * len(self.shadows)
+        self.window_count = 0
+        self.scores = [0.0] * len(self.shadows)  # Затухающие попадания теней
+        self.weight = 0.0                         # Затухающее число запросов
+        self.epochs = 0
+        self.sampled = 0
+
+    def _observe(self, key):
+        """Прогнать запрос выборки через тени (загрузка при промахе)"""
+        hits = self.window_hits
+        for index, shadow in enumerate(self.shadows):
+            if shadow.get(key) is None:
+                shadow.set(key, True)
+            else:
+                hits[index] += 1
+
+        self.sampled += 1
+        self.window_count += 1
+        if self.window_count >= self.window:
+            self._decide()
+
+    def _decide(self):
+        """Закрыть окно: обновить оценки и при явном выигрыше сменить политику"""
+        decay, scores, hits = self.decay, self.scores, self.window_hits
+        for index in range(len(scores)):
+            scores[index] = scores[index] * decay + hits[index]
+            hits[index] = 0
+        self.weight = self.weight * decay + self.window_count
+        self.window_count = 0
+        self.epochs += 1
+
+        best = max(range(len(scores)), key=scores.__getitem__)
+        if best != self.current and (scores[best] - scores[self.current]) / self.weight >= self.min_gain:
+            self._switch(best)
+
+    def _switch(self, index):
+        """Сделать политику index обслуживающей; старый кэш сливается в новый"""
+        previous = self.serving
+        previous._stats = None  # Промахи сливаемого кэша не считаются промахами запросов
+        self.draining = previous if previous.size() else None
+        self.serving = self.policies[self.names[index]](self.capacity, stats=self.stats)
+        self.current = index
+        self.switches += 1
+        self.history.append((self.epochs, self.names[index]))
+
+    def _finish_drain(self):
+        """Слив закончен, когда новый кэш полон или старый пуст"""
+        if self.serving.size() >= self.capacity or not self.draining.size():
+            self.draining = None
+
+    def _migrate(self, key):
+        """Промах обслуживающего кэша: перенести ключ из сливаемого"""
+        draining = self.draining
+        value = draining.get(key)
+        if value is None:
+            return None
+
+        draining.delete(key)
+        self.serving.set(key, value)
+        self.migrated += 1
+        if self._stats is not None:
+            # Обслуживающий кэш уже записал промах
+            self._stats.misses -= 1
+            self._stats.hits += 1
+        self._finish_drain()
+        return value
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        if (hash(key) * SAMPLE_MULTIPLIER) & SAMPLE_MASK >= self.cutoff:
+            self._observe(key)
+
+        value = self.serving.get(key)
+        if value is None and self.draining is not None:
+            return self._migrate(key)
+        return value
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Тени не меняются: они загружают ключ сами при промахе в get().
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        self.serving.set(key, value)
+        if self.draining is not None:
+            self.draining.delete(key)  # Устаревшая копия
+            self._trim_drain()
+            self._finish_drain()
+
+    def _trim_drain(self):
+        """Вытеснять из сливаемого кэша, пока оба вместе больше capacity"""
+        draining, serving = self.draining, self.serving
+        while draining.size() and serving.size() + draining.size() > self.capacity:
+            if not evict_one(draining):
+                # Политику не умеем вытеснять - слив прекращается
+                draining.clear()
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        if sample_hash(key) >= self.cutoff:
+            for shadow in self.shadows:
+                shadow.delete(key)
+
+        deleted = self.serving.delete(key)
+        if self.draining is not None and self.draining.delete(key):
+            deleted = True
+            self._finish_drain()
+        return deleted
+
+    def clear(self):
+        """Очистить кэш (текущая политика сохраняется)"""
+        self.serving.clear()
+        self.draining = None
+        self._reset_shadows()
+        self.stats.reset()
+
+    def size(self):
+        """Текущий размер кэша"""
+        size = self.serving.size()
+        if self.draining is not None:
+            size += self.draining.size()
+        return size
+
+    @property
+    def policy(self):
+        """Имя обслуживающей политики"""
+        return self.names[self.current]
+
+    def projected_hit_rates(self):
+        """Оценка hit rate каждой политики по теням (затухающее среднее)"""
+        if self.weight > 0:
+            return {name: score / self.weight for name, score in zip(self.names, self.scores)}
+        # Первое окно ещё не закрыто
+        count = self.window_count
+        return {name: hits / count if count else 0.0
+                for name, hits in zip(self.names, self.window_hits)}
+
+    def get_stats(self):
+        """Получить статистику"""
+        return {
+            **self.stats.snapshot(),
+            'current_size': self.size(),
+            'capacity': self.capacity,
+            'policy': self.policy,
+            'switches': self.switches,
+            'migrated': self.migrated,
+            'draining_size': self.draining.size() if self.draining is not None else 0,
+            'sampled_requests': self.sampled,
+            'shadow_capacity': self.shadow_capacity,
+            'shadow_overhead': self.shadow_capacity * len(self.shadows) / self.capacity,
+            'projected_hit_rates': self.projected_hit_rates()
+        }
+
+
+def _phased_requests(capacity, phase_length):
+    """Zipf -> Zipf на новых ключах -> Zipf со сканами"""
+    from workload_generators import ScanBurstsWorkload, ZipfWorkload
+
+    phases = [
+        ZipfWorkload(capacity * 20, phase_length, alpha=0.9),
+        ZipfWorkload(capacity * 20, phase_length, alpha=0.9, offset=10 ** 7),
+        ScanBurstsWorkload(ZipfWorkload(capacity * 20, alpha=0.9, offset=2 * 10 ** 7),
+                           every=20000, scan_length=capacity * 2, requests=phase_length)
+    ]
+    return [list(phase.stream(seed=seed)) for seed, phase in enumerate(phases)]
+
+
+def _run(cache, requests):
+    hits = 0
+    for key in requests:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, key)
+    return hits / len(requests)
+
+
+def demo():
+    """Демонстрация переключения политики"""
+    print("=== Adaptive Policy Cache Demo ===\n")
+
+    capacity = 5000
+    cache = AdaptivePolicyCache(capacity, initial='LFU')
+    print(f"Ёмкость {capacity}, начальная политика LFU, тени по {cache.shadow_capacity} "
+          f"ключей ({cache.get_stats()['shadow_overhead']:.0%} от основного кэша)\n")
+
+    names = ["Zipf(0.9)", "Zipf(0.9) на новых ключах", "Zipf(0.9) со сканами"]
+    for phase, (name, requests) in enumerate(zip(names, _phased_requests(capacity, 300000)), 1):
+        hit_rate = _run(cache, requests)
+        projected = ", ".join(f"{policy} {rate:.0%}"
+                              for policy, rate in cache.projected_hit_rates().items())
+        print(f"{phase}. {name}: hit rate {hit_rate:.1%}, политика {cache.policy}")
+        print(f"   Оценки теней: {projected}")
+
+    print(f"\nПереключения (окно, политика): {cache.history}, "
+          f"перенесено при сливе: {cache.migrated}")
+
+
+def benchmark():
+    """Hit rate против фиксированных политик и цена выборки на запрос"""
+    print("\n=== Benchmark ===\n")
+
+    capacity = 5000
+    phases = _phased_requests(capacity, 300000)
+    requests = [key for phase in phases for key in phase]
+
+    print("Три фазы подряд (Zipf -> Zipf на новых ключах -> Zipf со сканами):")
+    candidates = [(name, policy(capacity)) for name, policy in DEFAULT_POLICIES.items()]
+    candidates.append(("Adaptive", AdaptivePolicyCache(capacity, initial='LFU')))
+    for name, cache in candidates:
+        start = time.perf_counter()
+        hit_rate = _run(cache, requests)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<10} hit rate {hit_rate:.2%}, {elapsed / len(requests) * 1e9:.0f} ns/op")
+    print(f"  Переключения Adaptive: {cache.history}")
+
+    # Цена пути попадания: та же политика без теней и с ними
+    rng = random.Random(7)
+    hot = [rng.randrange(capacity) for _ in range(200000)]
+    print("\nПуть попадания (все ключи резидентны):")
+    for name, cache in [("LRU", LRUCache(capacity)),
+                        ("Adaptive(LRU)", AdaptivePolicyCache(capacity, initial='LRU',
+                                                              min_gain=1.0))]:
+        for key in range(capacity):
+            cache.set(key, key)
+        get = cache.get
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter_ns()
+            for key in hot:
+                get(key)
+            best = min(best, time.perf_counter_ns() - start)
+        print(f"  {name:<14} {best / len(hot):.0f} ns/op")
+
+
+def test_correctness():
+    """Тесты корректности адаптивного кэша"""
+    print("\n=== Adaptive Policy Cache Correctness Tests ===\n")
+
+    # Тест 1: Базовые операции
+    cache = AdaptivePolicyCache(3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1, "'a' should exist"
+    cache.set("a", 10)
+    assert cache.get("a") == 10, "'a' should be updated"
+    assert cache.get("missing") is None, "'missing' should not exist"
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    assert cache.size() == 1, "Only 'a' should remain"
+    assert cache.policy == 'LRU', "First policy serves by default"
+    print("✓ Test 1: Basic operations")
+
+    # Тест 2: Цикл больше кэша - LRU не попадает, кэш уходит с LRU
+    cache = AdaptivePolicyCache(1000, initial='LRU', sample_rate=0.1, window=200)
+    requests = [key % 1200 for key in range(60000)]
+    _run(cache, requests)
+    projected = cache.projected_hit_rates()
+    assert projected['LRU'] < 0.05, "Shadow LRU must miss on a loop"
+    assert cache.policy != 'LRU' and cache.switches >= 1, "Should switch away from LRU"
+    assert projected[cache.policy] >= max(projected.values()) - cache.min_gain, \
+        "Serving policy must be near the best shadow"
+    print(f"✓ Test 2: Switches away from LRU on a loop (-> {cache.policy})")
+
+    # Тест 3: Слив - содержимое переносится, hits/misses считаются по запросам
+    cache = AdaptivePolicyCache(100, initial='LRU')
+    for key in range(100):
+        cache.set(key, key * 2)
+    cache._switch(cache.names.index('LFU'))
+    assert cache.size() == 100 and cache.draining is not None, "Old cache drains"
+    hits_before, misses_before = cache.hits, cache.misses
+    assert all(cache.get(key) == key * 2 for key in range(50)), "Values survive the switch"
+    assert cache.migrated == 50, "Hits are migrated into the new cache"
+    assert (cache.hits - hits_before, cache.misses - misses_before) == (50, 0), \
+        "Migrated hits must count as hits"
+    cache.set(60, 'new')
+    assert cache.get(60) == 'new' and cache.size() == 100, "set() replaces the draining copy"
+    cache.set(1000, 'new')
+    assert cache.size() == 100, "A new key evicts from the draining cache"
+    assert cache.delete(70) and cache.get(70) is None, "delete() reaches the draining cache"
+    for key in range(100, 200):
+        cache.set(key, key)
+    assert cache.draining is None, "Drain ends once the new cache is full"
+    assert cache.size() == 100, "Capacity holds after the drain"
+
+    # Размер не превышает capacity во время слива при любой паре политик
+    for old in cache.names:
+        for new in cache.names:
+            cache = AdaptivePolicyCache(8, initial=old)
+            rng = random.Random(len(old) * 31 + len(new))
+            for key in range(8):
+                cache.set(key, key)
+            cache._switch(cache.names.index(new))
+            for _ in range(200):
+                key = rng.randint(0, 30)
+                if cache.get(key) is None:
+                    cache.set(key, key)
+                assert cache.size() <= 8, f"{old} -> {new}: size {cache.size()} > capacity"
+    print("✓ Test 3: Drain on switch")
+
+    # Тест 4: Гистерезис - без выигрыша переключений нет, тени ограничены
+    cache = AdaptivePolicyCache(2000, initial='ARC', sample_rate=0.05, window=100)
+    rng = random.Random(4)
+    _run(cache, [rng.randrange(1000) for _ in range(40000)])
+    assert cache.switches == 0, "No switch when every policy hits everything"
+    assert all(shadow.size() <= cache.shadow_capacity for shadow in cache.shadows), \
+        "Shadows stay within their capacity"
+    assert cache.get_stats()['shadow_overhead'] == 0.25, "5 shadows * 5%"
+    cache.clear()
+    assert cache.size() == 0 and cache.sampled == 0 and cache.policy == 'ARC', "Clear"
+    print("✓ Test 4: Hysteresis and bounded shadows")
+
+    # Тест 5: Выборка по ключам, а не по запросам
+    cache = AdaptivePolicyCache(10000, sample_rate=0.1)
+    sampled = [key for key in range(100000) if sample_hash(key) >= cache.cutoff]
+    assert 9000 < len(sampled) < 11000, "About sample_rate of the key space"
+    assert 4000 < sum(1 for key in sampled if key < 50000) < 6000, "Sample spread over keys"
+    for _ in range(3):
+        cache.get(sampled[0])
+        cache.get(sampled[1])
+    assert cache.sampled == 6, "Every request to a sampled key reaches the shadows"
+    print("✓ Test 5: Spatial sampling")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
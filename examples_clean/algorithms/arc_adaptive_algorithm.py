@@ -6,22 +6,237 @@ ARC динамически балансирует между LRU и LFU стра
 адаптируясь к паттернам доступа к данным.
 """
 
+from array import array
 from collections import OrderedDict
+import random
 import time
 
+from cache_base import CacheBase
+from cache_snapshot import Snapshot, remaining_ttl, write_snapshot
+from timing_wheel import ExpiryIndex, ManualClock
 
-class ARCCache:
+
+# Строка, хеш которой сверяется при восстановлении отпечатков из снимка
+SNAPSHOT_HASH_PROBE = 'ARCCache ghost fingerprints'
+
+# Перемешивание hash() для отпечатков: у целых ключей hash(k) == k, и без
+# него последовательные ключи занимают подряд идущие слоты таблицы. Одного
+# умножения мало: ключи с шагом 2**16 дают систематические совпадения
+# 16-битных отпечатков, поэтому два раунда умножения со сдвигом
+FINGERPRINT_MULTIPLIER = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+
+
+def mixed_hash(key):
+    """64-битный перемешанный hash(key): используются его старшие биты"""
+    mixed = (hash(key) * FINGERPRINT_MULTIPLIER) & MASK64
+    return ((mixed ^ (mixed >> 32)) * FINGERPRINT_MULTIPLIER) & MASK64
+
+
+class FingerprintGhostList:
+    """
+    История ARC (B1/B2) из отпечатков ключей
+
+    Вместо ключа хранится отпечаток - старшие bits бит mixed_hash(key)
+    (домашний слот таблицы - старшие биты отпечатка): кольцевой
+    буфер в порядке вытеснения и таблица с открытой адресацией
+    (отпечаток -> номер записи в кольце), всё в массивах array - без
+    объекта Python на запись. Ключи с одинаковым отпечатком неотличимы:
+    промах ложно попадает в историю с вероятностью не больше
+    len / 2**bits. Интерфейс - подмножество OrderedDict, которое
+    использует ARCCache.
+    """
+
+    TYPECODES = {16: 'H', 32: 'I', 64: 'Q'}
+
+    def __init__(self, bits=64):
+        """
+        Args:
+            bits: Размер отпечатка в битах (16, 32 или 64)
+        """
+        if bits not in self.TYPECODES:
+            raise ValueError("Fingerprint bits must be 16, 32 or 64")
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.shift = 64 - bits
+        self._reset(8)
+
+    def _reset(self, ring_size):
+        """Пустые кольцо на ring_size записей и таблица с заполнением не выше 2/3"""
+        typecode = self.TYPECODES[self.bits]
+        table_size = 1 << (ring_size * 3 // 2).bit_length()
+        self.ring = array(typecode, [0]) * ring_size
+        self.head = 0  # Номер самой старой записи кольца
+        self.tail = 0  # Номер следующей записи
+        self.table_fps = array(typecode, [0]) * table_size  # 0 - пустой слот
+        self.table_seqs = array('I', [0]) * table_size  # Номер записи mod 2**32
+        self.table_mask = table_size - 1
+        # Домашний слот - старшие биты отпечатка (младшие биты произведения
+        # зависят только от младших битов ключа)
+        self.home_shift = max(self.bits - (table_size.bit_length() - 1), 0)
+        self.count = 0
+
+    def fingerprint(self, key):
+        """Отпечаток ключа (не 0: 0 - пустой слот)"""
+        return (mixed_hash(key) >> self.shift) or self.mask
+
+    def _slot(self, fingerprint):
+        """Слот таблицы с отпечатком или пустой слот, где ему место"""
+        fps, mask = self.table_fps, self.table_mask
+        slot = (fingerprint >> self.home_shift) & mask
+        while True:
+            current = fps[slot]
+            if current == fingerprint or current == 0:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _remove_slot(self, slot):
+        """Удалить запись таблицы со сдвигом следующих (без надгробий)"""
+        fps, seqs, mask = self.table_fps, self.table_seqs, self.table_mask
+        home_shift = self.home_shift
+        hole = slot
+        while True:
+            slot = (slot + 1) & mask
+            current = fps[slot]
+            if current == 0:
+                break
+            home = (current >> home_shift) & mask
+            # Запись остаётся, если её домашний слот циклически в (hole, slot]
+            if hole <= slot:
+                stays = hole < home <= slot
+            else:
+                stays = home > hole or home <= slot
+            if not stays:
+                fps[hole] = current
+                seqs[hole] = seqs[slot]
+                hole = slot
+        fps[hole] = 0
+
+    def _live(self):
+        """Живые отпечатки от старых к новым (устаревшие записи кольца пропускаются)"""
+        ring, size = self.ring, len(self.ring)
+        for seq in range(self.head, self.tail):
+            fingerprint = ring[seq % size]
+            slot = self._slot(fingerprint)
+            if self.table_fps[slot] == fingerprint and self.table_seqs[slot] == seq & 0xFFFFFFFF:
+                yield fingerprint
+
+    def add_fingerprint(self, fingerprint):
+        """Добавить отпечаток как самую новую запись"""
+        slot = self._slot(fingerprint)
+        if self.table_fps[slot] == fingerprint:
+            return  # Как OrderedDict: существующая запись остаётся на месте
+
+        if self.tail - self.head == len(self.ring):
+            # Кольцо заполнено (в том числе устаревшими записями) - пересобираем
+            # из таблицы: живые записи по возрастанию номера
+            head = self.head
+            live = sorted(((seq - head) & 0xFFFFFFFF, fp)
+                          for fp, seq in zip(self.table_fps, self.table_seqs) if fp)
+            self._reset(max(8, len(live) * 3 // 2 + 1))
+            for _, fp in live:
+                self.add_fingerprint(fp)
+            slot = self._slot(fingerprint)
+
+        seq = self.tail
+        self.ring[seq % len(self.ring)] = fingerprint
+        self.tail += 1
+        self.table_fps[slot] = fingerprint
+        self.table_seqs[slot] = seq & 0xFFFFFFFF
+        self.count += 1
+
+    def __setitem__(self, key, value):
+        self.add_fingerprint(self.fingerprint(key))
+
+    def __contains__(self, key):
+        # Путь каждого промаха ARC - проба таблицы без вызовов методов
+        mixed = (hash(key) * FINGERPRINT_MULTIPLIER) & MASK64
+        mixed = ((mixed ^ (mixed >> 32)) * FINGERPRINT_MULTIPLIER) & MASK64
+        fingerprint = (mixed >> self.shift) or self.mask
+        fps, mask = self.table_fps, self.table_mask
+        slot = (fingerprint >> self.home_shift) & mask
+        while True:
+            current = fps[slot]
+            if current == fingerprint:
+                return True
+            if current == 0:
+                return False
+            slot = (slot + 1) & mask
+
+    def pop(self, key):
+        """Удалить ключ (запись кольца станет устаревшей)"""
+        fingerprint = self.fingerprint(key)
+        slot = self._slot(fingerprint)
+        if self.table_fps[slot] != fingerprint:
+            raise KeyError(key)
+        self._remove_slot(slot)
+        self.count -= 1
+
+    def popitem(self, last=True):
+        """Удалить самую старую запись (поддерживается только last=False)"""
+        if last:
+            raise NotImplementedError("Ghost list supports popitem(last=False) only")
+
+        ring, size = self.ring, len(self.ring)
+        while self.head < self.tail:
+            seq = self.head
+            fingerprint = ring[seq % size]
+            self.head += 1
+            slot = self._slot(fingerprint)
+            if self.table_fps[slot] == fingerprint and self.table_seqs[slot] == seq & 0xFFFFFFFF:
+                self._remove_slot(slot)
+                self.count -= 1
+                return fingerprint, None
+        raise KeyError("popitem(): ghost list is empty")
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return self._live()
+
+    def __reversed__(self):
+        return reversed(list(self._live()))
+
+    def clear(self):
+        """Очистить историю"""
+        self._reset(8)
+
+    def memory_bytes(self):
+        """Память массивов кольца и таблицы"""
+        return sum(part.itemsize * len(part)
+                   for part in (self.ring, self.table_fps, self.table_seqs))
+
+
+class ARCCache(CacheBase):
     """Адаптивный заменяемый кэш"""
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, weigher=None, max_weight=None,
+                 default_ttl=None, ttl_resolution=1.0, clock=time.monotonic,
+                 ghost_bits=None, stats=None):
         """
         Инициализация ARC кэша
 
         Args:
             capacity: Максимальный размер кэша
+            weigher: Функция weigher(key, value) -> int, вес элемента
+                (например, размер в байтах)
+            max_weight: Бюджет суммарного веса (требует weigher)
+            default_ttl: Срок жизни по умолчанию в секундах (None - бессрочно)
+            ttl_resolution: Длительность тика колеса таймеров
+            clock: Источник времени для TTL
+            ghost_bits: Хранить историю B1/B2 отпечатками ключей из
+                ghost_bits бит (16, 32, 64; None - ключи целиком)
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
+        if max_weight is not None and max_weight <= 0:
+            raise ValueError("Max weight must be positive")
+        if max_weight is not None and weigher is None:
+            raise ValueError("max_weight requires a weigher")
+        if ghost_bits is not None and ghost_bits not in FingerprintGhostList.TYPECODES:
+            raise ValueError("Ghost bits must be 16, 32 or 64")
 
         self.c = capacity  # Общий размер кэша
         self.p = 0  # Целевой размер для T1 (адаптивный параметр)
@@ -31,20 +246,39 @@ class ARCCache:
         self.T2 = OrderedDict()  # Недавно использованные МНОГОКРАТНО
 
         # B1, B2 - история удалённых ключей (ghost entries)
-        self.B1 = OrderedDict()  # История из T1
-        self.B2 = OrderedDict()  # История из T2
+        self.ghost_bits = ghost_bits
+        self.B1 = self._new_ghost_list()  # История из T1
+        self.B2 = self._new_ghost_list()  # История из T2
+
+        # Учёт веса резидентных элементов (только если задан weigher)
+        self.weigher = weigher
+        self.max_weight = max_weight
+        self.weights = {}  # key -> вес
+        self.current_weight = 0
+
+        # Сроки жизни резидентных элементов (только для ключей с TTL)
+        self.default_ttl = default_ttl
+        self.expiry = ExpiryIndex(tick=ttl_resolution, clock=clock)
+        self._deadlines = self.expiry.deadlines
 
         # Статистика
-        self.hits = 0
-        self.misses = 0
+        self._init_stats(stats)
         self.ghost_hits = 0
+        self.expirations = 0
+
+    def _new_ghost_list(self):
+        """Список истории: OrderedDict ключей или отпечатки"""
+        if self.ghost_bits is None:
+            return OrderedDict()
+        return FingerprintGhostList(self.ghost_bits)
 
     def _replace(self, key):
         """Замена элемента при переполнении"""
         # Определяем из какого списка удалять
         if self.T1 and (
             len(self.T1) > self.p or
-            (key in self.B2 and len(self.T1) == self.p)
+            (key in self.B2 and len(self.T1) == self.p) or
+            not self.T2
         ):
             # Удаляем из T1
             old_key, _ = self.T1.popitem(last=False)
@@ -54,6 +288,56 @@ class ARCCache:
             old_key, _ = self.T2.popitem(last=False)
             self.B2[old_key] = None  # Добавляем в историю
 
+        self._release(old_key)
+        if self._stats is not None:
+            self._stats.evictions += 1
+
+    def _release(self, key):
+        """Освободить вес и срок жизни вытесненного или удалённого элемента"""
+        if self.weigher is not None:
+            self.current_weight -= self.weights.pop(key)
+        if self._deadlines:
+            self.expiry.forget(key)
+
+    def _expire(self, keys=()):
+        """
+        Удалить элементы с истёкшим сроком жизни
+
+        Истёкший ключ не попадает в историю B1/B2: его повторный
+        запрос говорит о сроке жизни, а не об ошибке политики.
+        """
+        for key in self.expiry.collect(keys):
+            if self.delete(key):
+                self.expirations += 1
+
+    def _evict_overweight(self, keep):
+        """
+        Вытеснять из T1/T2 в историю, пока суммарный вес превышает бюджет
+
+        Args:
+            keep: Только что записанный ключ (он в конце своего списка
+                и не вытесняется)
+        """
+        if self.max_weight is None:
+            return
+
+        while self.current_weight > self.max_weight:
+            t1_candidates = len(self.T1) - (1 if keep in self.T1 else 0)
+            t2_candidates = len(self.T2) - (1 if keep in self.T2 else 0)
+            if t1_candidates == 0 and t2_candidates == 0:
+                break
+
+            if t1_candidates and (len(self.T1) > self.p or not t2_candidates):
+                old_key, _ = self.T1.popitem(last=False)
+                self.B1[old_key] = None
+            else:
+                old_key, _ = self.T2.popitem(last=False)
+                self.B2[old_key] = None
+
+            self._release(old_key)
+            if self._stats is not None:
+                self._stats.evictions += 1
+
     def _maintain_size(self):
         """Поддержание размера списков истории"""
         # Размер B1 + B2 не должен превышать 2c
@@ -71,24 +355,34 @@ class ARCCache:
             key: Ключ для поиска
 
         Returns:
-            Значение или None если не найдено
+            Значение или None если не найдено (или срок жизни истёк)
         """
+        if self._deadlines:
+            self._expire((key,))
+
         if key in self.T1:
             # Перемещаем из T1 в T2 (повторное обращение)
-            self.hits += 1
+            if self._stats is not None:
+                self._stats.hits += 1
             value = self.T1.pop(key)
             self.T2[key] = value
             return value
 
         elif key in self.T2:
             # Обновляем позицию в T2
-            self.hits += 1
+            if self._stats is not None:
+                self._stats.hits += 1
             self.T2.move_to_end(key)
             return self.T2[key]
 
         # Cache miss
-        self.misses += 1
+        if self._stats is not None:
+            self._stats.misses += 1
+        self._adapt_on_miss(key)
+        return None
 
+    def _adapt_on_miss(self, key):
+        """Адаптация p при промахе по ключу из истории (ghost hit)"""
         if key in self.B1:
             # Был в истории T1 - увеличиваем размер T1
             self.ghost_hits += 1
@@ -103,16 +397,77 @@ class ARCCache:
             self.p = max(0, self.p - delta)
             self.B2.pop(key)
 
-        return None
+    def get_many(self, keys):
+        """
+        Получить значения для пакета ключей
 
-    def set(self, key, value):
+        Args:
+            keys: Итерируемый набор ключей
+
+        Returns:
+            Список значений в порядке ключей (None для промахов)
+        """
+        if self._deadlines:
+            keys = list(keys)
+            self._expire(keys)
+
+        T1, T2 = self.T1, self.T2
+        results = []
+        hits = 0
+
+        for key in keys:
+            if key in T1:
+                value = T1.pop(key)
+                T2[key] = value
+                results.append(value)
+                hits += 1
+            elif key in T2:
+                T2.move_to_end(key)
+                results.append(T2[key])
+                hits += 1
+            else:
+                self._adapt_on_miss(key)
+                results.append(None)
+
+        # Статистика обновляется один раз на пакет
+        if self._stats is not None:
+            self._stats.hits += hits
+            self._stats.misses += len(results) - hits
+        return results
+
+    def set(self, key, value, ttl=None):
         """
         Установить значение по ключу
 
         Args:
             key: Ключ
             value: Значение
+            ttl: Срок жизни в секундах (None - default_ttl)
         """
+        if self._deadlines:
+            # Истёкшие элементы освобождают место раньше живых
+            self._expire()
+        if ttl is None:
+            ttl = self.default_ttl
+
+        self._store(key, value)
+
+        if ttl is not None:
+            self.expiry.track(key, ttl)
+        elif self._deadlines:
+            # Перезапись без TTL делает ключ бессрочным
+            self.expiry.forget(key)
+
+    def _store(self, key, value):
+        """Вставка или обновление по правилам ARC"""
+        weight = None
+        if self.weigher is not None:
+            weight = self.weigher(key, value)
+            if self.max_weight is not None and weight > self.max_weight:
+                # Элемент не помещается даже в пустой кэш - не кэшируем
+                self.delete(key)
+                return
+
         if key in self.T1 or key in self.T2:
             # Ключ уже в кэше - обновляем
             if key in self.T1:
@@ -123,6 +478,11 @@ class ARCCache:
             else:
                 self.T2[key] = value
                 self.T2.move_to_end(key)
+
+            if weight is not None:
+                self.current_weight += weight - self.weights[key]
+                self.weights[key] = weight
+                self._evict_overweight(key)
             return
 
         # Проверяем наличие в истории
@@ -161,6 +521,9 @@ class ARCCache:
                     # T1 полон, удаляем оттуда
                     old_key, _ = self.T1.popitem(last=False)
                     self.B1[old_key] = None
+                    self._release(old_key)
+                    if self._stats is not None:
+                        self._stats.evictions += 1
             else:
                 # Проверяем общий размер
                 total = len(self.T1) + len(self.B1) + len(self.T2) + len(self.B2)
@@ -176,9 +539,48 @@ class ARCCache:
             # Добавляем в T1
             self.T1[key] = value
 
+        if weight is not None:
+            self.weights[key] = weight
+            self.current_weight += weight
+            self._evict_overweight(key)
+
         # Поддерживаем размеры
         self._maintain_size()
 
+    def set_many(self, items, ttl=None):
+        """
+        Установить пакет значений
+
+        ARC адаптирует p по каждому ключу отдельно, поэтому пакет
+        обрабатывается последовательно, как серия вызовов set().
+
+        Args:
+            items: dict или итерируемый набор пар (key, value)
+            ttl: Срок жизни для всех элементов пакета (None - default_ttl)
+        """
+        if isinstance(items, dict):
+            items = items.items()
+
+        set_item = self.set
+        for key, value in items:
+            set_item(key, value, ttl)
+
+    def delete(self, key):
+        """Удалить элемент из кэша (история B1/B2 не затрагивается)"""
+        if key in self.T1:
+            del self.T1[key]
+        elif key in self.T2:
+            del self.T2[key]
+        else:
+            return False
+
+        self._release(key)
+        return True
+
+    def delete_many(self, keys):
+        """Удалить пакет ключей, возвращает количество удалённых"""
+        return sum(1 for key in keys if self.delete(key))
+
     def clear(self):
         """Очистить кэш"""
         self.T1.clear()
@@ -186,20 +588,102 @@ class ARCCache:
         self.B1.clear()
         self.B2.clear()
         self.p = 0
-        self.hits = 0
-        self.misses = 0
+        self.weights.clear()
+        self.current_weight = 0
+        self.expiry.clear()
+        self.stats.reset()
         self.ghost_hits = 0
+        self.expirations = 0
+
+    def size(self):
+        """Текущий размер кэша (T1 + T2)"""
+        return len(self.T1) + len(self.T2)
+
+    def snapshot(self, path):
+        """
+        Сохранить T1/T2, историю B1/B2 и p в бинарный снимок (см. cache_snapshot)
+
+        Returns:
+            Число сохранённых записей (элементы и ghost-ключи)
+        """
+        expiry = self.expiry
+
+        def resident(entries):
+            return ((key, value, remaining_ttl(expiry, key))
+                    for key, value in reversed(entries.items()))
+
+        def ghosts(entries):
+            return ((key,) for key in reversed(entries))
+
+        # Отпечатки строятся из hash() (mixed_hash): они верны только при том же PYTHONHASHSEED
+        meta = {'capacity': self.c, 'p': self.p, 'ghost_bits': self.ghost_bits,
+                'hash_probe': mixed_hash(SNAPSHOT_HASH_PROBE)}
+        return write_snapshot(path, 'ARCCache', meta, [
+            ('T2', resident(self.T2)),
+            ('T1', resident(self.T1)),
+            ('B1', ghosts(self.B1)),
+            ('B2', ghosts(self.B2))
+        ])
+
+    def restore(self, path, now=None):
+        """
+        Заменить содержимое снимком
+
+        Списки усекаются до инвариантов ARC текущей ёмкости (T2 важнее
+        T1, свежие важнее старых), p масштабируется к новой ёмкости.
+        История из отпечатков восстанавливается, только если совпадают
+        ghost_bits и хеш-функция процесса (PYTHONHASHSEED).
+
+        Args:
+            path: Путь к файлу снимка
+            now: Время восстановления по time.time() (None - текущее);
+                простой после снимка вычитается из остатка TTL
+
+        Returns:
+            Число загруженных резидентных элементов
+        """
+        c = self.c
+        with Snapshot(path, now=now) as snapshot:
+            snapshot.expect('ARCCache')
+            t2 = list(snapshot.records('T2', limit=c))
+            t1 = list(snapshot.records('T1', limit=c - len(t2)))
+            b1 = list(snapshot.records('B1', limit=c - len(t1)))
+            b2 = list(snapshot.records('B2', limit=2 * c - len(t1) - len(t2) - len(b1)))
+            p = snapshot.meta['p'] * c / snapshot.meta['capacity']
+            ghost_bits = snapshot.meta.get('ghost_bits')
+            same_hash = snapshot.meta.get('hash_probe') == mixed_hash(SNAPSHOT_HASH_PROBE)
+
+        self.clear()
+        self.p = min(c, round(p))
+        for target, entries in ((self.T1, t1), (self.T2, t2)):
+            for key, value, ttl in reversed(entries):
+                ttl = snapshot.live_ttl(ttl)
+                if ttl is not None and ttl <= 0:
+                    continue
+                target[key] = value
+                if self.weigher is not None:
+                    self.weights[key] = self.weigher(key, value)
+                    self.current_weight += self.weights[key]
+                if ttl is not None:
+                    self.expiry.track(key, ttl)
+        for target, entries in ((self.B1, b1), (self.B2, b2)):
+            if ghost_bits is None:
+                for (key,) in reversed(entries):
+                    target[key] = None
+            elif ghost_bits == self.ghost_bits and same_hash:
+                for (fingerprint,) in reversed(entries):
+                    target.add_fingerprint(fingerprint)
+            # Иначе отпечатки не сопоставить с ключами - история начинается заново
+
+        self._evict_overweight(keep=None)
+        return len(self.T1) + len(self.T2)
 
     def get_stats(self):
         """Получить статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
-
-        return {
-            'hits': self.hits,
-            'misses': self.misses,
+        stats = {
+            **self.stats.snapshot(),
             'ghost_hits': self.ghost_hits,
-            'hit_rate': hit_rate,
+            'expirations': self.expirations,
             'p': self.p,
             'T1_size': len(self.T1),
             'T2_size': len(self.T2),
@@ -207,6 +691,15 @@ class ARCCache:
             'B2_size': len(self.B2),
             'total_cached': len(self.T1) + len(self.T2)
         }
+        if self.weigher is not None:
+            stats['current_weight'] = self.current_weight
+            stats['max_weight'] = self.max_weight
+        if self.ghost_bits is not None:
+            ghosts = len(self.B1) + len(self.B2)
+            stats['ghost_bits'] = self.ghost_bits
+            stats['ghost_memory_bytes'] = self.B1.memory_bytes() + self.B2.memory_bytes()
+            stats['ghost_false_positive_bound'] = ghosts / 2 ** self.ghost_bits
+        return stats
 
 
 def demo():
@@ -329,6 +822,103 @@ def benchmark():
     print(f"   T1/T2 ratio: {stats['T1_size']}/{stats['T2_size']}")
 
 
+def test_correctness():
+    """Тесты корректности ARC кэша"""
+    print("\n=== ARC Correctness Tests ===\n")
+
+    # Тест 1: Пакетные операции совпадают с поштучными
+    single = ARCCache(3)
+    bulk = ARCCache(3)
+    items = [("a", 1), ("b", 2), ("a", 10), ("c", 3), ("d", 4), ("e", 5)]
+    for key, value in items:
+        single.set(key, value)
+    bulk.set_many(items)
+    assert (bulk.T1, bulk.T2, bulk.B1, bulk.B2) == (single.T1, single.T2, single.B1, single.B2), \
+        "set_many must match set()"
+
+    expected = [single.get(key) for key in ["a", "missing", "e"]]
+    assert bulk.get_many(["a", "missing", "e"]) == expected, "get_many must match get()"
+    assert bulk.get_stats() == single.get_stats(), "Batch stats must match"
+    print("✓ Test 1: get_many / set_many")
+
+    # Тест 2: Удаление
+    assert bulk.delete_many(["a", "missing", "e"]) == 2, "Two keys should be deleted"
+    assert bulk.get("a") is None, "'a' should be deleted"
+    print("✓ Test 2: delete / delete_many")
+
+    # Тест 3: Ёмкость по весу
+    cache = ARCCache(100, weigher=lambda key, value: len(value), max_weight=10)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.set("c", "xxxxx")     # 13 > 10 - 'a' уходит в историю B1
+    assert cache.get("a") is None, "'a' should be evicted by weight"
+    assert cache.get_stats()['current_weight'] == 9, "Weight must be 9"
+    assert cache.get_stats()['evictions'] == 1, "One eviction expected"
+    cache.set("c", "x" * 10)    # Обновление вытесняет 'b', но не само себя
+    assert cache.get("c") == "x" * 10 and cache.get("b") is None, "'b' should be evicted"
+    cache.set("d", "x" * 11)    # Больше всего бюджета - не кэшируется
+    assert cache.get("d") is None, "Oversized value rejected"
+    cache.delete("c")
+    assert cache.get_stats()['current_weight'] == 0, "Delete releases weight"
+    print("✓ Test 3: weigher / max_weight")
+
+    # Тест 4: TTL - истёкший ключ не попадает в историю
+    clock = ManualClock()
+    cache = ARCCache(2, clock=clock, default_ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+    clock.advance(6)
+    assert cache.get("b") is None, "'b' should be expired"
+    assert "b" not in cache.B1 and "b" not in cache.B2, "Expired key is not a ghost"
+    cache.set("c", 3)
+    assert cache.get("a") == 1, "'a' should not be evicted"
+    clock.advance(30)
+    assert cache.get_many(["a", "c"]) == [None, None], "default_ttl applies"
+    stats = cache.get_stats()
+    assert stats['expirations'] == 3 and stats['evictions'] == 0, "Expiry counted separately"
+    print("✓ Test 4: ttl / default_ttl / expirations")
+
+    # Тест 5: История из отпечатков ведёт себя как история из ключей
+    rng = random.Random(5)
+    exact = ARCCache(50)
+    compact = ARCCache(50, ghost_bits=64)
+    for _ in range(20000):
+        key = f"user:{rng.randint(0, 300)}:profile"
+        assert exact.get(key) == compact.get(key), "Hits must match exact ghosts"
+        if rng.random() < 0.5:
+            exact.set(key, key)
+            compact.set(key, key)
+    assert (exact.p, exact.T1, exact.T2) == (compact.p, compact.T1, compact.T2), \
+        "p, T1 and T2 must match exact ghosts"
+    assert list(compact.B1) == [compact.B1.fingerprint(key) for key in exact.B1], \
+        "B1 order must match"
+    assert compact.get_stats()['ghost_memory_bytes'] > 0, "Ghost memory reported"
+
+    ghosts = FingerprintGhostList(bits=16)
+    twin = next(key for key in range(2, 10 ** 6)
+                if ghosts.fingerprint(key) == ghosts.fingerprint(1))
+    ghosts[1] = None
+    ghosts[twin] = None                  # Тот же 16-битный отпечаток
+    assert len(ghosts) == 1 and twin in ghosts, "Collision is a false positive"
+    ghosts.pop(1)
+    assert twin not in ghosts and len(ghosts) == 0, "Pop removes the fingerprint"
+
+    # Последовательные и кратные 2**16 целые ключи не собираются в кластер
+    for step in (1, 1 << 16):
+        ghosts = FingerprintGhostList(bits=32)
+        for index in range(5000):
+            ghosts[index * step] = None
+        longest = run = 0
+        for fingerprint in ghosts.table_fps:
+            run = run + 1 if fingerprint else 0
+            longest = max(longest, run)
+        assert len(ghosts) == 5000 and longest < 64, "Int keys must spread over the table"
+    print("✓ Test 5: Fingerprint ghost lists")
+
+    print("\nAll tests passed!")
+
+
 if __name__ == "__main__":
     demo()
-    benchmark()
\ No newline at end of file
+    benchmark()
+    test_correctness()
\ No newline at end of file
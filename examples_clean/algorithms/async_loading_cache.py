@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Async Loading Cache - загрузка через кэш для asyncio с объединением промахов
+
+Обёртка над любой политикой из этого каталога: `await cache.get(key)`
+возвращает значение из кэша, а при промахе вызывает загрузчик. Загрузка
+по каждому ключу выполняется одной задачей (single flight): конкурентные
+промахи по тому же ключу ждут её результата, а не идут в источник сами.
+
+- Отмена безопасна: вызывающий ждёт задачу через asyncio.shield, поэтому
+  отмена одного ожидающего не прерывает загрузку для остальных, а
+  результат всё равно попадает в кэш.
+- Ошибка загрузки получают все ожидающие; в кэш она не записывается,
+  следующий get повторит загрузку.
+- Число одновременных загрузок ограничено семафором (max_concurrency).
+- delete() во время загрузки отвязывает её: устаревший результат не
+  записывается в кэш.
+
+Кэш не потокобезопасен и рассчитан на один event loop.
+"""
+
+import asyncio
+import inspect
+import random
+import time
+
+from lru_doubly_linked_list import LRUCache
+
+
+class AsyncLoadingCache:
+    """Read-through кэш для asyncio с одной загрузкой на ключ"""
+
+    def __init__(self, capacity, loader=None, cache_class=LRUCache,
+                 max_concurrency=16, **cache_kwargs):
+        """
+        Инициализация асинхронного кэша
+
+        Args:
+            capacity: Ёмкость кэша
+            loader: Загрузчик по умолчанию: async def loader(key) -> value
+                (обычная функция тоже подходит, если не блокирует loop)
+            cache_class: Класс политики вытеснения
+            max_concurrency: Максимум одновременно выполняемых загрузок
+            **cache_kwargs: Дополнительные параметры для cache_class
+        """
+        if max_concurrency <= 0:
+            raise ValueError("Concurrency limit must be positive")
+
+        self.cache = cache_class(capacity, **cache_kwargs)
+        self.loader = loader
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = {}  # key -> asyncio.Task загрузки
+
+        # Статистика
+        self.loads = 0
+        self.load_failures = 0
+        self.coalesced = 0
+
+    async def get(self, key, loader=None, ttl=None):
+        """
+        Получить значение, загрузив его при промахе
+
+        Args:
+            key: Ключ
+            loader: Загрузчик для этого вызова (по умолчанию self.loader)
+            ttl: Срок жизни загруженного значения (передаётся политике)
+
+        Returns:
+            Значение из кэша или загрузчика (None не кэшируется)
+        """
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+
+        task = self.in_flight.get(key)
+        if task is None:
+            task = self._start_load(key, loader, ttl)
+        else:
+            self.coalesced += 1
+
+        # shield: отмена вызывающего не отменяет общую загрузку
+        return await asyncio.shield(task)
+
+    async def get_many(self, keys, loader=None, ttl=None):
+        """Получить значения для пакета ключей (загрузки идут параллельно)"""
+        return await asyncio.gather(*(self.get(key, loader, ttl) for key in keys))
+
+    def refresh(self, key, loader=None, ttl=None):
+        """
+        Запустить фоновое обновление ключа, не дожидаясь его
+
+        Если загрузка ключа уже идёт, новая не запускается. Старое значение
+        остаётся в кэше, пока не придёт новое.
+
+        Returns:
+            asyncio.Task загрузки
+        """
+        task = self.in_flight.get(key)
+        if task is None:
+            return self._start_load(key, loader, ttl)
+        self.coalesced += 1
+        return task
+
+    def _start_load(self, key, loader, ttl):
+        """Создать задачу загрузки ключа и зарегистрировать её"""
+        loader = loader or self.loader
+        if loader is None:
+            raise ValueError("No loader given")
+
+        task = asyncio.get_running_loop().create_task(self._load(key, loader, ttl))
+        task.add_done_callback(self._retrieve_exception)
+        self.in_flight[key] = task
+        return task
+
+    async def _load(self, key, loader, ttl):
+        """Выполнить загрузку под семафором и записать результат в кэш"""
+        this = asyncio.current_task()
+        try:
+            async with self.semaphore:
+                self.loads += 1
+                value = loader(key)
+                if inspect.isawaitable(value):
+                    value = await value
+        except BaseException:
+            self.load_failures += 1
+            raise
+        finally:
+            if self.in_flight.get(key) is this:
+                del self.in_flight[key]
+                current = True
+            else:
+                current = False  # Ключ удалён во время загрузки
+
+        if current and value is not None:
+            if ttl is None:
+                self.cache.set(key, value)
+            else:
+                self.cache.set(key, value, ttl=ttl)
+        return value
+
+    @staticmethod
+    def _retrieve_exception(task):
+        """Пометить ошибку прочитанной, даже если все ожидающие отменены"""
+        if not task.cancelled():
+            task.exception()
+
+    def delete(self, key):
+        """Удалить ключ; идущая загрузка не запишет устаревший результат"""
+        detached = self.in_flight.pop(key, None) is not None
+        return self.cache.delete(key) or detached
+
+    def clear(self):
+        """Очистить кэш; идущие загрузки отвязываются"""
+        self.in_flight.clear()
+        self.cache.clear()
+
+    async def close(self):
+        """Отменить все идущие загрузки и дождаться их завершения"""
+        tasks = list(self.in_flight.values())
+        self.in_flight.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self):
+        """Статистика политики и загрузок"""
+        return {
+            **self.cache.get_stats(),
+            'loads': self.loads,
+            'load_failures': self.load_failures,
+            'coalesced': self.coalesced,
+            'in_flight': len(self.in_flight),
+            'max_concurrency': self.max_concurrency
+        }
+
+
+def demo():
+    """Демонстрация: лавина запросов к одному ключу"""
+    print("=== Async Loading Cache Demo ===\n")
+
+    async def load_product(key):
+        await asyncio.sleep(0.05)  # Запрос к БД
+        return {"id": key, "name": f"Product {key}"}
+
+    async def main():
+        cache = AsyncLoadingCache(100, loader=load_product)
+
+        print("1. 100 конкурентных запросов к холодному ключу:")
+        start = time.perf_counter()
+        results = await asyncio.gather(*(cache.get("p:1") for _ in range(100)))
+        elapsed = time.perf_counter() - start
+        stats = cache.get_stats()
+        print(f"   Загрузок: {stats['loads']}, объединено: {stats['coalesced']}, "
+              f"время: {elapsed * 1000:.0f} ms")
+        print(f"   Все получили одно значение: {all(r is results[0] for r in results)}")
+
+        print("\n2. Повторный запрос - из кэша:")
+        start = time.perf_counter()
+        await cache.get("p:1")
+        print(f"   Время: {(time.perf_counter() - start) * 1e6:.0f} us, "
+              f"загрузок: {cache.get_stats()['loads']}")
+
+        print("\n3. Отмена одного из ожидающих не прерывает загрузку:")
+        waiter = asyncio.ensure_future(cache.get("p:2"))
+        other = asyncio.ensure_future(cache.get("p:2"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        print(f"   Второй ожидающий получил: {await other}")
+
+    asyncio.run(main())
+
+
+def benchmark():
+    """Лавина промахов: без объединения vs с объединением и лимитом"""
+    print("\n=== Benchmark ===\n")
+
+    num_keys, requests = 50, 2000
+
+    async def run(coalesce):
+        calls = 0
+        active = peak = 0
+
+        async def loader(key):
+            nonlocal calls, active, peak
+            calls += 1
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return key
+
+        rng = random.Random(42)
+        keys = [rng.randrange(num_keys) for _ in range(requests)]
+
+        if coalesce:
+            cache = AsyncLoadingCache(1000, loader=loader, max_concurrency=8)
+            get = cache.get
+        else:
+            cache = LRUCache(1000)
+
+            async def get(key):
+                value = cache.get(key)
+                if value is None:
+                    value = await loader(key)
+                    cache.set(key, value)
+                return value
+
+        start = time.perf_counter()
+        await asyncio.gather(*(get(key) for key in keys))
+        return calls, peak, time.perf_counter() - start
+
+    for name, coalesce in [("Cache-aside (без объединения)", False),
+                           ("AsyncLoadingCache (max_concurrency=8)", True)]:
+        calls, peak, elapsed = asyncio.run(run(coalesce))
+        print(f"{name}:")
+        print(f"  Вызовов загрузчика: {calls} на {num_keys} ключей, "
+              f"пик одновременных: {peak}, время: {elapsed * 1000:.0f} ms")
+
+
+def test_correctness():
+    """Тесты корректности асинхронного кэша"""
+    print("\n=== Async Loading Cache Correctness Tests ===\n")
+
+    # Тест 1: Загрузка при промахе, попадание без загрузки
+    async def test_basic():
+        calls = []
+
+        async def loader(key):
+            calls.append(key)
+            return key * 2
+
+        cache = AsyncLoadingCache(10, loader=loader)
+        assert await cache.get(21) == 42, "Value must be loaded"
+        assert await cache.get(21) == 42, "Value must be cached"
+        assert calls == [21], "Loader must be called once"
+        assert await cache.get(5, loader=lambda key: -key) == -5, "Sync per-call loader"
+        assert cache.get_stats()['loads'] == 2 and not cache.in_flight, "Stats and cleanup"
+
+    asyncio.run(test_basic())
+    print("✓ Test 1: Load on miss")
+
+    # Тест 2: Конкурентные промахи по одному ключу разделяют одну загрузку
+    async def test_coalescing():
+        calls = 0
+
+        async def loader(key):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return object()
+
+        cache = AsyncLoadingCache(10, loader=loader)
+        results = await asyncio.gather(*(cache.get("k") for _ in range(50)))
+        assert calls == 1, "Only one load per key"
+        assert all(r is results[0] for r in results), "All waiters share the result"
+        assert cache.get_stats()['coalesced'] == 49, "Coalesced waiters must be counted"
+
+    asyncio.run(test_coalescing())
+    print("✓ Test 2: Request coalescing")
+
+    # Тест 3: Отмена ожидающего не отменяет загрузку для остальных
+    async def test_cancellation():
+        release = asyncio.Event()
+
+        async def loader(key):
+            await release.wait()
+            return "value"
+
+        cache = AsyncLoadingCache(10, loader=loader)
+        first = asyncio.ensure_future(cache.get("k"))
+        second = asyncio.ensure_future(cache.get("k"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        assert first.cancelled(), "Cancelled waiter must see CancelledError"
+        release.set()
+        assert await second == "value", "Other waiter must get the value"
+        assert cache.cache.get("k") == "value", "Result must be cached"
+        assert not cache.in_flight, "In-flight entry must be removed"
+
+        # Все ожидающие отменены - загрузка всё равно заполняет кэш
+        release.clear()
+        lonely = asyncio.ensure_future(cache.get("x"))
+        await asyncio.sleep(0)
+        lonely.cancel()
+        release.set()
+        await asyncio.sleep(0.01)
+        assert cache.cache.get("x") == "value", "Abandoned load still fills the cache"
+
+    asyncio.run(test_cancellation())
+    print("✓ Test 3: Cancellation safety")
+
+    # Тест 4: Ошибка доходит до всех ожидающих и не кэшируется
+    async def test_errors():
+        attempts = 0
+
+        async def loader(key):
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0.01)
+            if attempts == 1:
+                raise ConnectionError("db down")
+            return "ok"
+
+        cache = AsyncLoadingCache(10, loader=loader)
+        results = await asyncio.gather(*(cache.get("k") for _ in range(5)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, ConnectionError) for r in results), "All waiters see the error"
+        assert attempts == 1 and not cache.in_flight, "One failed load, slot released"
+        assert await cache.get("k") == "ok", "Next get must retry"
+        assert cache.get_stats()['load_failures'] == 1, "Failures must be counted"
+
+    asyncio.run(test_errors())
+    print("✓ Test 4: Errors are shared, not cached")
+
+    # Тест 5: Число одновременных загрузок ограничено
+    async def test_concurrency_limit():
+        active = peak = 0
+
+        async def loader(key):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.005)
+            active -= 1
+            return key
+
+        cache = AsyncLoadingCache(100, loader=loader, max_concurrency=4)
+        assert await cache.get_many(range(20)) == list(range(20)), "Order must be kept"
+        assert peak == 4, f"Peak concurrency must be 4, got {peak}"
+
+    asyncio.run(test_concurrency_limit())
+    print("✓ Test 5: Bounded loader concurrency")
+
+    # Тест 6: delete во время загрузки и дедупликация refresh
+    async def test_invalidation_and_refresh():
+        version = 0
+
+        async def loader(key):
+            nonlocal version
+            version += 1
+            loaded = version
+            await asyncio.sleep(0.01)
+            return loaded
+
+        cache = AsyncLoadingCache(10, loader=loader)
+        stale = asyncio.ensure_future(cache.get("k"))
+        await asyncio.sleep(0)
+        assert cache.delete("k"), "Detaching an in-flight load counts as delete"
+        assert await stale == 1, "Waiter still gets its result"
+        assert cache.cache.get("k") is None, "Stale result must not be cached"
+
+        assert await cache.get("k") == 2, "Fresh load after delete"
+        tasks = [cache.refresh("k") for _ in range(3)]
+        assert tasks[0] is tasks[1] is tasks[2], "Refreshes must be deduplicated"
+        assert cache.cache.get("k") == 2, "Old value served during refresh"
+        await tasks[0]
+        assert cache.cache.get("k") == 3, "Refresh must replace the value"
+
+    asyncio.run(test_invalidation_and_refresh())
+    print("✓ Test 6: Invalidation and refresh")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
@@ -10,34 +10,196 @@ import time
 import random
 import statistics
 from collections import defaultdict
-import sys
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
 import os
+import platform
+import threading
+import tracemalloc
 
 # Импортируем все наши алгоритмы
 from arc_adaptive_algorithm import ARCCache
-from lru_doubly_linked_list import LRUCache, LRUCacheDoublyLinked
+from lirs_inter_reference_recency import LIRSCache
+from lru_doubly_linked_list import LRUCache, LRUCacheDoublyLinked, LRUCacheArray
 from mru_most_recently_used import MRUCache
 from lfu_least_frequently_used import LFUCache
-from fifo_first_in_first_out import FIFOCache
+from fifo_first_in_first_out import FIFOCache, FIFOWithSecondChance
+from clock_pro import ClockProCache
+from sharded_cache import ShardedCache
+from tinylfu_admission import TinyLFUCache
+from sampled_eviction import SampledEvictionCache
+from two_queue_2q import TwoQueueCache
+from s3_fifo import S3FIFOCache
+from sieve_eviction import SIEVECache
+from gdsf_cost_aware import GDSFCache, mixed_cost_keys, key_prefix, timed_loader
+from timing_wheel import ManualClock
+from trace_replay import TraceReplay, iter_trace, print_results
+from miss_ratio_curve import MRCBuilder
+from workload_generators import (ZipfWorkload, UniformWorkload, ScanWorkload,
+                                 MixWorkload, PhasesWorkload)
+
+
+# Все политики бенчмарка: имя -> (класс, доп. параметры конструктора)
+CACHE_POLICIES = {
+    'LRU (OrderedDict)': (LRUCache, {}),
+    'LRU (Doubly Linked)': (LRUCacheDoublyLinked, {}),
+    'LRU (Array Slots)': (LRUCacheArray, {}),
+    'MRU': (MRUCache, {}),
+    'LFU': (LFUCache, {}),
+    'ARC': (ARCCache, {}),
+    'LIRS': (LIRSCache, {}),
+    '2Q': (TwoQueueCache, {}),
+    'S3-FIFO': (S3FIFOCache, {}),
+    'SIEVE': (SIEVECache, {}),
+    'W-TinyLFU': (TinyLFUCache, {}),
+    'GDSF': (GDSFCache, {}),
+    'FIFO': (FIFOCache, {}),
+    'CLOCK': (FIFOWithSecondChance, {}),
+    'CLOCK-Pro': (ClockProCache, {}),
+    'Redis allkeys-lru': (SampledEvictionCache, {'seed': 42})
+}
+
+# Сценарии с оценкой hit rate: ключ в results -> метод CacheBenchmark
+SCORED_SCENARIOS = {
+    'sequential_scan': 'sequential_scan_test',
+    'zipf': 'zipf_distribution_test',
+    'temporal_locality': 'temporal_locality_test',
+    'mixed_pattern': 'mixed_pattern_test',
+    'adaptive': 'adaptive_pattern_test'
+}
+
+
+# Направление метрик при сравнении с базовой линией: 1 - больше лучше, -1 - меньше лучше
+METRIC_DIRECTIONS = {
+    'hit_rate': 1,
+    'byte_hit_rate': 1,
+    'cost_savings': 1,
+    'overall_hit_rate': 1,
+    'preservation_rate': 1,
+    'adaptivity_score': 1,
+    'ops_per_sec': 1,
+    'ns_per_op': -1,
+    'get_p50_ns': -1,
+    'get_p99_ns': -1,
+    'get_p999_ns': -1,
+    'set_p50_ns': -1,
+    'set_p99_ns': -1,
+    'set_p999_ns': -1,
+    'bytes_per_entry': -1,
+    'peak_bytes_per_entry': -1
+}
+
+
+def _percentiles(samples):
+    """p50, p99 и p999 выборки"""
+    if len(samples) < 2:
+        value = samples[0] if samples else 0
+        return value, value, value
+    cuts = statistics.quantiles(samples, n=1000, method='inclusive')
+    return cuts[499], cuts[989], cuts[998]
+
+
+def load_results(path):
+    """Загрузить результаты, сохранённые CacheBenchmark.save_results"""
+    with open(path, 'r', encoding='utf-8') as source:
+        return json.load(source)['results']
+
+
+def compare_results(baseline, current, threshold=0.1):
+    """
+    Найти регрессии относительно базовой линии
+
+    Сравниваются только метрики из METRIC_DIRECTIONS, присутствующие в
+    обоих прогонах. Регрессия - ухудшение больше чем на threshold
+    (относительно значения базовой линии).
+
+    Args:
+        baseline: Результаты базовой линии (dict из load_results)
+        current: Текущие результаты в том же виде
+        threshold: Допустимое относительное ухудшение
+
+    Returns:
+        Список dict: test, label, metric, baseline, current, change
+    """
+    regressions = []
+    for test, labels in current.items():
+        for label, metrics in labels.items():
+            base_metrics = baseline.get(test, {}).get(label)
+            if not isinstance(base_metrics, dict) or not isinstance(metrics, dict):
+                continue
+            for metric, direction in METRIC_DIRECTIONS.items():
+                old, new = base_metrics.get(metric), metrics.get(metric)
+                if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+                    continue
+                change = (new - old) / abs(old)
+                if change * direction < -threshold:
+                    regressions.append({'test': test, 'label': label, 'metric': metric,
+                                        'baseline': old, 'current': new, 'change': change})
+    return regressions
+
+
+def print_regressions(regressions, threshold):
+    """Вывести найденные регрессии"""
+    print(f"\n=== Baseline Comparison (threshold {threshold:.0%}) ===")
+    if not regressions:
+        print("  No regressions")
+        return
+    for item in regressions:
+        print(f"  ✗ {item['test']} / {item['label']} / {item['metric']}: "
+              f"{item['baseline']:.4g} -> {item['current']:.4g} ({item['change']:+.1%})")
+
+
+def _run_matrix_task(task):
+    """
+    Одна ячейка матрицы (сценарий, политика, ёмкость, seed) в процессе пула
+
+    Зерно зависит только от сценария, ёмкости и номера прогона, поэтому
+    все политики видят один и тот же поток запросов.
+    """
+    scenario, policy, capacity, seed = task
+    benchmark = CacheBenchmark(capacity=capacity, verbose=False, policies=[policy])
+    random.seed(f"{scenario}/{capacity}/{seed}")
+    getattr(benchmark, SCORED_SCENARIOS[scenario])()
+    return task, benchmark.results[scenario][policy]
+
+
+def _average_results(entries):
+    """Усреднить результаты нескольких прогонов (числа и списки чисел)"""
+    merged = {}
+    for field, value in entries[0].items():
+        values = [entry[field] for entry in entries]
+        if isinstance(value, (int, float)):
+            merged[field] = statistics.mean(values)
+        elif isinstance(value, list):
+            merged[field] = [statistics.mean(column) for column in zip(*values)]
+        else:
+            merged[field] = value
+    merged['runs'] = len(entries)
+    return merged
 
 
 class CacheBenchmark:
     """Комплексное тестирование алгоритмов кэширования"""
 
-    def __init__(self, capacity=100, verbose=True):
+    def __init__(self, capacity=100, verbose=True, policies=None):
+        """
+        Args:
+            capacity: Ёмкость кэшей по умолчанию
+            verbose: Печатать подробности по каждому сценарию
+            policies: Имена политик из CACHE_POLICIES (None - все)
+        """
         self.capacity = capacity
         self.verbose = verbose
+        self.policies = list(policies) if policies is not None else list(CACHE_POLICIES)
         self.results = defaultdict(dict)
 
-    def create_caches(self):
-        """Создать все типы кэшей для тестирования"""
+    def create_caches(self, capacity=None):
+        """Создать все типы кэшей для тестирования (по умолчанию ёмкости self.capacity)"""
+        capacity = capacity or self.capacity
         return {
-            'LRU (OrderedDict)': LRUCache(self.capacity),
-            'LRU (Doubly Linked)': LRUCacheDoublyLinked(self.capacity),
-            'MRU': MRUCache(self.capacity),
-            'LFU': LFUCache(self.capacity),
-            'ARC': ARCCache(self.capacity),
-            'FIFO': FIFOCache(self.capacity)
+            name: CACHE_POLICIES[name][0](capacity, **CACHE_POLICIES[name][1])
+            for name in self.policies
         }
 
     def sequential_scan_test(self, data_size=1000, working_set_size=50):
@@ -53,22 +215,26 @@ class CacheBenchmark:
 
         caches = self.create_caches()
 
+        # Ключи 0..working_set_size-1 - рабочий набор, дальше - сканирование
+        working_set = range(working_set_size)
+        reads = UniformWorkload(working_set_size, 100)
+        scan = ScanWorkload(data_size, offset=working_set_size)
+        seed = random.getrandbits(32)
+
         for name, cache in caches.items():
             start_time = time.time()
 
             # Фаза 1: Заполняем рабочий набор
-            working_set = [f"work_{i}" for i in range(working_set_size)]
             for key in working_set:
-                cache.set(key, f"value_{key}")
+                cache.set(key, key)
 
             # Фаза 2: Обращаемся к рабочему набору
-            for _ in range(100):
-                key = random.choice(working_set)
+            for key in reads.stream(seed):
                 cache.get(key)
 
             # Фаза 3: Последовательное сканирование
-            for i in range(data_size):
-                cache.set(f"scan_{i}", f"scan_value_{i}")
+            for key in scan.stream():
+                cache.set(key, key)
 
             # Фаза 4: Проверяем сколько рабочего набора сохранилось
             preserved = sum(1 for key in working_set if cache.get(key) is not None)
@@ -95,49 +261,27 @@ class CacheBenchmark:
                 print(f"    Working set preserved: {preserved}/{len(working_set)} ({preservation_rate:.2%})")
                 print(f"    Evictions: {evictions}")
 
-    def zipf_distribution_test(self, requests=5000):
+    def zipf_distribution_test(self, requests=5000, alpha=1.0):
         """
         Тест с Zipf распределением (реалистичные паттерны доступа)
 
-        80/20 правило: 20% ключей получают 80% запросов
+        Zipf(1.0) по каталогу из 3 * capacity ключей: на 20% самых
+        популярных ключей приходится около 80% запросов
         """
         if self.verbose:
-            print("\n=== Zipf Distribution Test (80/20 rule) ===")
+            print(f"\n=== Zipf Distribution Test (alpha={alpha}) ===")
             print(f"Requests: {requests}")
 
         caches = self.create_caches()
-
-        # Создаём ключи с Zipf распределением
-        num_keys = self.capacity * 3
-        keys = [f"key_{i}" for i in range(num_keys)]
-
-        # Веса по закону Zipf (приблизительно 80/20)
-        weights = []
-        for i in range(num_keys):
-            if i < num_keys // 5:  # Первые 20% ключей
-                weights.append(4.0)  # Высокий вес
-            else:
-                weights.append(1.0)  # Низкий вес
-
-        total_weight = sum(weights)
-        weights = [w / total_weight for w in weights]
+        workload = ZipfWorkload(self.capacity * 3, requests, alpha=alpha)
+        seed = random.getrandbits(32)
 
         for name, cache in caches.items():
             start_time = time.time()
 
-            for _ in range(requests):
-                # Выбираем ключ с учётом весов
-                r = random.random()
-                cumsum = 0
-                for i, w in enumerate(weights):
-                    cumsum += w
-                    if r < cumsum:
-                        key = keys[i]
-                        break
-
-                val = cache.get(key)
-                if not val:
-                    cache.set(key, f"value_{key}")
+            for key in workload.stream(seed):
+                if cache.get(key) is None:
+                    cache.set(key, key)
 
             elapsed = time.time() - start_time
             stats = cache.get_stats()
@@ -169,23 +313,19 @@ class CacheBenchmark:
 
         caches = self.create_caches()
 
-        # Создаём несколько наборов данных
-        sets = []
-        for i in range(4):
-            sets.append([f"set{i}_key_{j}" for j in range(self.capacity // 2)])
+        # Четыре набора по capacity // 2 ключей; в каждом цикле - следующий набор
+        set_size = max(1, self.capacity // 2)
+        workload = PhasesWorkload(
+            UniformWorkload(set_size, cycle_length, offset=(cycle % 4) * set_size)
+            for cycle in range(cycles))
+        seed = random.getrandbits(32)
 
         for name, cache in caches.items():
             start_time = time.time()
 
-            for cycle in range(cycles):
-                # В каждом цикле используем разные наборы
-                current_set = sets[cycle % len(sets)]
-
-                for _ in range(cycle_length):
-                    key = random.choice(current_set)
-                    val = cache.get(key)
-                    if not val:
-                        cache.set(key, f"value_{key}")
+            for key in workload.stream(seed):
+                if cache.get(key) is None:
+                    cache.set(key, key)
 
             elapsed = time.time() - start_time
             stats = cache.get_stats()
@@ -215,31 +355,21 @@ class CacheBenchmark:
 
         caches = self.create_caches()
 
-        # Разные типы ключей
-        hot_keys = [f"hot_{i}" for i in range(20)]           # Горячие данные
-        warm_keys = [f"warm_{i}" for i in range(50)]         # Тёплые данные
-        cold_keys = [f"cold_{i}" for i in range(200)]        # Холодные данные
-        scan_keys = [f"scan_{i}" for i in range(1000)]       # Сканирование
+        # Разные типы ключей в непересекающихся диапазонах
+        workload = MixWorkload([
+            (UniformWorkload(20), 0.5),               # 50% - горячие данные
+            (UniformWorkload(50, offset=20), 0.2),    # 20% - тёплые данные
+            (UniformWorkload(200, offset=70), 0.2),   # 20% - холодные данные
+            (UniformWorkload(1000, offset=270), 0.1)  # 10% - сканирование
+        ], requests)
+        seed = random.getrandbits(32)
 
         for name, cache in caches.items():
             start_time = time.time()
 
-            for i in range(requests):
-                # Выбираем паттерн доступа
-                r = random.random()
-
-                if r < 0.5:  # 50% - горячие данные
-                    key = random.choice(hot_keys)
-                elif r < 0.7:  # 20% - тёплые данные
-                    key = random.choice(warm_keys)
-                elif r < 0.9:  # 20% - холодные данные
-                    key = random.choice(cold_keys)
-                else:  # 10% - сканирование
-                    key = random.choice(scan_keys)
-
-                val = cache.get(key)
-                if not val:
-                    cache.set(key, f"value_{key}")
+            for key in workload.stream(seed):
+                if cache.get(key) is None:
+                    cache.set(key, key)
 
             elapsed = time.time() - start_time
             stats = cache.get_stats()
@@ -271,24 +401,24 @@ class CacheBenchmark:
 
         caches = self.create_caches()
 
+        # Каждая фаза имеет свой рабочий набор из capacity ключей
+        workloads = [UniformWorkload(self.capacity, requests_per_phase, offset=phase * self.capacity)
+                     for phase in range(phases)]
+        seed = random.getrandbits(32)
+
         for name, cache in caches.items():
             start_time = time.time()
             hit_rates_by_phase = []
 
-            for phase in range(phases):
-                # Каждая фаза имеет свой рабочий набор
-                phase_keys = [f"phase{phase}_key_{i}" for i in range(self.capacity)]
+            for phase, workload in enumerate(workloads):
                 phase_hits = 0
                 phase_total = 0
 
-                for _ in range(requests_per_phase):
-                    key = random.choice(phase_keys)
-                    val = cache.get(key)
-
-                    if val:
+                for key in workload.stream(seed + phase):
+                    if cache.get(key) is not None:
                         phase_hits += 1
                     else:
-                        cache.set(key, f"value_{key}")
+                        cache.set(key, key)
 
                     phase_total += 1
 
@@ -319,16 +449,615 @@ class CacheBenchmark:
                 print(f"    Adaptivity score: {adaptivity_score:.2%}")
                 print(f"    Phase hit rates: {[f'{rate:.1%}' for rate in hit_rates_by_phase]}")
 
-    def run_all_tests(self):
-        """Запустить все тесты"""
+    def weighted_capacity_test(self, requests=20000, num_keys=None, alpha=1.2):
+        """
+        Тест ёмкости по весу с тяжёлым хвостом размеров значений
+
+        Размеры значений распределены по Парето: большинство ответов
+        несколько сотен байт, но встречаются блобы в мегабайты. Кэши
+        с weigher получают бюджет в байтах, кэш по количеству записей -
+        такую же ёмкость в штуках, чтобы было видно, сколько памяти
+        он реально занимает.
+        """
+        num_keys = num_keys or self.capacity * 10
+        rng = random.Random(42)
+
+        # Размер значения: 200 байт .. 2 МБ, хвост Парето
+        sizes = [min(int(200 * rng.paretovariate(alpha)), 2 * 1024 * 1024)
+                 for _ in range(num_keys)]
+        average_size = sum(sizes) / num_keys
+        max_weight = int(average_size * self.capacity)
+
+        if self.verbose:
+            print(f"\n=== Weighted Capacity Test (Pareto sizes) ===")
+            print(f"Requests: {requests}, Keys: {num_keys}, "
+                  f"Budget: {max_weight / 1024:.0f} KB, Max value: {max(sizes) / 1024:.0f} KB")
+
+        # Популярность не зависит от размера (Zipf по номеру ключа)
+        popularity = [1.0 / (i + 1) for i in range(num_keys)]
+        stream = rng.choices(range(num_keys), weights=popularity, k=requests)
+
+        def weigher(key, value):
+            return value  # Значением служит размер в байтах
+
+        caches = {
+            'LRU (by count)': LRUCache(self.capacity),
+            'LRU (weighted)': LRUCache(num_keys, weigher=weigher, max_weight=max_weight),
+            'LFU (weighted)': LFUCache(num_keys, weigher=weigher, max_weight=max_weight),
+            'ARC (weighted)': ARCCache(num_keys, weigher=weigher, max_weight=max_weight)
+        }
+
+        total_bytes = sum(sizes[key] for key in stream)
+
+        for name, cache in caches.items():
+            start_time = time.time()
+            hit_bytes = 0
+            peak_bytes = 0
+            resident_bytes = 0
+            by_count = cache.weigher is None
+
+            for key in stream:
+                if cache.get(key) is not None:
+                    hit_bytes += sizes[key]
+                    continue
+
+                cache.set(key, sizes[key])
+                if by_count:
+                    # Кэш по количеству не знает веса - считаем снаружи
+                    resident_bytes = sum(cache.cache.values())
+                else:
+                    resident_bytes = cache.get_stats()['current_weight']
+                peak_bytes = max(peak_bytes, resident_bytes)
+
+            elapsed = time.time() - start_time
+            stats = cache.get_stats()
+
+            self.results['weighted'][name] = {
+                'time': elapsed,
+                'hit_rate': stats['hit_rate'],
+                'byte_hit_rate': hit_bytes / total_bytes if total_bytes else 0,
+                'evictions': stats.get('evictions', 0),
+                'peak_weight': peak_bytes,
+                'max_weight': max_weight
+            }
+
+            if self.verbose:
+                print(f"  {name}:")
+                print(f"    Time: {elapsed:.4f}s")
+                print(f"    Hit rate: {stats['hit_rate']:.2%}")
+                print(f"    Byte hit rate: {hit_bytes / total_bytes:.2%}")
+                print(f"    Peak memory: {peak_bytes / 1024:.0f} KB "
+                      f"({peak_bytes / max_weight:.1f}x budget)")
+
+    def cost_aware_test(self, requests=50000, num_keys=None, alpha=0.9):
+        """
+        Тест сэкономленного времени бэкенда при разной стоимости промахов
+
+        Ключи четырёх классов со стоимостью промаха от 0.5 мс до 2 с
+        (gdsf_cost_aware.KEY_CLASSES), класс не зависит от популярности.
+        Политики без учёта стоимости загружают ключи через get + set, время
+        считается снаружи; 'GDSF (measured cost)' сам замеряет загрузчик
+        через get_or_load (время идёт по ManualClock, без реального ожидания).
+        """
+        num_keys = num_keys or self.capacity * 20
+        keys, costs = mixed_cost_keys(num_keys)
+        stream = [keys[index] for index in
+                  ZipfWorkload(num_keys, requests, alpha=alpha).stream(seed=42)]
+        clock = ManualClock()
+        loader = timed_loader(costs, clock)
+
+        if self.verbose:
+            print(f"\n=== Cost-Aware Test (saved backend time) ===")
+            print(f"Requests: {requests}, Keys: {num_keys}, Miss cost: 0.5 ms .. 2 s")
+
+        caches = self.create_caches()
+        caches['GDSF (measured cost)'] = GDSFCache(self.capacity, loader=loader,
+                                                   cost_class=key_prefix, clock=clock)
+
+        for name, cache in caches.items():
+            start_time = time.time()
+            saved = backend = 0.0
+            if name == 'GDSF (measured cost)':
+                for key in stream:
+                    cache.get_or_load(key)
+                stats = cache.get_stats()
+                saved, backend = stats['saved_seconds'], stats['backend_seconds']
+            else:
+                for key in stream:
+                    if cache.get(key) is None:
+                        cache.set(key, loader(key))
+                        backend += costs[key]
+                    else:
+                        saved += costs[key]
+                stats = cache.get_stats()
+
+            self.results['cost_aware'][name] = {
+                'time': time.time() - start_time,
+                'hit_rate': stats['hit_rate'],
+                'saved_seconds': saved,
+                'backend_seconds': backend,
+                'cost_savings': saved / (saved + backend) if saved + backend else 0
+            }
+
+        if self.verbose:
+            print(f"  {'Policy':<22} {'Hit rate':>9} {'Saved, s':>10} {'Backend, s':>11} {'Savings':>8}")
+            for name, result in sorted(self.results['cost_aware'].items(),
+                                       key=lambda item: -item[1]['saved_seconds']):
+                print(f"  {name:<22} {result['hit_rate']:>9.2%} {result['saved_seconds']:>10.0f} "
+                      f"{result['backend_seconds']:>11.0f} {result['cost_savings']:>8.2%}")
+
+    def concurrent_throughput_test(self, thread_counts=(1, 2, 4, 8),
+                                   ops_per_thread=10000, num_shards=16):
+        """
+        Тест пропускной способности под конкурентной нагрузкой
+
+        Сравнивает одну глобальную блокировку (1 шард) с lock striping
+        для каждой политики. В CPython с GIL выигрыш ограничен, но
+        рост конкуренции за блокировку хорошо виден по ops/sec.
+        """
+        if self.verbose:
+            print(f"\n=== Concurrent Throughput Test ===")
+            print(f"Threads: {list(thread_counts)}, Ops per thread: {ops_per_thread}")
+
+        policies = {
+            'LRU': LRUCache,
+            'LFU': LFUCache,
+            'ARC': ARCCache,
+            'FIFO': FIFOCache,
+            'MRU': MRUCache,
+            'SIEVE': SIEVECache
+        }
+        keys = [f"key_{i}" for i in range(self.capacity * 3)]
+
+        for policy_name, cache_class in policies.items():
+            for shards in (1, num_shards):
+                label = f"{policy_name} x{shards} shards"
+
+                for threads_count in thread_counts:
+                    cache = ShardedCache(self.capacity, cache_class=cache_class,
+                                         num_shards=shards)
+
+                    def worker(seed):
+                        rng = random.Random(seed)
+                        for _ in range(ops_per_thread):
+                            key = rng.choice(keys)
+                            if cache.get(key) is None:
+                                cache.set(key, f"value_{key}")
+
+                    threads = [threading.Thread(target=worker, args=(i,))
+                               for i in range(threads_count)]
+                    start_time = time.perf_counter()
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                    elapsed = time.perf_counter() - start_time
+
+                    stats = cache.get_stats()
+                    ops = ops_per_thread * threads_count
+
+                    self.results['concurrency'][f"{label}, {threads_count} threads"] = {
+                        'time': elapsed,
+                        'threads': threads_count,
+                        'num_shards': cache.num_shards,
+                        'ops_per_sec': ops / elapsed,
+                        'hit_rate': stats['hit_rate']
+                    }
+
+                if self.verbose:
+                    rates = [self.results['concurrency'][f"{label}, {n} threads"]['ops_per_sec']
+                             for n in thread_counts]
+                    print(f"  {label}:")
+                    print(f"    Ops/sec by threads: {[f'{rate:,.0f}' for rate in rates]}")
+
+    def overhead_test(self, requests=200000, alpha=1.0):
+        """
+        Тест накладных расходов политики (ns на операцию)
+
+        Один и тот же Zipf-поток прогоняется через каждую политику;
+        время get + set при промахе делится на число запросов. Рядом
+        выводится hit rate: дешёвая политика полезна, только если
+        не проигрывает в попаданиях.
+        """
+        num_keys = self.capacity * 10
+        rng = random.Random(42)
+        weights = [1.0 / (rank + 1) ** alpha for rank in range(num_keys)]
+        stream = [f"key_{i}" for i in rng.choices(range(num_keys), weights=weights, k=requests)]
+
+        if self.verbose:
+            print(f"\n=== Overhead Test (ns/op) ===")
+            print(f"Requests: {requests}, Keys: {num_keys}, Zipf alpha: {alpha}")
+
+        for name, cache in self.create_caches().items():
+            get, set_ = cache.get, cache.set
+            start = time.perf_counter_ns()
+            for key in stream:
+                if get(key) is None:
+                    set_(key, key)
+            elapsed_ns = time.perf_counter_ns() - start
+
+            self.results['overhead'][name] = {
+                'time': elapsed_ns / 1e9,
+                'ns_per_op': elapsed_ns / requests,
+                'hit_rate': cache.get_stats()['hit_rate']
+            }
+
+        if self.verbose:
+            for name, result in sorted(self.results['overhead'].items(),
+                                       key=lambda item: item[1]['ns_per_op']):
+                print(f"  {name:<20} {result['ns_per_op']:>7.0f} ns/op   "
+                      f"hit rate {result['hit_rate']:.2%}")
+
+    def latency_test(self, requests=100000, batch_size=32, alpha=1.0):
+        """
+        Тест задержек get и set: p50 / p99 / p999 в ns на операцию
+
+        Поток Zipf прогоняется пачками по batch_size операций; время каждой
+        пачки (perf_counter_ns) делится на её размер. Замер каждой
+        операции по отдельности измерял бы в основном сам таймер, поэтому
+        хвост здесь - хвост средних по пачке: редкие дорогие операции
+        (перестройка структуры, сборка мусора) в нём видны, но сглажены.
+        """
+        num_keys = self.capacity * 10
+        workload = ZipfWorkload(num_keys, requests, alpha=alpha)
+        reads = list(workload.stream(seed=42))
+        writes = list(workload.stream(seed=43))
+        read_batches = [reads[i:i + batch_size] for i in range(0, requests, batch_size)]
+        write_batches = [writes[i:i + batch_size] for i in range(0, requests, batch_size)]
+
+        if self.verbose:
+            print(f"\n=== Latency Test (ns/op percentiles) ===")
+            print(f"Requests: {requests}, Batch: {batch_size}, Keys: {num_keys}, Zipf alpha: {alpha}")
+
+        clock = time.perf_counter_ns
+        for name, cache in self.create_caches().items():
+            get, set_ = cache.get, cache.set
+
+            # Прогрев: кэш заполнен и в устойчивом состоянии
+            for key in reads:
+                if get(key) is None:
+                    set_(key, key)
+
+            get_samples = []
+            for batch in read_batches:
+                start = clock()
+                for key in batch:
+                    get(key)
+                get_samples.append((clock() - start) / len(batch))
+
+            set_samples = []
+            for batch in write_batches:
+                start = clock()
+                for key in batch:
+                    set_(key, key)
+                set_samples.append((clock() - start) / len(batch))
+
+            get_p50, get_p99, get_p999 = _percentiles(get_samples)
+            set_p50, set_p99, set_p999 = _percentiles(set_samples)
+            self.results['latency'][name] = {
+                'get_p50_ns': get_p50, 'get_p99_ns': get_p99, 'get_p999_ns': get_p999,
+                'set_p50_ns': set_p50, 'set_p99_ns': set_p99, 'set_p999_ns': set_p999,
+                'batch_size': batch_size
+            }
+
+        if self.verbose:
+            print(f"  {'Policy':<20} {'get p50':>8} {'p99':>7} {'p999':>7}   {'set p50':>8} {'p99':>7} {'p999':>7}")
+            for name, result in sorted(self.results['latency'].items(),
+                                       key=lambda item: item[1]['get_p99_ns']):
+                print(f"  {name:<20} {result['get_p50_ns']:>8.0f} {result['get_p99_ns']:>7.0f} "
+                      f"{result['get_p999_ns']:>7.0f}   {result['set_p50_ns']:>8.0f} "
+                      f"{result['set_p99_ns']:>7.0f} {result['set_p999_ns']:>7.0f}")
+
+    def memory_test(self, capacity=10000):
+        """
+        Тест памяти на запись (tracemalloc)
+
+        Кэш заполняется вдвое большим числом ключей, чем его ёмкость, чтобы
+        учесть и вытеснения. Ключи создаются до начала трассировки, так что
+        считается только память самой структуры: словари, узлы, массивы и
+        метаданные политики. peak - максимум за время заполнения.
+        """
+        keys = list(range(10 ** 9, 10 ** 9 + capacity * 2))
+
+        if self.verbose:
+            print(f"\n=== Memory Test (tracemalloc) ===")
+            print(f"Capacity: {capacity}, Inserted keys: {len(keys)}")
+
+        for name in self.policies:
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            cache_class, kwargs = CACHE_POLICIES[name]
+            cache = cache_class(capacity, **kwargs)
+            for key in keys:
+                cache.set(key, key)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            stats = cache.get_stats()
+            # ARC кэш не отдаёт current_size - резидентные записи лежат в T1 и T2
+            size = stats.get('current_size', stats.get('T1_size', 0) + stats.get('T2_size', 0))
+            entries = size or 1
+            self.results['memory'][name] = {
+                'entries': size,
+                'bytes': current - before,
+                'bytes_per_entry': (current - before) / entries,
+                'peak_bytes_per_entry': (peak - before) / entries
+            }
+
+        if self.verbose:
+            print(f"  {'Policy':<20} {'B/entry':>8} {'peak B/entry':>13}")
+            for name, result in sorted(self.results['memory'].items(),
+                                       key=lambda item: item[1]['bytes_per_entry']):
+                print(f"  {name:<20} {result['bytes_per_entry']:>8.0f} "
+                      f"{result['peak_bytes_per_entry']:>13.0f}")
+
+    def ghost_memory_test(self, capacity=2000, requests=50000, key_length=64, alpha=0.8):
+        """
+        ARC: история B1/B2 из ключей vs из отпечатков ключей
+
+        Строковые ключи - длинные строки (как URL или идентификаторы
+        сессий) и создаются в потоке запросов, поэтому история из ключей
+        держит строки вытесненных ключей, а история из отпечатков - только
+        числа в массивах. Целые ключи - последовательный скан и скан с
+        шагом 2**16: у них hash(k) == k, это проверка перемешивания
+        отпечатков (без него каждый промах стоит O(размер истории)).
+        Память всего кэша меряется tracemalloc, время - отдельным
+        прогоном без трассировки.
+        """
+        num_keys = capacity * 20
+        prefix = "/catalog/product/".ljust(key_length - 12, "x")
+        zipf = list(ZipfWorkload(num_keys, requests, alpha=alpha).stream(seed=42))
+        scan = list(range(requests // 2)) + [index << 16 for index in range(requests // 2)]
+        # (суффикс метки, поток номеров, ключ по номеру; None - сам номер)
+        workloads = [('', zipf, lambda index: f"{prefix}{index:012d}"),
+                     (' int scan', scan, None)]
+        variants = [('exact', None), ('64-bit', 64), ('32-bit', 32), ('16-bit', 16)]
+
+        if self.verbose:
+            print(f"\n=== ARC Ghost Lists: keys vs fingerprints ===")
+            print(f"Capacity: {capacity}, Requests: {requests}, Key length: {key_length}")
+
+        def run(ghost_bits, stream, make_key):
+            cache = ARCCache(capacity, ghost_bits=ghost_bits)
+            get, set_ = cache.get, cache.set
+            for index in stream:
+                key = make_key(index) if make_key is not None else index
+                if get(key) is None:
+                    set_(key, index)
+            return cache
+
+        for suffix, stream, make_key in workloads:
+            exact_bytes = exact_hit_rate = None
+            for label, ghost_bits in variants:
+                start = time.perf_counter_ns()
+                run(ghost_bits, stream, make_key)
+                elapsed_ns = time.perf_counter_ns() - start
+
+                tracemalloc.start()
+                before = tracemalloc.get_traced_memory()[0]
+                cache = run(ghost_bits, stream, make_key)
+                current = tracemalloc.get_traced_memory()[0] - before
+                tracemalloc.stop()
+
+                stats = cache.get_stats()
+                if ghost_bits is None:
+                    exact_bytes, exact_hit_rate = current, stats['hit_rate']
+                self.results['ghost_memory'][label + suffix] = {
+                    'hit_rate': stats['hit_rate'],
+                    'hit_rate_delta': stats['hit_rate'] - exact_hit_rate,
+                    'ghost_entries': stats['B1_size'] + stats['B2_size'],
+                    'bytes': current,
+                    'memory_saved': exact_bytes - current,
+                    'memory_saved_ratio': (exact_bytes - current) / exact_bytes,
+                    'false_positive_bound': stats.get('ghost_false_positive_bound', 0),
+                    'ns_per_op': elapsed_ns / len(stream)
+                }
+
+        if self.verbose:
+            print(f"  {'Ghosts':<17} {'Hit rate':>9} {'Delta':>8} {'Cache KB':>9} "
+                  f"{'Saved':>7} {'FP bound':>9} {'ns/op':>7}")
+            for label, result in self.results['ghost_memory'].items():
+                print(f"  {label:<17} {result['hit_rate']:>9.2%} "
+                      f"{result['hit_rate_delta'] * 100:>+7.2f}pp {result['bytes'] / 1024:>9.0f} "
+                      f"{result['memory_saved_ratio']:>7.1%} {result['false_positive_bound']:>9.1e} "
+                      f"{result['ns_per_op']:>7.0f}")
+
+    def save_results(self, path):
+        """Сохранить результаты в JSON (для сравнения с базовой линией)"""
+        document = {
+            'meta': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'capacity': self.capacity,
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S')
+            },
+            'results': self.results
+        }
+        with open(path, 'w', encoding='utf-8') as target:
+            json.dump(document, target, indent=2, ensure_ascii=False, default=str)
+
+    def compare_with_baseline(self, path, threshold=0.1):
+        """Сравнить текущие результаты с сохранённой базовой линией"""
+        # Через JSON, чтобы ключи (например, ёмкости в 'mrc') совпадали по типу
+        current = json.loads(json.dumps(self.results, default=str))
+        regressions = compare_results(load_results(path), current, threshold)
+        if self.verbose:
+            print_regressions(regressions, threshold)
+        return regressions
+
+    def replay_test(self, path, capacities, chunk_size=10000, key_field=None,
+                    size_field=None, progress_every=None):
+        """
+        Прогон реальной трассы через все политики на нескольких ёмкостях
+
+        Трасса читается потоково и один раз: каждая пачка строк проходит
+        через все кэши сразу, так что память не зависит от размера файла.
+        """
+        if self.verbose:
+            print(f"\n=== Trace Replay: {path} ===")
+            print(f"Capacities: {list(capacities)}, Chunk size: {chunk_size}")
+
+        caches = {}
+        for capacity in capacities:
+            for name, cache in self.create_caches(capacity).items():
+                caches[(name, capacity)] = cache
+        policies = self.policies
+
+        parse_stats = {}
+        start_time = time.time()
+        records = iter_trace(path, key_field=key_field, size_field=size_field,
+                             stats=parse_stats)
+        results = TraceReplay(caches).run(records, chunk_size=chunk_size,
+                                          progress_every=progress_every)
+        elapsed = time.time() - start_time
+
+        for (name, capacity), result in results.items():
+            self.results['replay'][f"{name} @ {capacity}"] = dict(result, capacity=capacity)
+
+        if self.verbose:
+            requests = next(iter(results.values()))['requests'] if results else 0
+            print(f"Requests: {requests:,}, skipped lines: {parse_stats.get('skipped', 0)}, "
+                  f"time: {elapsed:.1f}s")
+            print_results(results, capacities, policies)
+
+    def mrc_test(self, path=None, capacities=None, check_capacities=None,
+                 sample_rate=1.0, max_keys=None, requests=100000):
+        """
+        Кривая hit rate LRU от ёмкости за один проход
+
+        Стековые расстояния дают hit rate для любой ёмкости сразу, вместо
+        отдельного прогона на каждый размер. Для проверки LRUCache
+        прогоняется на нескольких ёмкостях (второй проход по трассе).
+        Без path используется синтетический Zipf-поток.
+        """
+        if path is None:
+            num_keys = self.capacity * 100
+            rng = random.Random(42)
+            weights = [1.0 / (rank + 1) for rank in range(num_keys)]
+            stream = [(f"key_{i}", 1, 'get')
+                      for i in rng.choices(range(num_keys), weights=weights, k=requests)]
+
+            def records():
+                return iter(stream)
+        else:
+            def records():
+                return iter_trace(path)
+
+        capacities = capacities or [self.capacity * factor for factor in (1, 2, 5, 10, 20, 50)]
+        check_capacities = check_capacities or capacities[::2]
+
+        if self.verbose:
+            print(f"\n=== Miss Ratio Curve ({path or 'synthetic Zipf'}) ===")
+            print(f"Sample rate: {sample_rate}, Max tracked keys: {max_keys}")
+
+        start_time = time.time()
+        builder = MRCBuilder(sample_rate=sample_rate, max_keys=max_keys).feed_records(records())
+        curve = builder.result()
+        mrc_time = time.time() - start_time
+
+        start_time = time.time()
+        replay = TraceReplay({capacity: LRUCache(capacity) for capacity in check_capacities})
+        lru_results = replay.run(records())
+        check_time = time.time() - start_time
+
+        for capacity in capacities:
+            self.results['mrc'][capacity] = {
+                'hit_rate': curve.hit_rate(capacity),
+                'lru_hit_rate': lru_results[capacity]['hit_rate'] if capacity in lru_results else None
+            }
+
+        if self.verbose:
+            stats = builder.get_stats()
+            print(f"Requests: {stats['requests']:,}, sampled: {stats['sampled']:,}, "
+                  f"tracked keys: {stats['tracked_keys']:,}")
+            print(f"MRC: {mrc_time:.2f}s (one pass), LRUCache check: {check_time:.2f}s "
+                  f"({len(check_capacities)} passes)")
+            print(f"  {'Capacity':>10} {'MRC':>8} {'LRUCache':>9}")
+            for capacity in capacities:
+                result = self.results['mrc'][capacity]
+                check = result['lru_hit_rate']
+                check = f"{check:>9.2%}" if check is not None else f"{'':>9}"
+                print(f"  {capacity:>10} {result['hit_rate']:>8.2%} {check}")
+
+    def run_matrix(self, scenarios=None, capacities=None, seeds=1, jobs=None):
+        """
+        Прогнать матрицу (сценарий × политика × ёмкость × seed) в пуле процессов
+
+        Каждая ячейка - независимая задача со своим детерминированным
+        зерном, так что результат не зависит от числа процессов. Прогоны
+        с разными seed усредняются; при нескольких ёмкостях политики
+        попадают в self.results как "имя @ ёмкость".
+
+        Args:
+            scenarios: Ключи SCORED_SCENARIOS (None - все)
+            capacities: Список ёмкостей (None - [self.capacity])
+            seeds: Количество прогонов с разными зёрнами
+            jobs: Число процессов (None - по числу ядер, 1 - без пула)
+        """
+        scenarios = list(scenarios or SCORED_SCENARIOS)
+        capacities = list(capacities or [self.capacity])
+        jobs = jobs or os.cpu_count() or 1
+
+        tasks = [(scenario, policy, capacity, seed)
+                 for scenario in scenarios
+                 for capacity in capacities
+                 for seed in range(seeds)
+                 for policy in self.policies]
+
+        if self.verbose:
+            print(f"\n=== Benchmark Matrix ===")
+            print(f"Scenarios: {len(scenarios)}, Policies: {len(self.policies)}, "
+                  f"Capacities: {capacities}, Seeds: {seeds} -> {len(tasks)} tasks, {jobs} processes")
+
+        start_time = time.time()
+        if jobs == 1:
+            outcomes = [_run_matrix_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                outcomes = list(pool.map(_run_matrix_task, tasks, chunksize=4))
+        elapsed = time.time() - start_time
+
+        grouped = defaultdict(list)
+        for (scenario, policy, capacity, _), result in outcomes:
+            label = policy if len(capacities) == 1 else f"{policy} @ {capacity}"
+            grouped[(scenario, label)].append(result)
+        for (scenario, label), entries in grouped.items():
+            self.results[scenario][label] = _average_results(entries)
+
+        if self.verbose:
+            print(f"Finished in {elapsed:.1f}s")
+
+    def run_all_tests(self, jobs=1, capacities=None, seeds=1):
+        """
+        Запустить все тесты
+
+        Args:
+            jobs: Процессов для сценариев с оценкой hit rate (1 - последовательно
+                с подробным выводом)
+            capacities: Ёмкости для матрицы (None - только self.capacity)
+            seeds: Прогонов с разными зёрнами на ячейку матрицы
+        """
         print("🔥 Starting Comprehensive Cache Algorithm Benchmark")
         print("=" * 60)
 
-        self.sequential_scan_test()
-        self.zipf_distribution_test()
-        self.temporal_locality_test()
-        self.mixed_pattern_test()
-        self.adaptive_pattern_test()
+        if jobs == 1 and capacities is None and seeds == 1:
+            self.sequential_scan_test()
+            self.zipf_distribution_test()
+            self.temporal_locality_test()
+            self.mixed_pattern_test()
+            self.adaptive_pattern_test()
+        else:
+            self.run_matrix(capacities=capacities, seeds=seeds, jobs=jobs)
+
+        # Тесты времени и потоков - в основном процессе, без конкуренции за ядра
+        self.weighted_capacity_test()
+        self.cost_aware_test()
+        self.overhead_test()
+        self.latency_test()
+        self.memory_test()
+        self.ghost_memory_test()
+        self.mrc_test()
+        self.concurrent_throughput_test()
 
         print("\n" + "=" * 60)
         print("📊 BENCHMARK SUMMARY")
@@ -339,20 +1068,21 @@ class CacheBenchmark:
     def print_summary(self):
         """Вывести сводные результаты"""
 
-        # Собираем все алгоритмы
+        # Собираем все алгоритмы (только из сценариев с оценкой hit rate)
         all_algorithms = set()
-        for test_results in self.results.values():
-            all_algorithms.update(test_results.keys())
+        for test_name in SCORED_SCENARIOS:
+            all_algorithms.update(self.results[test_name].keys())
+        width = max([20] + [len(algo) + 1 for algo in all_algorithms])
 
         # Таблица результатов
-        print(f"{'Algorithm':<20} {'SeqScan':<8} {'Zipf':<8} {'Temporal':<9} {'Mixed':<8} {'Adaptive':<9} {'Avg':<8}")
-        print("-" * 80)
+        print(f"{'Algorithm':<{width}} {'SeqScan':<8} {'Zipf':<8} {'Temporal':<9} {'Mixed':<8} {'Adaptive':<9} {'Avg':<8}")
+        print("-" * (width + 60))
 
         summary_scores = {}
 
         for algo in all_algorithms:
             scores = []
-            row = f"{algo:<20}"
+            row = f"{algo:<{width}}"
 
             # Sequential scan - важна preservation rate
             if algo in self.results['sequential_scan']:
@@ -429,6 +1159,11 @@ class CacheBenchmark:
                                key=lambda x: x[1]['adaptivity_score'])
             print(f"  • For changing patterns: {best_adaptive[0]}")
 
+        if 'cost_aware' in self.results and self.results['cost_aware']:
+            best_cost = max(self.results['cost_aware'].items(),
+                            key=lambda x: x[1]['saved_seconds'])
+            print(f"  • For misses of very different cost (saved backend time): {best_cost[0]}")
+
 
 def quick_demo():
     """Быстрая демонстрация всех алгоритмов"""
@@ -480,19 +1215,74 @@ def quick_demo():
 
 
 if __name__ == "__main__":
-    # Быстрая демонстрация
-    quick_demo()
-
-    print("\n" + "="*60)
-
-    # Полное тестирование
-    if len(sys.argv) > 1 and sys.argv[1] == '--full':
-        benchmark = CacheBenchmark(capacity=100, verbose=True)
-        benchmark.run_all_tests()
+    parser = argparse.ArgumentParser(description="Сравнение алгоритмов кэширования")
+    parser.add_argument('--full', action='store_true',
+                        help="Полное тестирование всех сценариев")
+    parser.add_argument('--replay', metavar='TRACE',
+                        help="Прогнать трассу (key / key size / timestamp,key,size[,op]; .gz)")
+    parser.add_argument('--mrc', metavar='TRACE',
+                        help="Построить кривую hit rate LRU от ёмкости за один проход")
+    parser.add_argument('--capacities',
+                        help="Ёмкости через запятую (--replay/--mrc: по умолчанию 100,1000,10000; "
+                             "--full: матрица по ёмкостям)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Процессов для матрицы --full (0 - по числу ядер)")
+    parser.add_argument('--seeds', type=int, default=1,
+                        help="Прогонов с разными зёрнами на ячейку матрицы --full")
+    parser.add_argument('--sample-rate', type=float, default=1.0,
+                        help="Доля ключей для SHARDS выборки в --mrc")
+    parser.add_argument('--max-keys', type=int,
+                        help="Лимит отслеживаемых ключей для --mrc (SHARDS с фиксированной памятью)")
+    parser.add_argument('--chunk-size', type=int, default=10000,
+                        help="Размер пачки строк для --replay")
+    parser.add_argument('--json', metavar='PATH',
+                        help="Сохранить результаты в JSON")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="Сравнить с сохранённым JSON; код выхода 1 при регрессиях")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Допустимое относительное ухудшение для --compare")
+    parser.add_argument('--key-field', type=int, help="Номер колонки ключа")
+    parser.add_argument('--size-field', type=int, help="Номер колонки размера")
+    args = parser.parse_args()
+    capacities = [int(value) for value in args.capacities.split(',')] if args.capacities else None
+
+    if args.replay or args.mrc:
+        # Трассы: результаты тоже можно сохранить и сравнить ниже
+        capacities = capacities or [100, 1000, 10000]
+        benchmark = CacheBenchmark(verbose=True)
+        if args.replay:
+            benchmark.replay_test(args.replay, capacities, chunk_size=args.chunk_size,
+                                  key_field=args.key_field, size_field=args.size_field,
+                                  progress_every=1000000)
+        if args.mrc:
+            benchmark.mrc_test(args.mrc, capacities=capacities, check_capacities=capacities,
+                               sample_rate=args.sample_rate, max_keys=args.max_keys)
     else:
-        # Краткое тестирование
-        print("Running quick benchmark (use --full for comprehensive testing)")
-        benchmark = CacheBenchmark(capacity=50, verbose=True)
-        benchmark.zipf_distribution_test(requests=2000)
-        benchmark.sequential_scan_test(data_size=300, working_set_size=25)
-        benchmark.print_summary()
\ No newline at end of file
+        # Быстрая демонстрация
+        quick_demo()
+
+        print("\n" + "="*60)
+
+        # Полное тестирование
+        if args.full:
+            benchmark = CacheBenchmark(capacity=100, verbose=True)
+            benchmark.run_all_tests(jobs=args.jobs or None, capacities=capacities,
+                                    seeds=args.seeds)
+        else:
+            # Краткое тестирование
+            print("Running quick benchmark (use --full for comprehensive testing)")
+            benchmark = CacheBenchmark(capacity=50, verbose=True)
+            benchmark.zipf_distribution_test(requests=2000)
+            benchmark.sequential_scan_test(data_size=300, working_set_size=25)
+            benchmark.overhead_test(requests=20000)
+            benchmark.latency_test(requests=20000)
+            benchmark.memory_test(capacity=1000)
+            benchmark.ghost_memory_test(capacity=500, requests=20000)
+            benchmark.cost_aware_test(requests=20000)
+            benchmark.print_summary()
+
+    if args.json:
+        benchmark.save_results(args.json)
+        print(f"\nResults saved to {args.json}")
+    if args.compare and benchmark.compare_with_baseline(args.compare, args.threshold):
+        raise SystemExit(1)
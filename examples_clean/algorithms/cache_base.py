@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Cache Base - общая основа кэшей и подключаемая статистика
+
+Кэш не держит счётчики сам: попадания, промахи и вытеснения пишутся в
+recorder, переданный в конструктор (stats=...). Путь попадания выглядит так:
+
+    if self._stats is not None:
+        self._stats.hits += 1
+
+- StatsRecorder - точные счётчики (по умолчанию, как раньше);
+- NullStatsRecorder - статистика выключена: кэш хранит _stats = None,
+  и на горячем пути остаётся одна проверка на None;
+- SampledStatsRecorder - счётчики ведутся только на доле шардов
+  ShardedCache (ключи распределены по шардам хешем, поэтому это
+  выборка ключей, как в SHARDS); остальные шарды работают без записи,
+  итог масштабируется. Работает только через ShardedCache: отдельный
+  кэш - это один шард, он всегда попадает в выборку, и счётчики у него
+  точные - экономии нет.
+
+Recorder - объект с целыми полями hits, misses, evictions; вызовов
+методов на горячем пути нет, поэтому включённый recorder стоит столько
+же, сколько прежние счётчики в самом кэше.
+
+CacheBase подключает recorder, отдаёт счётчики как атрибуты кэша
+(cache.hits) и даёт пакетные операции по умолчанию.
+"""
+
+import random
+import time
+
+
+class StatsRecorder:
+    """Точные счётчики попаданий, промахов и вытеснений"""
+
+    __slots__ = ('hits', 'misses', 'evictions')
+
+    enabled = True
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def reset(self):
+        """Обнулить счётчики"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def snapshot(self):
+        """Счётчики и hit rate"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total > 0 else 0
+        }
+
+    def for_shard(self, index, count):
+        """Recorder для шарда index из count"""
+        return type(self)()
+
+    def merge(self, snapshots):
+        """Сложить снимки get_stats() шардов"""
+        hits = sum(stats['hits'] for stats in snapshots)
+        misses = sum(stats['misses'] for stats in snapshots)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'evictions': sum(stats.get('evictions', 0) for stats in snapshots),
+            'hit_rate': hits / total if total > 0 else 0
+        }
+
+
+class NullStatsRecorder(StatsRecorder):
+    """Статистика выключена: кэш не обращается к recorder вовсе"""
+
+    __slots__ = ()
+
+    enabled = False
+
+    def for_shard(self, index, count):
+        return self
+
+
+class SampledStatsRecorder(StatsRecorder):
+    """
+    Статистика по выборке шардов - только для ShardedCache
+
+    В ShardedCache счётчики получает доля rate шардов (не меньше одного),
+    остальные шарды получают NullStatsRecorder; merge() масштабирует
+    сумму на count / sampled.
+
+    Переданный отдельному кэшу напрямую, recorder ничего не выбирает:
+    такой кэш - один шард, он всегда в выборке и считает каждый вызов
+    точно, как StatsRecorder. Чтобы не платить за статистику в отдельном
+    кэше, её выключают NullStatsRecorder.
+    """
+
+    __slots__ = ('rate', 'rng', 'sampled')
+
+    def __init__(self, rate=0.25, seed=None):
+        """
+        Args:
+            rate: Доля шардов со статистикой (0, 1]
+            seed: Зерно выбора шардов
+        """
+        if not 0 < rate <= 1:
+            raise ValueError("Sample rate must be in (0, 1]")
+        super().__init__()
+        self.rate = rate
+        self.rng = random.Random(seed)
+        self.sampled = None  # Номера шардов со статистикой
+
+    def for_shard(self, index, count):
+        if self.sampled is None:
+            self.sampled = set(self.rng.sample(range(count), max(1, round(count * self.rate))))
+        return StatsRecorder() if index in self.sampled else NullStatsRecorder()
+
+    def merge(self, snapshots):
+        chosen = [snapshots[index] for index in sorted(self.sampled)]
+        scale = len(snapshots) / len(chosen)
+        result = super().merge(chosen)
+        for field in ('hits', 'misses', 'evictions'):
+            result[field] = round(result[field] * scale)
+        result['sampled_shards'] = len(chosen)
+        return result
+
+
+class CacheBase:
+    """Общая часть кэшей: recorder статистики и пакетные операции"""
+
+    def _init_stats(self, stats=None):
+        """Подключить recorder (None - точные счётчики)"""
+        self.stats = stats if stats is not None else StatsRecorder()
+        self._stats = self.stats if self.stats.enabled else None
+
+    @property
+    def hits(self):
+        return self.stats.hits
+
+    @property
+    def misses(self):
+        return self.stats.misses
+
+    @property
+    def evictions(self):
+        return self.stats.evictions
+
+    def get_many(self, keys):
+        """Получить значения для нескольких ключей (в порядке запроса)"""
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items):
+        """Установить несколько значений"""
+        for key, value in items:
+            self.set(key, value)
+
+    def delete_many(self, keys):
+        """Удалить несколько ключей; возвращает количество удалённых"""
+        return sum(1 for key in keys if self.delete(key))
+
+
+def demo():
+    """Демонстрация recorders"""
+    print("=== Cache Stats Demo ===\n")
+
+    from lru_doubly_linked_list import LRUCache
+    from sharded_cache import ShardedCache
+
+    for name, stats in [("StatsRecorder", StatsRecorder()),
+                        ("NullStatsRecorder", NullStatsRecorder())]:
+        cache = LRUCache(2, stats=stats)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        print(f"{name}: {cache.get_stats()}")
+
+    print("\nSampledStatsRecorder(rate=0.25) на 16 шардах:")
+    cache = ShardedCache(1600, LRUCache, num_shards=16, stats=SampledStatsRecorder(0.25, seed=1))
+    rng = random.Random(1)
+    for _ in range(50000):
+        key = int(rng.paretovariate(1.0))
+        if cache.get(key) is None:
+            cache.set(key, key)
+    stats = cache.get_stats()
+    print(f"  Оценка по {stats['sampled_shards']} шардам: hits={stats['hits']}, "
+          f"misses={stats['misses']}, hit rate={stats['hit_rate']:.2%}")
+
+
+def benchmark():
+    """Стоимость get с точной статистикой и без неё"""
+    print("\n=== Benchmark ===\n")
+
+    from lru_doubly_linked_list import LRUCache
+    from sieve_eviction import SIEVECache
+
+    rng = random.Random(42)
+    weights = [1.0 / (rank + 1) for rank in range(5000)]
+    requests = rng.choices(range(5000), weights=weights, k=200000)
+
+    for cache_class in (LRUCache, SIEVECache):
+        for name, stats in [("exact", StatsRecorder()), ("disabled", NullStatsRecorder())]:
+            cache = cache_class(500, stats=stats)
+            for key in requests:
+                if cache.get(key) is None:
+                    cache.set(key, key)
+            hot = [key for key in set(requests[:2000]) if cache.get(key) is not None][:500]
+
+            get = cache.get
+            best = float('inf')
+            for _ in range(5):
+                start = time.perf_counter_ns()
+                for _ in range(100):
+                    for key in hot:
+                        get(key)
+                best = min(best, time.perf_counter_ns() - start)
+            print(f"{cache_class.__name__:<10} {name:<9} hit path: {best / (100 * len(hot)):.0f} ns/op")
+
+
+def test_correctness():
+    """Тесты корректности"""
+    print("\n=== Cache Stats Correctness Tests ===\n")
+
+    from lru_doubly_linked_list import LRUCache
+    from sharded_cache import ShardedCache
+
+    # Тест 1: Точный recorder
+    stats = StatsRecorder()
+    cache = LRUCache(1, stats=stats)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.set("b", 2)
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 1, 1), "Exact counters"
+    assert cache.get_stats()['hit_rate'] == 0.5, "get_stats must use the recorder"
+    assert cache.hits == 1, "Counters stay readable on the cache"
+    cache.clear()
+    assert stats.snapshot()['hits'] == 0, "clear() resets the recorder"
+    print("✓ Test 1: Exact recorder")
+
+    # Тест 2: Выключенная статистика - recorder не трогается
+    cache = LRUCache(1, stats=NullStatsRecorder())
+    assert cache._stats is None, "Disabled recorder is not bound"
+    cache.set("a", 1)
+    cache.get("a")
+    cache.set("b", 2)
+    stats = cache.get_stats()
+    assert stats['hits'] == stats['misses'] == stats['evictions'] == 0, "Nothing recorded"
+    assert stats['current_size'] == 1, "Cache still works"
+    print("✓ Test 2: Disabled recorder")
+
+    # Тест 3: Выборка шардов
+    recorder = SampledStatsRecorder(0.25, seed=3)
+    cache = ShardedCache(800, LRUCache, num_shards=8, stats=recorder)
+    recorded = [shard for shard in cache.shards if shard._stats is not None]
+    assert len(recorded) == 2, "A quarter of shards must record"
+    exact = ShardedCache(800, LRUCache, num_shards=8)
+    rng = random.Random(3)
+    for _ in range(40000):
+        key = rng.randint(0, 2000)
+        for target in (cache, exact):
+            if target.get(key) is None:
+                target.set(key, key)
+    sampled, full = cache.get_stats(), exact.get_stats()
+    assert abs(sampled['hit_rate'] - full['hit_rate']) < 0.05, "Sampled hit rate must be close"
+    assert abs(sampled['hits'] + sampled['misses'] - 40000) < 4000, "Scaled totals must be close"
+    print("✓ Test 3: Sampled shards")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
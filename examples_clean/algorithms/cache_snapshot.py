@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Cache Snapshot - бинарные снимки состояния кэша для тёплого рестарта
+
+LRUCache, LFUCache и ARCCache умеют snapshot(path) / restore(path):
+после деплоя кэш поднимается с прежним порядком давности, частотами LFU,
+параметром p и историей B1/B2 ARC, а не прогревается заново.
+
+Формат файла:
+    заголовок: b'CSNAP', версия (uint8), длина метаданных (uint32)
+    метаданные: JSON (класс кэша, ёмкость, параметры политики)
+    секции: имя (16 байт), число записей (uint64), длина в байтах (uint64),
+            затем блоки: число записей (uint32), длина (uint32) и pickle
+            списка кортежей (до BLOCK_RECORDS записей)
+
+Записи пишутся потоком, блоками - граф объектов кэша целиком не
+сериализуется, а pickle блока дешевле и компактнее pickle на запись.
+Внутри секции записи идут от самых ценных к наименее ценным (свежие,
+частые), поэтому кэш меньшей ёмкости читает только префикс. Файл
+отображается в память (mmap) и разбирается лениво: стоимость restore
+пропорциональна числу загруженных записей.
+
+Сроки жизни сохраняются как остаток TTL: монотонные часы не переживают
+рестарт. Вместе с ним в метаданные пишется время снимка по time.time(), и
+restore вычитает из остатка простой между снимком и восстановлением -
+истёкшие за это время элементы не загружаются. Статистика не сохраняется.
+"""
+
+from itertools import islice
+import json
+import mmap
+import os
+import pickle
+import random
+import struct
+import tempfile
+import time
+
+
+MAGIC = b'CSNAP'
+VERSION = 1
+HEADER = struct.Struct('<5sBI')
+SECTION = struct.Struct('<16sQQ')
+BLOCK = struct.Struct('<II')
+BLOCK_RECORDS = 1024
+
+
+def write_snapshot(path, kind, meta, sections):
+    """
+    Записать снимок (атомарно: через временный файл и os.replace)
+
+    Args:
+        path: Путь к файлу снимка
+        kind: Имя класса кэша
+        meta: dict JSON-совместимых параметров политики (время снимка
+            saved_at добавляется автоматически)
+        sections: Список (имя, итератор записей-кортежей)
+
+    Returns:
+        Общее число записей
+    """
+    meta_data = json.dumps({'kind': kind, 'saved_at': time.time(), **meta}).encode()
+    tmp_path = f"{path}.tmp"
+    total = 0
+
+    with open(tmp_path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, VERSION, len(meta_data)))
+        out.write(meta_data)
+
+        for name, records in sections:
+            # Заголовок секции дописывается после записей
+            header_at = out.tell()
+            out.write(SECTION.pack(name.encode(), 0, 0))
+            records = iter(records)
+            count = 0
+            while True:
+                block = list(islice(records, BLOCK_RECORDS))
+                if not block:
+                    break
+                data = pickle.dumps(block, pickle.HIGHEST_PROTOCOL)
+                out.write(BLOCK.pack(len(block), len(data)))
+                out.write(data)
+                count += len(block)
+
+            end = out.tell()
+            out.seek(header_at)
+            out.write(SECTION.pack(name.encode(), count, end - header_at - SECTION.size))
+            out.seek(end)
+            total += count
+
+    os.replace(tmp_path, path)
+    return total
+
+
+def remaining_ttl(expiry, key):
+    """Остаток срока жизни ключа по ExpiryIndex (None - бессрочно)"""
+    deadline = expiry.deadlines.get(key)
+    return None if deadline is None else deadline - expiry.clock()
+
+
+class Snapshot:
+    """Снимок, отображённый в память; секции читаются лениво"""
+
+    def __init__(self, path, now=None):
+        """
+        Открыть снимок
+
+        Args:
+            path: Путь к файлу снимка
+            now: Время восстановления по time.time() (None - текущее)
+        """
+        with open(path, 'rb') as source:
+            self.mm = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, meta_len = HEADER.unpack_from(self.mm, 0)
+        except struct.error:
+            magic, version, meta_len = b'', 0, 0
+        if magic != MAGIC:
+            self.mm.close()
+            raise ValueError(f"{path} is not a cache snapshot")
+        if version != VERSION:
+            self.mm.close()
+            raise ValueError(f"Unsupported snapshot version {version}")
+
+        offset = HEADER.size
+        self.meta = json.loads(self.mm[offset:offset + meta_len])
+        offset += meta_len
+
+        # Простой между снимком и восстановлением (часы назад не считаются)
+        now = time.time() if now is None else now
+        self.downtime = max(0.0, now - self.meta.get('saved_at', now))
+
+        # Оглавление: имя -> (число записей, смещение первой записи)
+        self.sections = {}
+        while offset < len(self.mm):
+            name, count, length = SECTION.unpack_from(self.mm, offset)
+            offset += SECTION.size
+            self.sections[name.rstrip(b'\0').decode()] = (count, offset)
+            offset += length
+
+    def expect(self, kind):
+        """Проверить, что снимок сделан кэшем класса kind"""
+        if self.meta['kind'] != kind:
+            raise ValueError(f"Snapshot of {self.meta['kind']} cannot be restored into {kind}")
+
+    def live_ttl(self, ttl):
+        """
+        Остаток TTL на момент восстановления
+
+        Returns:
+            None - бессрочно, иначе остаток за вычетом простоя
+            (<= 0 - элемент истёк, пока кэш не работал)
+        """
+        return None if ttl is None else ttl - self.downtime
+
+    def count(self, name):
+        """Число записей в секции"""
+        return self.sections.get(name, (0, 0))[0]
+
+    def records(self, name, limit=None):
+        """
+        Записи секции от самых ценных
+
+        Args:
+            name: Имя секции
+            limit: Прочитать не больше limit записей (None - все)
+        """
+        count, offset = self.sections.get(name, (0, 0))
+        if limit is not None:
+            count = min(count, max(0, limit))
+
+        # Читаются только блоки, покрывающие первые count записей
+        while count > 0:
+            block_count, length = BLOCK.unpack_from(self.mm, offset)
+            offset += BLOCK.size
+            block = pickle.loads(self.mm[offset:offset + length])
+            offset += length
+            yield from block[:count]
+            count -= block_count
+
+    def close(self):
+        """Закрыть отображение файла"""
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def demo():
+    """Демонстрация: тёплый рестарт ARC после деплоя"""
+    print("=== Cache Snapshot Demo ===\n")
+
+    from arc_adaptive_algorithm import ARCCache
+
+    rng = random.Random(42)
+    weights = [1.0 / (rank + 1) for rank in range(20000)]
+    before = rng.choices(range(20000), weights=weights, k=200000)
+    after = rng.choices(range(20000), weights=weights, k=20000)
+
+    cache = ARCCache(2000)
+    for key in before:
+        if cache.get(key) is None:
+            cache.set(key, f"value_{key}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "arc.snap")
+        written = cache.snapshot(path)
+        print(f"1. Снимок: {written} записей, {os.path.getsize(path) / 1024:.0f} KB, "
+              f"p={cache.p}")
+
+        for name, restart in [("Холодный старт", False), ("Тёплый рестарт", True)]:
+            fresh = ARCCache(2000)
+            if restart:
+                fresh.restore(path)
+            for key in after:
+                if fresh.get(key) is None:
+                    fresh.set(key, f"value_{key}")
+            stats = fresh.get_stats()
+            print(f"\n2. {name}: hit rate первых {len(after)} запросов "
+                  f"{stats['hit_rate']:.2%} (p={stats['p']})")
+
+
+def benchmark():
+    """Снимок vs pickle объекта целиком; restore в кэш меньшей ёмкости"""
+    print("\n=== Benchmark ===\n")
+
+    from lfu_least_frequently_used import LFUCache
+
+    rng = random.Random(1)
+    cache = LFUCache(100000)
+    for key in range(100000):
+        cache.set(key, f"value_{key}")
+    for key in rng.choices(range(100000), k=200000):
+        cache.get(key)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lfu.snap")
+        start = time.perf_counter()
+        cache.snapshot(path)
+        snapshot_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        blob = pickle.dumps(cache, pickle.HIGHEST_PROTOCOL)
+        pickle_time = time.perf_counter() - start
+
+        print(f"snapshot(): {snapshot_time * 1000:.0f} ms, "
+              f"{os.path.getsize(path) / 1024:.0f} KB")
+        print(f"pickle.dumps(cache): {pickle_time * 1000:.0f} ms, {len(blob) / 1024:.0f} KB")
+
+        start = time.perf_counter()
+        pickle.loads(blob)
+        print(f"\npickle.loads(cache): {(time.perf_counter() - start) * 1000:.0f} ms")
+        for capacity in (100000, 10000, 1000):
+            target = LFUCache(capacity)
+            start = time.perf_counter()
+            loaded = target.restore(path)
+            elapsed = time.perf_counter() - start
+            print(f"restore() в LFUCache({capacity}): {loaded} записей, {elapsed * 1000:.1f} ms")
+
+
+def test_correctness():
+    """Тесты корректности снимков"""
+    print("\n=== Cache Snapshot Correctness Tests ===\n")
+
+    from arc_adaptive_algorithm import ARCCache
+    from lfu_least_frequently_used import LFUCache
+    from lru_doubly_linked_list import LRUCache
+    from timing_wheel import ManualClock
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.snap")
+
+        # Тест 1: Формат - метаданные, секции, лимит, чужой файл
+        written = write_snapshot(path, 'Test', {'capacity': 3},
+                                 [('a', iter([(1, 'x'), (2, 'y')])), ('empty', iter(()))])
+        assert written == 2, "Two records written"
+        with Snapshot(path) as snapshot:
+            saved_at = snapshot.meta.pop('saved_at')
+            assert abs(saved_at - time.time()) < 60, "Snapshot time must be recorded"
+            assert snapshot.meta == {'kind': 'Test', 'capacity': 3}, "Meta must round-trip"
+            assert list(snapshot.records('a')) == [(1, 'x'), (2, 'y')], "Records in order"
+            assert list(snapshot.records('a', limit=1)) == [(1, 'x')], "Limit reads a prefix"
+            assert list(snapshot.records('empty')) == [], "Empty section"
+            assert snapshot.count('missing') == 0, "Missing section is empty"
+        with open(path, 'wb') as broken:
+            broken.write(b"not a snapshot")
+        try:
+            Snapshot(path)
+            assert False, "Foreign file must be rejected"
+        except ValueError:
+            pass
+        print("✓ Test 1: File format")
+
+        # Тест 2: LRU - порядок давности, усечение до меньшей ёмкости
+        cache = LRUCache(5)
+        for key in "abcde":
+            cache.set(key, key.upper())
+        cache.get("a")                      # Порядок: b c d e a
+        cache.snapshot(path)
+
+        restored = LRUCache(5)
+        assert restored.restore(path) == 5, "All entries restored"
+        assert list(restored.cache.items()) == list(cache.cache.items()), "Order must match"
+        restored.set("f", "F")
+        assert restored.get("b") is None, "LRU victim must be the same"
+
+        small = LRUCache(2)
+        small.restore(path)
+        assert list(small.cache) == ["e", "a"], "Smaller cache keeps the most recent"
+        print("✓ Test 2: LRU recency order")
+
+        # Тест 3: LFU - частоты и порядок вытеснения
+        cache = LFUCache(4)
+        for key in "abcd":
+            cache.set(key, key)
+        for key, hits in [("a", 3), ("b", 1), ("d", 2)]:
+            for _ in range(hits):
+                cache.get(key)
+        cache.snapshot(path)
+
+        restored = LFUCache(4)
+        restored.restore(path)
+        assert restored.get_frequency_distribution() == cache.get_frequency_distribution(), \
+            "Frequencies must match"
+        assert restored.key_to_val_freq == cache.key_to_val_freq, "Entries must match"
+        restored.set("e", "e")
+        assert restored.get("c") is None, "Least frequent key evicted first"
+
+        small = LFUCache(2)
+        small.restore(path)
+        assert sorted(small.key_to_val_freq) == ["a", "d"], "Smaller cache keeps the most frequent"
+        assert small.min_freq == 3, "min_freq must be rebuilt"
+        print("✓ Test 3: LFU frequencies")
+
+        # Тест 4: ARC - p, T1/T2 и история B1/B2
+        cache = ARCCache(4)
+        rng = random.Random(4)
+        for _ in range(500):
+            key = rng.randint(0, 12)
+            if cache.get(key) is None:
+                cache.set(key, key)
+        cache.snapshot(path)
+
+        restored = ARCCache(4)
+        restored.restore(path)
+        assert restored.p == cache.p, "p must match"
+        for name in ("T1", "T2", "B1", "B2"):
+            assert list(getattr(restored, name).items()) == list(getattr(cache, name).items()), \
+                f"{name} must match"
+
+        for _ in range(200):
+            key = rng.randint(0, 12)
+            assert restored.get(key) == cache.get(key), "Restored cache must behave the same"
+            if cache.get(key) is None:
+                cache.set(key, key)
+                restored.set(key, key)
+        try:
+            LRUCache(4).restore(path)
+            assert False, "Snapshot of another class must be rejected"
+        except ValueError:
+            pass
+
+        # История из отпечатков: восстанавливается в тот же режим, иначе отбрасывается
+        compact = ARCCache(4, ghost_bits=32)
+        for _ in range(500):
+            key = rng.randint(0, 12)
+            if compact.get(key) is None:
+                compact.set(key, key)
+        compact.snapshot(path)
+        restored = ARCCache(4, ghost_bits=32)
+        restored.restore(path)
+        assert list(restored.B1) == list(compact.B1) and list(restored.B2) == list(compact.B2), \
+            "Fingerprint ghosts must round-trip"
+        exact = ARCCache(4)
+        exact.restore(path)
+        assert not exact.B1 and not exact.B2 and exact.T2 == compact.T2, \
+            "Fingerprints cannot become exact ghosts"
+        print("✓ Test 4: ARC state")
+
+        # Тест 5: Сроки жизни сохраняются остатком, истёкшие не загружаются
+        clock = ManualClock()
+        cache = LRUCache(10, clock=clock)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2, ttl=100)
+        cache.set("forever", 3)
+        clock.advance(3)
+        cache.snapshot(path)
+
+        later = ManualClock(1000)
+        restored = LRUCache(10, clock=later)
+        assert restored.restore(path) == 3, "Live entries restored"
+        later.advance(2)
+        assert restored.get("short") is None, "Remaining 2s TTL must expire"
+        assert restored.get("long") == 2 and restored.get("forever") == 3, "Others stay"
+        assert "forever" not in restored.expiry.deadlines, "No TTL stays no TTL"
+
+        clock.advance(10)
+        cache.snapshot(path)
+        restored = LRUCache(10, clock=ManualClock())
+        assert restored.restore(path) == 2, "Expired entries must be skipped"
+        print("✓ Test 5: TTL across restart")
+
+        # Тест 6: Простой между снимком и восстановлением сокращает TTL
+        for cls in (LRUCache, LFUCache, ARCCache):
+            clock = ManualClock()
+            cache = cls(10, clock=clock)
+            cache.set("short", 1, ttl=30)
+            cache.set("long", 2, ttl=100)
+            cache.set("forever", 3)
+            cache.snapshot(path)
+            with Snapshot(path) as snapshot:
+                saved_at = snapshot.meta['saved_at']
+
+            later = ManualClock(1000)
+            restored = cls(10, clock=later)
+            assert restored.restore(path, now=saved_at + 60) == 2, \
+                f"{cls.__name__}: entries expired during downtime must be skipped"
+            assert restored.get("short") is None, f"{cls.__name__}: expired while down"
+            remaining = restored.expiry.deadlines["long"] - later()
+            assert abs(remaining - 40) < 1e-6, \
+                f"{cls.__name__}: downtime must be subtracted, got {remaining}"
+            assert "forever" not in restored.expiry.deadlines, \
+                f"{cls.__name__}: no TTL stays no TTL"
+            later.advance(remaining)
+            assert restored.get("long") is None and restored.get("forever") == 3, \
+                f"{cls.__name__}: shortened TTL must expire on time"
+        print("✓ Test 6: downtime shortens TTL")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
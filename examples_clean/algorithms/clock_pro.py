@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+CLOCK-Pro Cache - полная реализация
+
+CLOCK-Pro (Jiang, Chen, Zhang, 2005) - приближение LIRS на кольце
+CLOCK. Страницы делятся на горячие (hot), холодные (cold) и тестовые
+(test - только ключ, без значения). Три стрелки обходят одно кольцо:
+- hand_cold вытесняет холодные страницы (или повышает их до горячих);
+- hand_hot понижает горячие страницы без обращений до холодных;
+- hand_test удаляет устаревшие тестовые страницы.
+Повторное обращение к тестовой странице увеличивает долю холодных
+страниц (mem_cold), истечение тестовой страницы - уменьшает.
+
+Логика стрелок повторяет go-clockpro, с двумя отличиями для маленьких
+кэшей: mem_cold не больше capacity - 1, а hand_test, догнав hand_cold,
+только сдвигает её, не выполняя шаг (иначе стрелки вызывают друг друга
+без конца). Кольцо хранится в массивах слотов со связями по индексам,
+биты обращения - в bytearray.
+"""
+
+from array import array
+import random
+import time
+
+from cache_base import CacheBase
+
+
+# Типы страниц (0 - свободный слот)
+PAGE_HOT = 1
+PAGE_COLD = 2
+PAGE_TEST = 3
+
+
+class ClockProCache(CacheBase):
+    """CLOCK-Pro кэш с горячими, холодными и тестовыми страницами"""
+
+    def __init__(self, capacity, stats=None):
+        """
+        Инициализация CLOCK-Pro кэша
+
+        Args:
+            capacity: Максимальное количество резидентных страниц
+                (тестовых страниц хранится не больше столько же)
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+        # Адаптивная доля холодных страниц: не больше capacity - 1, чтобы
+        # горячим оставался хотя бы один слот (при capacity=1 - ноль)
+        self.max_cold = max(1, capacity - 1)
+        self.mem_cold = self.max_cold
+
+        # Резидентные и тестовые страницы + один слот для вставки
+        slots = 2 * capacity + 1
+        self.cache = {}  # key -> slot (включая тестовые страницы)
+        self.keys = [None] * slots
+        self.values = [None] * slots
+        self.kind = bytearray(slots)
+        self.ref_bits = bytearray(slots)
+        self.prev = array('i', [0]) * slots
+        self.next = array('i', [0]) * slots
+        self.free = list(range(slots - 1, -1, -1))
+
+        # Стрелки (-1 - кольцо пусто)
+        self.hand_hot = -1
+        self.hand_cold = -1
+        self.hand_test = -1
+
+        self.count_hot = 0
+        self.count_cold = 0
+        self.count_test = 0
+
+        # Статистика
+        self._init_stats(stats)
+        self.test_hits = 0
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        slot = self.cache.get(key)
+        if slot is None or self.kind[slot] == PAGE_TEST:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        self.ref_bits[slot] = 1
+        if self._stats is not None:
+            self._stats.hits += 1
+        return self.values[slot]
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        slot = self.cache.get(key)
+        if slot is None:
+            # Новая страница начинает холодной
+            self._meta_add(key, value, PAGE_COLD)
+            self.count_cold += 1
+            return
+
+        if self.kind[slot] != PAGE_TEST:
+            # Горячая или холодная страница
+            self.values[slot] = value
+            self.ref_bits[slot] = 1
+            return
+
+        # Тестовая страница: ключ вернулся вскоре после вытеснения -
+        # холодным страницам нужно больше места, а сам ключ становится горячим
+        self.test_hits += 1
+        if self.mem_cold < self.max_cold:
+            self.mem_cold += 1
+        self.count_test -= 1
+        self._meta_del(slot)
+        self._meta_add(key, value, PAGE_HOT)
+        self.count_hot += 1
+
+    def _meta_add(self, key, value, kind):
+        """Освободить место и вставить страницу перед стрелкой hand_hot"""
+        self._evict()
+
+        slot = self.free.pop()
+        self.cache[key] = slot
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.kind[slot] = kind
+        self.ref_bits[slot] = 0
+
+        prev, next_ = self.prev, self.next
+        hand = self.hand_hot
+        if hand == -1:
+            # Первая страница
+            prev[slot] = next_[slot] = slot
+            self.hand_hot = self.hand_cold = self.hand_test = slot
+        else:
+            before = prev[hand]
+            next_[before] = slot
+            prev[slot] = before
+            next_[slot] = hand
+            prev[hand] = slot
+
+        if self.hand_cold == self.hand_hot:
+            self.hand_cold = prev[self.hand_cold]
+
+    def _meta_del(self, slot):
+        """Убрать страницу из кольца и индекса"""
+        del self.cache[self.keys[slot]]
+
+        prev, next_ = self.prev, self.next
+        before, after = prev[slot], next_[slot]
+        if before == slot:
+            # Это была последняя страница
+            self.hand_hot = self.hand_cold = self.hand_test = -1
+        else:
+            if slot == self.hand_hot:
+                self.hand_hot = before
+            if slot == self.hand_cold:
+                self.hand_cold = before
+            if slot == self.hand_test:
+                self.hand_test = before
+            next_[before] = after
+            prev[after] = before
+
+        self.keys[slot] = None
+        self.values[slot] = None
+        self.kind[slot] = 0
+        self.ref_bits[slot] = 0
+        self.free.append(slot)
+
+    def _evict(self):
+        """Двигать hand_cold, пока резидентных страниц не станет меньше capacity"""
+        while self.capacity <= self.count_hot + self.count_cold:
+            self._run_hand_cold()
+
+    def _run_hand_cold(self):
+        """Шаг стрелки холодных страниц"""
+        slot = self.hand_cold
+        if self.kind[slot] == PAGE_COLD:
+            if self.ref_bits[slot]:
+                # Обращение за время пребывания в кэше - страница горячая
+                self.kind[slot] = PAGE_HOT
+                self.ref_bits[slot] = 0
+                self.count_cold -= 1
+                self.count_hot += 1
+            else:
+                # Вытеснение: значение освобождается, ключ остаётся тестовым
+                self.kind[slot] = PAGE_TEST
+                self.values[slot] = None
+                self.count_cold -= 1
+                self.count_test += 1
+                if self._stats is not None:
+                    self._stats.evictions += 1
+                while self.capacity < self.count_test:
+                    self._run_hand_test()
+
+        self.hand_cold = self.next[self.hand_cold]
+        while self.capacity - self.mem_cold < self.count_hot:
+            self._run_hand_hot()
+
+    def _run_hand_hot(self):
+        """Шаг стрелки горячих страниц"""
+        if self.hand_hot == self.hand_test:
+            self._run_hand_test()
+
+        slot = self.hand_hot
+        if self.kind[slot] == PAGE_HOT:
+            if self.ref_bits[slot]:
+                self.ref_bits[slot] = 0
+            else:
+                self.kind[slot] = PAGE_COLD
+                self.count_hot -= 1
+                self.count_cold += 1
+
+        self.hand_hot = self.next[self.hand_hot]
+
+    def _run_hand_test(self):
+        """Шаг стрелки тестовых страниц"""
+        if self.hand_test == self.hand_cold:
+            # Стрелка холодных сдвигается вперёд без обработки страницы:
+            # полный шаг hand_cold отсюда замыкал бы рекурсию
+            # cold -> hot -> test -> cold, которая на маленьком кольце
+            # (все стрелки на одном слоте) не продвигается
+            self.hand_cold = self.next[self.hand_cold]
+
+        slot = self.hand_test
+        if self.kind[slot] == PAGE_TEST:
+            # Тестовый период истёк без обращений - холодным нужно меньше места
+            before = self.prev[slot]
+            self._meta_del(slot)
+            self.hand_test = before
+            self.count_test -= 1
+            if self.mem_cold > 1:
+                self.mem_cold -= 1
+
+        self.hand_test = self.next[self.hand_test]
+
+    def delete(self, key):
+        """Удалить элемент из кэша (тестовые страницы не затрагиваются)"""
+        slot = self.cache.get(key)
+        if slot is None or self.kind[slot] == PAGE_TEST:
+            return False
+
+        if self.kind[slot] == PAGE_HOT:
+            self.count_hot -= 1
+        else:
+            self.count_cold -= 1
+        self._meta_del(slot)
+        return True
+
+    def clear(self):
+        """Очистить кэш"""
+        self.__init__(self.capacity, stats=self.stats)
+        self.stats.reset()
+
+    def size(self):
+        """Текущий размер кэша (только резидентные страницы)"""
+        return self.count_hot + self.count_cold
+
+    def get_stats(self):
+        """Получить статистику"""
+        return {
+            **self.stats.snapshot(),
+            'test_hits': self.test_hits,
+            'current_size': self.count_hot + self.count_cold,
+            'capacity': self.capacity,
+            'hot_pages': self.count_hot,
+            'cold_pages': self.count_cold,
+            'test_pages': self.count_test,
+            'cold_target': self.mem_cold
+        }
+
+
+def demo():
+    """Демонстрация работы CLOCK-Pro кэша"""
+    print("=== CLOCK-Pro Cache Demo ===\n")
+
+    cache = ClockProCache(4)
+
+    print("1. Заполнение кэша (capacity=4):")
+    for key in ["a", "b", "c", "d"]:
+        cache.set(key, key.upper())
+    print(f"   {cache.get_stats()['cold_pages']} холодных страниц")
+
+    print("\n2. Обращения к 'a' и 'b', затем вставка 'e' и 'f':")
+    cache.get("a")
+    cache.get("b")
+    cache.set("e", "E")
+    cache.set("f", "F")
+    for key in ["a", "b", "c", "d", "e", "f"]:
+        print(f"   '{key}': {'есть' if cache.get(key) else 'вытеснен'}")
+
+    print("\n3. Возврат вытесненного 'c' (тестовая страница):")
+    cache.set("c", "C")
+    stats = cache.get_stats()
+    print(f"   test_hits: {stats['test_hits']}, горячих: {stats['hot_pages']}, "
+          f"cold_target: {stats['cold_target']}")
+
+
+def benchmark():
+    """Сравнение CLOCK-Pro с CLOCK, LRU и ARC"""
+    print("\n=== Benchmark ===\n")
+
+    from arc_adaptive_algorithm import ARCCache
+    from fifo_first_in_first_out import FIFOWithSecondChance
+    from lru_doubly_linked_list import LRUCache
+
+    rng = random.Random(42)
+    capacity = 500
+
+    # Горячий набор, перемежающийся длинными сканированиями
+    hot = [f"hot_{i}" for i in range(300)]
+    requests = []
+    for phase in range(20):
+        requests.extend(rng.choice(hot) for _ in range(2000))
+        requests.extend(f"scan_{phase}_{i}" for i in range(1000))
+
+    for name, cache in [("LRU", LRUCache(capacity)),
+                        ("CLOCK", FIFOWithSecondChance(capacity)),
+                        ("ARC", ARCCache(capacity)),
+                        ("CLOCK-Pro", ClockProCache(capacity))]:
+        start = time.perf_counter()
+        for key in requests:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        elapsed = time.perf_counter() - start
+
+        stats = cache.get_stats()
+        print(f"{name}:")
+        print(f"  Hit rate: {stats['hit_rate']:.2%}")
+        print(f"  Time: {elapsed:.3f}s ({len(requests) / elapsed:,.0f} ops/sec)")
+
+
+def test_correctness():
+    """Тесты корректности CLOCK-Pro"""
+    print("\n=== CLOCK-Pro Correctness Tests ===\n")
+
+    # Тест 1: Базовые операции
+    cache = ClockProCache(3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1, "'a' should exist"
+    cache.set("a", 10)
+    assert cache.get("a") == 10, "'a' should be updated"
+    assert cache.get("missing") is None, "'missing' should not exist"
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    assert cache.size() == 1, "Only 'a' should remain"
+    print("✓ Test 1: Basic operations")
+
+    # Тест 2: Инварианты счётчиков и кольца под случайной нагрузкой
+    cache = ClockProCache(50)
+    rng = random.Random(5)
+    for step in range(20000):
+        key = rng.randint(0, 300) if rng.random() < 0.7 else rng.randint(0, 40)
+        if rng.random() < 0.05:
+            cache.delete(key)
+        elif cache.get(key) is None:
+            cache.set(key, key)
+
+        assert cache.size() <= 50, "Resident pages must not exceed capacity"
+        assert cache.count_test <= 50, "Test pages must not exceed capacity"
+    kinds = [cache.kind[slot] for slot in cache.cache.values()]
+    assert kinds.count(PAGE_HOT) == cache.count_hot, "Hot count mismatch"
+    assert kinds.count(PAGE_COLD) == cache.count_cold, "Cold count mismatch"
+    assert kinds.count(PAGE_TEST) == cache.count_test, "Test count mismatch"
+
+    # Обход кольца посещает каждую страницу ровно один раз
+    seen = set()
+    slot = cache.hand_hot
+    while slot not in seen:
+        seen.add(slot)
+        slot = cache.next[slot]
+    assert seen == set(cache.cache.values()), "Ring must contain every page"
+    print("✓ Test 2: Counters and ring stay consistent")
+
+    # Тест 3: Тестовая страница превращается в горячую при возврате
+    cache = ClockProCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)          # Один из ключей становится тестовой страницей
+    evicted = [k for k, slot in cache.cache.items()
+               if cache.kind[slot] == PAGE_TEST]
+    assert len(evicted) == 1, "Exactly one test page expected"
+    key = evicted[0]
+    assert cache.get(key) is None, "Test page should be non-resident"
+    cache.set(key, 1)
+    assert cache.get_stats()['test_hits'] == 1, "Test hit expected"
+    assert cache.kind[cache.cache[key]] == PAGE_HOT, "Returning key becomes hot"
+    assert cache.get(key) == 1, "Key should be resident again"
+    print("✓ Test 3: Test page promotion")
+
+    # Тест 4: Малые ёмкости - стрелки не зацикливаются на одном слоте
+    cache = ClockProCache(1)
+    for key in (2, 2, 0):
+        cache.set(key, key)
+    assert cache.get(0) == 0 and cache.size() == 1, "Single slot must be replaced"
+    for capacity in (1, 2, 3, 5):
+        cache = ClockProCache(capacity)
+        rng = random.Random(capacity)
+        for _ in range(3000):
+            key = rng.randint(0, capacity * 4)
+            draw = rng.random()
+            if draw < 0.05:
+                cache.delete(key)
+            elif draw < 0.5:
+                cache.get(key)
+            else:
+                cache.set(key, key)
+            assert cache.size() <= capacity, "Resident pages must not exceed capacity"
+            assert cache.count_test <= capacity, "Test pages must not exceed capacity"
+            assert 1 <= cache.mem_cold <= max(1, capacity - 1), "Cold target out of range"
+    print("✓ Test 4: Small capacities")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
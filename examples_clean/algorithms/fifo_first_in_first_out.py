@@ -10,16 +10,24 @@ from collections import OrderedDict, deque
 import time
 import random
 
+from cache_base import CacheBase
+from timing_wheel import ExpiryIndex, ManualClock
 
-class FIFOCache:
+
+class FIFOCache(CacheBase):
     """FIFO кэш на основе OrderedDict"""
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, default_ttl=None, ttl_resolution=1.0,
+                 clock=time.monotonic, stats=None):
         """
         Инициализация FIFO кэша
 
         Args:
             capacity: Максимальный размер кэша
+            default_ttl: Срок жизни по умолчанию в секундах (None - бессрочно)
+            ttl_resolution: Длительность тика колеса таймеров
+            clock: Источник времени для TTL
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
@@ -27,10 +35,14 @@ class FIFOCache:
         self.capacity = capacity
         self.cache = OrderedDict()
 
+        # Сроки жизни (только для ключей с TTL)
+        self.default_ttl = default_ttl
+        self.expiry = ExpiryIndex(tick=ttl_resolution, clock=clock)
+        self._deadlines = self.expiry.deadlines
+
         # Статистика
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self._init_stats(stats)
+        self.expirations = 0
 
     def get(self, key):
         """
@@ -40,24 +52,36 @@ class FIFOCache:
             key: Ключ для поиска
 
         Returns:
-            Значение или None если не найдено
+            Значение или None если не найдено (или срок жизни истёк)
         """
+        if self._deadlines:
+            self._expire((key,))
+
         if key not in self.cache:
-            self.misses += 1
+            if self._stats is not None:
+                self._stats.misses += 1
             return None
 
         # В FIFO НЕ перемещаем элементы при доступе
-        self.hits += 1
+        if self._stats is not None:
+            self._stats.hits += 1
         return self.cache[key]
 
-    def set(self, key, value):
+    def set(self, key, value, ttl=None):
         """
         Установить значение по ключу
 
         Args:
             key: Ключ
             value: Значение
+            ttl: Срок жизни в секундах (None - default_ttl)
         """
+        if self._deadlines:
+            # Истёкшие элементы освобождают место раньше живых
+            self._expire()
+        if ttl is None:
+            ttl = self.default_ttl
+
         if key in self.cache:
             # Обновляем существующий ключ БЕЗ изменения позиции
             self.cache[key] = value
@@ -66,24 +90,113 @@ class FIFOCache:
             if len(self.cache) >= self.capacity:
                 # Удаляем первый элемент (самый старый по времени добавления)
                 evicted = self.cache.popitem(last=False)
-                self.evictions += 1
+                if self._stats is not None:
+                    self._stats.evictions += 1
+                if self._deadlines:
+                    self.expiry.forget(evicted[0])
 
             # Добавляем в конец
             self.cache[key] = value
 
+        if ttl is not None:
+            self.expiry.track(key, ttl)
+        elif self._deadlines:
+            # Перезапись без TTL делает ключ бессрочным
+            self.expiry.forget(key)
+
+    def _expire(self, keys=()):
+        """Удалить элементы с истёкшим сроком жизни"""
+        for key in self.expiry.collect(keys):
+            if self.delete(key):
+                self.expirations += 1
+
+    def get_many(self, keys):
+        """
+        Получить значения для пакета ключей
+
+        Args:
+            keys: Итерируемый набор ключей
+
+        Returns:
+            Список значений в порядке ключей (None для промахов)
+        """
+        if self._deadlines:
+            keys = list(keys)
+            self._expire(keys)
+
+        cache = self.cache
+        results = []
+        hits = 0
+
+        for key in keys:
+            if key in cache:
+                results.append(cache[key])
+                hits += 1
+            else:
+                results.append(None)
+
+        if self._stats is not None:
+            self._stats.hits += hits
+            self._stats.misses += len(results) - hits
+        return results
+
+    def set_many(self, items, ttl=None):
+        """
+        Установить пакет значений
+
+        Новые ключи добавляются в конец, лишние вытесняются из начала
+        очереди одним проходом после вставки всего пакета.
+
+        Args:
+            items: dict или итерируемый набор пар (key, value)
+            ttl: Срок жизни для всех элементов пакета (None - default_ttl)
+        """
+        if isinstance(items, dict):
+            items = items.items()
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl is not None or self._deadlines:
+            # Сроки жизни требуют поштучной обработки
+            for key, value in items:
+                self.set(key, value, ttl=ttl)
+            return
+
+        cache = self.cache
+        for key, value in items:
+            cache[key] = value  # Существующий ключ сохраняет позицию
+
+        overflow = len(cache) - self.capacity
+        if overflow > 0:
+            popitem = cache.popitem
+            for _ in range(overflow):
+                popitem(last=False)
+            if self._stats is not None:
+                self._stats.evictions += overflow
+
     def delete(self, key):
         """Удалить элемент из кэша"""
         if key in self.cache:
             del self.cache[key]
+            if self._deadlines:
+                self.expiry.forget(key)
             return True
         return False
 
+    def delete_many(self, keys):
+        """Удалить пакет ключей, возвращает количество удалённых"""
+        if self._deadlines:
+            return sum(1 for key in keys if self.delete(key))
+
+        pop = self.cache.pop
+        missing = object()
+        return sum(1 for key in keys if pop(key, missing) is not missing)
+
     def clear(self):
         """Очистить кэш"""
         self.cache.clear()
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self.expiry.clear()
+        self.stats.reset()
+        self.expirations = 0
 
     def size(self):
         """Текущий размер кэша"""
@@ -95,40 +208,53 @@ class FIFOCache:
 
     def get_stats(self):
         """Получить статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
-
         return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'evictions': self.evictions,
-            'hit_rate': hit_rate,
+            **self.stats.snapshot(),
+            'expirations': self.expirations,
             'current_size': len(self.cache),
             'capacity': self.capacity
         }
 
 
-class FIFOCacheDeque:
-    """Альтернативная реализация FIFO через deque и dict"""
+class FIFOCacheDeque(CacheBase):
+    """
+    Альтернативная реализация FIFO через deque и dict
+
+    Удаление O(1): запись в очереди не ищется, а становится "надгробием"
+    (tombstone) и пропускается при вытеснении. Когда надгробий становится
+    больше compact_ratio от длины очереди, очередь уплотняется за один
+    проход - амортизированно O(1) на удаление.
+    """
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, compact_ratio=0.5, stats=None):
         """
         Инициализация FIFO кэша с deque
 
         Args:
             capacity: Максимальный размер кэша
+            compact_ratio: Доля надгробий в очереди, после которой
+                выполняется уплотнение
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
+        if not 0 < compact_ratio < 1:
+            raise ValueError("Compact ratio must be between 0 and 1")
 
         self.capacity = capacity
+        self.compact_ratio = compact_ratio
         self.cache = {}  # key -> value
-        self.order = deque()  # Порядок добавления
+        self.order = deque()  # Порядок добавления: (key, seq)
+
+        # Номер вставки живой записи: запись очереди с другим номером -
+        # надгробие (ключ удалён или удалён и вставлен заново)
+        self.seqs = {}  # key -> seq
+        self.next_seq = 0
+        self.tombstones = 0
 
         # Статистика
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self._init_stats(stats)
+        self.compactions = 0
 
     def get(self, key):
         """
@@ -141,10 +267,12 @@ class FIFOCacheDeque:
             Значение или None если не найдено
         """
         if key not in self.cache:
-            self.misses += 1
+            if self._stats is not None:
+                self._stats.misses += 1
             return None
 
-        self.hits += 1
+        if self._stats is not None:
+            self._stats.hits += 1
         return self.cache[key]
 
     def set(self, key, value):
@@ -162,79 +290,190 @@ class FIFOCacheDeque:
             # Новый ключ
             if len(self.cache) >= self.capacity:
                 # Удаляем самый старый
-                old_key = self.order.popleft()
-                del self.cache[old_key]
-                self.evictions += 1
+                self._evict()
+                if self._stats is not None:
+                    self._stats.evictions += 1
 
             # Добавляем новый
+            self._append(key)
             self.cache[key] = value
-            self.order.append(key)
+
+    def _append(self, key):
+        """Поставить новый ключ в конец очереди"""
+        seq = self.next_seq
+        self.next_seq = seq + 1
+        self.seqs[key] = seq
+        self.order.append((key, seq))
+
+    def _evict(self):
+        """Вытеснить самый старый живой ключ, пропуская надгробия"""
+        popleft = self.order.popleft
+        seqs = self.seqs
+        while True:
+            key, seq = popleft()
+            if seqs.get(key) == seq:
+                break
+            self.tombstones -= 1
+
+        del seqs[key]
+        del self.cache[key]
+
+    def _compact(self):
+        """Убрать надгробия из очереди одним проходом"""
+        seqs = self.seqs
+        self.order = deque(
+            entry for entry in self.order if seqs.get(entry[0]) == entry[1]
+        )
+        self.tombstones = 0
+        self.compactions += 1
+
+    def _maybe_compact(self):
+        """Уплотнить очередь, если надгробий слишком много"""
+        if self.tombstones > self.compact_ratio * len(self.order):
+            self._compact()
+
+    def get_many(self, keys):
+        """
+        Получить значения для пакета ключей
+
+        Args:
+            keys: Итерируемый набор ключей
+
+        Returns:
+            Список значений в порядке ключей (None для промахов)
+        """
+        cache = self.cache
+        results = []
+        hits = 0
+
+        for key in keys:
+            if key in cache:
+                results.append(cache[key])
+                hits += 1
+            else:
+                results.append(None)
+
+        if self._stats is not None:
+            self._stats.hits += hits
+            self._stats.misses += len(results) - hits
+        return results
+
+    def set_many(self, items):
+        """
+        Установить пакет значений
+
+        Лишние элементы вытесняются из начала очереди одним проходом
+        после вставки всего пакета.
+
+        Args:
+            items: dict или итерируемый набор пар (key, value)
+        """
+        if isinstance(items, dict):
+            items = items.items()
+
+        cache = self.cache
+        append = self._append
+        for key, value in items:
+            if key not in cache:
+                append(key)
+            cache[key] = value
+
+        overflow = len(cache) - self.capacity
+        if overflow > 0:
+            evict = self._evict
+            for _ in range(overflow):
+                evict()
+            if self._stats is not None:
+                self._stats.evictions += overflow
 
     def delete(self, key):
-        """Удалить элемент из кэша"""
+        """Удалить элемент из кэша (O(1): запись в очереди становится надгробием)"""
         if key in self.cache:
             del self.cache[key]
-            self.order.remove(key)  # O(n) операция
+            del self.seqs[key]
+            self.tombstones += 1
+            self._maybe_compact()
             return True
         return False
 
+    def delete_many(self, keys):
+        """Удалить пакет ключей, возвращает количество удалённых"""
+        cache = self.cache
+        seqs = self.seqs
+        deleted = 0
+        for key in keys:
+            if key in cache:
+                del cache[key]
+                del seqs[key]
+                deleted += 1
+
+        # Уплотнение не чаще одного раза на пакет
+        self.tombstones += deleted
+        self._maybe_compact()
+        return deleted
+
     def clear(self):
         """Очистить кэш"""
         self.cache.clear()
         self.order.clear()
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self.seqs.clear()
+        self.tombstones = 0
+        self.stats.reset()
+        self.compactions = 0
 
     def size(self):
         """Текущий размер кэша"""
         return len(self.cache)
 
     def peek_order(self):
-        """Посмотреть порядок элементов"""
-        return list(self.order)
+        """Посмотреть порядок элементов (без надгробий)"""
+        seqs = self.seqs
+        return [key for key, seq in self.order if seqs.get(key) == seq]
 
     def get_stats(self):
         """Получить статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
-
         return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'evictions': self.evictions,
-            'hit_rate': hit_rate,
+            **self.stats.snapshot(),
             'current_size': len(self.cache),
-            'capacity': self.capacity
+            'capacity': self.capacity,
+            'tombstones': self.tombstones,
+            'compactions': self.compactions
         }
 
 
-class FIFOWithSecondChance:
+class FIFOWithSecondChance(CacheBase):
     """
     FIFO с второй возможностью (Clock algorithm)
 
-    Дает элементам второй шанс если к ним недавно обращались
+    Дает элементам второй шанс если к ним недавно обращались.
+    Элементы лежат в кольце фиксированного размера, биты обращения -
+    в bytearray: попадание - это установка одного байта, а вытеснение
+    записывает новый ключ прямо в освободившийся слот под стрелкой.
     """
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, stats=None):
         """
         Инициализация FIFO с второй возможностью
 
         Args:
             capacity: Максимальный размер кэша
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
 
         self.capacity = capacity
-        self.cache = {}  # key -> (value, reference_bit)
-        self.order = deque()  # Циклический порядок
-        self.clock_hand = 0  # Указатель на текущий элемент
+        self.cache = {}  # key -> slot
+
+        # Кольцо слотов
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+        self.ref_bits = bytearray(capacity)  # Биты обращения
+        self.free = list(range(capacity - 1, -1, -1))  # Свободные слоты
+        self.clock_hand = 0  # Указатель на текущий слот
 
         # Статистика
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self._init_stats(stats)
         self.second_chances = 0
 
     def get(self, key):
@@ -247,15 +486,17 @@ class FIFOWithSecondChance:
         Returns:
             Значение или None если не найдено
         """
-        if key not in self.cache:
-            self.misses += 1
+        slot = self.cache.get(key)
+        if slot is None:
+            if self._stats is not None:
+                self._stats.misses += 1
             return None
 
         # Устанавливаем бит обращения
-        value, _ = self.cache[key]
-        self.cache[key] = (value, True)
-        self.hits += 1
-        return value
+        self.ref_bits[slot] = 1
+        if self._stats is not None:
+            self._stats.hits += 1
+        return self.values[slot]
 
     def set(self, key, value):
         """
@@ -265,53 +506,76 @@ class FIFOWithSecondChance:
             key: Ключ
             value: Значение
         """
-        if key in self.cache:
+        slot = self.cache.get(key)
+        if slot is not None:
             # Обновляем существующий ключ
-            self.cache[key] = (value, True)
+            self.values[slot] = value
+            self.ref_bits[slot] = 1
+            return
+
+        if self.free:
+            slot = self.free.pop()
         else:
-            # Новый ключ
-            if len(self.cache) >= self.capacity:
-                # Ищем жертву с помощью алгоритма часов
-                self._evict_with_clock()
+            # Ищем жертву с помощью алгоритма часов
+            slot = self._evict_with_clock()
 
-            # Добавляем новый элемент
-            self.cache[key] = (value, False)
-            self.order.append(key)
+        # Новый элемент занимает слот за стрелкой (конец кругового порядка)
+        self.cache[key] = slot
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.ref_bits[slot] = 0
 
     def _evict_with_clock(self):
-        """Найти и удалить жертву с помощью алгоритма часов"""
-        while True:
-            if self.clock_hand >= len(self.order):
-                self.clock_hand = 0
+        """Найти и удалить жертву с помощью алгоритма часов, возвращает её слот"""
+        ref_bits = self.ref_bits
+        capacity = self.capacity
+        hand = self.clock_hand
+
+        while ref_bits[hand]:
+            # Даем второй шанс
+            ref_bits[hand] = 0
+            self.second_chances += 1
+            hand = (hand + 1) % capacity
+
+        # Нашли жертву
+        del self.cache[self.keys[hand]]
+        if self._stats is not None:
+            self._stats.evictions += 1
+        self.clock_hand = (hand + 1) % capacity
+        return hand
 
-            key = self.order[self.clock_hand]
-            value, ref_bit = self.cache[key]
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        slot = self.cache.pop(key, None)
+        if slot is None:
+            return False
 
-            if not ref_bit:
-                # Нашли жертву
-                del self.cache[key]
-                del self.order[self.clock_hand]
-                self.evictions += 1
-                if self.clock_hand >= len(self.order) and self.order:
-                    self.clock_hand = 0
-                return
-            else:
-                # Даем второй шанс
-                self.cache[key] = (value, False)
-                self.second_chances += 1
-                self.clock_hand += 1
+        self.keys[slot] = None
+        self.values[slot] = None
+        self.ref_bits[slot] = 0
+        self.free.append(slot)
+        return True
+
+    def clear(self):
+        """Очистить кэш"""
+        self.cache.clear()
+        self.keys = [None] * self.capacity
+        self.values = [None] * self.capacity
+        self.ref_bits = bytearray(self.capacity)
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.clock_hand = 0
+        self.stats.reset()
+        self.second_chances = 0
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.cache)
 
     def get_stats(self):
         """Получить расширенную статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
-
         return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'evictions': self.evictions,
+            **self.stats.snapshot(),
             'second_chances': self.second_chances,
-            'hit_rate': hit_rate,
             'current_size': len(self.cache),
             'capacity': self.capacity
         }
@@ -511,6 +775,57 @@ def performance_test():
         print()
 
 
+def benchmark_deletes():
+    """Смешанный поток set/delete: надгробия vs deque.remove() vs OrderedDict"""
+    print("\n=== Delete-heavy Benchmark ===\n")
+
+    class FIFOCacheDequeRemove(FIFOCacheDeque):
+        """Прежний вариант: delete() ищет ключ в очереди за O(n)"""
+
+        def _append(self, key):
+            self.order.append(key)
+
+        def _evict(self):
+            del self.cache[self.order.popleft()]
+
+        def delete(self, key):
+            if key in self.cache:
+                del self.cache[key]
+                self.order.remove(key)
+                return True
+            return False
+
+    entries = 100000
+    operations = 10000
+
+    implementations = [
+        ("Deque + remove() (O(n))", FIFOCacheDequeRemove),
+        ("Deque + tombstones", FIFOCacheDeque),
+        ("OrderedDict", FIFOCache)
+    ]
+
+    for name, cache_class in implementations:
+        rng = random.Random(42)
+        cache = cache_class(entries)
+        for i in range(entries):
+            cache.set(f"key_{i}", i)
+
+        next_key = entries
+        start = time.perf_counter()
+        for _ in range(operations):
+            if rng.random() < 0.5:
+                cache.set(f"key_{next_key}", next_key)
+                next_key += 1
+            else:
+                # Инвалидация случайного ключа из текущего окна
+                cache.delete(f"key_{rng.randrange(next_key - entries, next_key)}")
+        elapsed = time.perf_counter() - start
+
+        print(f"  {name}:")
+        print(f"    Time: {elapsed:.4f}s ({operations / elapsed:,.0f} ops/sec)")
+        print(f"    Size: {cache.size():,}")
+
+
 def test_correctness():
     """Тесты корректности FIFO кэшей"""
     print("\n=== FIFO Correctness Tests ===\n")
@@ -545,11 +860,12 @@ def test_correctness():
         cache = cache_class(2)
         cache.set("a", 1)
         cache.set("b", 2)
-        cache.set("a", 10)  # Обновление
-        cache.set("c", 3)   # Должен вытеснить 'b'
-
+        cache.set("a", 10)  # Обновление не меняет позицию 'a' в очереди
         assert cache.get("a") == 10, "'a' should be updated"
-        assert cache.get("b") is None, "'b' should be evicted"
+        cache.set("c", 3)   # Всё равно вытесняет 'a' - он добавлен первым
+
+        assert cache.get("a") is None, "'a' should be evicted despite the update"
+        assert cache.get("b") == 2, "'b' should exist"
         assert cache.get("c") == 3, "'c' should exist"
         print(f"  ✓ Update existing key")
 
@@ -558,6 +874,59 @@ def test_correctness():
     test_implementation(FIFOCache, "OrderedDict FIFO")
     test_implementation(FIFOCacheDeque, "Deque FIFO")
 
+    # Пакетные операции дают тот же результат, что и поштучные
+    for cache_class in [FIFOCache, FIFOCacheDeque]:
+        print(f"Testing bulk operations for {cache_class.__name__}:")
+        single = cache_class(3)
+        bulk = cache_class(3)
+        items = [("a", 1), ("b", 2), ("c", 3), ("a", 10), ("d", 4), ("e", 5)]
+        for key, value in items:
+            single.set(key, value)
+        bulk.set_many(items)
+        assert bulk.peek_order() == single.peek_order(), "set_many must match set()"
+        assert bulk.get_stats()['evictions'] == single.get_stats()['evictions'], \
+            "Evictions must match"
+
+        assert bulk.get_many(["e", "missing", "c"]) == [5, None, 3], \
+            "Results must keep input order"
+        assert bulk.delete_many(["c", "missing", "d"]) == 2, "Two keys should be deleted"
+        assert bulk.peek_order() == ["e"], "Only 'e' should remain"
+        print("  ✓ get_many / set_many / delete_many\n")
+
+    # Надгробия: удалённый и вставленный заново ключ встаёт в конец очереди
+    print("Testing deque tombstones:")
+    cache = FIFOCacheDeque(3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    cache.delete("a")
+    cache.set("a", 10)          # Старая запись 'a' в очереди - надгробие
+    cache.set("d", 4)           # Вытесняет 'b', а не новую 'a'
+    assert cache.peek_order() == ["c", "a", "d"], "Tombstone must be skipped"
+    assert cache.get("a") == 10 and cache.get("b") is None, "Eviction order"
+
+    cache = FIFOCacheDeque(100, compact_ratio=0.5)
+    cache.set_many((i, i) for i in range(100))
+    cache.delete_many(range(0, 100, 2))
+    assert cache.get_stats()['compactions'] == 0, "50 of 100 is not above the ratio"
+    cache.delete(1)
+    assert cache.get_stats()['compactions'] == 1, "Compaction expected"
+    assert len(cache.order) == cache.size() == 49, "Queue must hold only live keys"
+    print("  ✓ tombstones / compaction\n")
+
+    # TTL: истёкший элемент покидает очередь, не считаясь вытеснением
+    print("Testing TTL expiry:")
+    clock = ManualClock()
+    cache = FIFOCache(2, default_ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    clock.advance(10)
+    cache.set("c", 3)           # 'a' уже истёк - вытеснение не нужно
+    assert cache.peek_order() == ["b", "c"], "'a' should be expired"
+    stats = cache.get_stats()
+    assert stats['expirations'] == 1 and stats['evictions'] == 0, "Expiry counted separately"
+    print("  ✓ ttl / default_ttl / expirations\n")
+
     # Специальный тест для Second Chance
     print("Testing Second Chance FIFO:")
     cache = FIFOWithSecondChance(2)
@@ -570,6 +939,16 @@ def test_correctness():
     assert cache.get("b") is None, "'b' should be evicted"
     assert cache.get("c") == 3, "'c' should exist"
     print("  ✓ Second chance mechanism")
+
+    # Кольцо: освобождённый слот переиспользуется без вытеснения
+    cache = FIFOWithSecondChance(3)
+    for key, value in [("a", 1), ("b", 2), ("c", 3)]:
+        cache.set(key, value)
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    cache.set("d", 4)
+    assert cache.size() == 3 and cache.evictions == 0, "Free slot must be reused"
+    assert len(cache.keys) == 3, "Ring must not grow"
+    print("  ✓ Ring slots / delete")
     print("  All tests passed for Second Chance FIFO!\n")
 
 
@@ -578,4 +957,5 @@ if __name__ == "__main__":
     demo_second_chance()
     benchmark()
     performance_test()
+    benchmark_deletes()
     test_correctness()
\ No newline at end of file
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+GDSF Cache - вытеснение с учётом стоимости промаха (GreedyDual-Size-Frequency)
+
+Промахи стоят по-разному: конфиг читается за 0.5 мс, отчёт строится 2 с.
+LRU и LFU этого не видят и вытесняют дорогой отчёт так же охотно, как
+дешёвый конфиг. GDSF (Cherkasova, 1998) даёт каждому элементу приоритет
+
+    H = L + частота * стоимость / размер
+
+и вытесняет элемент с наименьшим H. L ("инфляция") - приоритет последнего
+вытесненного: новые элементы стартуют с текущего L, поэтому давно не
+использованные элементы с большой накопленной частотой постепенно
+проигрывают свежим (старение без пересчёта всех приоритетов).
+
+- Стоимость измеряется автоматически: get_or_load(key, loader) засекает
+  время загрузчика. Для set() без стоимости берётся оценка: среднее
+  (EWMA) по классу ключа cost_class(key) или по всем загрузкам.
+- Размер - weigher(key, value) (по умолчанию 1), бюджет - max_weight.
+- Попадание меняет только частоту и приоритет записи: куча приоритетов
+  ленивая - при вытеснении устаревший элемент кучи, чей приоритет с тех
+  пор вырос, возвращается в кучу с новым значением.
+- Кроме hit rate кэш считает сэкономленное время бэкенда: сумму
+  стоимостей попаданий против времени загрузок на промахах.
+"""
+
+import heapq
+import random
+import time
+
+from cache_base import CacheBase
+
+
+# Классы ключей для демонстрации: (префикс, стоимость промаха в секундах, доля ключей)
+KEY_CLASSES = [
+    ('config', 0.0005, 0.4),
+    ('user', 0.02, 0.4),
+    ('search', 0.2, 0.15),
+    ('report', 2.0, 0.05)
+]
+
+# Поля записи: [значение, частота, стоимость, размер, приоритет, номер в куче]
+VALUE, FREQ, COST, SIZE, PRIORITY, SEQ = range(6)
+
+
+class GDSFCache(CacheBase):
+    """GreedyDual-Size-Frequency: приоритет = L + частота * стоимость / размер"""
+
+    def __init__(self, capacity, weigher=None, max_weight=None, loader=None,
+                 cost_class=None, default_cost=0.001, cost_smoothing=0.2,
+                 clock=time.perf_counter, stats=None):
+        """
+        Инициализация GDSF кэша
+
+        Args:
+            capacity: Максимальное количество элементов
+            weigher: Функция weigher(key, value) -> int, размер элемента (не меньше 1)
+            max_weight: Бюджет суммарного размера (требует weigher)
+            loader: Загрузчик по умолчанию для get_or_load: loader(key) -> value
+            cost_class: Функция cost_class(key) -> класс ключа для оценки
+                стоимости (например, префикс); None - одна оценка на все ключи
+            default_cost: Стоимость промаха в секундах, пока нет измерений
+            cost_smoothing: Вес нового измерения в EWMA оценке класса (0, 1]
+            clock: Источник времени для замера загрузчика
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if max_weight is not None and max_weight <= 0:
+            raise ValueError("Max weight must be positive")
+        if max_weight is not None and weigher is None:
+            raise ValueError("max_weight requires a weigher")
+        if not 0 < cost_smoothing <= 1:
+            raise ValueError("Cost smoothing must be in (0, 1]")
+
+        self.capacity = capacity
+        self.weigher = weigher
+        self.max_weight = max_weight
+        self.current_weight = 0
+
+        self.loader = loader
+        self.cost_class = cost_class
+        self.default_cost = default_cost
+        self.cost_smoothing = cost_smoothing
+        self.clock = clock
+        self.cost_estimates = {}  # класс ключа -> EWMA стоимости загрузки
+        self.global_cost = None   # EWMA по всем загрузкам
+
+        self.entries = {}  # key -> запись (список, см. VALUE..SEQ)
+        self.heap = []     # (приоритет, номер, ключ); приоритет может отставать
+        self.inflation = 0.0
+        self.seq = 0
+
+        # Статистика
+        self._init_stats(stats)
+        self.saved_time = 0.0    # Стоимость попаданий - время, не потраченное бэкендом
+        self.backend_time = 0.0  # Стоимость промахов, загруженных в кэш
+        self.loads = 0
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        entry[FREQ] += 1
+        entry[PRIORITY] = self.inflation + entry[FREQ] * entry[COST] / entry[SIZE]
+        self.saved_time += entry[COST]
+        if self._stats is not None:
+            self._stats.hits += 1
+        return entry[VALUE]
+
+    def get_or_load(self, key, loader=None):
+        """
+        Получить значение, при промахе загрузить его и замерить стоимость
+
+        Args:
+            key: Ключ
+            loader: Загрузчик (None - загрузчик кэша)
+
+        Returns:
+            Значение (None, если загрузчик вернул None - такое не кэшируется)
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        loader = loader or self.loader
+        if loader is None:
+            raise ValueError("No loader given")
+
+        start = self.clock()
+        value = loader(key)
+        cost = self.clock() - start
+        self.loads += 1
+        self._learn(key, cost)
+        if value is not None:
+            self.set(key, value, cost=cost)
+        return value
+
+    def _learn(self, key, cost):
+        """Учесть замер загрузчика в оценках стоимости"""
+        alpha = self.cost_smoothing
+        if self.global_cost is None:
+            self.global_cost = cost
+        else:
+            self.global_cost += alpha * (cost - self.global_cost)
+
+        if self.cost_class is not None:
+            cost_class = self.cost_class(key)
+            estimate = self.cost_estimates.get(cost_class)
+            self.cost_estimates[cost_class] = (
+                cost if estimate is None else estimate + alpha * (cost - estimate))
+
+    def estimate_cost(self, key):
+        """Ожидаемая стоимость промаха по ключу (секунды)"""
+        if self.cost_class is not None:
+            estimate = self.cost_estimates.get(self.cost_class(key))
+            if estimate is not None:
+                return estimate
+        return self.global_cost if self.global_cost is not None else self.default_cost
+
+    def set(self, key, value, cost=None):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+            cost: Стоимость промаха в секундах (None - оценка по классу ключа)
+        """
+        size = max(self.weigher(key, value), 1) if self.weigher is not None else 1
+        if self.max_weight is not None and size > self.max_weight:
+            # Элемент не помещается даже в пустой кэш - не кэшируем
+            self.delete(key)
+            return
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            # Обновление: частота сохраняется, стоимость и размер - новые.
+            # Приоритет может и уменьшиться, поэтому элемент кучи - новый
+            if cost is not None:
+                entry[COST] = cost
+            self.current_weight += size - entry[SIZE]
+            entry[VALUE] = value
+            entry[SIZE] = size
+            self._push(key, entry, self.inflation + entry[FREQ] * entry[COST] / size)
+            self._evict_overflow(keep=key)
+            return
+
+        if cost is None:
+            cost = self.estimate_cost(key)
+        self.backend_time += cost
+
+        # Место освобождается до вставки, чтобы новый элемент не вытеснил сам себя
+        self._evict_overflow(extra_count=1, extra_weight=size)
+
+        entry = [value, 1, cost, size, 0.0, 0]
+        self.entries[key] = entry
+        self._push(key, entry, self.inflation + cost / size)
+        self.current_weight += size
+
+    def _push(self, key, entry, priority):
+        """Записать приоритет и добавить элемент кучи (прежний становится устаревшим)"""
+        self.seq += 1
+        entry[PRIORITY] = priority
+        entry[SEQ] = self.seq
+        heapq.heappush(self.heap, (priority, self.seq, key))
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self._rebuild_heap()
+
+    def _evict_overflow(self, extra_count=0, extra_weight=0, keep=None):
+        """Вытеснять по минимальному приоритету, пока лимиты превышены"""
+        entries = self.entries
+        while entries and (
+                len(entries) + extra_count > self.capacity
+                or (self.max_weight is not None
+                    and self.current_weight + extra_weight > self.max_weight)):
+            if keep is not None and len(entries) == 1:
+                break
+            self._evict(keep)
+
+    def _evict(self, keep=None):
+        """Вытеснить элемент с наименьшим приоритетом и поднять инфляцию до него"""
+        heap, entries = self.heap, self.entries
+        deferred = None
+        while True:
+            priority, seq, key = heapq.heappop(heap)
+            entry = entries.get(key)
+            if entry is None or entry[SEQ] != seq:
+                continue  # Ключ удалён или вставлен заново
+            if entry[PRIORITY] > priority:
+                # После попаданий приоритет вырос - вернуть с актуальным
+                heapq.heappush(heap, (entry[PRIORITY], seq, key))
+                continue
+            if key == keep:
+                deferred = (priority, seq, key)
+                continue
+            break
+
+        if deferred is not None:
+            heapq.heappush(heap, deferred)
+        self.inflation = priority
+        del entries[key]
+        self.current_weight -= entry[SIZE]
+        if self._stats is not None:
+            self._stats.evictions += 1
+
+    def _rebuild_heap(self):
+        """Собрать кучу заново только из живых записей"""
+        self.heap = [(entry[PRIORITY], entry[SEQ], key) for key, entry in self.entries.items()]
+        heapq.heapify(self.heap)
+
+    def delete(self, key):
+        """Удалить элемент из кэша (элемент кучи станет устаревшим)"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        self.current_weight -= entry[SIZE]
+        return True
+
+    def clear(self):
+        """Очистить кэш (оценки стоимости сохраняются)"""
+        self.entries.clear()
+        self.heap = []
+        self.inflation = 0.0
+        self.current_weight = 0
+        self.stats.reset()
+        self.saved_time = 0.0
+        self.backend_time = 0.0
+        self.loads = 0
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.entries)
+
+    def get_stats(self):
+        """Получить статистику"""
+        total_time = self.saved_time + self.backend_time
+        stats = {
+            **self.stats.snapshot(),
+            'current_size': len(self.entries),
+            'capacity': self.capacity,
+            'inflation': self.inflation,
+            'loads': self.loads,
+            'saved_seconds': self.saved_time,
+            'backend_seconds': self.backend_time,
+            # Доля времени бэкенда, которую сэкономил кэш (hit rate, взвешенный стоимостью)
+            'cost_savings': self.saved_time / total_time if total_time > 0 else 0,
+            'cost_estimates': dict(self.cost_estimates)
+        }
+        if self.weigher is not None:
+            stats['current_weight'] = self.current_weight
+            stats['max_weight'] = self.max_weight
+        return stats
+
+
+def mixed_cost_keys(num_keys, seed=42):
+    """
+    Ключи с разной стоимостью промаха (0.5 мс .. 2 с, см. KEY_CLASSES)
+
+    Класс ключа выбирается случайно и не зависит от популярности: номер
+    ключа в Zipf-потоке - его ранг.
+
+    Returns:
+        (список ключей-строк "класс:номер", dict ключ -> стоимость)
+    """
+    rng = random.Random(seed)
+    prefixes = [prefix for prefix, _, _ in KEY_CLASSES]
+    costs_by_prefix = {prefix: cost for prefix, cost, _ in KEY_CLASSES}
+    shares = [share for _, _, share in KEY_CLASSES]
+
+    keys = [f"{prefix}:{index}"
+            for index, prefix in enumerate(rng.choices(prefixes, weights=shares, k=num_keys))]
+    costs = {key: costs_by_prefix[key.partition(':')[0]] for key in keys}
+    return keys, costs
+
+
+def key_prefix(key):
+    """Класс ключа - префикс до двоеточия"""
+    return key.partition(':')[0]
+
+
+def timed_loader(costs, clock):
+    """Загрузчик, который "работает" costs[key] секунд по ManualClock"""
+    def loader(key):
+        clock.advance(costs[key])
+        return key
+    return loader
+
+
+def demo():
+    """Демонстрация работы GDSF кэша"""
+    print("=== GDSF Cache Demo ===\n")
+
+    from timing_wheel import ManualClock
+
+    clock = ManualClock()
+    costs = {"config:1": 0.0005, "config:2": 0.0005, "report:1": 2.0}
+    cache = GDSFCache(2, loader=timed_loader(costs, clock), cost_class=key_prefix, clock=clock)
+
+    print("1. Загрузка report:1 (2 с) и config:1 (0.5 мс) через get_or_load:")
+    cache.get_or_load("report:1")
+    cache.get_or_load("config:1")
+    estimates = ", ".join(f"{prefix} {cost * 1000:.1f} мс"
+                          for prefix, cost in cache.get_stats()['cost_estimates'].items())
+    print(f"   Замеренная стоимость: {estimates}")
+
+    print("\n2. config:1 запрошен ещё 3 раза, затем загрузка config:2:")
+    for _ in range(3):
+        cache.get("config:1")
+    cache.get_or_load("config:2")
+    print(f"   В кэше: {sorted(cache.entries)} - дорогой отчёт пережил частый дешёвый ключ")
+    print(f"   Инфляция L = {cache.inflation:.4f}")
+
+    print("\n3. Повторный запрос отчёта:")
+    cache.get_or_load("report:1")
+    stats = cache.get_stats()
+    print(f"   Сэкономлено бэкенда: {stats['saved_seconds']:.4f} с, "
+          f"потрачено: {stats['backend_seconds']:.4f} с")
+
+
+def benchmark():
+    """Сэкономленное время бэкенда против LRU/LFU/ARC при разной стоимости промахов"""
+    print("\n=== Benchmark ===\n")
+
+    from arc_adaptive_algorithm import ARCCache
+    from lfu_least_frequently_used import LFUCache
+    from lru_doubly_linked_list import LRUCache
+    from timing_wheel import ManualClock
+    from workload_generators import ZipfWorkload
+
+    capacity, num_keys, requests = 1000, 20000, 200000
+    keys, costs = mixed_cost_keys(num_keys)
+    stream = [keys[index] for index in ZipfWorkload(num_keys, requests, alpha=0.9).stream(seed=1)]
+    clock = ManualClock()
+    loader = timed_loader(costs, clock)
+
+    print(f"Ёмкость {capacity}, {num_keys} ключей, стоимость промаха 0.5 мс .. 2 с:")
+    print(f"  {'Policy':<6} {'Hit rate':>9} {'Saved, s':>10} {'Backend, s':>11} "
+          f"{'Savings':>8} {'ns/op':>6}")
+    for name, cache in [("LRU", LRUCache(capacity)), ("LFU", LFUCache(capacity)),
+                        ("ARC", ARCCache(capacity)),
+                        ("GDSF", GDSFCache(capacity, loader=loader, cost_class=key_prefix,
+                                           clock=clock))]:
+        saved = backend = 0.0
+        start = time.perf_counter()
+        if isinstance(cache, GDSFCache):
+            for key in stream:
+                cache.get_or_load(key)
+            stats = cache.get_stats()
+            saved, backend = stats['saved_seconds'], stats['backend_seconds']
+        else:
+            # Политики без учёта стоимости: те же загрузки, время считается снаружи
+            for key in stream:
+                if cache.get(key) is None:
+                    cache.set(key, loader(key))
+                    backend += costs[key]
+                else:
+                    saved += costs[key]
+            stats = cache.get_stats()
+        elapsed = time.perf_counter() - start
+
+        print(f"  {name:<6} {stats['hit_rate']:>9.2%} {saved:>10.0f} {backend:>11.0f} "
+              f"{saved / (saved + backend):>8.2%} {elapsed / requests * 1e9:>6.0f}")
+
+
+def test_correctness():
+    """Тесты корректности GDSF кэша"""
+    print("\n=== GDSF Correctness Tests ===\n")
+
+    from timing_wheel import ManualClock
+
+    # Тест 1: Базовые операции
+    cache = GDSFCache(3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1, "'a' should exist"
+    cache.set("a", 10)
+    assert cache.get("a") == 10, "'a' should be updated"
+    assert cache.get("missing") is None, "'missing' should not exist"
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    assert cache.size() == 1, "Only 'a' should remain"
+    print("✓ Test 1: Basic operations")
+
+    # Тест 2: Дорогой промах переживает более частый дешёвый ключ
+    cache = GDSFCache(2)
+    cache.set("cheap", 1, cost=0.001)
+    cache.set("expensive", 2, cost=1.0)
+    for _ in range(10):
+        cache.get("cheap")
+    cache.set("new", 3, cost=0.001)
+    assert "expensive" in cache.entries and "cheap" not in cache.entries, \
+        "11 * 1 ms < 1 s: the cheap key goes"
+    assert cache.inflation == 11 * 0.001, "L rises to the evicted priority"
+    assert cache.entries["new"][PRIORITY] == cache.inflation + 0.001, "New keys start at L"
+    print("✓ Test 2: Cost-aware eviction and inflation")
+
+    # Тест 3: Стоимость замеряется загрузчиком, оценки по классам
+    clock = ManualClock()
+    costs = {"report:1": 2.0, "report:2": 1.0, "config:1": 0.001}
+    cache = GDSFCache(10, loader=timed_loader(costs, clock), cost_class=key_prefix, clock=clock)
+    for key in ["report:1", "config:1", "report:2"]:
+        assert cache.get_or_load(key) == key, "Loader result is returned"
+    assert cache.entries["report:1"][COST] == 2.0, "Measured cost is stored per key"
+    assert cache.cost_estimates["report"] == 2.0 + 0.2 * (1.0 - 2.0), "EWMA per class"
+    cache.set("report:3", "r3")
+    assert cache.entries["report:3"][COST] == cache.cost_estimates["report"], \
+        "set() without cost uses the class estimate"
+    cache.get_or_load("report:1")
+    stats = cache.get_stats()
+    assert stats['loads'] == 3 and stats['saved_seconds'] == 2.0, "Hits save their cost"
+    assert abs(stats['backend_seconds'] - (3.001 + cache.cost_estimates["report"])) < 1e-9, \
+        "Misses spend their cost"
+    assert cache.get_or_load("x", loader=lambda key: None) is None and "x" not in cache.entries, \
+        "None from the loader is not cached"
+    print("✓ Test 3: Loader timing and cost estimates")
+
+    # Тест 4: Размер - бюджет соблюдается, слишком большой элемент не кэшируется
+    cache = GDSFCache(100, weigher=lambda key, value: value, max_weight=100)
+    cache.set("small", 10, cost=1.0)
+    cache.set("big", 80, cost=1.0)
+    cache.set("medium", 30, cost=1.0)
+    assert cache.current_weight <= 100, "Weight budget holds"
+    assert "big" not in cache.entries, "Same cost, larger size - lower priority"
+    cache.set("huge", 200, cost=100.0)
+    assert "huge" not in cache.entries, "Oversized value is not cached"
+    cache.set("small", 90, cost=1.0)
+    assert cache.current_weight <= 100 and cache.get("small") == 90, "Resize keeps the updated key"
+    print("✓ Test 4: Weigher / max_weight")
+
+    # Тест 5: Случайная нагрузка совпадает с эталоном (минимум приоритета перебором)
+    rng = random.Random(5)
+    cache = GDSFCache(20)
+    model, inflation, seq = {}, 0.0, 0  # key -> [freq, cost, priority, seq]
+    for _ in range(20000):
+        key = rng.randint(0, 60)
+        op = rng.random()
+        if op < 0.1:
+            assert cache.delete(key) == (model.pop(key, None) is not None), "Delete result"
+        elif op < 0.6:
+            entry = model.get(key)
+            assert (cache.get(key) is not None) == (entry is not None), "Membership"
+            if entry is not None:
+                entry[0] += 1
+                entry[2] = inflation + entry[0] * entry[1] / 1
+        else:
+            cost = rng.choice([0.001, 0.01, 0.1, 1.0])
+            if key in model:
+                entry = model[key]
+                entry[1] = cost
+                seq += 1
+                entry[2], entry[3] = inflation + entry[0] * cost / 1, seq
+            else:
+                if len(model) >= 20:
+                    victim = min(model, key=lambda k: (model[k][2], model[k][3]))
+                    inflation = model.pop(victim)[2]
+                seq += 1
+                model[key] = [1, cost, inflation + cost / 1, seq]
+            cache.set(key, key, cost=cost)
+        assert set(cache.entries) == set(model), "Contents must match reference model"
+    assert cache.inflation == inflation and len(cache.heap) <= 2 * cache.size() + 64, \
+        "Inflation matches, heap stays compact"
+    print("✓ Test 5: Matches reference model")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
@@ -6,37 +6,63 @@ LFU удаляет наименее часто используемые элем
 При одинаковой частоте использует LRU для выбора жертвы.
 """
 
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict, defaultdict, deque
 import heapq
 import time
 
+from cache_base import CacheBase
+from cache_snapshot import Snapshot, remaining_ttl, write_snapshot
+from timing_wheel import ExpiryIndex, ManualClock
 
-class LFUCache:
+
+class LFUCache(CacheBase):
     """LFU кэш с O(1) операциями"""
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, weigher=None, max_weight=None,
+                 default_ttl=None, ttl_resolution=1.0, clock=time.monotonic, stats=None):
         """
         Инициализация LFU кэша
 
         Args:
             capacity: Максимальный размер кэша
+            weigher: Функция weigher(key, value) -> int, вес элемента
+                (например, размер в байтах)
+            max_weight: Бюджет суммарного веса (требует weigher)
+            default_ttl: Срок жизни по умолчанию в секундах (None - бессрочно)
+            ttl_resolution: Длительность тика колеса таймеров
+            clock: Источник времени для TTL
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
+        if max_weight is not None and max_weight <= 0:
+            raise ValueError("Max weight must be positive")
+        if max_weight is not None and weigher is None:
+            raise ValueError("max_weight requires a weigher")
 
         self.capacity = capacity
         self.min_freq = 0
 
+        # Учёт веса (только если задан weigher)
+        self.weigher = weigher
+        self.max_weight = max_weight
+        self.weights = {}  # key -> вес
+        self.current_weight = 0
+
         # Основное хранилище: key -> (value, freq)
         self.key_to_val_freq = {}
 
         # Частоты: freq -> OrderedDict of keys
         self.freq_to_keys = defaultdict(OrderedDict)
 
+        # Сроки жизни (только для ключей с TTL)
+        self.default_ttl = default_ttl
+        self.expiry = ExpiryIndex(tick=ttl_resolution, clock=clock)
+        self._deadlines = self.expiry.deadlines
+
         # Статистика
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self._init_stats(stats)
+        self.expirations = 0
 
     def _update_freq(self, key, value=None):
         """Обновить частоту использования ключа"""
@@ -73,51 +99,219 @@ class LFUCache:
             key: Ключ для поиска
 
         Returns:
-            Значение или None если не найдено
+            Значение или None если не найдено (или срок жизни истёк)
         """
+        if self._deadlines:
+            self._expire((key,))
+
         if key not in self.key_to_val_freq:
-            self.misses += 1
+            if self._stats is not None:
+                self._stats.misses += 1
             return None
 
         # Обновляем частоту
         self._update_freq(key)
-        self.hits += 1
+        if self._stats is not None:
+            self._stats.hits += 1
         return self.key_to_val_freq[key][0]
 
-    def set(self, key, value):
+    def set(self, key, value, ttl=None):
         """
         Установить значение по ключу
 
         Args:
             key: Ключ
             value: Значение
+            ttl: Срок жизни в секундах (None - default_ttl)
         """
         if self.capacity == 0:
             return
 
-        if key in self.key_to_val_freq:
+        if self._deadlines:
+            # Истёкшие элементы освобождают место раньше живых
+            self._expire()
+        if ttl is None:
+            ttl = self.default_ttl
+
+        if self.weigher is not None:
+            self._set_weighted(key, value)
+        elif key in self.key_to_val_freq:
             # Обновляем существующий ключ
             self._update_freq(key, value)
         else:
             # Новый ключ - проверяем размер
             if len(self.key_to_val_freq) >= self.capacity:
-                # Удаляем элемент с минимальной частотой
-                # (первый в OrderedDict для этой частоты - LRU среди равных)
-                evict_key = next(iter(self.freq_to_keys[self.min_freq]))
-                del self.freq_to_keys[self.min_freq][evict_key]
-                if len(self.freq_to_keys[self.min_freq]) == 0:
-                    del self.freq_to_keys[self.min_freq]
-                del self.key_to_val_freq[evict_key]
-                self.evictions += 1
+                self._evict()
+                if self._stats is not None:
+                    self._stats.evictions += 1
 
             # Добавляем новый ключ
             self._update_freq(key, value)
 
+        if ttl is not None:
+            self.expiry.track(key, ttl)
+        elif self._deadlines:
+            # Перезапись без TTL делает ключ бессрочным
+            self.expiry.forget(key)
+
+    def _expire(self, keys=()):
+        """Удалить элементы с истёкшим сроком жизни"""
+        for key in self.expiry.collect(keys):
+            if self.delete(key):
+                self.expirations += 1
+
+    def _set_weighted(self, key, value):
+        """Вставка с учётом веса: вытеснение до тех пор, пока бюджет не соблюдён"""
+        weight = self.weigher(key, value)
+        if self.max_weight is not None and weight > self.max_weight:
+            # Элемент не помещается даже в пустой кэш - не кэшируем
+            self.delete(key)
+            return
+
+        if key in self.key_to_val_freq:
+            self.current_weight += weight - self.weights[key]
+            self.weights[key] = weight
+            self._update_freq(key, value)
+            self._evict_overweight(keep=key)
+        else:
+            if len(self.key_to_val_freq) >= self.capacity:
+                self._evict()
+                if self._stats is not None:
+                    self._stats.evictions += 1
+            # Освобождаем место до вставки, чтобы новый ключ
+            # с частотой 1 не вытеснил сам себя
+            self._evict_overweight(extra=weight)
+            self._update_freq(key, value)
+            self.weights[key] = weight
+            self.current_weight += weight
+
+    def _evict_overweight(self, extra=0, keep=None):
+        """Вытеснять по LFU, пока суммарный вес (плюс extra) превышает бюджет"""
+        if self.max_weight is None:
+            return
+
+        store = self.key_to_val_freq
+        while store and self.current_weight + extra > self.max_weight:
+            if keep is not None and len(store) == 1:
+                break
+            self._evict(skip=keep)
+            if self._stats is not None:
+                self._stats.evictions += 1
+
+    def _evict(self, skip=None):
+        """
+        Удалить элемент с минимальной частотой
+        (первый в OrderedDict для этой частоты - LRU среди равных)
+
+        Args:
+            skip: Ключ, который нельзя вытеснять (только что обновлённый)
+        """
+        freq_to_keys = self.freq_to_keys
+        if self.min_freq not in freq_to_keys:
+            # После серии вытеснений минимальная частота могла устареть
+            self.min_freq = min(freq_to_keys)
+
+        freq = self.min_freq
+        evict_key = next(iter(freq_to_keys[freq]))
+        if skip is not None and evict_key == skip:
+            evict_key, freq = next(
+                (candidate, f)
+                for f in sorted(freq_to_keys)
+                for candidate in freq_to_keys[f]
+                if candidate != skip
+            )
+
+        del freq_to_keys[freq][evict_key]
+        if len(freq_to_keys[freq]) == 0:
+            del freq_to_keys[freq]
+        del self.key_to_val_freq[evict_key]
+        if self.weigher is not None:
+            self.current_weight -= self.weights.pop(evict_key)
+        if self._deadlines:
+            self.expiry.forget(evict_key)
+
+    def get_many(self, keys):
+        """
+        Получить значения для пакета ключей
+
+        Args:
+            keys: Итерируемый набор ключей
+
+        Returns:
+            Список значений в порядке ключей (None для промахов)
+        """
+        if self._deadlines:
+            keys = list(keys)
+            self._expire(keys)
+
+        store = self.key_to_val_freq
+        update_freq = self._update_freq
+        results = []
+        hits = 0
+
+        for key in keys:
+            if key in store:
+                update_freq(key)
+                results.append(store[key][0])
+                hits += 1
+            else:
+                results.append(None)
+
+        # Статистика обновляется один раз на пакет
+        if self._stats is not None:
+            self._stats.hits += hits
+            self._stats.misses += len(results) - hits
+        return results
+
+    def set_many(self, items, ttl=None):
+        """
+        Установить пакет значений
+
+        Порядок вытеснения совпадает с последовательными вызовами set():
+        новый ключ с частотой 1 может вытеснить предыдущий ключ пакета.
+
+        Args:
+            items: dict или итерируемый набор пар (key, value)
+            ttl: Срок жизни для всех элементов пакета (None - default_ttl)
+        """
+        if isinstance(items, dict):
+            items = items.items()
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl is not None or self._deadlines:
+            # Сроки жизни требуют поштучной обработки
+            for key, value in items:
+                self.set(key, value, ttl=ttl)
+            return
+
+        if self.weigher is not None:
+            for key, value in items:
+                self._set_weighted(key, value)
+            return
+
+        store = self.key_to_val_freq
+        update_freq = self._update_freq
+        capacity = self.capacity
+        evictions = 0
+
+        for key, value in items:
+            if key not in store and len(store) >= capacity:
+                self._evict()
+                evictions += 1
+            update_freq(key, value)
+
+        if self._stats is not None:
+            self._stats.evictions += evictions
+
     def delete(self, key):
         """Удалить элемент из кэша"""
         if key in self.key_to_val_freq:
             _, freq = self.key_to_val_freq[key]
             del self.key_to_val_freq[key]
+            if self.weigher is not None:
+                self.current_weight -= self.weights.pop(key)
+            if self._deadlines:
+                self.expiry.forget(key)
             del self.freq_to_keys[freq][key]
             if len(self.freq_to_keys[freq]) == 0:
                 del self.freq_to_keys[freq]
@@ -126,19 +320,79 @@ class LFUCache:
             return True
         return False
 
+    def delete_many(self, keys):
+        """Удалить пакет ключей, возвращает количество удалённых"""
+        return sum(1 for key in keys if self.delete(key))
+
     def clear(self):
         """Очистить кэш"""
         self.key_to_val_freq.clear()
         self.freq_to_keys.clear()
         self.min_freq = 0
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self.weights.clear()
+        self.current_weight = 0
+        self.expiry.clear()
+        self.stats.reset()
+        self.expirations = 0
 
     def size(self):
         """Текущий размер кэша"""
         return len(self.key_to_val_freq)
 
+    def snapshot(self, path):
+        """
+        Сохранить содержимое и частоты в бинарный снимок (см. cache_snapshot)
+
+        Returns:
+            Число сохранённых элементов
+        """
+        def entries():
+            # От частых к редким, внутри частоты - от свежих к старым
+            store = self.key_to_val_freq
+            for freq in sorted(self.freq_to_keys, reverse=True):
+                for key in reversed(self.freq_to_keys[freq]):
+                    yield key, store[key][0], freq, remaining_ttl(self.expiry, key)
+
+        return write_snapshot(path, 'LFUCache', {'capacity': self.capacity},
+                              [('entries', entries())])
+
+    def restore(self, path, now=None):
+        """
+        Заменить содержимое снимком, сохранив частоты и порядок внутри частоты
+
+        Загружаются только самые частые элементы, помещающиеся в ёмкость.
+
+        Args:
+            path: Путь к файлу снимка
+            now: Время восстановления по time.time() (None - текущее);
+                простой после снимка вычитается из остатка TTL
+
+        Returns:
+            Число загруженных элементов
+        """
+        with Snapshot(path, now=now) as snapshot:
+            snapshot.expect('LFUCache')
+            entries = list(snapshot.records('entries', limit=self.capacity))
+
+        self.clear()
+        store, freq_to_keys = self.key_to_val_freq, self.freq_to_keys
+        for key, value, freq, ttl in reversed(entries):
+            ttl = snapshot.live_ttl(ttl)
+            if ttl is not None and ttl <= 0:
+                continue
+            store[key] = (value, freq)
+            freq_to_keys[freq][key] = None
+            if self.weigher is not None:
+                self.weights[key] = self.weigher(key, value)
+                self.current_weight += self.weights[key]
+            if ttl is not None:
+                self.expiry.track(key, ttl)
+
+        if store:
+            self.min_freq = min(freq_to_keys)
+        self._evict_overweight()
+        return len(store)
+
     def get_frequency_distribution(self):
         """Получить распределение частот"""
         dist = {}
@@ -146,28 +400,37 @@ class LFUCache:
             dist[freq] = len(keys)
         return dist
 
-    def get_stats(self):
-        """Получить статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
+    def get_stats(self, distribution=True):
+        """
+        Получить статистику
 
-        return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'evictions': self.evictions,
-            'hit_rate': hit_rate,
+        Args:
+            distribution: Добавить frequency_distribution - обход всех
+                корзин частот; False - для частых опросов метрик
+        """
+        stats = {
+            **self.stats.snapshot(),
+            'expirations': self.expirations,
             'current_size': len(self.key_to_val_freq),
             'capacity': self.capacity,
-            'min_frequency': self.min_freq,
-            'frequency_distribution': self.get_frequency_distribution()
+            'min_frequency': self.min_freq
         }
+        if distribution:
+            stats['frequency_distribution'] = self.get_frequency_distribution()
+        if self.weigher is not None:
+            stats['current_weight'] = self.current_weight
+            stats['max_weight'] = self.max_weight
+        return stats
 
 
-class LFUCacheWithDecay:
+class LFUCacheWithEagerDecay:
     """
-    LFU кэш с затуханием частот
+    LFU кэш с затуханием частот (эталонная реализация)
 
-    Периодически уменьшает частоты для адаптации к изменениям паттернов
+    Периодически уменьшает частоты для адаптации к изменениям паттернов.
+    Каждое затухание перестраивает все корзины - O(n) раз в decay_interval
+    операций. Используется как эталон порядка вытеснения для
+    LFUCacheWithDecay.
     """
 
     def __init__(self, capacity, decay_factor=0.5, decay_interval=100):
@@ -188,14 +451,19 @@ class LFUCacheWithDecay:
         """Применить затухание если нужно"""
         self.operations += 1
         if self.operations % self.decay_interval == 0:
-            # Применяем затухание ко всем частотам
+            # Применяем затухание ко всем частотам. Корзины обходятся по
+            # возрастанию частоты: при слиянии ключи с меньшей исходной
+            # частотой оказываются первыми кандидатами на вытеснение
+            store = self.base_cache.key_to_val_freq
             new_key_to_val_freq = {}
             new_freq_to_keys = defaultdict(OrderedDict)
 
-            for key, (value, freq) in self.base_cache.key_to_val_freq.items():
+            for freq in sorted(self.base_cache.freq_to_keys):
                 new_freq = max(1, int(freq * self.decay_factor))
-                new_key_to_val_freq[key] = (value, new_freq)
-                new_freq_to_keys[new_freq][key] = None
+                bucket = new_freq_to_keys[new_freq]
+                for key in self.base_cache.freq_to_keys[freq]:
+                    new_key_to_val_freq[key] = (store[key][0], new_freq)
+                    bucket[key] = None
 
             self.base_cache.key_to_val_freq = new_key_to_val_freq
             self.base_cache.freq_to_keys = new_freq_to_keys
@@ -212,15 +480,245 @@ class LFUCacheWithDecay:
         self._maybe_decay()
         self.base_cache.set(key, value)
 
-    def get_stats(self):
-        """Получить статистику"""
-        stats = self.base_cache.get_stats()
+    def get_stats(self, distribution=True):
+        """Получить статистику (distribution - как у LFUCache.get_stats)"""
+        stats = self.base_cache.get_stats(distribution)
         stats['decay_factor'] = self.decay_factor
         stats['decay_interval'] = self.decay_interval
         stats['operations'] = self.operations
         return stats
 
 
+class FrequencyBucket:
+    """Корзина частоты: цепочка сегментов в порядке вытеснения"""
+
+    __slots__ = ('count', 'segments')
+
+    def __init__(self):
+        self.count = 0
+        self.segments = deque([OrderedDict()])
+
+
+class LFUCacheWithDecay(CacheBase):
+    """
+    LFU кэш с ленивым затуханием частот
+
+    Затухание делит эпохи: при смене эпохи перенумеровываются только
+    корзины частот (их не больше числа различных частот), а частота
+    ключа пересчитывается при следующем обращении к нему. Корзины при
+    слиянии не копируются - цепочки их сегментов склеиваются. Сегменты,
+    опустевшие после ухода ключей, выбрасываются, когда их становится
+    больше половины цепочки. Порядок вытеснения совпадает с
+    LFUCacheWithEagerDecay.
+    """
+
+    def __init__(self, capacity, decay_factor=0.5, decay_interval=100, stats=None):
+        """
+        Инициализация LFU кэша с затуханием
+
+        Args:
+            capacity: Максимальный размер кэша
+            decay_factor: Коэффициент затухания (0.5 = половина частоты)
+            decay_interval: Интервал операций между затуханиями
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+        self.decay_factor = decay_factor
+        self.decay_interval = decay_interval
+        self.operations = 0
+        self.epoch = 0
+
+        # key -> [value, freq, epoch, сегмент]; freq актуальна на момент epoch
+        self.entries = {}
+
+        # Частота (в текущей эпохе) -> FrequencyBucket
+        self.buckets = {}
+        self.min_freq = 0
+
+        # Статистика
+        self._init_stats(stats)
+
+    def _decayed(self, freq, epochs):
+        """Частота после затухания за epochs эпох"""
+        factor = self.decay_factor
+        while epochs > 0 and freq > 1:
+            new_freq = max(1, int(freq * factor))
+            if new_freq == freq:
+                break
+            freq = new_freq
+            epochs -= 1
+        return freq
+
+    def _maybe_decay(self):
+        """Начать новую эпоху, если пора (O(число корзин), а не O(n))"""
+        self.operations += 1
+        if self.operations % self.decay_interval != 0:
+            return
+
+        self.epoch += 1
+        factor = self.decay_factor
+        buckets = {}
+        for freq in sorted(self.buckets):
+            bucket = self.buckets[freq]
+            new_freq = max(1, int(freq * factor))
+            target = buckets.get(new_freq)
+            if target is None:
+                buckets[new_freq] = bucket
+            else:
+                # Ключи с большей исходной частотой идут после
+                target.count += bucket.count
+                target.segments.extend(bucket.segments)
+                self._compact(target)
+        self.buckets = buckets
+        if buckets:
+            self.min_freq = min(buckets)
+
+    @staticmethod
+    def _compact(bucket):
+        """Выбросить пустые сегменты, если их больше половины цепочки"""
+        segments = bucket.segments
+        if len(segments) > 2 * bucket.count + 1:
+            # Каждый пустой сегмент оставлен удалением ключа, поэтому
+            # проход окупается этими удалениями - O(1) амортизированно
+            bucket.segments = deque(segment for segment in segments if segment)
+
+    def _current_freq(self, entry):
+        """Применить к записи пропущенные затухания"""
+        lag = self.epoch - entry[2]
+        if lag:
+            entry[1] = self._decayed(entry[1], lag)
+            entry[2] = self.epoch
+        return entry[1]
+
+    def _append(self, key, entry, freq):
+        """Добавить ключ в конец корзины freq"""
+        bucket = self.buckets.get(freq)
+        if bucket is None:
+            bucket = self.buckets[freq] = FrequencyBucket()
+        segment = bucket.segments[-1]
+        segment[key] = None
+        bucket.count += 1
+        entry[1] = freq
+        entry[3] = segment
+
+    def _unlink(self, key, entry):
+        """Убрать ключ из его корзины, возвращает его текущую частоту"""
+        freq = self._current_freq(entry)
+        segment = entry[3]
+        del segment[key]
+        bucket = self.buckets[freq]
+        bucket.count -= 1
+        if bucket.count == 0:
+            del self.buckets[freq]
+        elif not segment:
+            self._compact(bucket)
+        return freq
+
+    def _touch(self, key, entry):
+        """Обращение к ключу: частота + 1"""
+        freq = self._unlink(key, entry)
+        if self.min_freq == freq and freq not in self.buckets:
+            self.min_freq = freq + 1
+        self._append(key, entry, freq + 1)
+
+    def _evict(self):
+        """Удалить самый первый ключ корзины с минимальной частотой"""
+        buckets = self.buckets
+        if self.min_freq not in buckets:
+            self.min_freq = min(buckets)
+
+        freq = self.min_freq
+        bucket = buckets[freq]
+        segments = bucket.segments
+        while not segments[0]:
+            segments.popleft()
+        key, _ = segments[0].popitem(last=False)
+
+        bucket.count -= 1
+        if bucket.count == 0:
+            del buckets[freq]
+        del self.entries[key]
+        if self._stats is not None:
+            self._stats.evictions += 1
+
+    def get(self, key):
+        """Получить значение с учётом затухания"""
+        self._maybe_decay()
+
+        entry = self.entries.get(key)
+        if entry is None:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        self._touch(key, entry)
+        if self._stats is not None:
+            self._stats.hits += 1
+        return entry[0]
+
+    def set(self, key, value):
+        """Установить значение с учётом затухания"""
+        self._maybe_decay()
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            if value is not None:
+                entry[0] = value
+            self._touch(key, entry)
+            return
+
+        if len(self.entries) >= self.capacity:
+            self._evict()
+
+        entry = self.entries[key] = [value, 1, self.epoch, None]
+        self._append(key, entry, 1)
+        self.min_freq = 1
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        self._unlink(key, entry)
+        return True
+
+    def clear(self):
+        """Очистить кэш"""
+        self.entries.clear()
+        self.buckets.clear()
+        self.min_freq = 0
+        self.operations = 0
+        self.epoch = 0
+        self.stats.reset()
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.entries)
+
+    def get_frequency_distribution(self):
+        """Получить распределение частот"""
+        return {freq: bucket.count for freq, bucket in self.buckets.items()}
+
+    def get_stats(self, distribution=True):
+        """Получить статистику (distribution - как у LFUCache.get_stats)"""
+        stats = {
+            **self.stats.snapshot(),
+            'current_size': len(self.entries),
+            'capacity': self.capacity,
+            'min_frequency': self.min_freq,
+            'decay_factor': self.decay_factor,
+            'decay_interval': self.decay_interval,
+            'operations': self.operations,
+            'epoch': self.epoch
+        }
+        if distribution:
+            stats['frequency_distribution'] = self.get_frequency_distribution()
+        return stats
+
+
 def demo():
     """Демонстрация работы LFU кэша"""
     print("=== LFU Cache Demo ===\n")
@@ -308,6 +806,37 @@ def demo_decay():
         print(f"   Старый 'горячий' '{key}': {'сохранён' if val else 'вытеснен'}")
 
 
+def benchmark_decay():
+    """Ленивое затухание vs полная перестройка корзин"""
+    print("\n=== Decay Benchmark: lazy vs eager ===\n")
+
+    import random
+
+    entries = 50000
+    requests = 10000
+    rng = random.Random(42)
+    keys = [rng.randrange(entries * 2) for _ in range(requests)]
+
+    for name, cache_class in [("Eager (rebuild)", LFUCacheWithEagerDecay),
+                              ("Lazy (epochs)", LFUCacheWithDecay)]:
+        cache = cache_class(entries, decay_factor=0.5, decay_interval=100)
+        for i in range(entries):
+            cache.set(i, i)
+
+        worst = 0.0
+        start = time.perf_counter()
+        for key in keys:
+            op_start = time.perf_counter()
+            if cache.get(key) is None:
+                cache.set(key, key)
+            worst = max(worst, time.perf_counter() - op_start)
+        elapsed = time.perf_counter() - start
+
+        print(f"{name}, {entries:,} entries, decay every 100 ops:")
+        print(f"  Ops/sec: {requests / elapsed:,.0f}")
+        print(f"  Worst operation: {worst * 1000:.2f} ms")
+
+
 def benchmark():
     """Сравнение LFU с LRU"""
     print("\n=== LFU vs LRU Benchmark ===\n")
@@ -468,11 +997,84 @@ def test_correctness():
         cache.set(f"trigger_{i}", i)
 
     # После затухания частоты должны уменьшиться
+    assert 'frequency_distribution' not in cache.get_stats(distribution=False), \
+        "Distribution can be skipped"
     stats = cache.get_stats()
     max_freq = max(stats['frequency_distribution'].keys())
     assert max_freq <= 6, f"Frequencies should decay, max={max_freq}"
     print("✓ Test 4: Frequency decay works")
 
+    # Тест 5: Ленивое затухание повторяет эталонное (полную перестройку)
+    import random
+    for decay_factor in [0.5, 0.7]:
+        rng = random.Random(3)
+        eager = LFUCacheWithEagerDecay(20, decay_factor=decay_factor, decay_interval=7)
+        lazy = LFUCacheWithDecay(20, decay_factor=decay_factor, decay_interval=7)
+        for step in range(20000):
+            key = rng.randint(0, 60)
+            if rng.random() < 0.7:
+                assert eager.get(key) == lazy.get(key), f"get differs at step {step}"
+            else:
+                eager.set(key, step)
+                lazy.set(key, step)
+            assert eager.base_cache.key_to_val_freq.keys() == lazy.entries.keys(), \
+                f"Resident keys differ at step {step}"
+        assert eager.get_stats()['frequency_distribution'] == \
+            lazy.get_stats()['frequency_distribution'], "Frequencies must match"
+
+    # Сегменты, опустевшие после обращений, не копятся между эпохами
+    rng = random.Random(1)
+    cache = LFUCacheWithDecay(200, decay_factor=0.5, decay_interval=50)
+    for step in range(100000):
+        key = int(rng.paretovariate(1.0)) % 1000
+        if cache.get(key) is None:
+            cache.set(key, step)
+    for bucket in cache.buckets.values():
+        assert len(bucket.segments) <= 2 * bucket.count + 1, "Empty segments must be dropped"
+    print("✓ Test 5: Lazy decay matches eager eviction order")
+
+    # Тест 6: Пакетные операции совпадают с поштучными
+    single = LFUCache(3)
+    bulk = LFUCache(3)
+    items = [("a", 1), ("b", 2), ("a", 10), ("c", 3), ("d", 4), ("e", 5)]
+    for key, value in items:
+        single.set(key, value)
+    bulk.set_many(items)
+    assert bulk.key_to_val_freq == single.key_to_val_freq, "set_many must match set()"
+    assert bulk.get_many(["a", "missing", "e"]) == [10, None, 5], "Results must keep input order"
+    assert bulk.get_stats()['hits'] == 2, "Batch hits must be counted"
+    assert bulk.delete_many(["a", "missing"]) == 1, "One key should be deleted"
+    print("✓ Test 6: get_many / set_many / delete_many")
+
+    # Тест 7: Ёмкость по весу
+    cache = LFUCache(100, weigher=lambda key, value: len(value), max_weight=10)
+    cache.set("a", "xxxx")
+    cache.get("a")              # freq('a') = 2
+    cache.set("b", "xxxx")      # freq('b') = 1
+    cache.set("c", "xxxxx")     # 13 > 10 - вытесняется 'b' (наименьшая частота)
+    assert cache.get("b") is None, "'b' should be evicted by weight"
+    assert cache.get("c") == "xxxxx", "New key must not evict itself"
+    assert cache.get_stats()['current_weight'] == 9, "Weight must be 9"
+    cache.set("a", "x" * 8)     # Обновление 'a' вытесняет 'c', но не само себя
+    assert cache.get("a") == "x" * 8 and cache.get("c") is None, "'c' should be evicted"
+    assert cache.get_stats()['current_weight'] == 8, "Weight must be 8"
+    print("✓ Test 7: weigher / max_weight")
+
+    # Тест 8: TTL - истёкший ключ не вытесняет живые, несмотря на частоту
+    clock = ManualClock()
+    cache = LFUCache(2, clock=clock)
+    cache.set("hot", 1, ttl=10)
+    for _ in range(5):
+        cache.get("hot")
+    cache.set("cold", 2)
+    clock.advance(10)
+    cache.set("new", 3)         # Место 'hot' освобождено истечением
+    assert cache.get("cold") == 2, "'cold' should not be evicted"
+    assert cache.get("hot") is None, "'hot' should be expired"
+    stats = cache.get_stats()
+    assert stats['expirations'] == 1 and stats['evictions'] == 0, "Expiry counted separately"
+    print("✓ Test 8: ttl / expirations")
+
     print("\nAll tests passed!")
 
 
@@ -480,4 +1082,5 @@ if __name__ == "__main__":
     demo()
     demo_decay()
     benchmark()
+    benchmark_decay()
     test_correctness()
\ No newline at end of file
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+LIRS (Low Inter-reference Recency Set) Cache - полная реализация
+
+LIRS (Jiang & Zhang, 2002) оценивает ключи не по давности последнего
+обращения, а по интервалу между двумя последними обращениями (IRR).
+Ключи с коротким IRR (LIR) занимают почти весь кэш и не вытесняются
+одноразовыми обращениями; остальные (HIR) живут в маленькой очереди.
+
+Структуры:
+- стек S - недавние обращения к LIR, резидентным и нерезидентным HIR;
+  на дне стека всегда LIR ключ;
+- очередь Q - резидентные HIR ключи, кандидаты на вытеснение.
+Нерезидентный HIR в стеке S - это "история": повторное обращение к
+нему доказывает короткий IRR, и ключ становится LIR.
+"""
+
+from collections import OrderedDict
+import random
+import time
+
+from cache_base import CacheBase
+
+
+# Статусы ключей
+LIR = 0
+HIR_RESIDENT = 1
+HIR_NONRESIDENT = 2
+
+
+class LIRSCache(CacheBase):
+    """LIRS кэш на стеке S и очереди Q"""
+
+    def __init__(self, capacity, hir_ratio=0.01, max_nonresident=None, stats=None):
+        """
+        Инициализация LIRS кэша
+
+        Args:
+            capacity: Максимальный размер кэша
+            hir_ratio: Доля кэша под резидентные HIR ключи
+            max_nonresident: Лимит нерезидентных HIR в стеке S
+                (по умолчанию capacity)
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+        self.hir_capacity = max(1, int(capacity * hir_ratio)) if capacity > 1 else 0
+        self.lir_capacity = capacity - self.hir_capacity
+        self.max_nonresident = capacity if max_nonresident is None else max_nonresident
+
+        self.values = {}              # Резидентные ключи: key -> value
+        self.status = {}              # key -> LIR / HIR_RESIDENT / HIR_NONRESIDENT
+        self.stack = OrderedDict()    # Стек S (конец - вершина)
+        self.queue = OrderedDict()    # Очередь Q резидентных HIR (начало - жертва)
+        self.nonresident = OrderedDict()  # Нерезидентные HIR в порядке появления
+        self.lir_count = 0
+
+        # Статистика
+        self._init_stats(stats)
+
+    def _prune(self):
+        """Снять с дна стека всё, кроме LIR"""
+        stack, status = self.stack, self.status
+        while stack:
+            key = next(iter(stack))
+            state = status[key]
+            if state == LIR:
+                return
+            del stack[key]
+            if state == HIR_NONRESIDENT:
+                del status[key]
+                del self.nonresident[key]
+
+    def _demote_bottom_lir(self):
+        """Перевести LIR с дна стека в резидентные HIR"""
+        # Дно стека - LIR, только если под ним не осталось HIR
+        self._prune()
+        key, _ = self.stack.popitem(last=False)
+        self.status[key] = HIR_RESIDENT
+        self.queue[key] = None
+        self.lir_count -= 1
+        self._prune()
+
+    def _promote(self, key):
+        """HIR ключ из стека получил короткий IRR - он становится LIR"""
+        self.status[key] = LIR
+        self.lir_count += 1
+        self.stack.move_to_end(key)
+        if self.lir_count > self.lir_capacity:
+            self._demote_bottom_lir()
+
+    def _access(self, key):
+        """Обращение к резидентному ключу"""
+        state = self.status[key]
+        stack = self.stack
+
+        if state == LIR:
+            was_bottom = next(iter(stack)) == key
+            stack.move_to_end(key)
+            if was_bottom:
+                self._prune()
+        elif key in stack:
+            # Резидентный HIR со свежей историей
+            del self.queue[key]
+            self._promote(key)
+        elif self.lir_count < self.lir_capacity:
+            # LIR не заполнен (после удалений) - ключ становится LIR,
+            # как новые ключи при разогреве
+            del self.queue[key]
+            self.status[key] = LIR
+            self.lir_count += 1
+            stack[key] = None
+            self._prune()
+        else:
+            stack[key] = None
+            self.queue.move_to_end(key)
+
+    def _evict(self):
+        """Вытеснить резидентный HIR из головы очереди Q"""
+        if not self.queue:
+            # Все резидентные ключи - LIR (capacity=1 или после удалений)
+            self._demote_bottom_lir()
+
+        key, _ = self.queue.popitem(last=False)
+        del self.values[key]
+        if self._stats is not None:
+            self._stats.evictions += 1
+
+        if key in self.stack:
+            # Ключ остаётся в стеке как история
+            self.status[key] = HIR_NONRESIDENT
+            self.nonresident[key] = None
+            if len(self.nonresident) > self.max_nonresident:
+                old, _ = self.nonresident.popitem(last=False)
+                del self.status[old]
+                del self.stack[old]
+        else:
+            del self.status[key]
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        if key not in self.values:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        self._access(key)
+        if self._stats is not None:
+            self._stats.hits += 1
+        return self.values[key]
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        if key in self.values:
+            self.values[key] = value
+            self._access(key)
+            return
+
+        if len(self.values) >= self.capacity:
+            self._evict()
+
+        self.values[key] = value
+        if self.status.get(key) == HIR_NONRESIDENT:
+            # Промах по истории: ключ возвращается сразу как LIR
+            del self.nonresident[key]
+            self._promote(key)
+        elif self.lir_count < self.lir_capacity:
+            # Разогрев (или LIR опустел после удалений и вытеснений):
+            # новые ключи сразу LIR; HIR под ним снимаются с дна стека
+            self.status[key] = LIR
+            self.stack[key] = None
+            self.lir_count += 1
+            self._prune()
+        else:
+            self.status[key] = HIR_RESIDENT
+            self.stack[key] = None
+            self.queue[key] = None
+
+    def delete(self, key):
+        """Удалить элемент из кэша (вместе с его историей)"""
+        if key not in self.values:
+            return False
+
+        del self.values[key]
+        state = self.status.pop(key)
+        self.stack.pop(key, None)
+        if state == LIR:
+            self.lir_count -= 1
+            self._prune()
+        else:
+            del self.queue[key]
+        return True
+
+    def clear(self):
+        """Очистить кэш"""
+        self.values.clear()
+        self.status.clear()
+        self.stack.clear()
+        self.queue.clear()
+        self.nonresident.clear()
+        self.lir_count = 0
+        self.stats.reset()
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.values)
+
+    def get_stats(self):
+        """Получить статистику"""
+        return {
+            **self.stats.snapshot(),
+            'current_size': len(self.values),
+            'capacity': self.capacity,
+            'lir_size': self.lir_count,
+            'hir_resident': len(self.queue),
+            'hir_nonresident': len(self.nonresident),
+            'stack_size': len(self.stack)
+        }
+
+
+def demo():
+    """Демонстрация работы LIRS кэша"""
+    print("=== LIRS Cache Demo ===\n")
+
+    cache = LIRSCache(10, hir_ratio=0.2)
+    print(f"1. Кэш на 10 элементов: {cache.lir_capacity} LIR + {cache.hir_capacity} HIR")
+
+    working_set = [f"work_{i}" for i in range(8)]
+    for key in working_set:
+        cache.set(key, key)
+    for key in working_set:
+        cache.get(key)
+    print(f"   Рабочий набор из 8 ключей: {cache.get_stats()['lir_size']} LIR")
+
+    print("\n2. Сканирование 100 ключей:")
+    for i in range(100):
+        cache.set(f"scan_{i}", i)
+    stats = cache.get_stats()
+    print(f"   HIR резидентных: {stats['hir_resident']}, "
+          f"нерезидентных (история): {stats['hir_nonresident']}")
+
+    print("\n3. Повторное обращение к недавно вытесненному ключу:")
+    cache.set("scan_95", 95)
+    print(f"   'scan_95' статус: {'LIR' if cache.status['scan_95'] == LIR else 'HIR'}")
+
+    preserved = sum(1 for key in working_set if cache.get(key) is not None)
+    print(f"   Рабочий набор сохранён: {preserved}/8")
+
+
+def benchmark():
+    """Сравнение LIRS с LRU и ARC на рабочем наборе со сканированиями"""
+    print("\n=== Benchmark ===\n")
+
+    from arc_adaptive_algorithm import ARCCache
+    from lru_doubly_linked_list import LRUCache
+
+    rng = random.Random(42)
+    capacity = 500
+
+    # Каталог: горячий набор + регулярный обход краулером
+    hot = [f"hot_{i}" for i in range(400)]
+    requests = []
+    for crawl in range(20):
+        requests.extend(rng.choice(hot) for _ in range(2000))
+        requests.extend(f"item_{i}" for i in range(crawl * 500, crawl * 500 + 1500))
+
+    for name, cache in [("LRU", LRUCache(capacity)),
+                        ("ARC", ARCCache(capacity)),
+                        ("LIRS", LIRSCache(capacity))]:
+        start = time.perf_counter()
+        for key in requests:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        elapsed = time.perf_counter() - start
+
+        stats = cache.get_stats()
+        print(f"{name}:")
+        print(f"  Hit rate: {stats['hit_rate']:.2%}")
+        print(f"  Time: {elapsed:.3f}s ({len(requests) / elapsed:,.0f} ops/sec)")
+
+
+def test_correctness():
+    """Тесты корректности LIRS кэша"""
+    print("\n=== LIRS Correctness Tests ===\n")
+
+    # Тест 1: Базовые операции
+    cache = LIRSCache(3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1, "'a' should exist"
+    cache.set("a", 10)
+    assert cache.get("a") == 10, "'a' should be updated"
+    assert cache.get("missing") is None, "'missing' should not exist"
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    assert cache.size() == 1, "Only 'a' should remain"
+    print("✓ Test 1: Basic operations")
+
+    # Тест 2: Сканирование не вытесняет LIR ключи
+    cache = LIRSCache(10, hir_ratio=0.2)
+    for i in range(8):
+        cache.set(f"work_{i}", i)
+    for i in range(1000):
+        cache.set(f"scan_{i}", i)
+    assert all(cache.get(f"work_{i}") == i for i in range(8)), "LIR keys must survive a scan"
+    assert cache.size() == 10, "Cache must stay full"
+    print("✓ Test 2: Scan resistance")
+
+    # Тест 3: Нерезидентный HIR становится LIR при повторном обращении
+    cache = LIRSCache(4, hir_ratio=0.25)   # 3 LIR + 1 HIR
+    for key in "abc":
+        cache.set(key, key)
+    cache.set("x", "x")          # HIR резидентный
+    cache.set("y", "y")          # 'x' вытеснен, остаётся в стеке как история
+    assert cache.status["x"] == HIR_NONRESIDENT, "'x' should be non-resident HIR"
+    cache.set("x", "x")
+    assert cache.status["x"] == LIR, "'x' should be promoted to LIR"
+    assert cache.lir_count == 3, "One LIR must be demoted"
+    print("✓ Test 3: Non-resident HIR promotion")
+
+    # Тест 4: Инварианты под случайной нагрузкой
+    cache = LIRSCache(50, hir_ratio=0.1)
+    rng = random.Random(3)
+    for _ in range(20000):
+        key = rng.randint(0, 40) if rng.random() < 0.6 else rng.randint(0, 500)
+        if rng.random() < 0.03:
+            cache.delete(key)
+        elif cache.get(key) is None:
+            cache.set(key, key)
+
+        assert cache.size() <= 50, "Size must not exceed capacity"
+    states = list(cache.status.values())
+    assert states.count(LIR) == cache.lir_count <= cache.lir_capacity, "LIR count mismatch"
+    assert states.count(HIR_RESIDENT) == len(cache.queue), "Queue mismatch"
+    assert states.count(HIR_NONRESIDENT) == len(cache.nonresident) <= 50, "History bound"
+    assert cache.status[next(iter(cache.stack))] == LIR, "Stack bottom must be LIR"
+    print("✓ Test 4: Invariants under random load")
+
+    # Тест 5: Малые ёмкости и удаления: инварианты после каждой операции
+    for capacity in (1, 2, 3, 5):
+        for seed in range(20):
+            cache = LIRSCache(capacity, hir_ratio=0.2)
+            rng = random.Random(seed)
+            for _ in range(1000):
+                key = rng.randint(0, capacity * 3)
+                draw = rng.random()
+                if draw < 0.05:
+                    cache.delete(key)
+                elif draw < 0.5:
+                    cache.get(key)
+                else:
+                    cache.set(key, key)
+
+                lir_keys = [key for key, state in cache.status.items() if state == LIR]
+                assert cache.lir_count == len(lir_keys) <= cache.lir_capacity, "LIR count mismatch"
+                assert cache.size() <= capacity, "Size must not exceed capacity"
+                assert cache.values.keys() == set(lir_keys) | cache.queue.keys(), "Residents mismatch"
+                assert not cache.stack or cache.status[next(iter(cache.stack))] == LIR, \
+                    "Stack bottom must be LIR"
+
+    cache = LIRSCache(1)
+    for key in (2, 1, 2, 0):
+        cache.set(key, key)
+    assert cache.get(0) == 0 and cache.size() == 1, "Single slot must be replaced"
+    cache.clear()
+    assert cache.get_stats()['hits'] == 0, "clear() must reset stats"
+    print("✓ Test 5: Small capacities with deletes")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
@@ -3,34 +3,63 @@
 LRU (Least Recently Used) Cache - полная реализация
 
 LRU удаляет наименее недавно использованные элементы,
-когда кэш заполнен. Реализация через OrderedDict и
-альтернативная через двусвязный список.
+когда кэш заполнен. Реализация через OrderedDict,
+классическая через двусвязный список и компактная
+через предвыделенные массивы слотов.
 """
 
+from array import array
 from collections import OrderedDict
 import time
+import tracemalloc
 
+from cache_base import CacheBase
+from cache_snapshot import Snapshot, remaining_ttl, write_snapshot
+from timing_wheel import ExpiryIndex, ManualClock
 
-class LRUCache:
+
+class LRUCache(CacheBase):
     """LRU кэш на основе OrderedDict"""
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, weigher=None, max_weight=None,
+                 default_ttl=None, ttl_resolution=1.0, clock=time.monotonic, stats=None):
         """
         Инициализация LRU кэша
 
         Args:
             capacity: Максимальный размер кэша
+            weigher: Функция weigher(key, value) -> int, вес элемента
+                (например, размер в байтах)
+            max_weight: Бюджет суммарного веса (требует weigher)
+            default_ttl: Срок жизни по умолчанию в секундах (None - бессрочно)
+            ttl_resolution: Длительность тика колеса таймеров
+            clock: Источник времени для TTL
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
+        if max_weight is not None and max_weight <= 0:
+            raise ValueError("Max weight must be positive")
+        if max_weight is not None and weigher is None:
+            raise ValueError("max_weight requires a weigher")
 
         self.capacity = capacity
         self.cache = OrderedDict()  # Сохраняет порядок вставки
 
+        # Учёт веса (только если задан weigher)
+        self.weigher = weigher
+        self.max_weight = max_weight
+        self.weights = {}  # key -> вес
+        self.current_weight = 0
+
+        # Сроки жизни (только для ключей с TTL)
+        self.default_ttl = default_ttl
+        self.expiry = ExpiryIndex(tick=ttl_resolution, clock=clock)
+        self._deadlines = self.expiry.deadlines
+
         # Статистика
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self._init_stats(stats)
+        self.expirations = 0
 
     def get(self, key):
         """
@@ -40,68 +69,266 @@ class LRUCache:
             key: Ключ для поиска
 
         Returns:
-            Значение или None если не найдено
+            Значение или None если не найдено (или срок жизни истёк)
         """
+        if self._deadlines:
+            self._expire((key,))
+
         if key not in self.cache:
-            self.misses += 1
+            if self._stats is not None:
+                self._stats.misses += 1
             return None
 
         # Перемещаем в конец (самый свежий)
         self.cache.move_to_end(key)
-        self.hits += 1
+        if self._stats is not None:
+            self._stats.hits += 1
         return self.cache[key]
 
-    def set(self, key, value):
+    def set(self, key, value, ttl=None):
         """
         Установить значение по ключу
 
         Args:
             key: Ключ
             value: Значение
+            ttl: Срок жизни в секундах (None - default_ttl)
         """
+        if self._deadlines:
+            # Истёкшие элементы освобождают место раньше живых
+            self._expire()
+        if ttl is None:
+            ttl = self.default_ttl
+
+        if self.weigher is not None:
+            self._set_weighted(key, value)
+            self._evict_overflow()
+        else:
+            if key in self.cache:
+                # Обновляем существующий ключ
+                self.cache.move_to_end(key)
+            else:
+                # Новый ключ
+                if len(self.cache) >= self.capacity:
+                    # Удаляем первый элемент (самый старый)
+                    evicted = self.cache.popitem(last=False)
+                    if self._stats is not None:
+                        self._stats.evictions += 1
+                    if self._deadlines:
+                        self.expiry.forget(evicted[0])
+
+            self.cache[key] = value
+
+        if ttl is not None:
+            self.expiry.track(key, ttl)
+        elif self._deadlines:
+            # Перезапись без TTL делает ключ бессрочным
+            self.expiry.forget(key)
+
+    def _expire(self, keys=()):
+        """Удалить элементы с истёкшим сроком жизни"""
+        for key in self.expiry.collect(keys):
+            if self.delete(key):
+                self.expirations += 1
+
+    def _set_weighted(self, key, value):
+        """Вставка с учётом веса (без вытеснения)"""
+        weight = self.weigher(key, value)
+        if self.max_weight is not None and weight > self.max_weight:
+            # Элемент не помещается даже в пустой кэш - не кэшируем
+            self.delete(key)
+            return
+
         if key in self.cache:
-            # Обновляем существующий ключ
             self.cache.move_to_end(key)
-        else:
-            # Новый ключ
-            if len(self.cache) >= self.capacity:
-                # Удаляем первый элемент (самый старый)
-                evicted = self.cache.popitem(last=False)
-                self.evictions += 1
+            self.current_weight -= self.weights[key]
 
         self.cache[key] = value
+        self.weights[key] = weight
+        self.current_weight += weight
+
+    def _evict_overflow(self):
+        """Вытеснять самые старые элементы, пока не соблюдены ёмкость и бюджет веса"""
+        cache = self.cache
+        max_weight = self.max_weight
+        while len(cache) > self.capacity or (
+            max_weight is not None and self.current_weight > max_weight
+        ):
+            old_key, _ = cache.popitem(last=False)
+            self.current_weight -= self.weights.pop(old_key)
+            if self._stats is not None:
+                self._stats.evictions += 1
+            if self._deadlines:
+                self.expiry.forget(old_key)
+
+    def get_many(self, keys):
+        """
+        Получить значения для пакета ключей
+
+        Args:
+            keys: Итерируемый набор ключей
+
+        Returns:
+            Список значений в порядке ключей (None для промахов)
+        """
+        if self._deadlines:
+            keys = list(keys)
+            self._expire(keys)
+
+        cache = self.cache
+        move_to_end = cache.move_to_end
+        results = []
+        hits = 0
+
+        for key in keys:
+            if key in cache:
+                move_to_end(key)
+                results.append(cache[key])
+                hits += 1
+            else:
+                results.append(None)
+
+        # Статистика обновляется один раз на пакет
+        if self._stats is not None:
+            self._stats.hits += hits
+            self._stats.misses += len(results) - hits
+        return results
+
+    def set_many(self, items, ttl=None):
+        """
+        Установить пакет значений
+
+        Вытеснение выполняется один раз после вставки всего пакета.
+        Без weigher итоговое содержимое совпадает с последовательными
+        вызовами set().
+
+        Args:
+            items: dict или итерируемый набор пар (key, value)
+            ttl: Срок жизни для всех элементов пакета (None - default_ttl)
+        """
+        if isinstance(items, dict):
+            items = items.items()
+        items = list(items)
+        if self._deadlines:
+            self._expire()
+        if ttl is None:
+            ttl = self.default_ttl
+
+        if self.weigher is not None:
+            for key, value in items:
+                self._set_weighted(key, value)
+            self._evict_overflow()
+        else:
+            cache = self.cache
+            move_to_end = cache.move_to_end
+            for key, value in items:
+                if key in cache:
+                    move_to_end(key)
+                cache[key] = value
+
+            overflow = len(cache) - self.capacity
+            if overflow > 0:
+                popitem = cache.popitem
+                deadlines = self._deadlines
+                for _ in range(overflow):
+                    old_key = popitem(last=False)[0]
+                    if deadlines:
+                        self.expiry.forget(old_key)
+                if self._stats is not None:
+                    self._stats.evictions += overflow
+
+        if ttl is not None:
+            # Ключи, вытесненные этим же пакетом, срок жизни не получают
+            cache = self.cache
+            for key, _ in items:
+                if key in cache:
+                    self.expiry.track(key, ttl)
+        elif self._deadlines:
+            for key, _ in items:
+                self.expiry.forget(key)
 
     def delete(self, key):
         """Удалить элемент из кэша"""
         if key in self.cache:
             del self.cache[key]
+            if self.weigher is not None:
+                self.current_weight -= self.weights.pop(key)
+            if self._deadlines:
+                self.expiry.forget(key)
             return True
         return False
 
+    def delete_many(self, keys):
+        """Удалить пакет ключей, возвращает количество удалённых"""
+        if self.weigher is not None or self._deadlines:
+            return sum(1 for key in keys if self.delete(key))
+
+        pop = self.cache.pop
+        missing = object()
+        return sum(1 for key in keys if pop(key, missing) is not missing)
+
     def clear(self):
         """Очистить кэш"""
         self.cache.clear()
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self.weights.clear()
+        self.current_weight = 0
+        self.expiry.clear()
+        self.stats.reset()
+        self.expirations = 0
 
     def size(self):
         """Текущий размер кэша"""
         return len(self.cache)
 
+    def snapshot(self, path):
+        """
+        Сохранить содержимое в бинарный снимок (см. cache_snapshot)
+
+        Returns:
+            Число сохранённых элементов
+        """
+        entries = ((key, value, remaining_ttl(self.expiry, key))
+                   for key, value in reversed(self.cache.items()))
+        return write_snapshot(path, 'LRUCache', {'capacity': self.capacity},
+                              [('entries', entries)])
+
+    def restore(self, path, now=None):
+        """
+        Заменить содержимое снимком, сохранив порядок давности
+
+        Загружаются только самые свежие элементы, помещающиеся в ёмкость.
+
+        Args:
+            path: Путь к файлу снимка
+            now: Время восстановления по time.time() (None - текущее);
+                простой после снимка вычитается из остатка TTL
+
+        Returns:
+            Число загруженных элементов
+        """
+        with Snapshot(path, now=now) as snapshot:
+            snapshot.expect('LRUCache')
+            entries = list(snapshot.records('entries', limit=self.capacity))
+
+        self.clear()
+        for key, value, ttl in reversed(entries):
+            ttl = snapshot.live_ttl(ttl)
+            if ttl is None or ttl > 0:
+                self.set(key, value, ttl=ttl)
+        return len(self.cache)
+
     def get_stats(self):
         """Получить статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
-
-        return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'evictions': self.evictions,
-            'hit_rate': hit_rate,
+        stats = {
+            **self.stats.snapshot(),
+            'expirations': self.expirations,
             'current_size': len(self.cache),
             'capacity': self.capacity
         }
+        if self.weigher is not None:
+            stats['current_weight'] = self.current_weight
+            stats['max_weight'] = self.max_weight
+        return stats
 
 
 class Node:
@@ -114,15 +341,16 @@ class Node:
         self.next = None
 
 
-class LRUCacheDoublyLinked:
+class LRUCacheDoublyLinked(CacheBase):
     """LRU кэш через двусвязный список (классическая реализация)"""
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, stats=None):
         """
         Инициализация LRU кэша с двусвязным списком
 
         Args:
             capacity: Максимальный размер кэша
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
@@ -137,9 +365,7 @@ class LRUCacheDoublyLinked:
         self.tail.prev = self.head
 
         # Статистика
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self._init_stats(stats)
 
     def _add_node(self, node):
         """Добавить узел в конец (перед tail)"""
@@ -172,12 +398,14 @@ class LRUCacheDoublyLinked:
             Значение или None если не найдено
         """
         if key not in self.cache:
-            self.misses += 1
+            if self._stats is not None:
+                self._stats.misses += 1
             return None
 
         node = self.cache[key]
         self._move_to_end(node)
-        self.hits += 1
+        if self._stats is not None:
+            self._stats.hits += 1
         return node.value
 
     def set(self, key, value):
@@ -200,7 +428,8 @@ class LRUCacheDoublyLinked:
                 lru_node = self.head.next
                 self._remove_node(lru_node)
                 del self.cache[lru_node.key]
-                self.evictions += 1
+                if self._stats is not None:
+                    self._stats.evictions += 1
 
             # Добавляем новый узел
             new_node = Node(key, value)
@@ -221,9 +450,7 @@ class LRUCacheDoublyLinked:
         self.cache.clear()
         self.head.next = self.tail
         self.tail.prev = self.head
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self.stats.reset()
 
     def size(self):
         """Текущий размер кэша"""
@@ -231,14 +458,157 @@ class LRUCacheDoublyLinked:
 
     def get_stats(self):
         """Получить статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
+        return {
+            **self.stats.snapshot(),
+            'current_size': len(self.cache),
+            'capacity': self.capacity
+        }
+
+
+class LRUCacheArray(CacheBase):
+    """
+    LRU кэш на предвыделенных массивах слотов
+
+    Вместо объекта Node на каждую запись связи prev/next хранятся
+    в массивах array('i') фиксированного размера, а узел списка -
+    это просто индекс слота. Освобождённые слоты переиспользуются,
+    поэтому после заполнения кэш не создаёт новых объектов узлов
+    и не нагружает сборщик мусора.
+    """
+
+    def __init__(self, capacity, stats=None):
+        """
+        Инициализация LRU кэша на массивах
+
+        Args:
+            capacity: Максимальный размер кэша
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+        self.cache = {}  # key -> slot index
+
+        # Слот с индексом capacity - фиктивный узел:
+        # next[head] - самый старый, prev[head] - самый свежий
+        self.head = capacity
+        self.prev = array('i', [capacity]) * (capacity + 1)
+        self.next = array('i', [capacity]) * (capacity + 1)
+
+        # Данные слотов
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+
+        # Стек свободных слотов (сначала выдаются младшие индексы)
+        self.free = array('i', range(capacity - 1, -1, -1))
+
+        # Статистика
+        self._init_stats(stats)
+
+    def _unlink(self, slot):
+        """Исключить слот из списка"""
+        prev_slot = self.prev[slot]
+        next_slot = self.next[slot]
+        self.next[prev_slot] = next_slot
+        self.prev[next_slot] = prev_slot
+
+    def _link_last(self, slot):
+        """Добавить слот в конец (самый свежий)"""
+        head = self.head
+        last = self.prev[head]
+        self.next[last] = slot
+        self.prev[slot] = last
+        self.next[slot] = head
+        self.prev[head] = slot
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        slot = self.cache.get(key)
+        if slot is None:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        # Перемещаем в конец, если слот ещё не самый свежий
+        if self.next[slot] != self.head:
+            self._unlink(slot)
+            self._link_last(slot)
+        if self._stats is not None:
+            self._stats.hits += 1
+        return self.values[slot]
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        slot = self.cache.get(key)
+        if slot is not None:
+            # Обновляем существующий слот
+            self.values[slot] = value
+            if self.next[slot] != self.head:
+                self._unlink(slot)
+                self._link_last(slot)
+            return
+
+        if self.free:
+            slot = self.free.pop()
+        else:
+            # Переиспользуем слот самого старого элемента
+            slot = self.next[self.head]
+            self._unlink(slot)
+            del self.cache[self.keys[slot]]
+            if self._stats is not None:
+                self._stats.evictions += 1
+
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.cache[key] = slot
+        self._link_last(slot)
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        slot = self.cache.pop(key, None)
+        if slot is None:
+            return False
+
+        self._unlink(slot)
+        self.keys[slot] = None
+        self.values[slot] = None
+        self.free.append(slot)
+        return True
+
+    def clear(self):
+        """Очистить кэш"""
+        self.cache.clear()
+        for i in range(self.capacity + 1):
+            self.prev[i] = self.head
+            self.next[i] = self.head
+        self.keys = [None] * self.capacity
+        self.values = [None] * self.capacity
+        self.free = array('i', range(self.capacity - 1, -1, -1))
+        self.stats.reset()
 
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.cache)
+
+    def get_stats(self):
+        """Получить статистику"""
         return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'evictions': self.evictions,
-            'hit_rate': hit_rate,
+            **self.stats.snapshot(),
             'current_size': len(self.cache),
             'capacity': self.capacity
         }
@@ -251,7 +621,8 @@ def demo():
     # Тестируем обе реализации
     implementations = [
         ("OrderedDict", LRUCache(3)),
-        ("Doubly Linked List", LRUCacheDoublyLinked(3))
+        ("Doubly Linked List", LRUCacheDoublyLinked(3)),
+        ("Array Slots", LRUCacheArray(3))
     ]
 
     for name, cache in implementations:
@@ -303,10 +674,36 @@ def demo():
         print("\n" + "=" * 50 + "\n")
 
 
+def measure_bytes_per_entry(cache_class, size):
+    """
+    Оценить расход памяти кэша на одну запись через tracemalloc
+
+    Ключи и значения создаются до начала трассировки, поэтому
+    учитываются только структуры самого кэша.
+    """
+    keys = [f"key_{i}" for i in range(size)]
+    values = [f"value_{i}" for i in range(size)]
+
+    tracemalloc.start()
+    cache = cache_class(size)
+    for key, value in zip(keys, values):
+        cache.set(key, value)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return current / size
+
+
 def benchmark():
     """Сравнение производительности реализаций"""
     print("=== Performance Benchmark ===\n")
 
+    implementations = [
+        ("OrderedDict", LRUCache),
+        ("Doubly Linked List", LRUCacheDoublyLinked),
+        ("Array Slots", LRUCacheArray)
+    ]
+
     sizes = [100, 1000, 10000]
     operations = 50000
 
@@ -314,39 +711,32 @@ def benchmark():
         print(f"Cache size: {size}")
         print("-" * 40)
 
-        # OrderedDict реализация
-        cache1 = LRUCache(size)
-        start = time.time()
-
-        for i in range(operations):
-            cache1.set(f"key_{i % (size * 2)}", f"value_{i}")
-            cache1.get(f"key_{i % (size * 2)}")
-
-        time1 = time.time() - start
-        stats1 = cache1.get_stats()
+        base_time = None
+        for name, cache_class in implementations:
+            cache = cache_class(size)
+            start = time.time()
 
-        # Doubly Linked List реализация
-        cache2 = LRUCacheDoublyLinked(size)
-        start = time.time()
+            for i in range(operations):
+                cache.set(f"key_{i % (size * 2)}", f"value_{i}")
+                cache.get(f"key_{i % (size * 2)}")
 
-        for i in range(operations):
-            cache2.set(f"key_{i % (size * 2)}", f"value_{i}")
-            cache2.get(f"key_{i % (size * 2)}")
+            elapsed = time.time() - start
+            stats = cache.get_stats()
+            bytes_per_entry = measure_bytes_per_entry(cache_class, size)
 
-        time2 = time.time() - start
-        stats2 = cache2.get_stats()
+            if base_time is None:
+                base_time = elapsed
 
-        print(f"OrderedDict:")
-        print(f"  Time: {time1:.4f}s")
-        print(f"  Hit rate: {stats1['hit_rate']:.2%}")
-        print(f"  Evictions: {stats1['evictions']}")
+            # Каждая итерация - это set + get
+            print(f"{name}:")
+            print(f"  Time: {elapsed:.4f}s")
+            print(f"  Ops/sec: {operations * 2 / elapsed:,.0f}")
+            print(f"  Bytes/entry: {bytes_per_entry:.1f}")
+            print(f"  Hit rate: {stats['hit_rate']:.2%}")
+            print(f"  Evictions: {stats['evictions']}")
+            print(f"  Speed ratio: {elapsed / base_time:.2f}x")
 
-        print(f"Doubly Linked List:")
-        print(f"  Time: {time2:.4f}s")
-        print(f"  Hit rate: {stats2['hit_rate']:.2%}")
-        print(f"  Evictions: {stats2['evictions']}")
-
-        print(f"Speed ratio: {time2/time1:.2f}x\n")
+        print()
 
 
 def test_correctness():
@@ -393,10 +783,118 @@ def test_correctness():
         assert cache.get("d") == 4, "'d' should exist"
         print("  ✓ LRU order maintained")
 
+        # Тест 4: Удаление и повторное заполнение
+        cache = cache_class(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.delete("a") is True, "'a' should be deleted"
+        assert cache.delete("a") is False, "'a' is already deleted"
+        cache.set("c", 3)  # Занимает освободившееся место без вытеснения
+        assert cache.get_stats()['evictions'] == 0, "No eviction expected"
+        assert cache.get("b") == 2, "'b' should exist"
+        assert cache.get("c") == 3, "'c' should exist"
+        print("  ✓ Delete frees space")
+
         print(f"  All tests passed for {name}!\n")
 
     run_tests(LRUCache, "OrderedDict implementation")
     run_tests(LRUCacheDoublyLinked, "Doubly Linked List implementation")
+    run_tests(LRUCacheArray, "Array Slots implementation")
+
+    # Слоты переиспользуются: кэш не выходит за пределы массивов
+    print("Testing slot reuse:")
+    cache = LRUCacheArray(3)
+    for i in range(100):
+        cache.set(f"key_{i}", i)
+        if i % 3 == 0:
+            cache.delete(f"key_{i}")
+    assert cache.size() <= 3, "Size must not exceed capacity"
+    assert sorted(cache.cache.values()) == sorted(set(cache.cache.values())), \
+        "Slots must be unique"
+    assert all(0 <= slot < 3 for slot in cache.cache.values()), "Slot out of range"
+    assert len(cache.free) + cache.size() == 3, "Every slot is either used or free"
+    print("  ✓ Freed slots are reused\n")
+
+    # Пакетные операции дают тот же результат, что и поштучные
+    print("Testing bulk operations:")
+    single = LRUCache(3)
+    bulk = LRUCache(3)
+    items = [("a", 1), ("b", 2), ("c", 3), ("a", 10), ("d", 4), ("e", 5)]
+    for key, value in items:
+        single.set(key, value)
+    bulk.set_many(items)
+    assert list(bulk.cache.items()) == list(single.cache.items()), "set_many must match set()"
+    assert bulk.get_stats()['evictions'] == single.get_stats()['evictions'], "Evictions must match"
+
+    assert bulk.get_many(["e", "missing", "a"]) == [5, None, 10], "Results must keep input order"
+    assert bulk.get_stats()['hits'] == 2 and bulk.get_stats()['misses'] == 1, "Batch stats"
+    assert bulk.delete_many(["a", "missing", "d"]) == 2, "Two keys should be deleted"
+    assert bulk.size() == 1, "Only 'e' should remain"
+
+    # Пакеты на длинном потоке: порядок вытеснения и статистика как у поштучных вызовов
+    single = LRUCache(50)
+    bulk = LRUCache(50)
+    for start in range(0, 400, 40):
+        batch = [(f"key_{(start + i * 7) % 120}", start + i) for i in range(40)]
+        keys = [key for key, _ in batch[::3]] + ["missing", batch[0][0]]
+        for key, value in batch:
+            single.set(key, value)
+        bulk.set_many(iter(batch))
+        assert bulk.get_many(iter(keys)) == [single.get(key) for key in keys], "get_many must match get()"
+        assert list(bulk.cache.items()) == list(single.cache.items()), "Recency order must match"
+        deleted = keys[:4]
+        expected = sum(1 for key in deleted if single.delete(key))
+        assert bulk.delete_many(iter(deleted)) == expected, "delete_many must count deleted keys"
+    assert bulk.get_stats() == single.get_stats(), "Batch stats must match single calls"
+    print("  ✓ get_many / set_many / delete_many\n")
+
+    # Ёмкость по весу: вытеснение продолжается, пока бюджет не соблюдён
+    print("Testing weighted capacity:")
+    cache = LRUCache(100, weigher=lambda key, value: len(value), max_weight=10)
+    cache.set("a", "xxxx")      # 4
+    cache.set("b", "xxxx")      # 8
+    cache.get("a")              # 'a' свежее 'b'
+    cache.set("c", "xxxxxx")    # 14 > 10 - вытесняется 'b'
+    assert cache.get("b") is None, "'b' should be evicted by weight"
+    assert cache.get_stats()['current_weight'] == 10, "Weight must be 10"
+    cache.set("d", "x" * 9)     # Вытесняет и 'a', и 'c'
+    assert cache.size() == 1 and cache.get_stats()['evictions'] == 3, "Two more evictions"
+    cache.set("e", "x" * 11)    # Больше всего бюджета - не кэшируется
+    assert cache.get("e") is None and cache.get("d") is not None, "Oversized value rejected"
+    cache.delete("d")
+    assert cache.get_stats()['current_weight'] == 0, "Delete releases weight"
+    print("  ✓ weigher / max_weight\n")
+
+    # TTL: истечение учитывается отдельно от вытеснения
+    print("Testing TTL expiry:")
+    clock = ManualClock()
+    cache = LRUCache(3, clock=clock)
+    cache.set("a", 1, ttl=5)
+    cache.set("b", 2, ttl=60)
+    cache.set("c", 3)
+    clock.advance(5.5)          # Внутри тика колеса - сработает точная проверка
+    assert cache.get("a") is None, "'a' should be expired"
+    cache.set("d", 4)           # Место 'a' уже свободно
+    assert cache.get_stats()['evictions'] == 0, "Expiry is not an eviction"
+    cache.set("b", 20)          # Перезапись без TTL - бессрочно
+    clock.advance(100)
+    assert cache.get("b") == 20, "'b' should no longer expire"
+    cache.set_many({"x": 1, "y": 2}, ttl=10)
+    clock.advance(11)
+    assert cache.get_many(["x", "y", "b"]) == [None, None, 20], "Batch TTL"
+    stats = cache.get_stats()
+    assert stats['expirations'] == 3, "Three keys should expire"
+    assert stats['evictions'] == 2, "'c' and 'd' are evicted by set_many"
+
+    # Перезапись не копит таймеры, вытесненные пакетом ключи их не получают
+    cache = LRUCache(2, clock=clock)
+    for i in range(1000):
+        cache.set(f"key_{i % 2}", i, ttl=5)
+    assert len(cache.expiry.wheel) == 2, "Re-tracking must replace the old timer"
+    cache.set_many({f"batch_{i}": i for i in range(10)}, ttl=5)
+    assert sorted(cache.expiry.deadlines) == ["batch_8", "batch_9"], "Only resident keys tracked"
+    assert len(cache.expiry.wheel) == 2, "Evicted keys must cancel their timers"
+    print("  ✓ ttl / default_ttl / expirations\n")
 
 
 if __name__ == "__main__":
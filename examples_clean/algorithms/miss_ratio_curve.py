@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Miss Ratio Curve - кривая hit rate от ёмкости LRU за один проход
+
+Стековое расстояние запроса - число различных ключей, к которым
+обращались после предыдущего обращения к этому ключу. LRU кэш ёмкости C
+попадает ровно тогда, когда расстояние < C, поэтому гистограмма
+расстояний даёт hit rate сразу для всех ёмкостей (Mattson, 1970).
+
+Это точно только для трасс без удалений. Удалённый ключ убирается из
+стека, и ключи под ним поднимаются, хотя LRU ёмкости C мог уже вытеснить
+их раньше: освободившееся место в кэше не возвращает вытесненное.
+Поэтому с DELETE в трассе кривая приблизительная и может завышать
+hit rate на ёмкостях, где удаления попадали в заполненный кэш.
+
+Расстояния считаются деревом Фенвика над метками времени: в позиции
+последнего обращения каждого ключа стоит 1, расстояние - сумма на
+отрезке после неё. O(log n) на запрос; когда метки заканчиваются,
+живые ключи перенумеровываются (память - O(число различных ключей)).
+
+SHARDS (Waldspurger et al., 2015) учитывает только ключи, у которых
+hash(key) mod P < T, то есть долю R = T/P пространства ключей.
+Расстояния масштабируются на 1/R. Вариант с фиксированной памятью
+(max_keys) понижает T, когда отслеживаемых ключей становится больше
+лимита. Разрешение выборки - около 1/R ключей: ёмкости меньше этого
+значения кривая с выборкой не различает.
+"""
+
+import heapq
+from bisect import bisect_left
+import random
+import time
+import zlib
+
+from trace_replay import DELETE_OPS
+
+
+SHARDS_MODULUS = 1 << 24
+MASK64 = (1 << 64) - 1
+
+
+def shard_hash(key, modulus=SHARDS_MODULUS):
+    """Стабильный между запусками хэш ключа (crc32 + перемешивание splitmix64)"""
+    value = zlib.crc32(key if isinstance(key, bytes) else str(key).encode())
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return (value ^ (value >> 31)) % modulus
+
+
+class FenwickTree:
+    """Дерево Фенвика (двоичное индексированное дерево) для префиксных сумм"""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index, delta):
+        """Прибавить delta к элементу index (1..size)"""
+        tree, size = self.tree, self.size
+        while index <= size:
+            tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, index):
+        """Сумма элементов 1..index"""
+        tree = self.tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    @classmethod
+    def from_ones(cls, size, count):
+        """Дерево, в котором элементы 1..count равны 1 (построение за O(size))"""
+        fenwick = cls(size)
+        tree = fenwick.tree
+        for index in range(1, count + 1):
+            tree[index] = 1
+        for index in range(1, size + 1):
+            parent = index + (index & -index)
+            if parent <= size:
+                tree[parent] += tree[index]
+        return fenwick
+
+
+class MissRatioCurve:
+    """Кривая hit rate LRU как функция ёмкости"""
+
+    def __init__(self, histogram, total):
+        """
+        Args:
+            histogram: dict расстояние -> вес запросов
+            total: Общий вес запросов (включая холодные промахи)
+        """
+        self.total = total
+        self.distances = sorted(histogram)
+        self.cumulative = []
+        running = 0.0
+        for distance in self.distances:
+            running += histogram[distance]
+            self.cumulative.append(running)
+
+    def hit_rate(self, capacity):
+        """Hit rate LRU кэша заданной ёмкости"""
+        index = bisect_left(self.distances, capacity)
+        if index == 0 or self.total <= 0:
+            return 0.0
+        return min(1.0, max(0.0, self.cumulative[index - 1] / self.total))
+
+    def miss_ratio(self, capacity):
+        return 1.0 - self.hit_rate(capacity)
+
+    def curve(self, capacities):
+        """[(ёмкость, hit rate), ...]"""
+        return [(capacity, self.hit_rate(capacity)) for capacity in capacities]
+
+    def capacity_for(self, target_hit_rate):
+        """Минимальная ёмкость, дающая target_hit_rate (None - недостижимо)"""
+        goal = target_hit_rate * self.total
+        for distance, running in zip(self.distances, self.cumulative):
+            if running >= goal:
+                return distance + 1
+        return None
+
+
+class MRCBuilder:
+    """Построение кривой за один проход по трассе"""
+
+    def __init__(self, sample_rate=1.0, max_keys=None, initial_size=1024,
+                 modulus=SHARDS_MODULUS):
+        """
+        Args:
+            sample_rate: Доля пространства ключей для SHARDS (1.0 - без выборки)
+            max_keys: Лимит отслеживаемых ключей (SHARDS с фиксированной памятью)
+            initial_size: Начальный размер дерева Фенвика
+            modulus: Модуль P для хэша выборки
+        """
+        if not 0 < sample_rate <= 1:
+            raise ValueError("Sample rate must be in (0, 1]")
+        if max_keys is not None and max_keys <= 0:
+            raise ValueError("Max keys must be positive")
+
+        self.modulus = modulus
+        self.threshold = max(1, int(sample_rate * modulus))
+        self.max_keys = max_keys
+        self.sampling = sample_rate < 1 or max_keys is not None
+
+        self.fenwick = FenwickTree(initial_size)
+        self.now = 0                  # Последняя выданная метка времени
+        self.last_access = {}         # key -> метка последнего обращения
+        self.key_hashes = []          # Max-куча (-hash, key) для понижения T
+
+        self.histogram = {}           # Масштабированное расстояние -> вес
+        self.requests = 0             # Все запросы трассы
+        self.sampled = 0              # Запросы, попавшие в выборку
+        self.total_weight = 0.0       # Сумма весов 1/R попавших в выборку
+        self.compactions = 0
+
+    @property
+    def rate(self):
+        return self.threshold / self.modulus
+
+    def _compact(self):
+        """Перенумеровать живые ключи 1..k; при необходимости увеличить дерево"""
+        live = sorted(self.last_access.items(), key=lambda item: item[1])
+        size = self.fenwick.size
+        if len(live) * 2 > size:
+            size *= 2
+        for stamp, (key, _) in enumerate(live, 1):
+            self.last_access[key] = stamp
+        self.fenwick = FenwickTree.from_ones(size, len(live))
+        self.now = len(live)
+        self.compactions += 1
+
+    def _forget(self, key):
+        stamp = self.last_access.pop(key)
+        self.fenwick.add(stamp, -1)
+
+    def _lower_threshold(self):
+        """SHARDS с фиксированной памятью: исключить ключи с наибольшим хэшем"""
+        heap = self.key_hashes
+        while len(self.last_access) > self.max_keys:
+            negative, key = heapq.heappop(heap)
+            if key not in self.last_access:
+                continue  # Ключ уже удалён
+            self.threshold = -negative
+            self._forget(key)
+            # Ключи с тем же хэшем тоже выходят за новый порог
+            while heap and -heap[0][0] >= self.threshold:
+                _, other = heapq.heappop(heap)
+                if other in self.last_access:
+                    self._forget(other)
+
+    def access(self, key):
+        """Учесть обращение к ключу"""
+        self.requests += 1
+        key_hash = 0
+        if self.sampling:
+            key_hash = shard_hash(key, self.modulus)
+            if key_hash >= self.threshold:
+                return
+
+        rate = self.threshold / self.modulus
+        weight = 1.0 / rate
+        self.sampled += 1
+        self.total_weight += weight
+
+        previous = self.last_access.get(key)
+        if previous is not None:
+            # Различные ключи после предыдущего обращения
+            distance = len(self.last_access) - self.fenwick.prefix_sum(previous)
+            self.fenwick.add(previous, -1)
+            scaled = int(distance * weight)
+            self.histogram[scaled] = self.histogram.get(scaled, 0.0) + weight
+        elif self.max_keys is not None:
+            heapq.heappush(self.key_hashes, (-key_hash, key))
+
+        if self.now == self.fenwick.size:
+            if previous is not None:
+                del self.last_access[key]   # Не переносить старую метку
+            self._compact()
+        self.now += 1
+        self.last_access[key] = self.now
+        self.fenwick.add(self.now, 1)
+
+        if self.max_keys is not None and len(self.last_access) > self.max_keys:
+            self._lower_threshold()
+
+    def delete(self, key):
+        """
+        Ключ удалён из кэша - следующее обращение будет холодным промахом
+
+        Стек после удаления не совпадает с содержимым LRU каждой ёмкости,
+        поэтому кривая становится приблизительной (см. описание модуля).
+        """
+        if key in self.last_access:
+            self._forget(key)
+
+    def feed(self, keys):
+        """Учесть поток ключей"""
+        access = self.access
+        for key in keys:
+            access(key)
+        return self
+
+    def result(self):
+        """
+        Кривая с поправкой SHARDS_adj
+
+        Ожидаемый вес выборки равен числу запросов; расхождение (из-за
+        неравномерности выборки) относится к наименьшему расстоянию.
+        """
+        histogram = dict(self.histogram)
+        if self.sampling and self.sampled:
+            histogram[0] = histogram.get(0, 0.0) + (self.requests - self.total_weight)
+        total = self.requests if self.sampling else self.total_weight
+        return MissRatioCurve(histogram, total)
+
+    def feed_records(self, records):
+        """Учесть записи трассы (key, size, op); delete удаляет ключ"""
+        access, delete = self.access, self.delete
+        for key, _, op in records:
+            if op in DELETE_OPS:
+                delete(key)
+            else:
+                access(key)
+        return self
+
+    def get_stats(self):
+        return {
+            'requests': self.requests,
+            'sampled': self.sampled,
+            'sample_rate': self.rate,
+            'tracked_keys': len(self.last_access),
+            'tree_size': self.fenwick.size,
+            'compactions': self.compactions
+        }
+
+
+def lru_hit_rate(keys, capacity):
+    """Эталон: hit rate LRUCache при прямом прогоне"""
+    from lru_doubly_linked_list import LRUCache
+
+    cache = LRUCache(capacity)
+    for key in keys:
+        if cache.get(key) is None:
+            cache.set(key, True)
+    return cache.get_stats()['hit_rate']
+
+
+def zipf_trace(requests, num_keys, alpha=1.0, seed=42):
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) ** alpha for rank in range(num_keys)]
+    return [f"key_{i}" for i in rng.choices(range(num_keys), weights=weights, k=requests)]
+
+
+def demo():
+    """Демонстрация: кривая для Zipf-трассы и сверка с LRUCache"""
+    print("=== Miss Ratio Curve Demo ===\n")
+
+    keys = zipf_trace(200000, 50000)
+    capacities = [100, 1000, 5000, 20000]
+
+    exact = MRCBuilder().feed(keys).result()
+    print("1. Точная кривая (без выборки) против LRUCache:")
+    print(f"   {'Capacity':>8} {'MRC':>8} {'LRUCache':>9}")
+    for capacity in capacities:
+        print(f"   {capacity:>8} {exact.hit_rate(capacity):>8.2%} "
+              f"{lru_hit_rate(keys, capacity):>9.2%}")
+
+    print("\n2. SHARDS: выборка 1% и фиксированные 2000 ключей (ёмкости >= 1/R):")
+    fixed_rate = MRCBuilder(sample_rate=0.01).feed(keys)
+    fixed_size = MRCBuilder(max_keys=2000).feed(keys)
+    print(f"   {'Capacity':>8} {'exact':>8} {'R=0.01':>8} {'2000 keys':>10}")
+    for capacity in capacities[1:]:
+        print(f"   {capacity:>8} {exact.hit_rate(capacity):>8.2%} "
+              f"{fixed_rate.result().hit_rate(capacity):>8.2%} "
+              f"{fixed_size.result().hit_rate(capacity):>10.2%}")
+    print(f"   Итоговая доля выборки (2000 ключей): {fixed_size.rate:.4f}")
+
+    target = 0.6
+    print(f"\n3. Ёмкость для hit rate {target:.0%}: {exact.capacity_for(target)}")
+
+
+def benchmark():
+    """Один проход против прогона LRUCache на каждую ёмкость"""
+    print("\n=== Benchmark ===\n")
+
+    keys = zipf_trace(300000, 100000)
+    capacities = [100, 1000, 10000, 50000]
+
+    start = time.perf_counter()
+    for capacity in capacities:
+        lru_hit_rate(keys, capacity)
+    per_size = time.perf_counter() - start
+
+    for name, builder in [("MRC exact", MRCBuilder()),
+                          ("MRC SHARDS R=0.01", MRCBuilder(sample_rate=0.01)),
+                          ("MRC SHARDS 4096 keys", MRCBuilder(max_keys=4096))]:
+        start = time.perf_counter()
+        builder.feed(keys)
+        elapsed = time.perf_counter() - start
+        stats = builder.get_stats()
+        print(f"{name:<22} {elapsed:.2f}s, отслеживается ключей: {stats['tracked_keys']}")
+
+    print(f"{'LRUCache x' + str(len(capacities)):<22} {per_size:.2f}s "
+          f"(и только {len(capacities)} точки кривой)")
+
+
+def test_correctness():
+    """Тесты корректности"""
+    print("\n=== Miss Ratio Curve Correctness Tests ===\n")
+
+    # Тест 1: Дерево Фенвика
+    fenwick = FenwickTree(16)
+    values = [0] * 17
+    rng = random.Random(1)
+    for _ in range(200):
+        index, delta = rng.randint(1, 16), rng.randint(-3, 3)
+        fenwick.add(index, delta)
+        values[index] += delta
+        probe = rng.randint(0, 16)
+        assert fenwick.prefix_sum(probe) == sum(values[1:probe + 1]), "Prefix sum mismatch"
+    built = FenwickTree.from_ones(16, 11)
+    assert all(built.prefix_sum(i) == min(i, 11) for i in range(17)), "from_ones mismatch"
+    print("✓ Test 1: Fenwick tree")
+
+    # Тест 2: Стековые расстояния на маленьком примере
+    builder = MRCBuilder().feed(["a", "b", "c", "a", "b", "b", "d", "a"])
+    # Повторы: a (после b, c) -> 2, b (c, a) -> 2, b -> 0, a (b, d) -> 2
+    assert builder.histogram == {2: 3.0, 0: 1.0}, "Stack distance histogram"
+    curve = builder.result()
+    assert curve.hit_rate(1) == 1 / 8 and curve.hit_rate(2) == 1 / 8, "Only b-b hits below 3"
+    assert curve.hit_rate(3) == 4 / 8, "All reuses hit at capacity 3"
+    print("✓ Test 2: Stack distances")
+
+    # Тест 3: Точная кривая совпадает с LRUCache (с перенумерацией меток)
+    keys = zipf_trace(30000, 3000, seed=3)
+    builder = MRCBuilder(initial_size=64).feed(keys)
+    assert builder.compactions > 0, "Small tree must be compacted"
+    curve = builder.result()
+    for capacity in (1, 10, 100, 1000, 5000):
+        assert abs(curve.hit_rate(capacity) - lru_hit_rate(keys, capacity)) < 1e-12, \
+            f"Exact MRC must match LRUCache at {capacity}"
+    print("✓ Test 3: Exact curve matches LRUCache")
+
+    # Тест 4: SHARDS близок к точной кривой, память ограничена
+    keys = zipf_trace(200000, 20000, seed=4)
+    exact = MRCBuilder().feed(keys).result()
+    sampled = MRCBuilder(sample_rate=0.1).feed(keys)
+    bounded = MRCBuilder(max_keys=500).feed(keys)
+    assert len(bounded.last_access) <= 500, "Fixed-size SHARDS must bound tracked keys"
+    for capacity in (500, 2000, 10000):
+        assert abs(sampled.result().hit_rate(capacity) - exact.hit_rate(capacity)) < 0.03, \
+            "Fixed-rate SHARDS should be close"
+        assert abs(bounded.result().hit_rate(capacity) - exact.hit_rate(capacity)) < 0.05, \
+            "Fixed-size SHARDS should be close"
+    print("✓ Test 4: SHARDS approximation")
+
+    # Тест 5: Удаление делает следующее обращение холодным
+    builder = MRCBuilder()
+    builder.feed(["a", "b"])
+    builder.delete("a")
+    builder.feed(["a", "b"])
+    assert builder.histogram == {1: 1.0}, "Only 'b' should have a reuse distance"
+    print("✓ Test 5: Delete")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
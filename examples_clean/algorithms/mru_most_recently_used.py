@@ -10,16 +10,25 @@ from collections import OrderedDict
 import time
 import random
 
+from cache_base import CacheBase
+from timing_wheel import ExpiryIndex, ManualClock
+from sampled_eviction import IndexedKeySet
 
-class MRUCache:
+
+class MRUCache(CacheBase):
     """MRU кэш на основе OrderedDict"""
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, default_ttl=None, ttl_resolution=1.0,
+                 clock=time.monotonic, stats=None):
         """
         Инициализация MRU кэша
 
         Args:
             capacity: Максимальный размер кэша
+            default_ttl: Срок жизни по умолчанию в секундах (None - бессрочно)
+            ttl_resolution: Длительность тика колеса таймеров
+            clock: Источник времени для TTL
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
@@ -27,10 +36,14 @@ class MRUCache:
         self.capacity = capacity
         self.cache = OrderedDict()
 
+        # Сроки жизни (только для ключей с TTL)
+        self.default_ttl = default_ttl
+        self.expiry = ExpiryIndex(tick=ttl_resolution, clock=clock)
+        self._deadlines = self.expiry.deadlines
+
         # Статистика
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self._init_stats(stats)
+        self.expirations = 0
 
     def get(self, key):
         """
@@ -40,25 +53,37 @@ class MRUCache:
             key: Ключ для поиска
 
         Returns:
-            Значение или None если не найдено
+            Значение или None если не найдено (или срок жизни истёк)
         """
+        if self._deadlines:
+            self._expire((key,))
+
         if key not in self.cache:
-            self.misses += 1
+            if self._stats is not None:
+                self._stats.misses += 1
             return None
 
         # Также перемещаем в конец (для отслеживания использования)
         self.cache.move_to_end(key)
-        self.hits += 1
+        if self._stats is not None:
+            self._stats.hits += 1
         return self.cache[key]
 
-    def set(self, key, value):
+    def set(self, key, value, ttl=None):
         """
         Установить значение по ключу
 
         Args:
             key: Ключ
             value: Значение
+            ttl: Срок жизни в секундах (None - default_ttl)
         """
+        if self._deadlines:
+            # Истёкшие элементы освобождают место раньше живых
+            self._expire()
+        if ttl is None:
+            ttl = self.default_ttl
+
         if key in self.cache:
             # Обновляем существующий ключ
             self.cache.move_to_end(key)
@@ -68,23 +93,121 @@ class MRUCache:
                 # Удаляем ПОСЛЕДНИЙ элемент (самый свежий!)
                 # Это главное отличие от LRU
                 evicted = self.cache.popitem(last=True)
-                self.evictions += 1
+                if self._stats is not None:
+                    self._stats.evictions += 1
+                if self._deadlines:
+                    self.expiry.forget(evicted[0])
 
         self.cache[key] = value
 
+        if ttl is not None:
+            self.expiry.track(key, ttl)
+        elif self._deadlines:
+            # Перезапись без TTL делает ключ бессрочным
+            self.expiry.forget(key)
+
+    def _expire(self, keys=()):
+        """Удалить элементы с истёкшим сроком жизни"""
+        for key in self.expiry.collect(keys):
+            if self.delete(key):
+                self.expirations += 1
+
+    def get_many(self, keys):
+        """
+        Получить значения для пакета ключей
+
+        Args:
+            keys: Итерируемый набор ключей
+
+        Returns:
+            Список значений в порядке ключей (None для промахов)
+        """
+        if self._deadlines:
+            keys = list(keys)
+            self._expire(keys)
+
+        cache = self.cache
+        move_to_end = cache.move_to_end
+        results = []
+        hits = 0
+
+        for key in keys:
+            if key in cache:
+                move_to_end(key)
+                results.append(cache[key])
+                hits += 1
+            else:
+                results.append(None)
+
+        if self._stats is not None:
+            self._stats.hits += hits
+            self._stats.misses += len(results) - hits
+        return results
+
+    def set_many(self, items, ttl=None):
+        """
+        Установить пакет значений
+
+        В MRU каждый новый ключ вытесняет самый свежий элемент, которым
+        после первой вставки становится предыдущий ключ пакета. Поэтому
+        порядок операций сохраняется, а экономия достигается за счёт
+        локальных ссылок и одного обновления статистики на пакет.
+
+        Args:
+            items: dict или итерируемый набор пар (key, value)
+            ttl: Срок жизни для всех элементов пакета (None - default_ttl)
+        """
+        if isinstance(items, dict):
+            items = items.items()
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl is not None or self._deadlines:
+            # Сроки жизни требуют поштучной обработки
+            for key, value in items:
+                self.set(key, value, ttl=ttl)
+            return
+
+        cache = self.cache
+        capacity = self.capacity
+        move_to_end = cache.move_to_end
+        popitem = cache.popitem
+        evictions = 0
+
+        for key, value in items:
+            if key in cache:
+                move_to_end(key)
+            elif len(cache) >= capacity:
+                popitem(last=True)
+                evictions += 1
+            cache[key] = value
+
+        if self._stats is not None:
+            self._stats.evictions += evictions
+
     def delete(self, key):
         """Удалить элемент из кэша"""
         if key in self.cache:
             del self.cache[key]
+            if self._deadlines:
+                self.expiry.forget(key)
             return True
         return False
 
+    def delete_many(self, keys):
+        """Удалить пакет ключей, возвращает количество удалённых"""
+        if self._deadlines:
+            return sum(1 for key in keys if self.delete(key))
+
+        pop = self.cache.pop
+        missing = object()
+        return sum(1 for key in keys if pop(key, missing) is not missing)
+
     def clear(self):
         """Очистить кэш"""
         self.cache.clear()
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self.expiry.clear()
+        self.stats.reset()
+        self.expirations = 0
 
     def size(self):
         """Текущий размер кэша"""
@@ -96,46 +219,43 @@ class MRUCache:
 
     def get_stats(self):
         """Получить статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
-
         return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'evictions': self.evictions,
-            'hit_rate': hit_rate,
+            **self.stats.snapshot(),
+            'expirations': self.expirations,
             'current_size': len(self.cache),
             'capacity': self.capacity
         }
 
 
-class MRUCacheWithProbability:
+class MRUCacheWithProbability(CacheBase):
     """
     MRU кэш с вероятностным удалением
 
     Вместо всегда удаления самого недавнего, удаляет
-    с вероятностью, зависящей от давности использования
+    с вероятностью, зависящей от давности использования.
+    Ключи дублируются в IndexedKeySet, чтобы случайная жертва
+    выбиралась за O(1), а не копированием всех ключей.
     """
 
-    def __init__(self, capacity, mru_probability=0.8):
+    def __init__(self, capacity, mru_probability=0.8, stats=None):
         """
         Инициализация MRU кэша с вероятностным удалением
 
         Args:
             capacity: Максимальный размер кэша
             mru_probability: Вероятность удаления самого недавнего элемента
+            stats: Recorder статистики (None - точные счётчики)
         """
         if capacity <= 0:
             raise ValueError("Capacity must be positive")
 
         self.capacity = capacity
         self.cache = OrderedDict()
+        self.key_set = IndexedKeySet()
         self.mru_probability = mru_probability
 
         # Статистика
-        self.hits = 0
-        self.misses = 0
-        self.evictions = 0
+        self._init_stats(stats)
         self.mru_evictions = 0
 
     def get(self, key):
@@ -149,11 +269,13 @@ class MRUCacheWithProbability:
             Значение или None если не найдено
         """
         if key not in self.cache:
-            self.misses += 1
+            if self._stats is not None:
+                self._stats.misses += 1
             return None
 
         self.cache.move_to_end(key)
-        self.hits += 1
+        if self._stats is not None:
+            self._stats.hits += 1
         return self.cache[key]
 
     def set(self, key, value):
@@ -169,32 +291,49 @@ class MRUCacheWithProbability:
         else:
             if len(self.cache) >= self.capacity:
                 # Вероятностное удаление
-                if random.random() < self.mru_probability:
+                if random.random() < self.mru_probability or len(self.cache) == 1:
                     # Удаляем самый недавний (MRU)
-                    evicted = self.cache.popitem(last=True)
-                    self.mru_evictions += 1
+                    evicted_key, _ = self.cache.popitem(last=True)
+                    if self._stats is not None:
+                        self.mru_evictions += 1
                 else:
-                    # Удаляем случайный элемент
-                    keys = list(self.cache.keys())
-                    random_key = random.choice(keys[:-1])  # Исключаем последний
-                    del self.cache[random_key]
+                    # Удаляем случайный элемент, кроме самого недавнего
+                    evicted_key = self.key_set.choice_excluding(next(reversed(self.cache)))
+                    del self.cache[evicted_key]
 
-                self.evictions += 1
+                self.key_set.remove(evicted_key)
+                if self._stats is not None:
+                    self._stats.evictions += 1
+
+            self.key_set.add(key)
 
         self.cache[key] = value
 
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        if key in self.cache:
+            del self.cache[key]
+            self.key_set.remove(key)
+            return True
+        return False
+
+    def clear(self):
+        """Очистить кэш"""
+        self.cache.clear()
+        self.key_set.clear()
+        self.stats.reset()
+        self.mru_evictions = 0
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.cache)
+
     def get_stats(self):
         """Получить расширенную статистику"""
-        total = self.hits + self.misses
-        hit_rate = self.hits / total if total > 0 else 0
-
         return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'evictions': self.evictions,
+            **self.stats.snapshot(),
             'mru_evictions': self.mru_evictions,
             'random_evictions': self.evictions - self.mru_evictions,
-            'hit_rate': hit_rate,
             'current_size': len(self.cache),
             'capacity': self.capacity,
             'mru_probability': self.mru_probability
@@ -438,8 +577,40 @@ def test_correctness():
 
     # Проверяем что соотношение близко к заданной вероятности
     assert 0.5 < mru_ratio < 0.9, f"MRU eviction ratio {mru_ratio} not close to 0.7"
+    assert prob_cache.delete_many(list(prob_cache.cache)[:4] + ["missing"]) == 4, \
+        "Bulk delete must go through delete()"
+    for i in range(100, 120):
+        prob_cache.set(f"key_{i}", i)
+    assert prob_cache.size() == 10, "Deleted keys must leave the victim index"
+    prob_cache.clear()
+    assert prob_cache.size() == 0 and prob_cache.get_stats()['evictions'] == 0, \
+        "clear() empties the cache and resets stats"
     print(f"✓ Test 4: Probabilistic MRU (ratio: {mru_ratio:.2f})")
 
+    # Тест 5: Пакетные операции совпадают с поштучными
+    single = MRUCache(3)
+    bulk = MRUCache(3)
+    items = [("a", 1), ("b", 2), ("c", 3), ("a", 10), ("d", 4), ("e", 5)]
+    for key, value in items:
+        single.set(key, value)
+    bulk.set_many(items)
+    assert bulk.peek() == single.peek(), "set_many must match set()"
+    assert bulk.get_many(["e", "missing", "b"]) == [5, None, 2], "Results must keep input order"
+    assert bulk.delete_many(["b", "missing"]) == 1, "One key should be deleted"
+    print("✓ Test 5: get_many / set_many / delete_many")
+
+    # Тест 6: TTL - истёкший элемент удаляется, а не вытесняется
+    clock = ManualClock()
+    cache = MRUCache(2, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+    clock.advance(5)
+    cache.set("c", 3)           # Место 'b' освобождено истечением
+    assert cache.peek() == ["a", "c"], "'b' should be expired"
+    stats = cache.get_stats()
+    assert stats['expirations'] == 1 and stats['evictions'] == 0, "Expiry counted separately"
+    print("✓ Test 6: ttl / expirations")
+
     print("\nAll tests passed!")
 
 
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+S3-FIFO Cache - полная реализация
+
+S3-FIFO (Yang et al., SOSP 2023) строится только на FIFO очередях:
+- small (S, ~10%) - фильтр для новых ключей;
+- main (M, ~90%) - основная очередь с повторной вставкой (как CLOCK);
+- ghost (G) - ключи, недавно вытесненные из S, без значений.
+Попадание лишь увеличивает 2-битный счётчик частоты, без перестановок
+в очередях. Большинство одноразовых ключей покидает кэш из S быстро,
+не доходя до M ("quick demotion").
+"""
+
+from collections import OrderedDict
+import random
+import time
+
+from cache_base import CacheBase
+
+
+MAX_FREQ = 3  # 2-битный счётчик
+
+
+class S3FIFOCache(CacheBase):
+    """S3-FIFO кэш: small + main + ghost FIFO очереди"""
+
+    def __init__(self, capacity, small_ratio=0.1, move_threshold=1, stats=None):
+        """
+        Инициализация S3-FIFO кэша
+
+        Args:
+            capacity: Максимальный размер кэша
+            small_ratio: Доля кэша под очередь S
+            move_threshold: Сколько обращений в S нужно для перехода в M
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+        self.small_capacity = max(1, int(capacity * small_ratio))
+        self.main_capacity = capacity - self.small_capacity
+        self.move_threshold = move_threshold
+
+        self.entries = {}            # key -> [value, freq]
+        self.small = OrderedDict()   # FIFO: начало - самый старый
+        self.main = OrderedDict()
+        self.ghost = OrderedDict()   # Размер ghost ограничен main_capacity
+
+        # Статистика
+        self._init_stats(stats)
+        self.ghost_hits = 0
+        self.promotions = 0
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        if entry[1] < MAX_FREQ:
+            entry[1] += 1
+        if self._stats is not None:
+            self._stats.hits += 1
+        return entry[0]
+
+    def _evict_small(self):
+        """Вытеснение из S: частые ключи переходят в M, остальные в ghost"""
+        small, entries = self.small, self.entries
+        while small:
+            key, _ = small.popitem(last=False)
+            entry = entries[key]
+            if entry[1] >= self.move_threshold:
+                entry[1] = 0
+                self.main[key] = None
+                self.promotions += 1
+                if len(self.main) > self.main_capacity:
+                    self._evict_main()
+            else:
+                del entries[key]
+                self.ghost[key] = None
+                if len(self.ghost) > self.main_capacity:
+                    self.ghost.popitem(last=False)
+                if self._stats is not None:
+                    self._stats.evictions += 1
+                return
+
+    def _evict_main(self):
+        """Вытеснение из M: ключ с ненулевой частотой вставляется заново"""
+        main, entries = self.main, self.entries
+        while main:
+            key, _ = main.popitem(last=False)
+            entry = entries[key]
+            if entry[1] > 0:
+                entry[1] -= 1
+                main[key] = None
+            else:
+                del entries[key]
+                if self._stats is not None:
+                    self._stats.evictions += 1
+                return
+
+    def _evict(self):
+        if len(self.small) >= self.small_capacity or not self.main:
+            self._evict_small()
+        else:
+            self._evict_main()
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[0] = value
+            if entry[1] < MAX_FREQ:
+                entry[1] += 1
+            return
+
+        while len(self.entries) >= self.capacity:
+            self._evict()
+
+        self.entries[key] = [value, 0]
+        if key in self.ghost:
+            # Ключ недавно вытеснен из S - сразу в основную очередь
+            del self.ghost[key]
+            self.ghost_hits += 1
+            self.main[key] = None
+        else:
+            self.small[key] = None
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        if self.entries.pop(key, None) is None:
+            return False
+        if key in self.small:
+            del self.small[key]
+        else:
+            del self.main[key]
+        return True
+
+    def clear(self):
+        """Очистить кэш"""
+        self.entries.clear()
+        self.small.clear()
+        self.main.clear()
+        self.ghost.clear()
+        self.stats.reset()
+        self.ghost_hits = 0
+        self.promotions = 0
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.entries)
+
+    def get_stats(self):
+        """Получить статистику"""
+        return {
+            **self.stats.snapshot(),
+            'ghost_hits': self.ghost_hits,
+            'promotions': self.promotions,
+            'current_size': len(self.entries),
+            'capacity': self.capacity,
+            'small_size': len(self.small),
+            'main_size': len(self.main),
+            'ghost_size': len(self.ghost)
+        }
+
+
+def demo():
+    """Демонстрация работы S3-FIFO кэша"""
+    print("=== S3-FIFO Cache Demo ===\n")
+
+    cache = S3FIFOCache(10, small_ratio=0.2)
+    print(f"1. Кэш на 10 элементов: S={cache.small_capacity}, M={cache.main_capacity}")
+
+    for key in ["a", "b"]:
+        cache.set(key, key.upper())
+        cache.get(key)
+    print("   'a' и 'b' вставлены и прочитаны (freq=1)")
+
+    print("\n2. Поток из 20 одноразовых ключей:")
+    for i in range(20):
+        cache.set(f"once_{i}", i)
+    stats = cache.get_stats()
+    print(f"   'a': {'в M' if 'a' in cache.main else 'нет'}, "
+          f"'b': {'в M' if 'b' in cache.main else 'нет'}")
+    print(f"   Переходов S->M: {stats['promotions']}, ghost: {stats['ghost_size']}")
+
+    print("\n3. Повторный ключ из ghost попадает сразу в M:")
+    cache.set("once_5", 5)
+    print(f"   'once_5' в M: {'once_5' in cache.main}, ghost hits: {cache.ghost_hits}")
+
+
+def benchmark():
+    """Сравнение S3-FIFO с LRU и ARC"""
+    print("\n=== Benchmark ===\n")
+
+    from arc_adaptive_algorithm import ARCCache
+    from lru_doubly_linked_list import LRUCache
+
+    rng = random.Random(42)
+    capacity = 500
+    weights = [1.0 / (rank + 1) for rank in range(10000)]
+    requests = rng.choices(range(10000), weights=weights, k=100000)
+
+    for name, cache in [("LRU", LRUCache(capacity)),
+                        ("ARC", ARCCache(capacity)),
+                        ("S3-FIFO", S3FIFOCache(capacity))]:
+        start = time.perf_counter()
+        for key in requests:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        elapsed = time.perf_counter() - start
+
+        stats = cache.get_stats()
+        print(f"{name}:")
+        print(f"  Hit rate: {stats['hit_rate']:.2%}")
+        print(f"  Time: {elapsed:.3f}s ({elapsed / len(requests) * 1e9:.0f} ns/op)")
+
+
+def test_correctness():
+    """Тесты корректности S3-FIFO кэша"""
+    print("\n=== S3-FIFO Correctness Tests ===\n")
+
+    # Тест 1: Базовые операции
+    cache = S3FIFOCache(4)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1, "'a' should exist"
+    cache.set("a", 10)
+    assert cache.get("a") == 10, "'a' should be updated"
+    assert cache.get("missing") is None, "'missing' should not exist"
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    assert cache.size() == 1, "Only 'a' should remain"
+    cache.clear()
+    assert cache.size() == 0, "clear() empties the cache"
+    assert cache.get_stats()['hits'] == 0 and cache.get_stats()['misses'] == 0, \
+        "clear() resets stats"
+    print("✓ Test 1: Basic operations")
+
+    # Тест 2: Прочитанный ключ переходит из S в M, одноразовые уходят в ghost
+    cache = S3FIFOCache(10, small_ratio=0.2)
+    cache.set("hot", 1)
+    cache.get("hot")
+    for i in range(12):
+        cache.set(i, i)
+    assert "hot" in cache.main, "'hot' should be promoted to M"
+    assert cache.get("hot") == 1, "'hot' should survive one-hit wonders"
+    assert 0 in cache.ghost and 0 not in cache.entries, "One-hit key goes to ghost"
+    print("✓ Test 2: Quick demotion")
+
+    # Тест 3: Ключ из ghost вставляется в M
+    cache.set(0, 0)
+    assert 0 in cache.main and cache.ghost_hits == 1, "Ghost hit must insert into M"
+    print("✓ Test 3: Ghost hit")
+
+    # Тест 4: Инварианты под случайной нагрузкой
+    cache = S3FIFOCache(50)
+    rng = random.Random(2)
+    for _ in range(20000):
+        key = rng.randint(0, 30) if rng.random() < 0.5 else rng.randint(0, 1000)
+        if rng.random() < 0.05:
+            cache.delete(key)
+        elif cache.get(key) is None:
+            cache.set(key, key)
+        assert cache.size() <= 50, "Size must not exceed capacity"
+    assert set(cache.entries) == set(cache.small) | set(cache.main), "Queues must cover entries"
+    assert not (set(cache.small) & set(cache.main)), "Queues must be disjoint"
+    assert len(cache.ghost) <= cache.main_capacity, "Ghost must stay bounded"
+    print("✓ Test 4: Invariants under random load")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
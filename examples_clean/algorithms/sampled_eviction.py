@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Sampled Eviction Cache - приближённое вытеснение в стиле Redis
+
+Redis не поддерживает точный порядок LRU/LFU: при нехватке памяти он
+выбирает maxmemory-samples случайных ключей и вытесняет лучшего
+кандидата по политике. Кандидаты копятся в небольшом пуле (16 записей)
+между вытеснениями, что заметно приближает результат к точному LRU.
+
+Ключи хранятся в IndexedKeySet (массив + индекс), поэтому случайная
+выборка и удаление - O(1). TTL, как в Redis, проверяется лениво при
+обращении и активной выборкой истёкших ключей перед вставкой.
+"""
+
+from bisect import insort
+import math
+from operator import itemgetter
+import random
+import time
+
+from cache_base import CacheBase
+from timing_wheel import ManualClock
+
+
+POLICIES = (
+    'allkeys-lru', 'allkeys-lfu', 'allkeys-random',
+    'volatile-lru', 'volatile-lfu', 'volatile-random', 'volatile-ttl',
+    'noeviction'
+)
+
+EVICTION_POOL_SIZE = 16      # EVPOOL_SIZE в Redis
+ACTIVE_EXPIRE_SAMPLES = 20   # ACTIVE_EXPIRE_CYCLE_KEYS_PER_LOOP
+LFU_INIT_VAL = 5             # Начальное значение счётчика LFU
+LFU_MAX = 255                # Счётчик LFU - 8 бит
+
+_SCORE = itemgetter(0)
+
+
+class IndexedKeySet:
+    """Множество ключей с O(1) добавлением, удалением и случайной выборкой"""
+
+    def __init__(self):
+        self.items = []   # Плотный массив ключей
+        self.index = {}   # key -> позиция в items
+
+    def add(self, key):
+        """Добавить ключ (повторное добавление игнорируется)"""
+        if key not in self.index:
+            self.index[key] = len(self.items)
+            self.items.append(key)
+
+    def remove(self, key):
+        """Удалить ключ: на его место переносится последний элемент"""
+        pos = self.index.pop(key, None)
+        if pos is None:
+            return False
+
+        last = self.items.pop()
+        if pos < len(self.items):
+            self.items[pos] = last
+            self.index[last] = pos
+        return True
+
+    def choice(self, rng=random):
+        """Случайный ключ"""
+        return self.items[rng.randrange(len(self.items))]
+
+    def choice_excluding(self, key, rng=random):
+        """Случайный ключ, отличный от key (равномерно среди остальных)"""
+        items = self.items
+        picked = items[rng.randrange(len(items) - 1)]
+        return items[-1] if picked == key else picked
+
+    def sample(self, k, rng=random):
+        """k случайных ключей (с повторениями, как dictGetSomeKeys)"""
+        items = self.items
+        n = len(items)
+        if n <= k:
+            return list(items)
+        randrange = rng.randrange
+        return [items[randrange(n)] for _ in range(k)]
+
+    def clear(self):
+        self.items.clear()
+        self.index.clear()
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.items)
+
+
+class SampledEvictionCache(CacheBase):
+    """Кэш с вытеснением по выборке ключей (maxmemory-policy Redis)"""
+
+    def __init__(self, capacity, policy='allkeys-lru', samples=5,
+                 default_ttl=None, lfu_log_factor=10, lfu_decay_time=60.0,
+                 clock=time.monotonic, seed=None, stats=None):
+        """
+        Инициализация кэша
+
+        Args:
+            capacity: Максимальное количество ключей
+            policy: Политика вытеснения (см. POLICIES)
+            samples: Количество ключей в выборке (maxmemory-samples)
+            default_ttl: Срок жизни по умолчанию в секундах (None - бессрочно)
+            lfu_log_factor: Логарифмический множитель счётчика LFU
+            lfu_decay_time: Период (в секундах clock), за который счётчик LFU
+                уменьшается на 1
+            clock: Источник времени для TTL и старения LFU
+            seed: Зерно генератора выборки (для воспроизводимости)
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        if samples <= 0:
+            raise ValueError("Samples must be positive")
+
+        self.capacity = capacity
+        self.policy = policy
+        self.samples = samples
+        self.default_ttl = default_ttl
+        self.lfu_log_factor = lfu_log_factor
+        self.lfu_decay_time = lfu_decay_time
+        self.clock = clock
+        self.rng = random.Random(seed)
+
+        self.volatile_only = policy.startswith('volatile-')
+        self.criterion = policy.split('-', 1)[-1]   # lru / lfu / random / ttl
+
+        # key -> [value, lru_tick, lfu_counter, lfu_stamp]
+        self.data = {}
+        self.keys = IndexedKeySet()       # Все ключи
+        self.volatile = IndexedKeySet()   # Ключи с TTL
+        self.deadlines = {}               # key -> момент истечения
+        self.pool = []                    # Пул кандидатов (score, key) по возрастанию
+        self.pool_keys = set()
+        self.lru_clock = 0                # Логические часы обращений
+
+        # Статистика
+        self._init_stats(stats)
+        self.expirations = 0
+        self.rejections = 0
+
+    def _touch(self, entry):
+        """Обновить LRU часы и вероятностный счётчик LFU"""
+        self.lru_clock += 1
+        entry[1] = self.lru_clock
+
+        if self.criterion == 'lfu':
+            counter = self._lfu_decayed(entry)
+            if counter < LFU_MAX:
+                base = counter - LFU_INIT_VAL
+                if base < 0 or self.rng.random() < 1.0 / (base * self.lfu_log_factor + 1):
+                    counter += 1
+            entry[2] = counter
+            entry[3] = self.clock()
+
+    def _lfu_decayed(self, entry):
+        """Счётчик LFU с учётом старения (LFUDecrAndReturn)"""
+        counter = entry[2]
+        if self.lfu_decay_time:
+            periods = int((self.clock() - entry[3]) / self.lfu_decay_time)
+            if periods:
+                counter = max(0, counter - periods)
+        return counter
+
+    def _score(self, key):
+        """Оценка кандидата: чем больше, тем раньше вытесняется"""
+        criterion = self.criterion
+        if criterion == 'lru':
+            return self.lru_clock - self.data[key][1]
+        if criterion == 'lfu':
+            return LFU_MAX - self._lfu_decayed(self.data[key])
+        # ttl: чем ближе истечение, тем выше оценка
+        return -self.deadlines[key]
+
+    def _remove(self, key):
+        """Удалить ключ из всех структур"""
+        del self.data[key]
+        self.keys.remove(key)
+        if self.deadlines and self.deadlines.pop(key, None) is not None:
+            self.volatile.remove(key)
+
+    def _is_expired(self, key, now):
+        deadline = self.deadlines.get(key)
+        return deadline is not None and deadline <= now
+
+    def _active_expire(self):
+        """Активное истечение: выборки из ключей с TTL, пока истёкших больше 25%"""
+        now = self.clock()
+        while self.volatile:
+            sample = self.volatile.sample(ACTIVE_EXPIRE_SAMPLES, self.rng)
+            expired = 0
+            for key in sample:
+                if key in self.data and self._is_expired(key, now):
+                    self._remove(key)
+                    self.expirations += 1
+                    expired += 1
+            if expired * 4 <= len(sample):
+                break
+
+    def _evict(self):
+        """
+        Вытеснить один ключ по политике
+
+        Returns:
+            True, если место освобождено; False, если кандидатов нет
+        """
+        candidates = self.volatile if self.volatile_only else self.keys
+        if self.policy == 'noeviction' or not candidates:
+            return False
+
+        if self.criterion == 'random':
+            self._remove(candidates.choice(self.rng))
+            if self._stats is not None:
+                self._stats.evictions += 1
+            return True
+
+        # Пополняем пул свежей выборкой; оценки уже лежащих в нём ключей
+        # не пересчитываются, как и в evictionPoolPopulate
+        pool, pool_keys = self.pool, self.pool_keys
+        for key in candidates.sample(self.samples, self.rng):
+            if key in pool_keys:
+                continue
+            score = self._score(key)
+            if len(pool) < EVICTION_POOL_SIZE:
+                insort(pool, (score, key), key=_SCORE)
+                pool_keys.add(key)
+            elif score > pool[0][0]:
+                pool_keys.discard(pool[0][1])
+                pool[0] = (score, key)
+                pool.sort(key=_SCORE)
+                pool_keys.add(key)
+
+        while pool:
+            _, key = pool.pop()
+            pool_keys.discard(key)
+            # Ключ мог быть удалён или потерять TTL после попадания в пул
+            if key in candidates:
+                self._remove(key)
+                if self._stats is not None:
+                    self._stats.evictions += 1
+                return True
+        return False
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        entry = self.data.get(key)
+        if entry is None:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        # Ленивое истечение
+        if self.deadlines and self._is_expired(key, self.clock()):
+            self._remove(key)
+            self.expirations += 1
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        self._touch(entry)
+        if self._stats is not None:
+            self._stats.hits += 1
+        return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+            ttl: Срок жизни в секундах (по умолчанию default_ttl)
+
+        Returns:
+            False, если запись отклонена (нет кандидатов на вытеснение)
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+
+        entry = self.data.get(key)
+        if entry is not None:
+            entry[0] = value
+            self._touch(entry)
+        else:
+            if self.deadlines:
+                self._active_expire()
+            if len(self.data) >= self.capacity and not self._evict():
+                self.rejections += 1
+                return False
+
+            entry = [value, 0, LFU_INIT_VAL, self.clock()]
+            self.data[key] = entry
+            self.keys.add(key)
+            self._touch(entry)
+
+        # Как SET в Redis: запись без TTL снимает прежний срок жизни
+        if ttl is not None:
+            self.deadlines[key] = self.clock() + ttl
+            self.volatile.add(key)
+        elif self.deadlines and self.deadlines.pop(key, None) is not None:
+            self.volatile.remove(key)
+        return True
+
+    def set_many(self, items, ttl=None):
+        """Установить несколько значений; возвращает число принятых записей"""
+        return sum(1 for key, value in items if self.set(key, value, ttl))
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        if key not in self.data:
+            return False
+        self._remove(key)
+        return True
+
+    def clear(self):
+        """Очистить кэш"""
+        self.data.clear()
+        self.keys.clear()
+        self.volatile.clear()
+        self.deadlines.clear()
+        self.pool.clear()
+        self.pool_keys.clear()
+        self.stats.reset()
+        self.expirations = 0
+        self.rejections = 0
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.data)
+
+    def get_stats(self):
+        """Получить статистику"""
+        return {
+            **self.stats.snapshot(),
+            'expirations': self.expirations,
+            'rejections': self.rejections,
+            'current_size': len(self.data),
+            'capacity': self.capacity,
+            'policy': self.policy,
+            'samples': self.samples,
+            'volatile_keys': len(self.volatile)
+        }
+
+
+def zipf_keys(count, universe, alpha=1.0, seed=42):
+    """Последовательность ключей с распределением Zipf"""
+    rng = random.Random(seed)
+    weights = [1.0 / math.pow(rank, alpha) for rank in range(1, universe + 1)]
+    return [f"key_{i}" for i in rng.choices(range(universe), weights=weights, k=count)]
+
+
+def demo():
+    """Демонстрация приближённого LRU и политики volatile-ttl"""
+    print("=== Sampled Eviction Demo ===\n")
+
+    from lru_doubly_linked_list import LRUCache
+
+    requests = zipf_keys(50000, 5000)
+    capacity = 500
+
+    print("1. allkeys-lru на Zipf-нагрузке (capacity=500):")
+    exact = LRUCache(capacity)
+    for key in requests:
+        if exact.get(key) is None:
+            exact.set(key, key)
+    print(f"   Точный LRU:     {exact.get_stats()['hit_rate']:.2%}")
+
+    for samples in (1, 3, 5, 10):
+        cache = SampledEvictionCache(capacity, policy='allkeys-lru',
+                                     samples=samples, seed=1)
+        for key in requests:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        print(f"   samples={samples:<2}      {cache.get_stats()['hit_rate']:.2%}")
+
+    # Сегменты и сроки жизни из misc/cache_segmentation_by_data_type.py
+    print("\n2. volatile-ttl с сегментами products/prices/inventory/static:")
+    segment_ttls = {'products': 300, 'prices': 60, 'inventory': 30, 'static': 3600}
+    clock = ManualClock()
+    cache = SampledEvictionCache(200, policy='volatile-ttl', clock=clock, seed=1)
+    rng = random.Random(7)
+    segments = list(segment_ttls)
+    for step in range(5000):
+        clock.advance(0.05)
+        segment = rng.choice(segments)
+        key = f"{segment}:{rng.randint(0, 200)}"
+        if cache.get(key) is None:
+            cache.set(key, step, ttl=segment_ttls[segment])
+
+    resident = {segment: 0 for segment in segments}
+    for key in cache.keys.items:
+        resident[key.split(':')[0]] += 1
+    stats = cache.get_stats()
+    print(f"   Hit rate: {stats['hit_rate']:.2%}, вытеснений: {stats['evictions']}, "
+          f"истечений: {stats['expirations']}")
+    print(f"   Резидентные ключи по сегментам: {resident}")
+    print("   (короткий TTL вытесняется первым - inventory и prices теснятся)")
+
+
+def benchmark():
+    """Стоимость вытеснения при росте capacity"""
+    print("\n=== Benchmark ===\n")
+
+    from mru_most_recently_used import MRUCacheWithProbability
+
+    for capacity in (1000, 100000):
+        keys = [f"key_{i}" for i in range(capacity + 20000)]
+        print(f"Capacity {capacity}:")
+
+        for name, cache in [
+            ("MRU with probability", MRUCacheWithProbability(capacity, mru_probability=0.5)),
+            ("Sampled allkeys-lru", SampledEvictionCache(capacity, samples=5, seed=1)),
+            ("Sampled allkeys-lfu", SampledEvictionCache(capacity, policy='allkeys-lfu',
+                                                         samples=5, seed=1)),
+        ]:
+            for key in keys[:capacity]:
+                cache.set(key, key)
+
+            # Каждая вставка нового ключа вызывает вытеснение
+            start = time.perf_counter()
+            for key in keys[capacity:capacity + 20000]:
+                cache.set(key, key)
+            elapsed = time.perf_counter() - start
+            print(f"  {name:<22} {20000 / elapsed:>12,.0f} evicting sets/sec")
+
+
+def test_correctness():
+    """Тесты корректности"""
+    print("\n=== Sampled Eviction Correctness Tests ===\n")
+
+    # Тест 1: IndexedKeySet
+    keyset = IndexedKeySet()
+    for key in "abcde":
+        keyset.add(key)
+    keyset.add("a")
+    assert keyset.remove("b") and not keyset.remove("b"), "Remove semantics"
+    assert sorted(keyset.items) == ["a", "c", "d", "e"], "Swap-remove must keep others"
+    assert all(keyset.items[pos] == key for key, pos in keyset.index.items()), \
+        "Index must match positions"
+    rng = random.Random(1)
+    assert all(keyset.choice_excluding("e", rng) != "e" for _ in range(200)), \
+        "Excluded key must never be chosen"
+    print("✓ Test 1: IndexedKeySet")
+
+    # Тест 2: samples >= capacity вырождается в точный LRU
+    cache = SampledEvictionCache(3, samples=10, seed=1)
+    for key in "abc":
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")          # 'b' - самый давний
+    assert cache.get("b") is None and cache.get("a") == "a", "Exact LRU victim expected"
+    print("✓ Test 2: Full sample matches exact LRU")
+
+    # Тест 3: volatile-ttl вытесняет ближайший срок, бессрочные не трогает
+    clock = ManualClock()
+    cache = SampledEvictionCache(3, policy='volatile-ttl', samples=10, clock=clock)
+    cache.set("forever", 0)
+    cache.set("long", 1, ttl=100)
+    cache.set("short", 2, ttl=10)
+    cache.set("new", 3, ttl=50)
+    assert cache.get("short") is None, "Nearest deadline should be evicted"
+    assert cache.get("forever") == 0 and cache.get("long") == 1, "Others stay"
+    print("✓ Test 3: volatile-ttl")
+
+    # Тест 4: volatile-* без ключей с TTL отклоняет запись
+    cache = SampledEvictionCache(2, policy='volatile-lru')
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.set("c", 3) is False, "Write must be rejected"
+    assert cache.get_stats()['rejections'] == 1 and cache.size() == 2, "Nothing evicted"
+    cache.clear()
+    assert cache.get_stats()['rejections'] == 0 and cache.size() == 0, \
+        "clear() resets stats"
+    print("✓ Test 4: volatile policy without volatile keys")
+
+    # Тест 5: Ленивое и активное истечение
+    clock = ManualClock()
+    cache = SampledEvictionCache(100, clock=clock)
+    cache.set_many(((i, i) for i in range(50)), ttl=5)
+    cache.set("stay", 1)
+    clock.advance(5)
+    assert cache.get(0) is None, "Lazy expiry on access"
+    cache.set("trigger", 1)      # Активная выборка чистит истёкшие ключи
+    stats = cache.get_stats()
+    assert stats['expirations'] == 50 and stats['evictions'] == 0, "All TTL keys expired"
+    assert cache.size() == 2 and len(cache.volatile) == 0, "Only 'stay' and 'trigger' left"
+    print("✓ Test 5: Lazy and active expiry")
+
+    # Тест 6: allkeys-lfu сохраняет частые ключи
+    cache = SampledEvictionCache(10, policy='allkeys-lfu', samples=10, seed=3)
+    for _ in range(50):
+        for key in range(5):
+            if cache.get(key) is None:
+                cache.set(key, key)
+    for key in range(100, 200):
+        cache.set(key, key)
+    assert all(cache.get(key) == key for key in range(5)), "Hot keys must survive"
+    print("✓ Test 6: allkeys-lfu keeps frequent keys")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Sharded Cache - потокобезопасная обёртка с разбиением на шарды
+
+Ни один из кэшей в этом каталоге не защищён от конкурентного доступа:
+LFUCache._update_freq или ARCCache.set разрушают свои структуры, если
+два потока выполняются вперемешку. ShardedCache распределяет ключи по
+N независимым шардам (lock striping), у каждого шарда своя блокировка
+и свой экземпляр любой политики вытеснения.
+"""
+
+import random
+import threading
+import time
+
+from lru_doubly_linked_list import LRUCache
+from lfu_least_frequently_used import LFUCache
+from arc_adaptive_algorithm import ARCCache
+from cache_base import StatsRecorder
+from timing_wheel import ManualClock
+
+
+class ShardedCache:
+    """Кэш из N независимо блокируемых шардов с любой политикой"""
+
+    def __init__(self, capacity, cache_class=LRUCache, num_shards=16, stats=None, **cache_kwargs):
+        """
+        Инициализация шардированного кэша
+
+        Args:
+            capacity: Общая ёмкость (делится между шардами)
+            cache_class: Класс политики вытеснения для каждого шарда
+            num_shards: Количество шардов (не больше capacity и max_weight)
+            stats: Recorder статистики; раздаёт recorders шардам
+                (None - точные счётчики на каждом шарде)
+            **cache_kwargs: Дополнительные параметры для cache_class;
+                max_weight - общий бюджет веса, делится между шардами
+                так же, как capacity
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if num_shards <= 0:
+            raise ValueError("Number of shards must be positive")
+
+        self.capacity = capacity
+        self.cache_class = cache_class
+        self.max_weight = cache_kwargs.pop('max_weight', None)
+        self.weighted = cache_kwargs.get('weigher') is not None
+        self.num_shards = min(num_shards, capacity)
+        if self.max_weight is not None:
+            if self.max_weight <= 0:
+                raise ValueError("Max weight must be positive")
+            self.num_shards = min(self.num_shards, self.max_weight)
+
+        # Распределяем ёмкость и бюджет веса максимально равномерно
+        self.stats = stats if stats is not None else StatsRecorder()
+        base, extra = divmod(capacity, self.num_shards)
+        if self.max_weight is not None:
+            weight_base, weight_extra = divmod(self.max_weight, self.num_shards)
+            budgets = [weight_base + (1 if i < weight_extra else 0)
+                       for i in range(self.num_shards)]
+            shard_kwargs = [dict(cache_kwargs, max_weight=budget) for budget in budgets]
+        else:
+            shard_kwargs = [cache_kwargs] * self.num_shards
+        self.shards = [
+            cache_class(base + (1 if i < extra else 0),
+                        stats=self.stats.for_shard(i, self.num_shards), **shard_kwargs[i])
+            for i in range(self.num_shards)
+        ]
+        self.locks = [threading.Lock() for _ in range(self.num_shards)]
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        index = hash(key) % self.num_shards
+        with self.locks[index]:
+            return self.shards[index].get(key)
+
+    def set(self, key, value, ttl=None):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+            ttl: Срок жизни в секундах (передаётся шарду, если задан)
+        """
+        index = hash(key) % self.num_shards
+        with self.locks[index]:
+            if ttl is None:
+                self.shards[index].set(key, value)
+            else:
+                self.shards[index].set(key, value, ttl=ttl)
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        index = hash(key) % self.num_shards
+        with self.locks[index]:
+            return self.shards[index].delete(key)
+
+    def _group_by_shard(self, keys):
+        """Позиции ключей, сгруппированные по номеру шарда"""
+        groups = {}
+        num_shards = self.num_shards
+        for position, key in enumerate(keys):
+            groups.setdefault(hash(key) % num_shards, []).append(position)
+        return groups
+
+    def get_many(self, keys):
+        """
+        Получить значения для пакета ключей
+
+        Каждый шард блокируется один раз на весь пакет.
+
+        Returns:
+            Список значений в порядке ключей (None для промахов)
+        """
+        keys = list(keys)
+        results = [None] * len(keys)
+
+        for index, positions in self._group_by_shard(keys).items():
+            with self.locks[index]:
+                values = self.shards[index].get_many([keys[p] for p in positions])
+            for position, value in zip(positions, values):
+                results[position] = value
+        return results
+
+    def set_many(self, items, ttl=None):
+        """Установить пакет значений (dict или пары (key, value))"""
+        if isinstance(items, dict):
+            items = items.items()
+        items = list(items)
+
+        groups = self._group_by_shard(key for key, _ in items)
+        for index, positions in groups.items():
+            with self.locks[index]:
+                batch = [items[p] for p in positions]
+                if ttl is None:
+                    self.shards[index].set_many(batch)
+                else:
+                    self.shards[index].set_many(batch, ttl=ttl)
+
+    def delete_many(self, keys):
+        """Удалить пакет ключей, возвращает количество удалённых"""
+        keys = list(keys)
+        deleted = 0
+        for index, positions in self._group_by_shard(keys).items():
+            with self.locks[index]:
+                deleted += self.shards[index].delete_many([keys[p] for p in positions])
+        return deleted
+
+    def clear(self):
+        """Очистить кэш"""
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.clear()
+
+    def _shard_stats(self):
+        """Снимок статистики каждого шарда под его блокировкой"""
+        snapshots = []
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                snapshots.append(shard.get_stats())
+        return snapshots
+
+    def size(self):
+        """Текущий размер кэша"""
+        return sum(self._current_size(stats) for stats in self._shard_stats())
+
+    @staticmethod
+    def _current_size(stats):
+        """Размер шарда (ARC называет это поле total_cached)"""
+        return stats.get('current_size', stats.get('total_cached', 0))
+
+    def get_stats(self):
+        """Получить статистику, агрегированную по всем шардам"""
+        snapshots = self._shard_stats()
+        shard_sizes = [self._current_size(stats) for stats in snapshots]
+
+        result = {
+            **self.stats.merge(snapshots),
+            'expirations': sum(stats.get('expirations', 0) for stats in snapshots),
+            'current_size': sum(shard_sizes),
+            'capacity': self.capacity,
+            'num_shards': self.num_shards,
+            'shard_sizes': shard_sizes
+        }
+        if self.weighted:
+            result['current_weight'] = sum(stats.get('current_weight', 0) for stats in snapshots)
+            result['max_weight'] = self.max_weight
+        return result
+
+
+def demo():
+    """Демонстрация работы шардированного кэша"""
+    print("=== Sharded Cache Demo ===\n")
+
+    cache = ShardedCache(8, cache_class=LFUCache, num_shards=4)
+
+    print("1. Заполнение кэша (capacity=8, 4 шарда LFU):")
+    for i in range(12):
+        cache.set(f"key_{i}", f"value_{i}")
+    stats = cache.get_stats()
+    print(f"   Размер: {stats['current_size']}, по шардам: {stats['shard_sizes']}")
+    print(f"   Вытеснений: {stats['evictions']}")
+
+    print("\n2. Конкурентный доступ из 4 потоков:")
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(2000):
+            key = f"key_{rng.randint(0, 20)}"
+            if cache.get(key) is None:
+                cache.set(key, key)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.get_stats()
+    print(f"   Операций get: {stats['hits'] + stats['misses']}")
+    print(f"   Hit rate: {stats['hit_rate']:.2%}")
+    print(f"   Размер: {stats['current_size']}/{stats['capacity']}")
+
+
+def benchmark():
+    """Пропускная способность: одна блокировка vs шарды"""
+    print("\n=== Contention Benchmark ===\n")
+
+    keys = [f"key_{i}" for i in range(2000)]
+    ops_per_thread = 20000
+
+    for threads_count in [1, 2, 4, 8]:
+        print(f"Threads: {threads_count}")
+        for name, num_shards in [("Global lock", 1), ("16 shards", 16)]:
+            cache = ShardedCache(1000, cache_class=LRUCache, num_shards=num_shards)
+
+            def worker(seed):
+                rng = random.Random(seed)
+                for _ in range(ops_per_thread):
+                    key = rng.choice(keys)
+                    if cache.get(key) is None:
+                        cache.set(key, key)
+
+            threads = [threading.Thread(target=worker, args=(i,))
+                       for i in range(threads_count)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            total_ops = ops_per_thread * threads_count
+            print(f"  {name}: {total_ops / elapsed:,.0f} ops/sec")
+        print()
+
+
+def test_correctness():
+    """Тесты корректности шардированного кэша"""
+    print("\n=== Sharded Cache Correctness Tests ===\n")
+
+    # Тест 1: Базовые операции для разных политик
+    for cache_class in [LRUCache, LFUCache, ARCCache]:
+        cache = ShardedCache(16, cache_class=cache_class, num_shards=4)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1, "'a' should exist"
+        assert cache.get("b") == 2, "'b' should exist"
+        assert cache.get("missing") is None, "'missing' should not exist"
+        stats = cache.get_stats()
+        assert stats['hits'] == 2 and stats['misses'] == 1, "Stats must be aggregated"
+    print("✓ Test 1: Basic operations for LRU/LFU/ARC shards")
+
+    # Тест 2: Ёмкость делится между шардами без потерь
+    cache = ShardedCache(10, num_shards=4)
+    assert sum(shard.capacity for shard in cache.shards) == 10, "Capacity must be preserved"
+    assert ShardedCache(3, num_shards=16).num_shards == 3, "Shards limited by capacity"
+    print("✓ Test 2: Capacity split across shards")
+
+    # Тест 3: Конкурентные вставки не разрушают структуры LFU
+    cache = ShardedCache(64, cache_class=LFUCache, num_shards=8)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(5000):
+            key = rng.randint(0, 200)
+            if cache.get(key) is None:
+                cache.set(key, key)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.get_stats()
+    assert stats['hits'] + stats['misses'] == 8 * 5000, "Every get must be counted"
+    assert stats['current_size'] <= 64, "Size must not exceed capacity"
+    for shard in cache.shards:
+        in_buckets = sum(len(keys) for keys in shard.freq_to_keys.values())
+        assert in_buckets == len(shard.key_to_val_freq), "LFU structures must stay consistent"
+    print("✓ Test 3: Concurrent access keeps LFU shards consistent")
+
+    # Тест 4: Пакетные операции сохраняют порядок ключей
+    # (каждый шард вмещает все 50 ключей - вытеснений нет при любом PYTHONHASHSEED)
+    cache = ShardedCache(8 * 50, cache_class=ARCCache, num_shards=8)
+    cache.set_many({f"key_{i}": i for i in range(50)})
+    keys = [f"key_{i}" for i in range(60, 40, -1)]
+    expected = [i if i < 50 else None for i in range(60, 40, -1)]
+    assert cache.get_many(keys) == expected, "Results must keep input order"
+    assert cache.delete_many(keys) == 9, "Keys 41..49 should be deleted"
+    assert cache.size() == 41, "41 keys should remain"
+    print("✓ Test 4: get_many / set_many / delete_many across shards")
+
+    # Тест 5: TTL передаётся шардам, истечения агрегируются
+    clock = ManualClock()
+    # (9 ключей на шард - ключи истекают, а не вытесняются при любом PYTHONHASHSEED)
+    cache = ShardedCache(4 * 9, cache_class=LRUCache, num_shards=4, clock=clock)
+    cache.set_many({f"key_{i}": i for i in range(8)}, ttl=5)
+    cache.set("forever", 1)
+    clock.advance(5)
+    assert cache.get_many([f"key_{i}" for i in range(8)]) == [None] * 8, "Keys should expire"
+    assert cache.get("forever") == 1, "Key without TTL should stay"
+    assert cache.get_stats()['expirations'] == 8, "Expirations must be aggregated"
+    print("✓ Test 5: ttl across shards")
+
+    # Тест 6: Бюджет веса делится между шардами, а не умножается на их число
+    cache = ShardedCache(1000, cache_class=LRUCache, num_shards=4,
+                         weigher=lambda key, value: len(value), max_weight=42)
+    assert [shard.max_weight for shard in cache.shards] == [11, 11, 10, 10], "Budget split"
+    cache.set_many({f"key_{i}": "x" * 5 for i in range(100)})
+    stats = cache.get_stats()
+    assert stats['current_weight'] <= 42, "Total weight must respect max_weight"
+    assert stats['max_weight'] == 42, "Stats report the total budget"
+    assert ShardedCache(1000, num_shards=16, weigher=lambda key, value: 1,
+                        max_weight=8).num_shards == 8, "No shard with an empty budget"
+    print("✓ Test 6: max_weight split across shards")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
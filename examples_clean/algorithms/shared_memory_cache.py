@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Shared Memory Cache - один кэш на все pre-fork воркеры хоста
+
+Индекс и значения лежат в multiprocessing.shared_memory, поэтому воркеры,
+унаследовавшие кэш от мастер-процесса (gunicorn --preload), видят одну
+копию данных и прогревают её вместе.
+
+Устройство (set-associative, как кэш процессора):
+- ключ хешируется стабильным хешем (blake2b от pickle ключа) в корзину;
+- в корзине `ways` слотов фиксированного размера: заголовок, ключ и
+  значение (pickle) целиком внутри слота;
+- отпечатки (64-битный хеш) слотов хранятся отдельным массивом -
+  поиск в корзине сравнивает ключ только у совпавшего отпечатка;
+- вытеснение внутри корзины - CLOCK: бит обращения на слот и стрелка
+  на корзину;
+- у каждой корзины seqlock: писатель делает счётчик нечётным, меняет
+  слоты и снова делает чётным. Читатель не берёт блокировок: копирует
+  байты и повторяет чтение, если счётчик был нечётным или изменился.
+  Распаковывается только проверенная копия.
+
+Писатели одной корзины исключают друг друга через полосы (stripes)
+multiprocessing.Lock. Блокировки наследуются при fork, поэтому кэш
+создаётся до запуска воркеров. Бит обращения читатель ставит без
+блокировки: гонка с писателем лишь сохраняет слоту лишний круг.
+
+Статистика hits/misses/evictions - своя у каждого процесса.
+"""
+
+from hashlib import blake2b
+from multiprocessing import shared_memory
+import multiprocessing
+import os
+import pickle
+import random
+import time
+
+from cache_base import CacheBase
+
+
+# Заголовок слота: длина ключа (uint16) и длина значения (uint32)
+SLOT_HEADER = 6
+
+
+class SharedMemoryCache(CacheBase):
+    """Кэш в разделяемой памяти: корзины со слотами, CLOCK и seqlock"""
+
+    def __init__(self, capacity, slot_size=256, ways=8, lock_stripes=64, stats=None):
+        """
+        Инициализация кэша в разделяемой памяти
+
+        Args:
+            capacity: Количество слотов (округляется вверх до кратного ways)
+            slot_size: Размер слота в байтах (ключ и значение в pickle)
+            ways: Слотов в корзине
+            lock_stripes: Количество блокировок писателей
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if slot_size <= SLOT_HEADER:
+            raise ValueError("Slot size must exceed slot header")
+        if ways <= 0 or ways > 255:
+            raise ValueError("Ways must be in 1..255")
+
+        self.ways = ways
+        self.num_buckets = -(-capacity // ways)
+        self.capacity = self.num_buckets * ways
+        self.slot_size = slot_size
+
+        # Раскладка: seqlock'и, стрелки, биты обращения, отпечатки, слоты
+        slots = self.capacity
+        seq_offset = 0
+        hand_offset = seq_offset + 4 * self.num_buckets
+        ref_offset = hand_offset + self.num_buckets
+        fp_offset = -(-(ref_offset + slots) // 8) * 8
+        slot_offset = fp_offset + 8 * slots
+        total = slot_offset + slots * slot_size
+
+        self.shm = shared_memory.SharedMemory(create=True, size=total)
+        self.owner_pid = os.getpid()
+        buf = self.shm.buf
+        self._seqs = buf[seq_offset:hand_offset].cast('I')
+        self._hands = buf[hand_offset:ref_offset]
+        self._refs = buf[ref_offset:ref_offset + slots]
+        self._fps = buf[fp_offset:slot_offset].cast('Q')
+        self._slots = buf[slot_offset:total]
+
+        self.locks = [multiprocessing.Lock() for _ in range(min(lock_stripes, self.num_buckets))]
+
+        # Статистика
+        self._init_stats(stats)
+        self.read_retries = 0
+        self.oversized = 0
+
+    @property
+    def name(self):
+        """Имя сегмента разделяемой памяти"""
+        return self.shm.name
+
+    def _locate(self, key):
+        """Байты ключа, номер корзины и отпечаток (не 0: 0 - пустой слот)"""
+        key_data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        digest = int.from_bytes(blake2b(key_data, digest_size=8).digest(), 'little')
+        return key_data, digest % self.num_buckets, digest | 1
+
+    def _find(self, bucket, fingerprint, key_data):
+        """Номер слота с ключом в корзине или -1"""
+        base = bucket * self.ways
+        row = self._fps[base:base + self.ways].tolist()
+        slots, slot_size = self._slots, self.slot_size
+        position = 0
+        while True:
+            try:
+                position = row.index(fingerprint, position)
+            except ValueError:
+                return -1
+            offset = (base + position) * slot_size
+            key_len = slots[offset] | slots[offset + 1] << 8
+            start = offset + SLOT_HEADER
+            if slots[start:start + key_len] == key_data:
+                return base + position
+            position += 1
+
+    def _read_value(self, slot):
+        """Копия байтов значения слота"""
+        slots = self._slots
+        offset = slot * self.slot_size
+        key_len = slots[offset] | slots[offset + 1] << 8
+        value_len = int.from_bytes(slots[offset + 2:offset + SLOT_HEADER], 'little')
+        start = offset + SLOT_HEADER + key_len
+        return bytes(slots[start:start + value_len])
+
+    def get(self, key):
+        """
+        Получить значение по ключу (без блокировок)
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        key_data, bucket, fingerprint = self._locate(key)
+        seqs = self._seqs
+        while True:
+            before = seqs[bucket]
+            if not before & 1:
+                slot = self._find(bucket, fingerprint, key_data)
+                data = self._read_value(slot) if slot >= 0 else None
+                if seqs[bucket] == before:
+                    break
+            # Корзину меняет писатель - повторяем чтение
+            self.read_retries += 1
+            os.sched_yield()
+
+        if slot < 0:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        if not self._refs[slot]:
+            self._refs[slot] = 1
+        if self._stats is not None:
+            self._stats.hits += 1
+        return pickle.loads(data)
+
+    def _victim(self, bucket):
+        """Свободный слот корзины или жертва CLOCK; второй элемент - вытеснение"""
+        base = bucket * self.ways
+        row = self._fps[base:base + self.ways].tolist()
+        if 0 in row:
+            return base + row.index(0), False
+
+        refs = self._refs
+        hand = self._hands[bucket]
+        for _ in range(2 * self.ways):
+            if not refs[base + hand]:
+                break
+            refs[base + hand] = 0
+            hand = (hand + 1) % self.ways
+        self._hands[bucket] = (hand + 1) % self.ways
+        return base + hand, True
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Значение, не помещающееся в слот, не кэшируется (старое удаляется).
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        key_data, bucket, fingerprint = self._locate(key)
+        value_data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if SLOT_HEADER + len(key_data) + len(value_data) > self.slot_size:
+            self.oversized += 1
+            self.delete(key)
+            return
+
+        seqs = self._seqs
+        with self.locks[bucket % len(self.locks)]:
+            slot = self._find(bucket, fingerprint, key_data)
+            existing = slot >= 0
+            if not existing:
+                slot, evicted = self._victim(bucket)
+                if evicted and self._stats is not None:
+                    self._stats.evictions += 1
+
+            offset = slot * self.slot_size
+            seqs[bucket] = (seqs[bucket] + 1) & 0xFFFFFFFF
+            try:
+                slots = self._slots
+                slots[offset:offset + 2] = len(key_data).to_bytes(2, 'little')
+                slots[offset + 2:offset + SLOT_HEADER] = len(value_data).to_bytes(4, 'little')
+                start = offset + SLOT_HEADER
+                slots[start:start + len(key_data)] = key_data
+                start += len(key_data)
+                slots[start:start + len(value_data)] = value_data
+                self._fps[slot] = fingerprint
+            finally:
+                seqs[bucket] = (seqs[bucket] + 1) & 0xFFFFFFFF
+            self._refs[slot] = 1 if existing else 0
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        key_data, bucket, fingerprint = self._locate(key)
+        seqs = self._seqs
+        with self.locks[bucket % len(self.locks)]:
+            slot = self._find(bucket, fingerprint, key_data)
+            if slot < 0:
+                return False
+            seqs[bucket] = (seqs[bucket] + 1) & 0xFFFFFFFF
+            self._fps[slot] = 0
+            seqs[bucket] = (seqs[bucket] + 1) & 0xFFFFFFFF
+            self._refs[slot] = 0
+            return True
+
+    def clear(self):
+        """Очистить кэш (во всех процессах)"""
+        seqs, fps, ways = self._seqs, self._fps, self.ways
+        for bucket in range(self.num_buckets):
+            with self.locks[bucket % len(self.locks)]:
+                seqs[bucket] = (seqs[bucket] + 1) & 0xFFFFFFFF
+                for slot in range(bucket * ways, (bucket + 1) * ways):
+                    fps[slot] = 0
+                    self._refs[slot] = 0
+                self._hands[bucket] = 0
+                seqs[bucket] = (seqs[bucket] + 1) & 0xFFFFFFFF
+        self.stats.reset()
+        self.read_retries = 0
+        self.oversized = 0
+
+    def size(self):
+        """Текущий размер кэша (занятые слоты)"""
+        return self.capacity - self._fps.tolist().count(0)
+
+    def close(self):
+        """Отключиться от разделяемой памяти в этом процессе"""
+        for view in (self._seqs, self._hands, self._refs, self._fps, self._slots):
+            view.release()
+        self.shm.close()
+
+    def unlink(self):
+        """Удалить сегмент (только процесс-создатель, после close)"""
+        if os.getpid() == self.owner_pid:
+            self.shm.unlink()
+
+    def get_stats(self):
+        """Получить статистику (счётчики - этого процесса)"""
+        return {
+            **self.stats.snapshot(),
+            'current_size': self.size(),
+            'capacity': self.capacity,
+            'num_buckets': self.num_buckets,
+            'ways': self.ways,
+            'slot_size': self.slot_size,
+            'read_retries': self.read_retries,
+            'oversized': self.oversized
+        }
+
+
+def _zipf_requests(seed, count, num_keys=5000):
+    """Поток Zipf запросов для воркера"""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(num_keys)]
+    return rng.choices(range(num_keys), weights=weights, k=count)
+
+
+def _worker(cache, seed, count, loads):
+    """Воркер: читает через кэш, при промахе 'загружает' из БД"""
+    for key in _zipf_requests(seed, count):
+        if cache.get(key) is None:
+            cache.set(key, {"id": key, "title": f"Product {key}"})
+            with loads.get_lock():
+                loads.value += 1
+
+
+def demo():
+    """Демонстрация: воркеры прогревают один общий кэш"""
+    print("=== Shared Memory Cache Demo ===\n")
+
+    ctx = multiprocessing.get_context('fork')
+    cache = SharedMemoryCache(2000, slot_size=128)
+    try:
+        print(f"1. Сегмент {cache.name}: {cache.num_buckets} корзин x {cache.ways} слотов "
+              f"по {cache.slot_size} байт")
+
+        print("\n2. 4 воркера по 5000 запросов, общий кэш:")
+        loads = ctx.Value('i', 0)
+        workers = [ctx.Process(target=_worker, args=(cache, seed, 5000, loads))
+                   for seed in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        print(f"   Загрузок из БД: {loads.value}, в кэше: {cache.size()} ключей")
+
+        print("\n3. Родитель видит данные, загруженные воркерами:")
+        print(f"   get(0) -> {cache.get(0)}")
+    finally:
+        cache.close()
+        cache.unlink()
+
+
+def benchmark():
+    """Холодный старт: свой LRU в каждом воркере vs общий кэш"""
+    print("\n=== Benchmark ===\n")
+
+    from lru_doubly_linked_list import LRUCache
+
+    ctx = multiprocessing.get_context('fork')
+    workers_count, requests = 4, 20000
+
+    # Ёмкость вмещает весь каталог: промахи - только холодный старт
+    for name in ("LRUCache в каждом воркере", "SharedMemoryCache"):
+        shared = SharedMemoryCache(8000, slot_size=128) if name == "SharedMemoryCache" else None
+        loads = ctx.Value('i', 0)
+        workers = [ctx.Process(target=_worker,
+                               args=(shared or LRUCache(8000), seed, requests, loads))
+                   for seed in range(workers_count)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        print(f"{name}:")
+        print(f"  Загрузок из БД: {loads.value:,} на {workers_count * requests:,} запросов, "
+              f"время: {elapsed:.2f}s")
+        if shared is not None:
+            shared.close()
+            shared.unlink()
+
+    # Стоимость операций в одном процессе
+    print()
+    keys = _zipf_requests(1, 100000)
+    for name, cache in [("LRUCache", LRUCache(2000)),
+                        ("SharedMemoryCache", SharedMemoryCache(2000, slot_size=128))]:
+        start = time.perf_counter()
+        for key in keys:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {elapsed / len(keys) * 1e9:,.0f} ns/op, "
+              f"hit rate {cache.get_stats()['hit_rate']:.2%}")
+        if isinstance(cache, SharedMemoryCache):
+            cache.close()
+            cache.unlink()
+
+
+def _child_roundtrip(cache, queue):
+    """Дочерний процесс: прочитать ключ родителя и записать свой"""
+    queue.put(cache.get("from_parent"))
+    cache.set("from_child", [1, 2, 3])
+
+
+def _child_writer(cache, rounds):
+    """Дочерний процесс: многократно перезаписывать ключ"""
+    for i in range(rounds):
+        cache.set("hot", bytes([i % 256]) * 150)
+
+
+def test_correctness():
+    """Тесты корректности кэша в разделяемой памяти"""
+    print("\n=== Shared Memory Cache Correctness Tests ===\n")
+
+    ctx = multiprocessing.get_context('fork')
+
+    # Тест 1: Базовые операции
+    cache = SharedMemoryCache(16, slot_size=64, ways=4)
+    try:
+        cache.set("a", 1)
+        cache.set(("tuple", 2), {"nested": [1, 2]})
+        assert cache.get("a") == 1, "'a' should exist"
+        assert cache.get(("tuple", 2)) == {"nested": [1, 2]}, "Any picklable key/value"
+        cache.set("a", 10)
+        assert cache.get("a") == 10, "'a' should be updated"
+        assert cache.size() == 2, "Update must not add a slot"
+        assert cache.get("missing") is None, "'missing' should not exist"
+        assert cache.delete("a") and not cache.delete("a"), "Delete semantics"
+        stats = cache.get_stats()
+        assert stats['hits'] == 3 and stats['misses'] == 1, "Stats must be counted"
+        cache.clear()
+        assert cache.size() == 0 and cache.get(("tuple", 2)) is None, "Clear empties the cache"
+    finally:
+        cache.close()
+        cache.unlink()
+    print("✓ Test 1: Basic operations")
+
+    # Тест 2: CLOCK внутри корзины
+    cache = SharedMemoryCache(4, slot_size=64, ways=4)
+    try:
+        for key in "abcd":
+            cache.set(key, key)
+        cache.get("a")
+        cache.set("e", "e")
+        assert cache.get("b") is None, "'b' should be evicted (no reference bit)"
+        assert all(cache.get(key) == key for key in "acde"), "Others must stay"
+        assert cache.get_stats()['evictions'] == 1, "Eviction must be counted"
+    finally:
+        cache.close()
+        cache.unlink()
+    print("✓ Test 2: CLOCK eviction within a bucket")
+
+    # Тест 3: Значение больше слота не кэшируется и вытесняет старое
+    cache = SharedMemoryCache(8, slot_size=64)
+    try:
+        cache.set("k", "small")
+        cache.set("k", "x" * 1000)
+        assert cache.get("k") is None, "Oversized value must not leave a stale entry"
+        assert cache.get_stats()['oversized'] == 1, "Oversized sets must be counted"
+    finally:
+        cache.close()
+        cache.unlink()
+    print("✓ Test 3: Oversized values")
+
+    # Тест 4: Данные видны между процессами
+    cache = SharedMemoryCache(64, slot_size=64)
+    try:
+        cache.set("from_parent", "hello")
+        queue = ctx.Queue()
+        child = ctx.Process(target=_child_roundtrip, args=(cache, queue))
+        child.start()
+        child.join()
+        assert queue.get() == "hello", "Child must see parent's data"
+        assert cache.get("from_child") == [1, 2, 3], "Parent must see child's data"
+    finally:
+        cache.close()
+        cache.unlink()
+    print("✓ Test 4: Shared across forked processes")
+
+    # Тест 5: Читатель без блокировок не видит разорванных значений
+    cache = SharedMemoryCache(8, slot_size=256)
+    try:
+        cache.set("hot", bytes(150))
+        writer = ctx.Process(target=_child_writer, args=(cache, 20000))
+        writer.start()
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            value = cache.get("hot")
+            assert value is not None and len(value) == 150, "Value must be present"
+            assert value.count(value[0]) == 150, "Torn read detected"
+            reads += 1
+        writer.join()
+        assert cache.get("hot") == bytes([19999 % 256]) * 150, "Last write must win"
+        retries = cache.read_retries
+    finally:
+        cache.close()
+        cache.unlink()
+    print(f"✓ Test 5: Seqlock readers ({reads} reads, {retries} retries)")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+SIEVE Cache - полная реализация
+
+SIEVE (Zhang et al., NSDI 2024) - FIFO очередь с битом посещения и
+стрелкой. Попадание только выставляет бит и никогда не меняет порядок.
+Стрелка идёт от старых элементов к новым: посещённые теряют бит и
+остаются на месте, первый непосещённый вытесняется. В отличие от CLOCK,
+выжившие элементы не переносятся в голову очереди, поэтому новые
+элементы, к которым не обращались, вытесняются быстрее.
+
+Очередь хранится в массивах слотов со связями по индексам, биты
+посещения - в bytearray; путь попадания - поиск в dict и запись байта.
+"""
+
+from array import array
+import random
+import time
+
+from cache_base import CacheBase
+
+
+class SIEVECache(CacheBase):
+    """SIEVE кэш: FIFO очередь + бит посещения + стрелка"""
+
+    def __init__(self, capacity, stats=None):
+        """
+        Инициализация SIEVE кэша
+
+        Args:
+            capacity: Максимальный размер кэша
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+        self.cache = {}  # key -> slot
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+        self.visited = bytearray(capacity)
+        self.newer = array('i', [-1]) * capacity  # Связь к голове (новым)
+        self.older = array('i', [-1]) * capacity  # Связь к хвосту (старым)
+        self.free = list(range(capacity - 1, -1, -1))
+
+        self.head = -1  # Самый новый элемент
+        self.tail = -1  # Самый старый элемент
+        self.hand = -1  # -1 - начать с хвоста
+
+        # Статистика
+        self._init_stats(stats)
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        slot = self.cache.get(key)
+        if slot is None:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        self.visited[slot] = 1
+        if self._stats is not None:
+            self._stats.hits += 1
+        return self.values[slot]
+
+    def _unlink(self, slot):
+        """Убрать слот из очереди и вернуть в список свободных"""
+        newer, older = self.newer, self.older
+        after, before = newer[slot], older[slot]
+        if after == -1:
+            self.head = before
+        else:
+            older[after] = before
+        if before == -1:
+            self.tail = after
+        else:
+            newer[before] = after
+
+        del self.cache[self.keys[slot]]
+        self.keys[slot] = None
+        self.values[slot] = None
+        self.visited[slot] = 0
+        self.free.append(slot)
+
+    def _evict(self):
+        """Пройти стрелкой до первого непосещённого элемента и вытеснить его"""
+        visited, newer = self.visited, self.newer
+        slot = self.hand if self.hand != -1 else self.tail
+        while visited[slot]:
+            visited[slot] = 0
+            slot = newer[slot]
+            if slot == -1:
+                slot = self.tail
+
+        self.hand = newer[slot]
+        self._unlink(slot)
+        if self._stats is not None:
+            self._stats.evictions += 1
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        slot = self.cache.get(key)
+        if slot is not None:
+            self.values[slot] = value
+            self.visited[slot] = 1
+            return
+
+        if not self.free:
+            self._evict()
+
+        # Вставка в голову очереди
+        slot = self.free.pop()
+        self.cache[key] = slot
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.older[slot] = self.head
+        self.newer[slot] = -1
+        if self.head == -1:
+            self.tail = slot
+        else:
+            self.newer[self.head] = slot
+        self.head = slot
+
+    def get_many(self, keys):
+        """Получить значения для нескольких ключей (в порядке запроса)"""
+        cache, visited, values = self.cache, self.visited, self.values
+        results = []
+        hits = 0
+        for key in keys:
+            slot = cache.get(key)
+            if slot is None:
+                results.append(None)
+            else:
+                visited[slot] = 1
+                results.append(values[slot])
+                hits += 1
+
+        if self._stats is not None:
+            self._stats.hits += hits
+            self._stats.misses += len(results) - hits
+        return results
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        slot = self.cache.get(key)
+        if slot is None:
+            return False
+
+        if slot == self.hand:
+            self.hand = self.newer[slot]
+        self._unlink(slot)
+        return True
+
+    def clear(self):
+        """Очистить кэш"""
+        self.__init__(self.capacity, stats=self.stats)
+        self.stats.reset()
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.cache)
+
+    def peek_order(self):
+        """Ключи от старых к новым (для отладки)"""
+        order = []
+        slot = self.tail
+        while slot != -1:
+            order.append(self.keys[slot])
+            slot = self.newer[slot]
+        return order
+
+    def get_stats(self):
+        """Получить статистику"""
+        return {
+            **self.stats.snapshot(),
+            'current_size': len(self.cache),
+            'capacity': self.capacity
+        }
+
+
+def demo():
+    """Демонстрация работы SIEVE кэша"""
+    print("=== SIEVE Cache Demo ===\n")
+
+    cache = SIEVECache(4)
+    for key in ["a", "b", "c", "d"]:
+        cache.set(key, key.upper())
+    print(f"1. Очередь (старые -> новые): {cache.peek_order()}")
+
+    print("\n2. Обращения к 'a' и 'c', затем вставка 'e':")
+    cache.get("a")
+    cache.get("c")
+    cache.set("e", "E")
+    print(f"   Очередь: {cache.peek_order()} - 'b' вытеснен, 'a' остался на месте")
+
+    print("\n3. Вставка 'f': стрелка продолжает с места остановки:")
+    cache.set("f", "F")
+    print(f"   Очередь: {cache.peek_order()}")
+
+
+def benchmark():
+    """Сравнение SIEVE с LRU и CLOCK (hit rate и ns/op)"""
+    print("\n=== Benchmark ===\n")
+
+    from fifo_first_in_first_out import FIFOWithSecondChance
+    from lru_doubly_linked_list import LRUCache
+
+    rng = random.Random(42)
+    capacity = 1000
+    weights = [1.0 / (rank + 1) for rank in range(20000)]
+    requests = rng.choices(range(20000), weights=weights, k=200000)
+
+    for name, cache in [("LRU", LRUCache(capacity)),
+                        ("CLOCK", FIFOWithSecondChance(capacity)),
+                        ("SIEVE", SIEVECache(capacity))]:
+        start = time.perf_counter()
+        for key in requests:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        elapsed = time.perf_counter() - start
+
+        stats = cache.get_stats()
+
+        # Стоимость попадания отдельно от промахов: только резидентные ключи
+        hot = [key for key in set(requests[:5000]) if cache.get(key) is not None][:500]
+        start = time.perf_counter()
+        for _ in range(100):
+            for key in hot:
+                cache.get(key)
+        hit_elapsed = time.perf_counter() - start
+
+        print(f"{name}:")
+        print(f"  Hit rate: {stats['hit_rate']:.2%}")
+        print(f"  Mixed: {elapsed / len(requests) * 1e9:.0f} ns/op, "
+              f"hit path: {hit_elapsed / (100 * len(hot)) * 1e9:.0f} ns/op")
+
+
+def test_correctness():
+    """Тесты корректности SIEVE кэша"""
+    print("\n=== SIEVE Correctness Tests ===\n")
+
+    # Тест 1: Базовые операции
+    cache = SIEVECache(3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1, "'a' should exist"
+    cache.set("a", 10)
+    assert cache.get("a") == 10, "'a' should be updated"
+    assert cache.get("missing") is None, "'missing' should not exist"
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    assert cache.size() == 1, "Only 'a' should remain"
+    print("✓ Test 1: Basic operations")
+
+    # Тест 2: Попадание не меняет порядок, посещённые переживают стрелку
+    cache = SIEVECache(3)
+    for key in "abc":
+        cache.set(key, key)
+    cache.get("a")
+    assert cache.peek_order() == ["a", "b", "c"], "Hit must not reorder"
+    cache.set("d", "d")
+    assert cache.peek_order() == ["a", "c", "d"], "'b' should be evicted, 'a' stays in place"
+    cache.set("e", "e")          # Стрелка уже за 'a' - вытесняется 'c'
+    assert cache.peek_order() == ["a", "d", "e"], "Hand must continue from its position"
+    print("✓ Test 2: Sieve order")
+
+    # Тест 3: Все посещены - стрелка делает круг и вытесняет хвост
+    cache = SIEVECache(3)
+    for key in "abc":
+        cache.set(key, key)
+        cache.get(key)
+    cache.set("d", "d")
+    assert cache.peek_order() == ["b", "c", "d"], "Tail should go after a full sweep"
+    print("✓ Test 3: Full sweep")
+
+    # Тест 4: Случайная нагрузка совпадает с эталоном на списке
+    cache = SIEVECache(20)
+    order, visited, hand = [], {}, None
+    rng = random.Random(4)
+    for _ in range(5000):
+        key = rng.randint(0, 60)
+        op = rng.random()
+        if op < 0.1:
+            if key in visited:
+                position = order.index(key)
+                if hand == position:
+                    hand = position if position + 1 < len(order) else None
+                elif hand is not None and hand > position:
+                    hand -= 1
+                order.remove(key)
+                del visited[key]
+            cache.delete(key)
+        elif cache.get(key) is None:
+            if key not in visited:
+                if len(order) == 20:
+                    position = hand if hand is not None else 0
+                    while visited[order[position]]:
+                        visited[order[position]] = False
+                        position = (position + 1) % len(order)
+                    victim = order.pop(position)
+                    del visited[victim]
+                    hand = position if position < len(order) else None
+                order.append(key)
+                visited[key] = False
+            cache.set(key, key)
+        else:
+            visited[key] = True
+        assert cache.peek_order() == order, "Queue must match reference model"
+    print("✓ Test 4: Matches reference model")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Hierarchical Timing Wheel - иерархическое колесо таймеров для TTL
+
+Вместо кучи таймеров (O(log n) на запись) или периодического
+сканирования всех ключей сроки жизни раскладываются по слотам
+нескольких колёс разной гранулярности, как в ядре Linux и Kafka.
+Вставка и отмена - O(1), продвижение времени - O(1) амортизированно на тик
+и на истёкшую запись.
+"""
+
+import random
+import time
+
+
+class HierarchicalTimingWheel:
+    """Иерархическое колесо таймеров"""
+
+    def __init__(self, tick=1.0, wheel_size=64, levels=4, start=0.0):
+        """
+        Инициализация колеса таймеров
+
+        Args:
+            tick: Длительность одного тика (разрешение таймеров)
+            wheel_size: Количество слотов в каждом колесе
+            levels: Количество колёс; уровень i покрывает wheel_size^(i+1) тиков
+            start: Начальный момент времени
+        """
+        if tick <= 0:
+            raise ValueError("Tick must be positive")
+        if wheel_size < 2 or levels < 1:
+            raise ValueError("Wheel must have at least 2 slots and 1 level")
+
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self.spans = [wheel_size ** level for level in range(levels + 1)]
+        # Слот - словарь key -> (deadline, expire_tick), поэтому отмена O(1)
+        self.wheels = [[{} for _ in range(wheel_size)] for _ in range(levels)]
+        self.slots = {}  # key -> слот, в котором лежит таймер
+        self.current_tick = int(start // tick)
+
+    def schedule(self, key, deadline):
+        """
+        Запланировать срабатывание (заменяет прежний таймер ключа)
+
+        Args:
+            key: Идентификатор таймера
+            deadline: Момент времени, после которого таймер срабатывает
+        """
+        self.cancel(key)
+        # Округляем вверх: таймер никогда не срабатывает раньше срока
+        expire_tick = -int(-deadline // self.tick)
+        self._place(key, deadline, expire_tick)
+
+    def cancel(self, key):
+        """Отменить таймер ключа, возвращает True если он был"""
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return False
+        del slot[key]
+        return True
+
+    def _place(self, key, deadline, expire_tick):
+        """Положить запись в слот подходящего уровня"""
+        delta = expire_tick - self.current_tick
+        if delta <= 0:
+            # Уже просрочено - сработает на ближайшем тике
+            expire_tick = self.current_tick + 1
+            delta = 1
+
+        spans = self.spans
+        level = 0
+        while level < self.levels - 1 and delta >= spans[level + 1]:
+            level += 1
+        # На верхнем уровне слот может совпасть с более ранним оборотом -
+        # тогда запись просто перекладывается повторно при каскаде
+        slot = self.wheels[level][(expire_tick // spans[level]) % self.wheel_size]
+        slot[key] = (deadline, expire_tick)
+        self.slots[key] = slot
+
+    def advance(self, now):
+        """
+        Продвинуть время до now
+
+        Args:
+            now: Текущий момент времени
+
+        Returns:
+            Список пар (key, deadline) сработавших таймеров
+        """
+        target = int(now // self.tick)
+        expired = []
+        wheel_size = self.wheel_size
+        spans = self.spans
+        wheels = self.wheels
+        slots = self.slots
+
+        while self.current_tick < target:
+            if not slots:
+                # Пустое колесо - перепрыгиваем сразу к цели
+                self.current_tick = target
+                break
+
+            self.current_tick += 1
+            tick = self.current_tick
+
+            # Каскад: когда младший уровень делает полный оборот,
+            # очередной слот старшего уровня раскладывается вниз
+            level = 1
+            while level < self.levels and tick % spans[level] == 0:
+                slot = (tick // spans[level]) % wheel_size
+                entries = wheels[level][slot]
+                if entries:
+                    wheels[level][slot] = {}
+                    for key, (deadline, expire_tick) in entries.items():
+                        if expire_tick <= tick:
+                            del slots[key]
+                            expired.append((key, deadline))
+                        else:
+                            self._place(key, deadline, expire_tick)
+                level += 1
+
+            slot = tick % wheel_size
+            entries = wheels[0][slot]
+            if entries:
+                wheels[0][slot] = {}
+                for key, (deadline, expire_tick) in entries.items():
+                    if expire_tick <= tick:
+                        del slots[key]
+                        expired.append((key, deadline))
+                    else:
+                        # levels=1: срок дальше одного оборота - ждём следующего
+                        self._place(key, deadline, expire_tick)
+
+        return expired
+
+    def clear(self):
+        """Удалить все таймеры"""
+        for wheel in self.wheels:
+            for slot in range(self.wheel_size):
+                wheel[slot] = {}
+        self.slots.clear()
+
+    def __len__(self):
+        return len(self.slots)
+
+
+class ExpiryIndex:
+    """Сроки жизни ключей кэша поверх колеса таймеров"""
+
+    def __init__(self, tick=1.0, clock=time.monotonic):
+        """
+        Инициализация индекса сроков жизни
+
+        Args:
+            tick: Разрешение колеса таймеров
+            clock: Источник времени (по умолчанию time.monotonic)
+        """
+        self.tick = tick
+        self.clock = clock
+        self.deadlines = {}  # key -> момент истечения
+        self.wheel = None    # Создаётся при первом TTL
+
+    def track(self, key, ttl):
+        """Установить ключу срок жизни ttl (перезаписывает прежний)"""
+        if ttl <= 0:
+            raise ValueError("TTL must be positive")
+        now = self.clock()
+        if self.wheel is None:
+            self.wheel = HierarchicalTimingWheel(tick=self.tick, start=now)
+        deadline = now + ttl
+        self.deadlines[key] = deadline
+        # Прежний таймер ключа заменяется - колесо не растёт при перезаписи
+        self.wheel.schedule(key, deadline)
+
+    def forget(self, key):
+        """Снять срок жизни (ключ удалён или вытеснен)"""
+        if self.deadlines.pop(key, None) is not None:
+            self.wheel.cancel(key)
+
+    def collect(self, keys=()):
+        """
+        Забрать истёкшие ключи
+
+        Args:
+            keys: Ключи, которые дополнительно проверяются точно
+                (колесо срабатывает с точностью до тика)
+
+        Returns:
+            Список ключей, срок жизни которых истёк
+        """
+        now = self.clock()
+        deadlines = self.deadlines
+        expired = []
+
+        if self.wheel is not None:
+            for key, _ in self.wheel.advance(now):
+                del deadlines[key]
+                expired.append(key)
+
+        for key in keys:
+            deadline = deadlines.get(key)
+            if deadline is not None and deadline <= now:
+                del deadlines[key]
+                self.wheel.cancel(key)
+                expired.append(key)
+
+        return expired
+
+    def clear(self):
+        """Удалить все сроки жизни"""
+        self.deadlines.clear()
+        if self.wheel is not None:
+            self.wheel.clear()
+
+    def __len__(self):
+        return len(self.deadlines)
+
+
+class ManualClock:
+    """Управляемые часы для тестов и демонстраций"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def demo():
+    """Демонстрация работы колеса таймеров"""
+    print("=== Hierarchical Timing Wheel Demo ===\n")
+
+    wheel = HierarchicalTimingWheel(tick=1.0, wheel_size=8, levels=3)
+    for key, deadline in [("a", 3), ("b", 10), ("c", 70), ("d", 5.5)]:
+        wheel.schedule(key, deadline)
+    print("1. Запланированы таймеры: a@3, d@5.5, b@10, c@70 (8 слотов, 3 уровня)")
+
+    for now in [2, 3, 6, 12, 80]:
+        fired = wheel.advance(now)
+        print(f"   t={now:>2}: сработали {[key for key, _ in fired]}, осталось {len(wheel)}")
+
+
+def benchmark():
+    """Колесо таймеров vs сканирование всех ключей"""
+    print("\n=== Expiry Benchmark ===\n")
+
+    n = 100000
+    rng = random.Random(42)
+    deadlines = [rng.uniform(1, 3600) for _ in range(n)]
+
+    wheel = HierarchicalTimingWheel(tick=1.0)
+    start = time.perf_counter()
+    for i, deadline in enumerate(deadlines):
+        wheel.schedule(i, deadline)
+    fired = 0
+    for now in range(0, 3601, 10):
+        fired += len(wheel.advance(now))
+    wheel_time = time.perf_counter() - start
+
+    table = dict(enumerate(deadlines))
+    start = time.perf_counter()
+    scanned = 0
+    for now in range(0, 3601, 10):
+        expired = [key for key, deadline in table.items() if deadline <= now]
+        for key in expired:
+            del table[key]
+        scanned += len(expired)
+    scan_time = time.perf_counter() - start
+
+    print(f"Timers: {n:,}, проверка каждые 10 тиков")
+    print(f"  Timing wheel: {wheel_time:.3f}s ({fired:,} expired)")
+    print(f"  Full scan:    {scan_time:.3f}s ({scanned:,} expired)")
+    print(f"  Speed ratio:  {scan_time / wheel_time:.1f}x")
+
+
+def test_correctness():
+    """Тесты корректности колеса таймеров"""
+    print("\n=== Timing Wheel Correctness Tests ===\n")
+
+    # Тест 1: Таймеры не срабатывают раньше срока и срабатывают все
+    rng = random.Random(1)
+    wheel = HierarchicalTimingWheel(tick=1.0, wheel_size=4, levels=3)
+    deadlines = {i: rng.uniform(0, 500) for i in range(1000)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+
+    fired = {}
+    for now in range(0, 600, 7):
+        for key, deadline in wheel.advance(now):
+            assert deadline <= now, "Timer must not fire early"
+            assert now - deadline < 8, "Timer must fire within one advance step"
+            fired[key] = deadline
+    assert fired == deadlines, "Every timer must fire exactly once"
+    assert len(wheel) == 0, "Wheel must be empty"
+    print("✓ Test 1: Timers fire on time across cascading levels")
+
+    # Тест 2: Сроки за пределами верхнего уровня
+    wheel = HierarchicalTimingWheel(tick=1.0, wheel_size=4, levels=2)
+    wheel.schedule("far", 100)
+    assert wheel.advance(99) == [], "Far timer must not fire early"
+    assert wheel.advance(100) == [("far", 100)], "Far timer must fire"
+    print("✓ Test 2: Deadlines beyond the top level")
+
+    # Тест 3: ExpiryIndex пропускает устаревшие записи колеса
+    clock = ManualClock()
+    index = ExpiryIndex(tick=1.0, clock=clock)
+    index.track("a", 5)
+    index.track("a", 20)   # Продление срока
+    index.track("b", 5)
+    index.forget("b")      # Ключ удалён из кэша
+    clock.advance(10)
+    assert index.collect() == [], "Stale entries must be skipped"
+    clock.advance(10)
+    assert index.collect() == ["a"], "Renewed deadline must be honoured"
+    print("✓ Test 3: Renewed and forgotten keys")
+
+    # Тест 4: Точная проверка внутри тика
+    clock = ManualClock()
+    index = ExpiryIndex(tick=10.0, clock=clock)
+    index.track("a", 1)
+    clock.advance(2)
+    assert index.collect() == [], "Wheel resolution is one tick"
+    assert index.collect(["a"]) == ["a"], "Exact check must catch expired key"
+    print("✓ Test 4: Exact deadline check")
+
+    # Тест 5: Повторный track и forget отменяют прежний таймер
+    clock = ManualClock()
+    index = ExpiryIndex(tick=1.0, clock=clock)
+    for i in range(1000):
+        index.track(i % 2, 5 + i)
+    assert len(index.wheel) == 2, "Re-tracking must replace the old timer"
+    index.forget(0)
+    assert len(index.wheel) == 1 and len(index) == 1, "Forget must cancel the timer"
+    clock.advance(2000)
+    assert index.collect() == [1] and len(index.wheel) == 0, "Only the live timer fires"
+    print("✓ Test 5: Timers are cancelled, not left behind")
+
+    # Тест 6: Одно колесо - сроки дальше одного оборота не срабатывают раньше
+    rng = random.Random(6)
+    wheel = HierarchicalTimingWheel(tick=1.0, wheel_size=2, levels=1)
+    deadlines = {i: rng.uniform(0, 400) for i in range(200)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+    fired = {}
+    now = 0.0
+    while now < 410:
+        now += rng.uniform(0.1, 3)
+        for key, deadline in wheel.advance(now):
+            assert deadline <= now, f"Timer {deadline:.2f} fired early at {now:.2f}"
+            fired[key] = deadline
+    assert fired == deadlines and len(wheel) == 0, "Every timer must fire exactly once"
+    print("✓ Test 6: Single-level wheel with long deadlines")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+W-TinyLFU (Window TinyLFU) Cache - полная реализация
+
+W-TinyLFU (Caffeine) отделяет решение "пускать ли ключ в кэш" от
+решения "кого вытеснять". Новые ключи попадают в маленькое LRU окно,
+а из окна в основную область (сегментированный LRU) проходят только
+если по оценке Count-Min Sketch они популярнее кандидата на вытеснение.
+Одноразовые ключи (one-hit wonders) не вымывают горячий набор.
+"""
+
+from collections import OrderedDict
+import random
+import time
+
+from cache_base import CacheBase
+
+
+class CountMinSketch:
+    """Count-Min Sketch с 4-битными счётчиками и периодическим старением"""
+
+    MAX_DEPTH = 4
+
+    # Таблица деления пополам обоих полубайтов (старение одним translate)
+    HALVE = bytes(((b >> 1) & 0x77) for b in range(256))
+
+    def __init__(self, width, depth=4, sample_size=None):
+        """
+        Инициализация скетча
+
+        Args:
+            width: Количество счётчиков в строке (округляется до степени двойки)
+            depth: Количество строк (независимых хешей), не больше MAX_DEPTH
+            sample_size: Число инкрементов между старениями (по умолчанию 10 * width)
+        """
+        if width <= 0:
+            raise ValueError("Width must be positive")
+        if not 1 <= depth <= self.MAX_DEPTH:
+            raise ValueError(f"Depth must be between 1 and {self.MAX_DEPTH}")
+
+        width = max(16, 1 << (width - 1).bit_length())
+        self.width = width
+        self.mask = width - 1
+
+        # Два 4-битных счётчика в байте
+        self.rows = [bytearray(width // 2) for _ in range(depth)]
+
+        self.sample_size = sample_size or 10 * width
+        self.additions = 0
+        self.resets = 0
+
+    @staticmethod
+    def _hash_pair(key):
+        """
+        Пара хешей для двойного хеширования (Kirsch-Mitzenmacher)
+
+        Позиция в строке i - (h1 + i * h2) & mask: один перемешанный
+        64-битный хеш заменяет depth независимых хеш-функций.
+        """
+        h = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return h >> 32, (h & 0xFFFFFFFF) | 1
+
+    def increment(self, key):
+        """Увеличить оценку частоты ключа (счётчики насыщаются на 15)"""
+        index, step = self._hash_pair(key)
+        mask = self.mask
+        added = False
+        for row in self.rows:
+            slot = index & mask
+            byte_index = slot >> 1
+            shift = (slot & 1) << 2
+            if (row[byte_index] >> shift) & 0xF != 0xF:
+                row[byte_index] += 1 << shift
+                added = True
+            index += step
+
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self._reset()
+
+    def frequency(self, key):
+        """Оценка частоты ключа (минимум по строкам, не меньше истинной)"""
+        index, step = self._hash_pair(key)
+        mask = self.mask
+        estimate = 0xF
+        for row in self.rows:
+            slot = index & mask
+            count = (row[slot >> 1] >> ((slot & 1) << 2)) & 0xF
+            if count < estimate:
+                estimate = count
+            index += step
+        return estimate
+
+    def _reset(self):
+        """Старение: все счётчики делятся пополам"""
+        halve = self.HALVE
+        self.rows = [row.translate(halve) for row in self.rows]
+        self.additions //= 2
+        self.resets += 1
+
+    def clear(self):
+        """Обнулить все счётчики"""
+        for row in self.rows:
+            row[:] = bytes(len(row))
+        self.additions = 0
+
+
+class TinyLFUCache(CacheBase):
+    """W-TinyLFU кэш: LRU окно + сегментированный LRU с фильтром допуска"""
+
+    def __init__(self, capacity, window_ratio=0.01, protected_ratio=0.8, stats=None):
+        """
+        Инициализация W-TinyLFU кэша
+
+        Args:
+            capacity: Максимальный размер кэша
+            window_ratio: Доля ёмкости под LRU окно (1% в Caffeine)
+            protected_ratio: Доля основной области под защищённый сегмент
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+
+        # Окно принимает все новые ключи, основная область - после фильтра
+        self.window_capacity = max(1, int(capacity * window_ratio))
+        self.main_capacity = capacity - self.window_capacity
+        self.protected_capacity = int(self.main_capacity * protected_ratio)
+
+        self.window = OrderedDict()     # LRU окно
+        self.probation = OrderedDict()  # Испытательный сегмент основной области
+        self.protected = OrderedDict()  # Защищённый сегмент (повторные обращения)
+
+        self.sketch = CountMinSketch(capacity)
+
+        # Статистика
+        self._init_stats(stats)
+        self.rejections = 0  # Кандидаты из окна, не прошедшие фильтр
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        self.sketch.increment(key)
+
+        if key in self.protected:
+            self.protected.move_to_end(key)
+            value = self.protected[key]
+        elif key in self.window:
+            self.window.move_to_end(key)
+            value = self.window[key]
+        elif key in self.probation:
+            value = self._promote(key)
+        else:
+            if self._stats is not None:
+                self._stats.misses += 1
+            return None
+
+        if self._stats is not None:
+            self._stats.hits += 1
+        return value
+
+    def _promote(self, key):
+        """Повторное обращение: перевод из испытательного в защищённый сегмент"""
+        value = self.protected[key] = self.probation.pop(key)
+        if len(self.protected) > self.protected_capacity:
+            # Самый старый защищённый ключ получает ещё один шанс
+            demoted, demoted_value = self.protected.popitem(last=False)
+            self.probation[demoted] = demoted_value
+        return value
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        for segment in (self.window, self.protected):
+            if key in segment:
+                segment[key] = value
+                segment.move_to_end(key)
+                return
+        if key in self.probation:
+            self.probation[key] = value
+            self._promote(key)
+            return
+
+        # Новый ключ: учитываем в скетче и кладём в окно
+        self.sketch.increment(key)
+        self.window[key] = value
+        if len(self.window) > self.window_capacity:
+            candidate, candidate_value = self.window.popitem(last=False)
+            self._admit(candidate, candidate_value)
+
+    def _admit(self, candidate, value):
+        """Перенос кандидата из окна в основную область через фильтр TinyLFU"""
+        if self.main_capacity == 0:
+            # capacity=1: вся ёмкость - окно, кандидат просто вытесняется как в LRU
+            if self._stats is not None:
+                self._stats.evictions += 1
+            return
+        if len(self.probation) + len(self.protected) < self.main_capacity:
+            self.probation[candidate] = value
+            return
+
+        # Жертва - самый старый ключ испытательного сегмента
+        segment = self.probation if self.probation else self.protected
+        victim = next(iter(segment))
+
+        if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+            del segment[victim]
+            self.probation[candidate] = value
+        else:
+            self.rejections += 1
+        if self._stats is not None:
+            self._stats.evictions += 1
+
+    def get_many(self, keys):
+        """Получить значения для пакета ключей (None для промахов)"""
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items):
+        """Установить пакет значений (dict или пары (key, value))"""
+        if isinstance(items, dict):
+            items = items.items()
+        for key, value in items:
+            self.set(key, value)
+
+    def delete(self, key):
+        """Удалить элемент из кэша (оценка частоты в скетче сохраняется)"""
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                del segment[key]
+                return True
+        return False
+
+    def delete_many(self, keys):
+        """Удалить пакет ключей, возвращает количество удалённых"""
+        return sum(1 for key in keys if self.delete(key))
+
+    def clear(self):
+        """Очистить кэш"""
+        self.window.clear()
+        self.probation.clear()
+        self.protected.clear()
+        self.sketch.clear()
+        self.stats.reset()
+        self.rejections = 0
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.window) + len(self.probation) + len(self.protected)
+
+    def get_stats(self):
+        """Получить статистику"""
+        return {
+            **self.stats.snapshot(),
+            'rejections': self.rejections,
+            'current_size': self.size(),
+            'capacity': self.capacity,
+            'window_size': len(self.window),
+            'probation_size': len(self.probation),
+            'protected_size': len(self.protected),
+            'sketch_resets': self.sketch.resets
+        }
+
+
+def demo():
+    """Демонстрация работы W-TinyLFU кэша"""
+    print("=== W-TinyLFU Cache Demo ===\n")
+
+    cache = TinyLFUCache(100)
+
+    print("1. Горячий набор из 50 ключей, по 5 обращений к каждому:")
+    for _ in range(5):
+        for i in range(50):
+            key = f"hot_{i}"
+            if cache.get(key) is None:
+                cache.set(key, i)
+    stats = cache.get_stats()
+    print(f"   Окно: {stats['window_size']}, испытательный: {stats['probation_size']}, "
+          f"защищённый: {stats['protected_size']}")
+
+    print("\n2. Сканирование 1000 одноразовых ключей:")
+    for i in range(1000):
+        cache.set(f"scan_{i}", i)
+    stats = cache.get_stats()
+    print(f"   Отклонено фильтром допуска: {stats['rejections']}")
+
+    preserved = sum(1 for i in range(50) if cache.get(f"hot_{i}") is not None)
+    print(f"   Горячих ключей сохранилось: {preserved}/50")
+
+
+def benchmark():
+    """Сравнение W-TinyLFU с LRU и ARC"""
+    print("\n=== Benchmark ===\n")
+
+    from lru_doubly_linked_list import LRUCache
+    from arc_adaptive_algorithm import ARCCache
+
+    rng = random.Random(42)
+    capacity = 1000
+    num_keys = 50000
+
+    # Zipf-подобное распределение с примесью одноразовых ключей
+    weights = [1 / (rank ** 0.9) for rank in range(1, num_keys + 1)]
+    requests = rng.choices(range(num_keys), weights=weights, k=100000)
+    requests = [key if rng.random() < 0.8 else f"once_{i}" for i, key in enumerate(requests)]
+
+    for name, cache in [("LRU", LRUCache(capacity)),
+                        ("ARC", ARCCache(capacity)),
+                        ("W-TinyLFU", TinyLFUCache(capacity))]:
+        start = time.perf_counter()
+        for key in requests:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        elapsed = time.perf_counter() - start
+
+        stats = cache.get_stats()
+        print(f"{name}:")
+        print(f"  Hit rate: {stats['hit_rate']:.2%}")
+        print(f"  Time: {elapsed:.3f}s ({len(requests) / elapsed:,.0f} ops/sec)")
+
+
+def test_correctness():
+    """Тесты корректности W-TinyLFU"""
+    print("\n=== W-TinyLFU Correctness Tests ===\n")
+
+    # Тест 1: Скетч не занижает частоту и стареет
+    sketch = CountMinSketch(64, sample_size=10**9)
+    for i in range(20):
+        for _ in range(i % 16):
+            sketch.increment(i)
+    assert all(sketch.frequency(i) >= min(i % 16, 15) for i in range(20)), \
+        "Count-Min Sketch must not underestimate"
+    for _ in range(30):
+        sketch.increment("hot")
+    assert sketch.frequency("hot") == 15, "Counters saturate at 15"
+    sketch._reset()
+    assert sketch.frequency("hot") == 7, "Aging halves counters"
+    print("✓ Test 1: Count-Min Sketch estimates and aging")
+
+    # Тест 2: Базовые операции
+    cache = TinyLFUCache(10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1, "'a' should exist"
+    cache.set("a", 10)
+    assert cache.get("a") == 10, "'a' should be updated"
+    assert cache.get("missing") is None, "'missing' should not exist"
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    print("✓ Test 2: Basic operations")
+
+    # Тест 3: Ёмкость соблюдается, сегменты не превышают лимитов
+    cache = TinyLFUCache(50)
+    rng = random.Random(7)
+    for _ in range(5000):
+        key = rng.randint(0, 500)
+        if cache.get(key) is None:
+            cache.set(key, key)
+        assert cache.size() <= 50, "Size must not exceed capacity"
+        assert len(cache.protected) <= cache.protected_capacity, "Protected overflow"
+    print("✓ Test 3: Capacity and segment limits")
+
+    # Тест 4: Сканирование не вытесняет частый набор
+    cache = TinyLFUCache(100)
+    for _ in range(5):
+        for i in range(50):
+            if cache.get(f"hot_{i}") is None:
+                cache.set(f"hot_{i}", i)
+    for i in range(2000):
+        cache.set(f"scan_{i}", i)
+    preserved = sum(1 for i in range(50) if cache.get(f"hot_{i}") is not None)
+    assert preserved >= 45, f"Hot set should survive a scan, preserved {preserved}"
+    assert cache.get_stats()['rejections'] > 0, "Scan keys should be rejected"
+    print("✓ Test 4: Scan resistance")
+
+    # Тест 5: Малые ёмкости (capacity=1 - только окно, без основной области)
+    cache = TinyLFUCache(1)
+    cache.set(2, 2)
+    cache.set(0, 0)
+    assert cache.get(0) == 0 and cache.get(2) is None, "Single slot must be replaced"
+    for capacity in (1, 2, 3):
+        cache = TinyLFUCache(capacity)
+        rng = random.Random(capacity)
+        for _ in range(2000):
+            key = rng.randint(0, 10)
+            if rng.random() < 0.05:
+                cache.delete(key)
+            elif cache.get(key) is None:
+                cache.set(key, key)
+            assert cache.size() <= capacity, "Size must not exceed capacity"
+    print("✓ Test 5: Small capacities")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
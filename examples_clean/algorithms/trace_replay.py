@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Trace Replay - прогон реальных логов доступа через политики кэширования
+
+Трасса читается потоково, строка за строкой, и обрабатывается пачками:
+каждая пачка сразу проходит через все кэши (все политики и все ёмкости),
+поэтому файл читается один раз, а память ограничена размером кэшей и
+одной пачки - независимо от размера трассы. Файлы .gz читаются без
+распаковки на диск.
+
+Поддерживаемые форматы строк (формат 'auto'):
+    key
+    key size
+    timestamp,key,size[,op]     (как CSV в libCacheSim)
+Разделитель - запятая, если она есть в строке, иначе пробелы.
+Операции delete/del удаляют ключ; остальные - чтение с заполнением при
+промахе (demand fill).
+"""
+
+import gzip
+from itertools import islice
+import os
+import random
+import tempfile
+import time
+
+
+DELETE_OPS = frozenset(('delete', 'del'))
+
+
+def open_trace(path):
+    """Открыть трассу как текст (с распаковкой .gz на лету)"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def parse_line(line, key_field=None, size_field=None, op_field=None):
+    """
+    Разобрать строку трассы
+
+    Returns:
+        (key, size, op) или None для пустых строк, комментариев и заголовков
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    fields = line.split(',') if ',' in line else line.split()
+    count = len(fields)
+
+    # Позиции полей по умолчанию зависят от числа колонок
+    if key_field is None:
+        key_field = 0 if count < 3 else 1
+    if size_field is None and count > 1:
+        size_field = 1 if count == 2 else 2
+    if op_field is None and count > 3:
+        op_field = 3
+
+    try:
+        key = fields[key_field].strip()
+        size = int(fields[size_field]) if size_field is not None else 1
+    except (IndexError, ValueError):
+        return None  # Заголовок CSV или битая строка
+
+    op = fields[op_field].strip().lower() if op_field is not None and op_field < count else 'get'
+    return key, size, op
+
+
+def iter_trace(path, key_field=None, size_field=None, op_field=None, stats=None):
+    """
+    Потоково читать записи трассы
+
+    Args:
+        path: Путь к файлу трассы (.gz поддерживается)
+        key_field, size_field, op_field: Номера колонок (None - по формату)
+        stats: dict, в который пишется число пропущенных строк ('skipped')
+
+    Yields:
+        (key, size, op)
+    """
+    skipped = 0
+    with open_trace(path) as trace:
+        for line in trace:
+            record = parse_line(line, key_field, size_field, op_field)
+            if record is None:
+                skipped += 1
+                continue
+            yield record
+    if stats is not None:
+        stats['skipped'] = skipped
+
+
+def iter_chunks(records, chunk_size):
+    """Разбить поток записей на пачки по chunk_size"""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class TraceReplay:
+    """Прогон одного потока запросов через набор кэшей"""
+
+    def __init__(self, caches):
+        """
+        Args:
+            caches: dict label -> кэш (например, (policy, capacity) -> кэш)
+        """
+        self.caches = caches
+        self.counters = {label: [0, 0] for label in caches}  # hits, hit_bytes
+        self.requests = 0
+        self.total_bytes = 0
+
+    def feed(self, chunk):
+        """Прогнать пачку записей через все кэши"""
+        reads = [(key, size) for key, size, op in chunk if op not in DELETE_OPS]
+        self.requests += len(reads)
+        self.total_bytes += sum(size for _, size in reads)
+
+        for label, cache in self.caches.items():
+            counters = self.counters[label]
+            get, set_, delete = cache.get, cache.set, cache.delete
+            hits = hit_bytes = 0
+            for key, size, op in chunk:
+                if op in DELETE_OPS:
+                    delete(key)
+                elif get(key) is not None:
+                    hits += 1
+                    hit_bytes += size
+                else:
+                    set_(key, size)  # Значением служит размер объекта
+            counters[0] += hits
+            counters[1] += hit_bytes
+
+    def run(self, records, chunk_size=10000, progress_every=None):
+        """
+        Прогнать весь поток записей
+
+        Args:
+            records: Итератор (key, size, op)
+            chunk_size: Размер пачки
+            progress_every: Печатать прогресс каждые N запросов (None - молча)
+        """
+        next_report = progress_every
+        for chunk in iter_chunks(records, chunk_size):
+            self.feed(chunk)
+            if progress_every and self.requests >= next_report:
+                print(f"  ... {self.requests:,} requests")
+                next_report += progress_every
+        return self.results()
+
+    def results(self):
+        """Hit rate, byte hit rate и вытеснения для каждого кэша"""
+        results = {}
+        for label, cache in self.caches.items():
+            hits, hit_bytes = self.counters[label]
+            results[label] = {
+                'requests': self.requests,
+                'hits': hits,
+                'hit_rate': hits / self.requests if self.requests else 0,
+                'byte_hit_rate': hit_bytes / self.total_bytes if self.total_bytes else 0,
+                'evictions': cache.get_stats().get('evictions', 0)
+            }
+        return results
+
+
+def print_results(results, capacities, policies):
+    """Таблица результатов: по таблице на каждую ёмкость"""
+    for capacity in capacities:
+        print(f"\nCapacity {capacity}:")
+        print(f"  {'Policy':<20} {'Hit rate':>9} {'Byte HR':>9} {'Evictions':>11}")
+        ranked = sorted(policies, key=lambda name: -results[(name, capacity)]['hit_rate'])
+        for name in ranked:
+            result = results[(name, capacity)]
+            print(f"  {name:<20} {result['hit_rate']:>9.2%} "
+                  f"{result['byte_hit_rate']:>9.2%} {result['evictions']:>11,}")
+
+
+def write_synthetic_trace(path, requests=100000, num_keys=20000, alpha=1.0, seed=42):
+    """Записать синтетическую трассу 'timestamp,key,size' (Zipf + Парето)"""
+    rng = random.Random(seed)
+    sizes = [min(int(200 * rng.paretovariate(1.2)), 1024 * 1024) for _ in range(num_keys)]
+    weights = [1.0 / (rank + 1) ** alpha for rank in range(num_keys)]
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt') as trace:
+        trace.write("timestamp,key,size\n")
+        for ts, key in enumerate(rng.choices(range(num_keys), weights=weights, k=requests)):
+            trace.write(f"{ts},obj_{key},{sizes[key]}\n")
+
+
+def demo():
+    """Демонстрация: синтетическая трасса через несколько политик"""
+    print("=== Trace Replay Demo ===\n")
+
+    from arc_adaptive_algorithm import ARCCache
+    from lru_doubly_linked_list import LRUCache
+    from sieve_eviction import SIEVECache
+
+    policies = {'LRU': LRUCache, 'ARC': ARCCache, 'SIEVE': SIEVECache}
+    capacities = [200, 2000]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.csv.gz")
+        write_synthetic_trace(path, requests=100000)
+        print(f"Трасса: {os.path.getsize(path) / 1024:.0f} KB (gzip), 100000 запросов")
+
+        caches = {(name, capacity): factory(capacity)
+                  for name, factory in policies.items() for capacity in capacities}
+        start = time.perf_counter()
+        results = TraceReplay(caches).run(iter_trace(path))
+        elapsed = time.perf_counter() - start
+
+    print_results(results, capacities, list(policies))
+    print(f"\nВремя: {elapsed:.2f}s")
+
+
+def benchmark():
+    """Пиковая память не растёт с длиной трассы"""
+    print("\n=== Benchmark ===\n")
+
+    import tracemalloc
+    from lru_doubly_linked_list import LRUCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for requests in (50000, 200000):
+            path = os.path.join(tmp, f"trace_{requests}.csv")
+            write_synthetic_trace(path, requests=requests, num_keys=5000)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            TraceReplay({('LRU', 1000): LRUCache(1000)}).run(iter_trace(path))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(f"{requests:>7} запросов ({os.path.getsize(path) / 1024:.0f} KB): "
+                  f"пик памяти {peak / 1024:.0f} KB, {requests / elapsed:,.0f} req/sec")
+
+
+def test_correctness():
+    """Тесты корректности"""
+    print("\n=== Trace Replay Correctness Tests ===\n")
+
+    from lru_doubly_linked_list import LRUCache
+
+    # Тест 1: Разбор форматов строк
+    assert parse_line("a") == ("a", 1, "get"), "Key only"
+    assert parse_line("a 100") == ("a", 100, "get"), "Key and size"
+    assert parse_line("5,a,100") == ("a", 100, "get"), "CSV timestamp,key,size"
+    assert parse_line("5,a,100,DELETE") == ("a", 100, "delete"), "CSV with op"
+    assert parse_line("timestamp,key,size") is None, "Header must be skipped"
+    assert parse_line("# comment") is None and parse_line("  ") is None, "Comments and blanks"
+    assert parse_line("a;x;7", key_field=0) == ("a;x;7", 1, "get"), "Explicit key field"
+    print("✓ Test 1: Line formats")
+
+    # Тест 2: Чтение .gz и счётчик пропущенных строк
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "t.csv.gz")
+        with gzip.open(path, 'wt') as trace:
+            trace.write("timestamp,key,size\n1,a,10\n2,b,20\nbroken,line\n3,a,10\n")
+        stats = {}
+        records = list(iter_trace(path, stats=stats))
+        assert records == [("a", 10, "get"), ("b", 20, "get"), ("a", 10, "get")], "Records"
+        assert stats['skipped'] == 2, "Header and broken line skipped"
+    print("✓ Test 2: gzip and skipped lines")
+
+    # Тест 3: Результат не зависит от размера пачки и совпадает с прямым прогоном
+    rng = random.Random(3)
+    records = [(f"k{rng.randint(0, 50)}", rng.randint(1, 100), 'get') for _ in range(5000)]
+    records[100] = ("k1", 1, "delete")
+
+    direct = LRUCache(20)
+    hits = hit_bytes = 0
+    for key, size, op in records:
+        if op == 'delete':
+            direct.delete(key)
+        elif direct.get(key) is not None:
+            hits += 1
+            hit_bytes += size
+        else:
+            direct.set(key, size)
+
+    for chunk_size in (1, 7, 10000):
+        result = TraceReplay({'lru': LRUCache(20)}).run(iter(records), chunk_size=chunk_size)['lru']
+        assert result['hits'] == hits, f"Hits must match (chunk {chunk_size})"
+        assert result['requests'] == len(records) - 1, "Deletes are not requests"
+        assert result['evictions'] == direct.get_stats()['evictions'], "Evictions must match"
+    total_bytes = sum(size for _, size, op in records if op != 'delete')
+    assert abs(result['byte_hit_rate'] - hit_bytes / total_bytes) < 1e-12, "Byte hit rate"
+    print("✓ Test 3: Chunked replay matches direct loop")
+
+    # Тест 4: Поток читается лениво
+    consumed = []
+
+    def generator():
+        for i in range(10 ** 9):
+            consumed.append(i)
+            yield (f"k{i}", 1, 'get')
+
+    first = next(iter_chunks(generator(), 100))
+    assert len(first) == 100 and len(consumed) == 100, "Only one chunk must be read"
+    print("✓ Test 4: Lazy streaming")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+2Q Cache - полная реализация
+
+2Q (Johnson & Shasha, 1994) - упрощённый LRU-2 с O(1) операциями.
+Новые ключи попадают в FIFO очередь A1in; вытесненные из неё ключи
+запоминаются (без значений) в A1out. Только ключ, к которому
+обратились снова, пока он в A1out, попадает в основной LRU список Am.
+
+Попадание в A1in не меняет порядок - одноразовые и коррелированные
+обращения (несколько чтений подряд сразу после вставки) не засоряют Am.
+"""
+
+from collections import OrderedDict
+import random
+import time
+
+from cache_base import CacheBase
+
+
+class TwoQueueCache(CacheBase):
+    """2Q кэш: A1in (FIFO) + A1out (ghost FIFO) + Am (LRU)"""
+
+    def __init__(self, capacity, kin_ratio=0.25, kout_ratio=0.5, stats=None):
+        """
+        Инициализация 2Q кэша
+
+        Args:
+            capacity: Максимальный размер кэша
+            kin_ratio: Доля кэша под очередь A1in
+            kout_ratio: Размер истории A1out относительно capacity
+            stats: Recorder статистики (None - точные счётчики)
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self.capacity = capacity
+        self.kin = max(1, int(capacity * kin_ratio))
+        self.kout = max(1, int(capacity * kout_ratio))
+
+        self.a1in = OrderedDict()   # key -> value, порядок вставки
+        self.a1out = OrderedDict()  # key -> None, только история
+        self.am = OrderedDict()     # key -> value, порядок LRU
+
+        # Статистика
+        self._init_stats(stats)
+        self.ghost_hits = 0
+
+    def get(self, key):
+        """
+        Получить значение по ключу
+
+        Args:
+            key: Ключ для поиска
+
+        Returns:
+            Значение или None если не найдено
+        """
+        am = self.am
+        if key in am:
+            am.move_to_end(key)
+            if self._stats is not None:
+                self._stats.hits += 1
+            return am[key]
+
+        value = self.a1in.get(key)
+        if value is not None or key in self.a1in:
+            # Попадание в A1in порядок не меняет
+            if self._stats is not None:
+                self._stats.hits += 1
+            return value
+
+        if self._stats is not None:
+            self._stats.misses += 1
+        return None
+
+    def _reclaim(self):
+        """Освободить место под новый ключ"""
+        if len(self.a1in) + len(self.am) < self.capacity:
+            return
+
+        if len(self.a1in) > self.kin or not self.am:
+            key, _ = self.a1in.popitem(last=False)
+            self.a1out[key] = None
+            if len(self.a1out) > self.kout:
+                self.a1out.popitem(last=False)
+        else:
+            self.am.popitem(last=False)
+        if self._stats is not None:
+            self._stats.evictions += 1
+
+    def set(self, key, value):
+        """
+        Установить значение по ключу
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        if key in self.am:
+            self.am[key] = value
+            self.am.move_to_end(key)
+            return
+        if key in self.a1in:
+            self.a1in[key] = value
+            return
+
+        # Историю проверяем до освобождения места: reclaim сдвигает A1out
+        if key in self.a1out:
+            # Повторное обращение после вытеснения из A1in - ключ горячий
+            del self.a1out[key]
+            self.ghost_hits += 1
+            self._reclaim()
+            self.am[key] = value
+        else:
+            self._reclaim()
+            self.a1in[key] = value
+
+    def delete(self, key):
+        """Удалить элемент из кэша"""
+        if key in self.am:
+            del self.am[key]
+            return True
+        if key in self.a1in:
+            del self.a1in[key]
+            return True
+        return False
+
+    def clear(self):
+        """Очистить кэш"""
+        self.a1in.clear()
+        self.a1out.clear()
+        self.am.clear()
+        self.stats.reset()
+        self.ghost_hits = 0
+
+    def size(self):
+        """Текущий размер кэша"""
+        return len(self.a1in) + len(self.am)
+
+    def get_stats(self):
+        """Получить статистику"""
+        return {
+            **self.stats.snapshot(),
+            'ghost_hits': self.ghost_hits,
+            'current_size': len(self.a1in) + len(self.am),
+            'capacity': self.capacity,
+            'a1in_size': len(self.a1in),
+            'a1out_size': len(self.a1out),
+            'am_size': len(self.am)
+        }
+
+
+def demo():
+    """Демонстрация работы 2Q кэша"""
+    print("=== 2Q Cache Demo ===\n")
+
+    cache = TwoQueueCache(8, kin_ratio=0.25, kout_ratio=0.5)
+    print(f"1. Кэш на 8 элементов: Kin={cache.kin}, Kout={cache.kout}")
+
+    for key in ["a", "b", "c"]:
+        cache.set(key, key.upper())
+        cache.get(key)          # Коррелированное чтение сразу после вставки
+    print(f"   После вставки и чтения a, b, c: {cache.get_stats()['am_size']} ключей в Am")
+
+    print("\n2. Поток новых ключей вытесняет a, b, c в A1out:")
+    for i in range(8):
+        cache.set(f"new_{i}", i)
+    print(f"   A1out: {list(cache.a1out)}")
+
+    print("\n3. Повторное обращение к 'b' - ключ попадает в Am:")
+    if cache.get("b") is None:
+        cache.set("b", "B")
+    print(f"   Am: {list(cache.am)}, ghost hits: {cache.ghost_hits}")
+
+
+def benchmark():
+    """Сравнение 2Q с LRU и ARC (hit rate и ns/op)"""
+    print("\n=== Benchmark ===\n")
+
+    from arc_adaptive_algorithm import ARCCache
+    from lru_doubly_linked_list import LRUCache
+
+    rng = random.Random(42)
+    capacity = 500
+    # Zipf по каталогу + короткие сканирования, не длиннее A1out
+    weights = [1.0 / (rank + 1) for rank in range(10000)]
+    requests = []
+    for phase in range(20):
+        requests.extend(rng.choices(range(10000), weights=weights, k=5000))
+        requests.extend(f"scan_{phase}_{i}" for i in range(200))
+
+    for name, cache in [("LRU", LRUCache(capacity)),
+                        ("ARC", ARCCache(capacity)),
+                        ("2Q", TwoQueueCache(capacity))]:
+        start = time.perf_counter()
+        for key in requests:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        elapsed = time.perf_counter() - start
+
+        stats = cache.get_stats()
+        print(f"{name}:")
+        print(f"  Hit rate: {stats['hit_rate']:.2%}")
+        print(f"  Time: {elapsed:.3f}s ({elapsed / len(requests) * 1e9:.0f} ns/op)")
+
+
+def test_correctness():
+    """Тесты корректности 2Q кэша"""
+    print("\n=== 2Q Correctness Tests ===\n")
+
+    # Тест 1: Базовые операции
+    cache = TwoQueueCache(4)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1, "'a' should exist"
+    cache.set("a", 10)
+    assert cache.get("a") == 10, "'a' should be updated"
+    assert cache.get("missing") is None, "'missing' should not exist"
+    assert cache.delete("b") and not cache.delete("b"), "Delete semantics"
+    assert cache.size() == 1, "Only 'a' should remain"
+    cache.clear()
+    assert cache.size() == 0, "clear() empties the cache"
+    assert cache.get_stats()['hits'] == 0 and cache.get_stats()['misses'] == 0, \
+        "clear() resets stats"
+    print("✓ Test 1: Basic operations")
+
+    # Тест 2: Ключ из A1out попадает в Am
+    cache = TwoQueueCache(4, kin_ratio=0.25)
+    for key in "abcde":
+        cache.set(key, key)
+    assert "a" in cache.a1out, "'a' should be remembered in A1out"
+    cache.set("a", "a")
+    assert "a" in cache.am and cache.ghost_hits == 1, "'a' should move to Am"
+    print("✓ Test 2: A1out promotion")
+
+    # Тест 3: Сканирование не вытесняет Am
+    cache = TwoQueueCache(10, kin_ratio=0.3)
+    for key in range(5):
+        cache.set(key, key)
+    for key in range(100, 110):
+        cache.set(key, key)      # 0..4 вытеснены в A1out
+    for key in range(5):
+        cache.set(key, key)      # ... и возвращаются в Am
+    for key in range(1000, 2000):
+        cache.set(key, key)
+    assert all(cache.get(key) == key for key in range(5)), "Am must survive a scan"
+    print("✓ Test 3: Scan resistance")
+
+    # Тест 4: Размеры очередей под случайной нагрузкой
+    cache = TwoQueueCache(50)
+    rng = random.Random(1)
+    for _ in range(20000):
+        key = rng.randint(0, 200)
+        if rng.random() < 0.05:
+            cache.delete(key)
+        elif cache.get(key) is None:
+            cache.set(key, key)
+        assert cache.size() <= 50, "Size must not exceed capacity"
+        assert len(cache.a1out) <= cache.kout, "A1out must stay bounded"
+    assert not (set(cache.am) & set(cache.a1in)), "Queues must be disjoint"
+    print("✓ Test 4: Bounds under random load")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
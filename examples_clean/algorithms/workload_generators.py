@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+Workload Generators - генераторы потоков ключей для бенчмарков
+
+Поток ключей генерируется блоками: весь блок выбирается одним
+векторным вызовом (numpy, если установлен), а потребитель получает
+обычный итератор целых ключей. Стоимость генерации на запрос почти
+нулевая и не искажает время, измеряемое у кэша.
+
+Нагрузки:
+- ZipfWorkload - настоящий Zipf(alpha) по конечному каталогу ключей;
+- UniformWorkload - равномерный выбор из диапазона;
+- HotSetWorkload - горячее окно ключей, которое сдвигается со временем;
+- ScanWorkload - последовательное сканирование;
+- LoopWorkload - циклический проход по одному и тому же набору;
+- ScanBurstsWorkload - базовая нагрузка с периодическими всплесками сканирований;
+- MixWorkload - смесь нагрузок с весами;
+- DiurnalWorkload - смесь "день/ночь", доля которой меняется по синусоиде;
+- PhasesWorkload - фазы, идущие друг за другом.
+
+Нагрузки - описания, а не состояние: stream(seed) каждый раз начинает
+поток заново, и одинаковый seed даёт одинаковый поток при любом
+block_size (в пределах одного бэкенда - numpy и чистый Python дают
+разные потоки).
+"""
+
+from itertools import chain, islice, repeat
+import math
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy необязателен - без него блоки строятся на random
+    np = None
+
+
+BLOCK_SIZE = 65536
+
+
+def new_rng(seed=None):
+    """Генератор случайных чисел текущего бэкенда"""
+    if np is not None:
+        return np.random.default_rng(seed)
+    return random.Random(seed)
+
+
+def _spawn(rng, count):
+    """count независимых генераторов с seed из rng (как SeedSequence.spawn)"""
+    if np is not None:
+        seeds = rng.integers(0, 2 ** 63, count).tolist()
+    else:
+        seeds = [rng.getrandbits(63) for _ in range(count)]
+    return [new_rng(seed) for seed in seeds]
+
+
+def _randoms(rng, count):
+    """Блок равномерных чисел [0, 1)"""
+    if np is not None:
+        return rng.random(count)
+    return [rng.random() for _ in range(count)]
+
+
+def _integers(rng, low, high, count):
+    """Блок целых из [low, high)"""
+    if np is not None:
+        return rng.integers(low, high, count)
+    return [low + int(rng.random() * (high - low)) for _ in range(count)]
+
+
+def _from_cdf(rng, cdf, count):
+    """Блок индексов по накопленным вероятностям"""
+    if np is not None:
+        return np.minimum(np.searchsorted(cdf, rng.random(count), side='right'), len(cdf) - 1)
+    return rng.choices(range(len(cdf)), cum_weights=cdf, k=count)
+
+
+def _cdf(weights):
+    """Накопленные нормированные вероятности"""
+    if np is not None:
+        cdf = np.cumsum(np.asarray(weights, dtype=float))
+        return cdf / cdf[-1]
+    total = 0.0
+    cdf = []
+    for weight in weights:
+        total += weight
+        cdf.append(total)
+    return [value / total for value in cdf]
+
+
+def _as_list(block):
+    """Блок как список int (значения numpy медленнее в ключах dict)"""
+    return block.tolist() if np is not None and isinstance(block, np.ndarray) else block
+
+
+class Workload:
+    """
+    Базовый класс нагрузки
+
+    Наследники реализуют _blocks(rng, block_size) - генератор блоков
+    ключей. requests=None означает бесконечный поток.
+    """
+
+    requests = None
+
+    def stream(self, seed=None, block_size=BLOCK_SIZE):
+        """Итератор ключей (int) с заданным seed"""
+        return chain.from_iterable(self.blocks(seed, block_size))
+
+    def blocks(self, seed=None, block_size=BLOCK_SIZE, rng=None):
+        """Итератор блоков ключей (списков int)"""
+        rng = rng if rng is not None else new_rng(seed)
+        blocks = (_as_list(block) for block in self._blocks(rng, block_size))
+        if self.requests is None:
+            return blocks
+        return _truncate(blocks, self.requests)
+
+    def _sized_blocks(self, block_size):
+        """Размеры блоков с учётом общего числа запросов"""
+        if self.requests is None:
+            return repeat(block_size)
+        full, rest = divmod(self.requests, block_size)
+        return chain(repeat(block_size, full), [rest] if rest else [])
+
+    def __iter__(self):
+        return self.stream()
+
+    def __len__(self):
+        if self.requests is None:
+            raise TypeError("Infinite workload has no length")
+        return self.requests
+
+    def _blocks(self, rng, block_size):
+        raise NotImplementedError
+
+
+def _truncate(blocks, requests):
+    """Обрезать поток блоков до requests ключей"""
+    remaining = requests
+    for block in blocks:
+        if remaining <= 0:
+            return
+        if len(block) > remaining:
+            block = block[:remaining]
+        remaining -= len(block)
+        yield block
+
+
+class _Reader:
+    """Чтение произвольного числа ключей из потока блоков"""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.buffer = []
+        self.position = 0
+
+    def take(self, count):
+        result = []
+        while count > 0:
+            if self.position == len(self.buffer):
+                self.buffer = next(self.blocks, None)
+                self.position = 0
+                if self.buffer is None:
+                    raise ValueError("Component workload is shorter than the mix")
+            chunk = self.buffer[self.position:self.position + count]
+            self.position += len(chunk)
+            count -= len(chunk)
+            result.extend(chunk)
+        return result
+
+
+class ZipfWorkload(Workload):
+    """Zipf(alpha): ключ ранга r (0 - самый популярный) с весом 1/(r+1)^alpha"""
+
+    def __init__(self, num_keys, requests=None, alpha=1.0, offset=0):
+        """
+        Args:
+            num_keys: Размер каталога
+            requests: Длина потока (None - бесконечный)
+            alpha: Параметр перекоса (0 - равномерно)
+            offset: Первый ключ диапазона
+        """
+        if num_keys <= 0:
+            raise ValueError("num_keys must be positive")
+        self.num_keys = num_keys
+        self.requests = requests
+        self.alpha = alpha
+        self.offset = offset
+        self.cdf = _cdf([1.0 / (rank + 1) ** alpha for rank in range(num_keys)])
+
+    def _blocks(self, rng, block_size):
+        offset = self.offset
+        for count in self._sized_blocks(block_size):
+            block = _from_cdf(rng, self.cdf, count)
+            if np is not None:
+                yield block + offset
+            else:
+                yield [key + offset for key in block] if offset else block
+
+
+class UniformWorkload(Workload):
+    """Равномерный выбор из [offset, offset + num_keys)"""
+
+    def __init__(self, num_keys, requests=None, offset=0):
+        if num_keys <= 0:
+            raise ValueError("num_keys must be positive")
+        self.num_keys = num_keys
+        self.requests = requests
+        self.offset = offset
+
+    def _blocks(self, rng, block_size):
+        for count in self._sized_blocks(block_size):
+            yield _integers(rng, self.offset, self.offset + self.num_keys, count)
+
+
+class HotSetWorkload(Workload):
+    """
+    Горячее окно, дрейфующее по каталогу
+
+    Доля hot_fraction запросов идёт в окно из hot_size ключей, остальные -
+    равномерно по всему каталогу. Каждые drift_every запросов окно
+    сдвигается на drift ключей (по кругу).
+    """
+
+    def __init__(self, num_keys, hot_size, requests=None, hot_fraction=0.9,
+                 drift=1, drift_every=100, offset=0):
+        if not 0 < hot_size <= num_keys:
+            raise ValueError("hot_size must be in (0, num_keys]")
+        self.num_keys = num_keys
+        self.hot_size = hot_size
+        self.requests = requests
+        self.hot_fraction = hot_fraction
+        self.drift = drift
+        self.drift_every = drift_every
+        self.offset = offset
+
+    def _blocks(self, rng, block_size):
+        num_keys, hot_size, offset = self.num_keys, self.hot_size, self.offset
+        hot_fraction = self.hot_fraction
+        cold_scale = num_keys / (1 - hot_fraction) if hot_fraction < 1 else 0
+        position = 0
+        for count in self._sized_blocks(block_size):
+            # Одно число на запрос: и выбор окна, и ключ внутри него
+            draws = _randoms(rng, count)
+            if np is not None:
+                starts = (np.arange(position, position + count) // self.drift_every) * self.drift
+                window_keys = (starts + (draws / hot_fraction * hot_size).astype(np.int64)) % num_keys
+                cold_keys = ((draws - hot_fraction) * cold_scale).astype(np.int64)
+                yield np.where(draws < hot_fraction, window_keys, cold_keys) + offset
+            else:
+                block = []
+                for i, draw in enumerate(draws):
+                    if draw < hot_fraction:
+                        start = (position + i) // self.drift_every * self.drift
+                        block.append((start + int(draw / hot_fraction * hot_size)) % num_keys + offset)
+                    else:
+                        block.append(int((draw - hot_fraction) * cold_scale) + offset)
+                yield block
+            position += count
+
+    def hot_window(self, position):
+        """Ключи горячего окна на позиции position потока (для проверок)"""
+        start = position // self.drift_every * self.drift
+        return {(start + i) % self.num_keys + self.offset for i in range(self.hot_size)}
+
+
+class ScanWorkload(Workload):
+    """Последовательное сканирование offset, offset+1, ... (repeat раз)"""
+
+    def __init__(self, length, offset=0, repeat=1):
+        self.length = length
+        self.offset = offset
+        self.repeat = repeat
+        self.requests = length * repeat if repeat is not None else None
+
+    def _blocks(self, rng, block_size):
+        passes = range(self.repeat) if self.repeat is not None else iter(int, 1)
+        for _ in passes:
+            for start in range(self.offset, self.offset + self.length, block_size):
+                yield list(range(start, min(start + block_size, self.offset + self.length)))
+
+
+class LoopWorkload(Workload):
+    """Цикл по length ключам: offset, ..., offset+length-1, offset, ..."""
+
+    def __init__(self, length, requests=None, offset=0):
+        if length <= 0:
+            raise ValueError("length must be positive")
+        self.length = length
+        self.requests = requests
+        self.offset = offset
+
+    def _blocks(self, rng, block_size):
+        position = 0
+        for count in self._sized_blocks(block_size):
+            if np is not None:
+                yield np.arange(position, position + count) % self.length + self.offset
+            else:
+                yield [(position + i) % self.length + self.offset for i in range(count)]
+            position += count
+
+
+class ScanBurstsWorkload(Workload):
+    """
+    Базовая нагрузка, прерываемая сканированиями
+
+    Каждые every ключей базового потока вставляется сканирование из
+    scan_length новых ключей; ключи сканирований не повторяются и
+    начинаются с scan_offset.
+    """
+
+    def __init__(self, base, every, scan_length, scan_offset=10 ** 9, requests=None):
+        self.base = base
+        self.every = every
+        self.scan_length = scan_length
+        self.scan_offset = scan_offset
+        self.requests = requests if requests is not None else (
+            None if base.requests is None
+            else base.requests + base.requests // every * scan_length)
+
+    def _blocks(self, rng, block_size):
+        base = chain.from_iterable(self.base.blocks(block_size=block_size, rng=rng))
+        scan_start = self.scan_offset
+        while True:
+            chunk = list(islice(base, self.every))
+            if chunk:
+                yield chunk
+            if len(chunk) < self.every:
+                return
+            yield list(range(scan_start, scan_start + self.scan_length))
+            scan_start += self.scan_length
+
+
+class MixWorkload(Workload):
+    """Каждый запрос берётся из компонента, выбранного по весам"""
+
+    def __init__(self, components, requests=None):
+        """
+        Args:
+            components: Список (нагрузка, вес); компоненты должны быть
+                не короче своей доли смеси (проще всего - бесконечные)
+            requests: Длина потока
+        """
+        self.components = [workload for workload, _ in components]
+        self.cdf = _cdf([weight for _, weight in components])
+        self.requests = requests
+
+    def _mix(self, readers, choices):
+        """Собрать блок по номерам компонентов, сохраняя порядок каждого"""
+        choices = _as_list(choices)
+        counts = [0] * len(readers)
+        for index in choices:
+            counts[index] += 1
+        pulled = [iter(reader.take(count)) for reader, count in zip(readers, counts)]
+        return [next(pulled[index]) for index in choices]
+
+    def _readers(self, rng, block_size):
+        """
+        Читатели компонентов и генератор выбора компонента
+
+        У каждого свой генератор: иначе компоненты, читающие блоки
+        с опережением, и выбор делили бы один rng, и поток зависел бы
+        от block_size.
+        """
+        *rngs, chooser = _spawn(rng, len(self.components) + 1)
+        readers = [_Reader(workload.blocks(block_size=block_size, rng=component_rng))
+                   for workload, component_rng in zip(self.components, rngs)]
+        return readers, chooser
+
+    def _blocks(self, rng, block_size):
+        readers, chooser = self._readers(rng, block_size)
+        for count in self._sized_blocks(block_size):
+            yield self._mix(readers, _from_cdf(chooser, self.cdf, count))
+
+
+class DiurnalWorkload(MixWorkload):
+    """
+    Суточная смесь двух нагрузок
+
+    Доля day меняется по синусоиде между low и high с периодом period
+    запросов: пик в четверть периода, минимум - в три четверти.
+    """
+
+    def __init__(self, day, night, period, requests=None, low=0.1, high=0.9):
+        super().__init__([(day, 1), (night, 1)], requests)
+        self.period = period
+        self.low = low
+        self.high = high
+
+    def day_share(self, position):
+        """Доля дневной нагрузки в позиции position"""
+        wave = (1 + math.sin(2 * math.pi * position / self.period)) / 2
+        return self.low + (self.high - self.low) * wave
+
+    def _blocks(self, rng, block_size):
+        readers, chooser = self._readers(rng, block_size)
+        position = 0
+        for count in self._sized_blocks(block_size):
+            draws = _randoms(chooser, count)
+            if np is not None:
+                positions = np.arange(position, position + count)
+                shares = self.low + (self.high - self.low) * (
+                    1 + np.sin(2 * np.pi * positions / self.period)) / 2
+                choices = (draws >= shares).astype(np.int64)
+            else:
+                choices = [0 if draw < self.day_share(position + i) else 1
+                           for i, draw in enumerate(draws)]
+            yield self._mix(readers, choices)
+            position += count
+
+
+class PhasesWorkload(Workload):
+    """Фазы одна за другой; все фазы, кроме последней, конечны"""
+
+    def __init__(self, phases):
+        self.phases = list(phases)
+        if any(phase.requests is None for phase in self.phases[:-1]):
+            raise ValueError("Only the last phase may be infinite")
+        lengths = [phase.requests for phase in self.phases]
+        self.requests = None if None in lengths else sum(lengths)
+
+    def _blocks(self, rng, block_size):
+        for phase in self.phases:
+            yield from phase.blocks(block_size=block_size, rng=rng)
+
+
+def demo():
+    """Демонстрация нагрузок"""
+    print("=== Workload Generators Demo ===\n")
+    print(f"Бэкенд: {'numpy' if np is not None else 'random (numpy не установлен)'}\n")
+
+    zipf = list(ZipfWorkload(1000, 100000, alpha=1.0).stream(seed=1))
+    top = sum(1 for key in zipf if key < 200) / len(zipf)
+    print(f"1. Zipf(1.0), 1000 ключей: на 20% самых популярных приходится {top:.0%} запросов")
+
+    hot = HotSetWorkload(10000, 100, 20000, drift=10, drift_every=1000)
+    keys = list(hot.stream(seed=1))
+    print(f"2. Дрейфующее окно: начало в {min(keys[:900])}, через 19000 запросов - "
+          f"в районе {sorted(keys[19000:19900])[len(keys[19000:19900]) // 2]}")
+
+    bursts = ScanBurstsWorkload(ZipfWorkload(100, 20), every=10, scan_length=3, scan_offset=1000)
+    print(f"3. Zipf со сканированиями: {list(bursts.stream(seed=2))}")
+
+    diurnal = DiurnalWorkload(UniformWorkload(10), UniformWorkload(10, offset=100),
+                              period=10000, requests=10000)
+    keys = list(diurnal.stream(seed=3))
+    shares = [sum(1 for key in keys[i:i + 1000] if key < 100) / 1000 for i in range(0, 10000, 2500)]
+    print(f"4. Суточная смесь, доля дневных ключей по четвертям: {[f'{s:.0%}' for s in shares]}")
+
+    phases = PhasesWorkload([LoopWorkload(3, 7), ScanWorkload(4, offset=50)])
+    print(f"5. Фазы (цикл, затем скан): {list(phases.stream())}")
+
+
+def benchmark():
+    """Скорость генерации: блоки против выбора ключа на каждый запрос"""
+    print("\n=== Benchmark ===\n")
+
+    requests = 200000
+    num_keys = 3000
+
+    # Прежний способ: линейный проход по весам и f-строка на каждый запрос
+    weights = [4.0 if i < num_keys // 5 else 1.0 for i in range(num_keys)]
+    total = sum(weights)
+    weights = [w / total for w in weights]
+    start = time.perf_counter()
+    for _ in range(requests // 100):
+        r = random.random()
+        cumsum = 0
+        for i, w in enumerate(weights):
+            cumsum += w
+            if r < cumsum:
+                key = f"key_{i}"
+                break
+    per_request = (time.perf_counter() - start) * 100
+    print(f"{'Линейный проход по весам':<26} {per_request / requests * 1e9:>7.0f} ns/key")
+
+    keys = [f"key_{i}" for i in range(num_keys)]
+    start = time.perf_counter()
+    for _ in range(requests):
+        key = random.choice(keys)
+    print(f"{'random.choice':<26} {(time.perf_counter() - start) / requests * 1e9:>7.0f} ns/key")
+
+    for name, workload in [("Zipf(1.0) блоками", ZipfWorkload(num_keys, requests)),
+                           ("HotSet блоками", HotSetWorkload(num_keys, 100, requests)),
+                           ("Uniform блоками", UniformWorkload(num_keys, requests))]:
+        start = time.perf_counter()
+        for key in workload.stream(seed=1):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"{name:<26} {elapsed / requests * 1e9:>7.0f} ns/key")
+
+
+def test_correctness():
+    """Тесты корректности"""
+    print("\n=== Workload Generators Correctness Tests ===\n")
+
+    # Тест 1: Длина, диапазон и воспроизводимость
+    for workload in (ZipfWorkload(50, 1000, offset=10), UniformWorkload(50, 1000, offset=10),
+                     HotSetWorkload(50, 5, 1000, offset=10), LoopWorkload(50, 1000, offset=10)):
+        keys = list(workload.stream(seed=7, block_size=64))
+        assert len(keys) == len(workload) == 1000, f"{type(workload).__name__}: length"
+        assert all(10 <= key < 60 for key in keys), f"{type(workload).__name__}: range"
+        assert all(type(key) is int for key in keys), f"{type(workload).__name__}: int keys"
+        assert keys == list(workload.stream(seed=7, block_size=1000)), \
+            f"{type(workload).__name__}: same seed, same stream"
+    print("✓ Test 1: Lengths, ranges and seeds")
+
+    # Тест 2: Частоты Zipf соответствуют закону 1/r^alpha
+    keys = list(ZipfWorkload(100, 200000, alpha=1.0).stream(seed=1))
+    counts = [keys.count(rank) for rank in range(4)]
+    for rank in range(1, 4):
+        ratio = counts[0] / counts[rank]
+        assert abs(ratio - (rank + 1)) < 0.15 * (rank + 1), f"Zipf ratio for rank {rank}: {ratio:.2f}"
+    print("✓ Test 2: Zipf frequencies")
+
+    # Тест 3: Горячее окно дрейфует
+    hot = HotSetWorkload(1000, 20, 5000, hot_fraction=1.0, drift=20, drift_every=500)
+    keys = list(hot.stream(seed=3))
+    for position in (0, 2499, 4999):
+        assert keys[position] in hot.hot_window(position), "Key must be in the current window"
+    assert not set(keys[:500]) & set(keys[4500:]), "Window must move away"
+    print("✓ Test 3: Drifting hot set")
+
+    # Тест 4: Сканирования, циклы и фазы
+    assert list(LoopWorkload(3, 7).stream()) == [0, 1, 2, 0, 1, 2, 0], "Loop"
+    assert list(ScanWorkload(3, offset=5, repeat=2).stream()) == [5, 6, 7, 5, 6, 7], "Scan"
+    phases = PhasesWorkload([ScanWorkload(2), LoopWorkload(1, 2, offset=9)])
+    assert list(phases.stream(block_size=1)) == [0, 1, 9, 9] and len(phases) == 4, "Phases"
+    bursts = list(ScanBurstsWorkload(LoopWorkload(1, 4), every=2, scan_length=2,
+                                     scan_offset=100).stream())
+    assert bursts == [0, 0, 100, 101, 0, 0, 102, 103], f"Scan bursts: {bursts}"
+    print("✓ Test 4: Scans, loops and phases")
+
+    # Тест 5: Смеси соблюдают веса и порядок компонентов
+    mix = MixWorkload([(LoopWorkload(10 ** 6), 3), (LoopWorkload(10 ** 6, offset=10 ** 7), 1)], 40000)
+    keys = list(mix.stream(seed=5, block_size=999))
+    first = [key for key in keys if key < 10 ** 7]
+    assert first == list(range(len(first))), "Component order must be preserved"
+    assert abs(len(first) / len(keys) - 0.75) < 0.02, "Weights must hold"
+
+    diurnal = DiurnalWorkload(UniformWorkload(10), UniformWorkload(10, offset=100),
+                              period=20000, requests=20000, low=0.0, high=1.0)
+    keys = list(diurnal.stream(seed=5))
+    peak = sum(1 for key in keys[4000:6000] if key < 100) / 2000
+    trough = sum(1 for key in keys[14000:16000] if key < 100) / 2000
+    assert peak > 0.9 and trough < 0.1, f"Diurnal shares: {peak:.2f} / {trough:.2f}"
+
+    # Поток смеси не зависит от размера блока
+    mix = MixWorkload([(ZipfWorkload(1000), 2), (UniformWorkload(1000, offset=5000), 1),
+                       (HotSetWorkload(1000, 50, offset=9000), 1)], 5000)
+    for workload in (mix, diurnal):
+        keys = list(workload.stream(seed=11, block_size=BLOCK_SIZE))
+        for block_size in (1, 97, 4096):
+            assert list(workload.stream(seed=11, block_size=block_size)) == keys, \
+                f"{type(workload).__name__}: stream depends on block_size={block_size}"
+    print("✓ Test 5: Mixes")
+
+    print("\nAll tests passed!")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
+    test_correctness()
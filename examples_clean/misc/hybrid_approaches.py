@@ -1,6 +1,8 @@
 # Гибридные подходы
 
 # Техномир: адаптивный выбор стратегии
+# (паттерн доступа по ключу; выбор политики вытеснения на лету -
+# AdaptivePolicyCache в algorithms/adaptive_policy_cache.py)
 class AdaptiveCacheStrategy:
     def __init__(self, cache, db):
         self.cache = cache
@@ -2,19 +2,46 @@
 
 # Техномир: расчёт накладных расходов
 class CacheOverhead:
+    def __init__(self, cost_model=None):
+        """
+        cost_model: GDSFCache из algorithms/gdsf_cost_aware.py - стоимость
+        промаха берётся из замеров загрузчика, а не из константы
+        """
+        self.cost_model = cost_model
+
+    def db_query_ms(self, request):
+        """Стоимость запроса к БД при miss (измеренная, если есть модель)"""
+        if self.cost_model is None:
+            return 15            # Оценка «на глаз» без замеров
+        return self.cost_model.estimate_cost(request) * 1000
+
     def calculate_total_cost(self, request):
         """Полная стоимость обслуживания запроса с кэшем"""
         cache_lookup_ms = 1      # Проверка кэша
         serialize_ms = 5         # Сериализация объекта
         network_ms = 2           # Передача по сети
         deserialize_ms = 3       # Десериализация
-        db_query_ms = 15         # Запрос к БД при miss
+        db_query_ms = self.db_query_ms(request)
 
         cache_hit_cost = cache_lookup_ms + deserialize_ms
         cache_miss_cost = (cache_lookup_ms + db_query_ms +
                           serialize_ms + network_ms)
 
-        # Если hit rate < 60%, то кэш медленнее прямого обращения к БД
         return cache_hit_cost, cache_miss_cost
 
-# БД быстрая (SSD, индексы) + низкий hit rate = кэш вреден
\ No newline at end of file
+    def break_even_hit_rate(self, request):
+        """Hit rate, ниже которого кэш медленнее прямого обращения к БД"""
+        hit_cost, miss_cost = self.calculate_total_cost(request)
+        db_query_ms = self.db_query_ms(request)
+        if db_query_ms <= hit_cost:
+            return None          # Кэш не окупается ни при каком hit rate
+        # hit_rate * hit_cost + (1 - hit_rate) * miss_cost = db_query_ms
+        return (miss_cost - db_query_ms) / (miss_cost - hit_cost)
+
+# Использование с измеренной стоимостью:
+#   costs = GDSFCache(10_000, loader=load_from_db, cost_class=key_prefix)
+#   ... рабочий трафик через costs.get_or_load(key) ...
+#   CacheOverhead(costs).break_even_hit_rate("user:42")
+#   # Быстрый SQL (2 мс) - кэш вреден всегда, отчёт (120 мс) - окупается почти сразу
+
+# БД быстрая (SSD, индексы) + низкий hit rate = кэш вреден